@@ -140,12 +140,14 @@ def cloudsc_validate(fields, ref_fields, cloudsc_args):
 @click.command()
 @click.option('--regenerate/--no-regenerate', default=False,
               help='Re-generate the kernel file from source. (NOTE: DO NOT USE!!!)')
-def dwarf_cloudsc(regenerate):
+@click.option('--engine', type=click.Choice(['gt4py', 'numpy', 'python']), default='gt4py',
+              help='Kernels to run: GT4Py, NumPy (vectorized over the columns) or pure Python.')
+def dwarf_cloudsc(regenerate, engine):
     """
     Run that dwarf, ...!
     """
 
-    use_gt4py = True
+    use_gt4py = engine == 'gt4py'
 
     # Get raw input fields and parameters from input file
     input_path = rootpath/'config-files/input.h5'
@@ -185,7 +187,10 @@ def dwarf_cloudsc(regenerate):
     # Load the kernel dynamically
     sys.path.insert(0, str(rootpath/'src/cloudsc2_nl_gt4py'))
     from cloudsc2_py import cloudsc2_py, satur
-    from cloudsc2_gt4py import cloudsc2_py_gt4py, satur_py_gt4py
+    if use_gt4py:
+        from cloudsc2_gt4py import cloudsc2_py_gt4py, satur_py_gt4py
+    if engine == 'numpy':
+        from cloudsc2_numpy import cloudsc2_numpy as cloudsc2_py, satur_numpy as satur
 
     satur_args['kflag'] = 2
 
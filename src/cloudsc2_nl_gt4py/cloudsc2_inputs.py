@@ -3,6 +3,7 @@ import numpy as np
 
 from pathlib import Path
 from collections import OrderedDict
+from functools import lru_cache
 
 
 NCLV = 5      # number of microphysics variables
@@ -45,7 +46,11 @@ def load_input_fields(path, transpose=False):
     return fields
 
 
+@lru_cache(maxsize=None)
 def load_input_parameters(path):
+    """
+    Load the parameter blocks; the result is cached per input path.
+    """
     class TECLDP:
         pass
     yrecldp = TECLDP()
@@ -67,55 +72,57 @@ def load_input_parameters(path):
     yrecld = TECLD()
 
     with h5py.File(path, 'r') as f:
-        tecldp_keys = [k for k in f.keys() if 'YRECLDP' in k]
-        for k in tecldp_keys:
-            attrkey = k.replace('YRECLDP_', '').lower()
-            setattr(yrecldp, attrkey, f[k][0])
-
-        tephli_keys = [k for k in f.keys() if 'YREPHLI' in k]
-        for k in tephli_keys:
-            attrkey = k.replace('YREPHLI_', '').lower()
-            setattr(yrephli, attrkey, f[k][0])
-
-        yrmcst.rg = f['RG'][0]
-        yrmcst.rd = f['RD'][0]
-        yrmcst.rcpd = f['RCPD'][0]
-        yrmcst.retv = f['RETV'][0]
-        yrmcst.rlvtt = f['RLVTT'][0]
-        yrmcst.rlstt = f['RLSTT'][0]
-        yrmcst.rlmlt = f['RLMLT'][0]
-        yrmcst.rtt = f['RTT'][0]
-        yrmcst.rv = f['RV'][0]
-
-        yrethf.r2es = f['R2ES'][0]
-        yrethf.r3les = f['R3LES'][0]
-        yrethf.r3ies = f['R3IES'][0]
-        yrethf.r4les = f['R4LES'][0]
-        yrethf.r4ies = f['R4IES'][0]
-        yrethf.r5les = f['R5LES'][0]
-        yrethf.r5ies = f['R5IES'][0]
-        yrethf.r5alvcp = f['R5ALVCP'][0]
-        yrethf.r5alscp = f['R5ALSCP'][0]
-        yrethf.ralvdcp = f['RALVDCP'][0]
-        yrethf.ralsdcp = f['RALSDCP'][0]
-        yrethf.ralfdcp = f['RALFDCP'][0]
-        yrethf.rtwat = f['RTWAT'][0]
-        yrethf.rtice = f['RTICE'][0]
-        yrethf.rticecu = f['RTICECU'][0]
-        yrethf.rtwat_rtice_r = f['RTWAT_RTICE_R'][0]
-        yrethf.rtwat_rticecu_r = f['RTWAT_RTICECU_R'][0]
-        yrethf.rkoop1 = f['RKOOP1'][0]
-        yrethf.rkoop2 = f['RKOOP2'][0]
-
-        yrethf.rvtmp2 = 0.0
-
-        klev = f['KLEV'][0]
+        # Read all scalar datasets in a single pass
+        scalars = {
+            k: ds[0] for k, ds in f.items() if isinstance(ds, h5py.Dataset) and ds.shape == (1,)
+        }
+
+        klev = scalars['KLEV']
         pap = np.ascontiguousarray(f['PAP'])
         paph = np.ascontiguousarray(f['PAPH'])
-        yrecld.ceta = np.ndarray(order="C", shape=(klev, ))
-        yrecld.ceta[:] = pap[0:,0] / paph[klev,0]
 
-        yrephli.lphylin = True
+    for k, v in scalars.items():
+        if k.startswith('YRECLDP_'):
+            setattr(yrecldp, k.replace('YRECLDP_', '').lower(), v)
+        elif k.startswith('YREPHLI_'):
+            setattr(yrephli, k.replace('YREPHLI_', '').lower(), v)
+
+    yrmcst.rg = scalars['RG']
+    yrmcst.rd = scalars['RD']
+    yrmcst.rcpd = scalars['RCPD']
+    yrmcst.retv = scalars['RETV']
+    yrmcst.rlvtt = scalars['RLVTT']
+    yrmcst.rlstt = scalars['RLSTT']
+    yrmcst.rlmlt = scalars['RLMLT']
+    yrmcst.rtt = scalars['RTT']
+    yrmcst.rv = scalars['RV']
+
+    yrethf.r2es = scalars['R2ES']
+    yrethf.r3les = scalars['R3LES']
+    yrethf.r3ies = scalars['R3IES']
+    yrethf.r4les = scalars['R4LES']
+    yrethf.r4ies = scalars['R4IES']
+    yrethf.r5les = scalars['R5LES']
+    yrethf.r5ies = scalars['R5IES']
+    yrethf.r5alvcp = scalars['R5ALVCP']
+    yrethf.r5alscp = scalars['R5ALSCP']
+    yrethf.ralvdcp = scalars['RALVDCP']
+    yrethf.ralsdcp = scalars['RALSDCP']
+    yrethf.ralfdcp = scalars['RALFDCP']
+    yrethf.rtwat = scalars['RTWAT']
+    yrethf.rtice = scalars['RTICE']
+    yrethf.rticecu = scalars['RTICECU']
+    yrethf.rtwat_rtice_r = scalars['RTWAT_RTICE_R']
+    yrethf.rtwat_rticecu_r = scalars['RTWAT_RTICECU_R']
+    yrethf.rkoop1 = scalars['RKOOP1']
+    yrethf.rkoop2 = scalars['RKOOP2']
+
+    yrethf.rvtmp2 = 0.0
+
+    yrecld.ceta = np.ndarray(order="C", shape=(klev, ))
+    yrecld.ceta[:] = pap[0:,0] / paph[klev,0]
+
+    yrephli.lphylin = True
 
     return yrecldp, yrmcst, yrethf, yrephli, yrecld
 
@@ -0,0 +1,448 @@
+import numpy as np
+
+# NumPy versions of the kernels in cloudsc2_py.py, with the same arguments. Only the vertical
+# loop is kept: each level is computed at once over the columns 0:kfdia, the branches on the
+# column values being turned into masks (np.where). Both branches of a mask are evaluated, so
+# the floating point warnings raised by the discarded one are silenced.
+
+def foealfa(ptare, yrethf):
+  return np.minimum(1.0,((np.maximum(yrethf.rtice,np.minimum(yrethf.rtwat,ptare))-yrethf.rtice)*yrethf.rtwat_rtice_r)**2)
+
+def foeewm(ptare, yrethf, yrmcst):
+  return yrethf.r2es*(foealfa(ptare, yrethf)*np.exp(yrethf.r3les*(ptare-yrmcst.rtt)/(ptare-yrethf.r4les)) + \
+                      (1.0-foealfa(ptare, yrethf))*np.exp(yrethf.r3ies*(ptare-yrmcst.rtt)/(ptare-yrethf.r4ies)))
+
+def foealfcu(ptare, yrethf):
+  return np.minimum(1.0,((np.maximum(yrethf.rticecu,np.minimum(yrethf.rtwat,ptare))-yrethf.rticecu)*yrethf.rtwat_rticecu_r)**2)
+
+def foeewmcu(ptare, yrethf, yrmcst):
+  return yrethf.r2es*(foealfcu(ptare, yrethf)*np.exp(yrethf.r3les*(ptare-yrmcst.rtt)/(ptare-yrethf.r4les)) + \
+                      (1.0-foealfcu(ptare, yrethf))*np.exp(yrethf.r3ies*(ptare-yrmcst.rtt)/(ptare-yrethf.r4ies)))
+
+
+def satur_numpy(kidia, kfdia, klon, ktdia, klev, ldphylin, paprsf, pt, pqsat, kflag, yrethf, yrmcst):
+
+    #----------------------------------------------------------------------
+    #*    1.           DEFINE CONSTANTS
+    zqmax = 0.5
+
+    #     *
+    #----------------------------------------------------------------------
+    #     *    2.           CALCULATE SATURATION SPECIFIC HUMIDITY
+    #                       --------------------------------------
+
+    ztarg = pt[:klev, :kfdia]
+    if ldphylin:
+        zalfa = foealfa(ztarg, yrethf)
+
+        zfoeewl = yrethf.r2es*np.exp(yrethf.r3les*(ztarg-yrmcst.rtt)/(ztarg-yrethf.r4les))
+        zfoeewi = yrethf.r2es*np.exp(yrethf.r3ies*(ztarg-yrmcst.rtt)/(ztarg-yrethf.r4ies))
+        zfoeew = zalfa*zfoeewl+(1.0-zalfa)*zfoeewi
+
+        zqs    = np.minimum(zfoeew/paprsf[:klev, :kfdia], zqmax)
+
+    else:
+        if(kflag == 1):
+            zew  = foeewmcu(ztarg, yrethf, yrmcst)
+        else:
+            zew  = foeewm(ztarg, yrethf, yrmcst)
+
+        zqs  = np.minimum(zqmax, zew/paprsf[:klev, :kfdia])
+
+    zcor = 1.0/(1.0-yrmcst.retv*zqs)
+    pqsat[:klev, :kfdia]=zqs*zcor
+
+
+def cloudsc2_numpy(kidia: None, kfdia: None, klon: None, ktdia: None, klev: None, ldrain1d: None, \
+  ptsphy: None, paphp1: None, papp1: None, pqm1: None, pqs: None, ptm1: None, pl: None, pi: None, \
+  plude: None, plu: None, pmfu: None, pmfd: None, ptent: None, pgtent: None, ptenq: None, \
+  pgtenq: None, ptenl: None, pgtenl: None, pteni: None, pgteni: None, psupsat: None, pclc: None, \
+  pfplsl: None, pfplsn: None, pfhpsl: None, pfhpsn: None, pcovptot: None, \
+  yrecldp: None, yrecld: None, yrmcst: None, yrethf:None, yrephli: None):
+  with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+    _cloudsc2_numpy(kfdia, klev, ldrain1d, ptsphy, paphp1, papp1, pqm1, pqs, ptm1, pl, pi, plude, \
+      plu, pmfu, pmfd, ptent, pgtent, ptenq, pgtenq, ptenl, pgtenl, pteni, pgteni, psupsat, \
+      pclc, pfplsl, pfplsn, pfhpsl, pfhpsn, pcovptot, yrecldp, yrecld, yrmcst, yrethf, yrephli)
+
+
+def _cloudsc2_numpy(kfdia, klev, ldrain1d, ptsphy, paphp1, papp1, pqm1, pqs, ptm1, pl, pi, plude, \
+  plu, pmfu, pmfd, ptent, pgtent, ptenq, pgtenq, ptenl, pgtenl, pteni, pgteni, psupsat, pclc, \
+  pfplsl, pfplsn, pfhpsl, pfhpsn, pcovptot, yrecldp, yrecld, yrmcst, yrethf, yrephli):
+
+  #=======================================================================
+  #     TUNABLE CONSTANTS (to be moved to include files later)
+  #=======================================================================
+
+  # zscal is a scale factor that linearly reduces the variance between
+  # qv=qv-crit and qv-qsat
+  # 0 = No scaling
+  # 1 = full scaling (i.e. variance=0 when qv=qsat)
+
+  zscal = 0.9
+
+  #=======================================================================
+
+  # the columns processed
+  jl = slice(0, kfdia)
+
+  #*         1.     SET-UP INPUT QUANTITIES
+  #                 -----------------------
+
+  #*         1.1    Set-up tunning parameters
+
+  # set up constants required
+
+  zckcodtl = 2.0*yrecldp.rkconv*ptsphy
+  zckcodti = 5.0*yrecldp.rkconv*ptsphy
+  zcons2 = 1.0 / ((ptsphy*yrmcst.rg))
+  zcons3 = yrmcst.rlvtt / yrmcst.rcpd
+  zmeltp2 = yrmcst.rtt + 2.0
+  zqtmst = 1.0 / ptsphy
+
+  zqmax = 0.5
+  zeps1 = 1.E-12
+  zeps2 = 1.E-10
+
+  #     --------------------------------------------------------------------
+
+  #*         2.1    COMPUTE CRITICAL RELATIVE HUMIDITY AND RELATIVE HUMIDITY
+  #                 --------------------------------------------------------
+
+  # first guess values for T, q, ql and qi
+
+  ztp1 = ptm1[:klev, jl] + ptsphy*pgtent[:klev, jl]
+  zqp1 = pqm1[:klev, jl] + ptsphy*pgtenq[:klev, jl] + psupsat[:klev, jl]
+  zl = pl[:klev, jl] + ptsphy*pgtenl[:klev, jl]
+  zi = pi[:klev, jl] + ptsphy*pgteni[:klev, jl]
+
+  # Parameter for cloud formation
+
+  zscalm = zscal*np.maximum((np.asarray(yrecld.ceta[:klev]) - 0.2), zeps1)**0.2
+
+  # thermodynamic constants
+
+  zdp = paphp1[1:klev+1, jl] - paphp1[:klev, jl]
+  zzz = 1.0 / (yrmcst.rcpd + yrmcst.rcpd*yrethf.rvtmp2*zqp1)
+  zlfdcp = yrmcst.rlmlt*zzz
+  zlsdcp = yrmcst.rlstt*zzz
+  zlvdcp = yrmcst.rlvtt*zzz
+
+  #     ------------------------------------------------------------------
+
+  #*         2.2    INITIALIZATION OF CLOUD AND PRECIPITATION ARRAYS
+  #                 ------------------------------------------------
+
+  #       Clear cloud and freezing arrays
+
+  pclc[:klev, jl] = 0.0
+  pcovptot[:klev, jl] = 0.0
+
+  #       Set to zero precipitation fluxes at the top
+
+  zrfl = np.zeros_like(ztp1[0])
+  zsfl = np.zeros_like(ztp1[0])
+  pfplsl[0, jl] = 0.0
+  pfplsn[0, jl] = 0.0
+  zcovptot = np.zeros_like(ztp1[0])
+
+  # Eta value at tropopause
+  ztrpaus = np.full_like(ztp1[0], 0.1)
+  for jk in range(klev - 1):
+    if yrecld.ceta[jk] > 0.1 and yrecld.ceta[jk] < 0.4:
+      ztrpaus = np.where(ztp1[jk] > ztp1[jk+1], yrecld.ceta[jk], ztrpaus)
+
+  # set up critical value of humidity (the level-independent part)
+
+  zeta3 = ztrpaus
+  zrh1 = 1.0
+  zrh2 = 0.35 + 0.14*((zeta3 - 0.25) / 0.15)**2 + (0.04*np.minimum(zeta3 - 0.25, 0.0)) / 0.15
+  zrh3 = 1.0
+  zdeta2 = 0.3
+  zdeta1 = 0.09 + (0.16*(0.4 - zeta3)) / 0.3
+
+  #     ------------------------------------------------------------------
+
+  #*        3. COMPUTE LAYER CLOUD AMOUNTS
+  #            ---------------------------
+
+  # Large loop over KLEV
+  # Calculates
+  #   1. diagnostic CC and QL
+  #   2. Convective CC and QL
+  #   3. Rainfall
+
+  for jk in range(klev):
+
+    #       3.1   INITIALIZATION
+
+    #-----------------------------------
+    # calculate dqs/dT correction factor
+    #-----------------------------------
+
+    if yrephli.lphylin or ldrain1d:
+      zoealfaw = 0.545*(np.tanh(0.17*(ztp1[jk] - yrephli.rlptrc)) + 1.0)
+      llcold = ztp1[jk] < yrmcst.rtt
+      zfwat = np.where(llcold, zoealfaw, 1.0)
+      z3es = np.where(llcold, yrethf.r3ies, yrethf.r3les)
+      z4es = np.where(llcold, yrethf.r4ies, yrethf.r4les)
+      zfoeew = yrethf.r2es*np.exp((z3es*(ztp1[jk] - yrmcst.rtt)) / (ztp1[jk] - z4es))
+      zesdp = np.minimum(zfoeew / papp1[jk, jl], zqmax)
+    else:
+      zfwat = foealfa(ztp1[jk], yrethf)
+      zfoeew = foeewm(ztp1[jk], yrethf, yrmcst)
+      zesdp = zfoeew / papp1[jk, jl]
+    zfacw = yrethf.r5les / ((ztp1[jk] - yrethf.r4les)**2)
+    zfaci = yrethf.r5ies / ((ztp1[jk] - yrethf.r4ies)**2)
+    zfac = zfwat*zfacw + (1.0 - zfwat)*zfaci
+    zcor = 1.0 / (1.0 - yrmcst.retv*zesdp)
+    zdqsdtemp = zfac*zcor*pqs[jk, jl]
+    zcorqs = 1.0 + zcons3*zdqsdtemp
+
+    # use clipped state
+
+    zqlim = np.minimum(zqp1[jk], pqs[jk, jl])
+
+    # set up critical value of humidity
+
+    zeta = yrecld.ceta[jk]
+    zcrh2 = np.where(zeta < zeta3, zrh3,
+      np.where(zeta < zeta3 + zdeta2, zrh3 + (zrh2 - zrh3)*((zeta - zeta3) / zdeta2),
+      np.where(zeta < 1.0 - zdeta1, zrh2, zrh1 + (zrh2 - zrh1)*((1.0 - zeta) / zdeta1)**0.5)))
+    # Allow ice supersaturation at cold temperatures
+    zsupsat = np.where(ztp1[jk] < yrethf.rtice, 1.8 - 3.E-03*ztp1[jk], 1.0)
+    zqsat = pqs[jk, jl]*zsupsat
+    zqcrit = zcrh2*zqsat
+
+    # Simple UNIFORM distribution of total water from Letreut & Li (90)
+
+    zqt = zqp1[jk] + zl[jk] + zi[jk]
+    zqpd = zqsat - zqt
+    zqcd = zqsat - zqcrit
+    zclc = 1.0 - np.sqrt(zqpd / (zqcd - zscalm[jk]*(zqt - zqcrit)))
+    llclear = zqt <= zqcrit
+    llsat = zqt >= zqsat
+    zqc = np.where(llclear, 0.0, np.where(llsat, (1.0 - zscalm[jk])*(zqsat - zqcrit), \
+      (zscalm[jk]*zqpd + (1.0 - zscalm[jk])*zqcd)*zclc**2))
+    zclc = np.where(llclear, 0.0, np.where(llsat, 1.0, zclc))
+
+    # Add convective component
+
+    zgdp = yrmcst.rg / (paphp1[jk+1, jl] - paphp1[jk, jl])
+    zlude = plude[jk, jl]*ptsphy*zgdp
+    if jk < klev - 1:
+      llo1 = (zlude >= yrecldp.rlmin) & (plu[jk+1, jl] >= zeps2)
+      zclc = np.where(llo1, zclc + (1.0 - zclc)*(1.0 - np.exp(-zlude / plu[jk+1, jl])), zclc)
+      zqc = np.where(llo1, zqc + zlude, zqc)
+    pclc[jk, jl] = zclc
+
+    # Add compensating subsidence component
+
+    zfac1 = 1.0 / ((yrmcst.rd*ztp1[jk]))
+    zrho = papp1[jk, jl]*zfac1
+    zfac2 = 1.0 / (papp1[jk, jl] - yrmcst.retv*zfoeew)
+    zrodqsdp = -zrho*pqs[jk, jl]*zfac2
+    zldcp = zfwat*zlvdcp[jk] + (1.0 - zfwat)*zlsdcp[jk]
+    zfac3 = 1.0 / (1.0 + zldcp*zdqsdtemp)
+    dtdzmo = yrmcst.rg*(1.0 / yrmcst.rcpd - zldcp*zrodqsdp)*zfac3
+    zdqsdz = zdqsdtemp*dtdzmo - yrmcst.rg*zrodqsdp
+    zfac4 = 1.0 / zrho
+    zdqc = np.minimum(zdqsdz*(pmfu[jk, jl] + pmfd[jk, jl])*ptsphy*zfac4, zqc)
+    zqc = zqc - zdqc
+
+    # New cloud liquid/ice contents and condensation rates (liquid/ice)
+
+    zqlwc = zqc*zfwat
+    zqiwc = zqc*(1.0 - zfwat)
+    zcondl = (zqlwc - zl[jk])*zqtmst
+    zcondi = (zqiwc - zi[jk])*zqtmst
+
+    # Calculate precipitation overlap.
+    # Simple form based on Maximum Overlap.
+
+    # total rain frac
+    zcovptot = np.where(zclc > zcovptot, zclc, zcovptot)
+    zcovpclr = np.maximum(zcovptot - zclc, 0.0)        # clear sky frac
+
+    #*         3.3    CALCULATE PRECIPITATION
+
+    # Melting of incoming snow
+
+    zcons = (zcons2*zdp[jk]) / zlfdcp[jk]
+    zsnmlt = np.where(zsfl != 0.0, np.minimum(zsfl, zcons*np.maximum(0.0, (ztp1[jk] - zmeltp2))), 0.0)
+    zrfln = zrfl + zsnmlt
+    zsfln = zsfl - zsnmlt
+    ztp1[jk] = np.where(zsfl != 0.0, ztp1[jk] - zsnmlt / zcons, ztp1[jk])
+
+    llcld = zclc > zeps2
+
+    #   Diagnostic calculation of rain production from cloud liquid water
+
+    # if yrphnc.levapls2 or ldrain1d:
+    if False or ldrain1d:
+      zlcrit = 1.9*yrecldp.rclcrit
+    else:
+      zlcrit = yrecldp.rclcrit*2.
+    zcldl = zqlwc / zclc          # in-cloud liquid
+    zd = zckcodtl*(1.0 - np.exp(-(zcldl / zlcrit)**2))
+    zlnew = zclc*zcldl*np.exp(-zd)
+    zprr = np.where(llcld, zqlwc - zlnew, 0.0)
+    zqlwc = zqlwc - zprr
+
+    #   Diagnostic calculation of snow production from cloud ice
+
+    # if yrphnc.levapls2 or ldrain1d:
+    if False or ldrain1d:
+      zlcrit = 1.E-04
+    else:
+      zlcrit = yrecldp.rclcrit*2.
+    zcldi = zqiwc / zclc          # in-cloud ice
+    zd = zckcodti*np.exp(0.025*(ztp1[jk] - yrmcst.rtt))*(1.0 - np.exp(-(zcldi / zlcrit)**2))
+    zinew = zclc*zcldi*np.exp(-zd)
+    zprs = np.where(llcld, zqiwc - zinew, 0.0)
+    zqiwc = zqiwc - zprs
+
+    #   New precipitation (rain + snow)
+
+    zdr = zcons2*zdp[jk]*(zprr + zprs)
+
+    #   Rain fraction (different from cloud liquid water fraction!)
+
+    llcold = ztp1[jk] < yrmcst.rtt
+    zrfreeze = np.where(llcold, zcons2*zdp[jk]*zprr, 0.0)
+    zfwatr = np.where(llcold, 0.0, 1.0)
+
+    zrn = zfwatr*zdr
+    zsn = (1.0 - zfwatr)*zdr
+    zrfln = zrfln + zrn
+    zsfln = zsfln + zsn
+
+    #   Precip evaporation
+
+    if ldrain1d:
+      zprtot = zrfln + zsfln
+      llo2 = (zprtot > zeps2) & (zcovpclr > zeps2)
+
+      zpreclr = (zprtot*zcovpclr) / zcovptot
+
+      #     This is the humidity in the moistest zcovpclr region
+
+      zqe = pqs[jk, jl] - ((pqs[jk, jl] - zqlim)*zcovpclr) / (1.0 - zclc)**2
+      zbeta = yrmcst.rg*yrecldp.rpecons*(((np.sqrt(papp1[jk, jl] / paphp1[klev, jl]) / \
+        5.09E-3)*zpreclr) / zcovpclr)**0.5777
+
+      #     implicit solution:
+      zb = (ptsphy*zbeta*(pqs[jk, jl] - zqe)) / (1.0 + zbeta*ptsphy*zcorqs)
+
+      #     exact solution:
+      #     ZB=(PQS(JL,JK)-ZQE)*(_ONE_-EXP(-ZBETA*ZCORQS(JL)*PTSPHY))/ZCORQS(JL)
+
+      zdtgdp = (ptsphy*yrmcst.rg) / (paphp1[jk+1, jl] - paphp1[jk, jl])
+
+      zdpr = (zcovpclr*zb) / zdtgdp
+      zdpr = np.minimum(zdpr, zpreclr)
+      zpreclr = zpreclr - zdpr          # take away from clr sky flux
+      zcovptot = np.where(llo2 & (zpreclr <= 0.0), zclc, zcovptot)
+      #reset
+      pcovptot[jk, jl] = np.where(llo2, zcovptot, 0.0)
+
+      # warm proportion
+      zevapr = np.where(llo2, (zdpr*zrfln) / zprtot, 0.0)
+      zrfln = zrfln - zevapr
+
+      # ice proportion
+      zevaps = np.where(llo2, (zdpr*zsfln) / zprtot, 0.0)
+      zsfln = zsfln - zevaps
+    else:
+      zevapr = 0.0
+      zevaps = 0.0
+
+    # Update of T and Q tendencies due to:
+    #  - condensation/evaporation of cloud liquid water/ice
+    #  - detrainment of convective cloud condensate
+    #  - evaporation of precipitation
+    #  - freezing of rain (impact on T only).
+
+    zdqdt = -(zcondl + zcondi) + (plude[jk, jl] + zevapr + zevaps)*zgdp
+
+    zdtdt = zlvdcp[jk]*zcondl + zlsdcp[jk]*zcondi - (zlvdcp[jk]*zevapr + \
+      zlsdcp[jk]*zevaps + plude[jk, jl]*(zfwat*zlvdcp[jk] + (1.0 - zfwat)*zlsdcp[jk]) - \
+      (zlsdcp[jk] - zlvdcp[jk])*zrfreeze)*zgdp
+
+    # first guess T and Q
+    ztp1[jk] = ztp1[jk] + ptsphy*zdtdt
+    zqp1[jk] = zqp1[jk] + ptsphy*zdqdt
+
+    zpp = papp1[jk, jl]
+    zqold = zqp1[jk].copy()
+
+    # clipping of final qv
+
+    # -----------------------------------
+    # Manually inlined CUADJTQS
+    # -----------------------------------
+    zqmax = 0.5
+    llwarm = ztp1[jk] > yrmcst.rtt
+    z3es = np.where(llwarm, yrethf.r3les, yrethf.r3ies)
+    z4es = np.where(llwarm, yrethf.r4les, yrethf.r4ies)
+    z5alcp = np.where(llwarm, yrethf.r5alvcp, yrethf.r5alscp)
+    zaldcp = np.where(llwarm, yrethf.ralvdcp, yrethf.ralsdcp)
+
+    zqp = 1.0 / zpp
+    for _ in range(2):
+      ztarg = ztp1[jk]
+      zfoeew = yrethf.r2es*np.exp((z3es*(ztarg - yrmcst.rtt)) / (ztarg - z4es))
+      zqsat = np.minimum(zqp*zfoeew, zqmax)
+      zcor = 1.0 / (1.0 - yrmcst.retv*zqsat)
+      zqsat = zqsat*zcor
+      z2s = z5alcp / (ztarg - z4es)**2
+      zcond1 = (zqp1[jk] - zqsat) / (1.0 + zqsat*zcor*z2s)
+      ztp1[jk] = ztp1[jk] + zaldcp*zcond1
+      zqp1[jk] = zqp1[jk] - zcond1
+    # -----------------------------------
+
+    zdq = np.maximum(0.0, zqold - zqp1[jk])
+    zdr2 = zcons2*zdp[jk]*zdq
+    # Update rain fraction and freezing.
+    # Note: impact of new temperature ZTP1 on ZFWAT is neglected here.
+    llcold = ztp1[jk] < yrmcst.rtt
+    zrfreeze2 = np.where(llcold, zfwat*zdr2, 0.0)
+    zfwatr = np.where(llcold, 0.0, 1.0)
+    zrn = zfwatr*zdr2
+    zsn = (1.0 - zfwatr)*zdr2
+    # Note: The extra condensation due to the adjustment goes directly to precipitation
+    zcondl = zcondl + zfwatr*zdq*zqtmst
+    zcondi = zcondi + (1.0 - zfwatr)*zdq*zqtmst
+    zrfln = zrfln + zrn
+    zsfln = zsfln + zsn
+    zrfreeze = zrfreeze + zrfreeze2
+
+    zdqdt = -(zcondl + zcondi) + (plude[jk, jl] + zevapr + zevaps)*zgdp
+
+    zdtdt = zlvdcp[jk]*zcondl + zlsdcp[jk]*zcondi - (zlvdcp[jk]*zevapr + \
+      zlsdcp[jk]*zevaps + plude[jk, jl]*(zfwat*zlvdcp[jk] + (1.0 - zfwat)*zlsdcp[jk]) - \
+      (zlsdcp[jk] - zlvdcp[jk])*zrfreeze)*zgdp
+
+    zdldt = (zqlwc - zl[jk])*zqtmst
+
+    zdidt = (zqiwc - zi[jk])*zqtmst
+
+    ptenq[jk, jl] = zdqdt
+    ptent[jk, jl] = zdtdt
+    ptenl[jk, jl] = zdldt
+    pteni[jk, jl] = zdidt
+
+    pfplsl[jk+1, jl] = zrfln
+    pfplsn[jk+1, jl] = zsfln
+
+    # record rain flux for next level
+
+    zrfl = zrfln
+    zsfl = zsfln
+
+  #jk
+
+  #*     ENTHALPY FLUXES DUE TO PRECIPITATION
+  #      ------------------------------------
+
+  pfhpsl[:klev+1, jl] = -pfplsl[:klev+1, jl]*yrmcst.rlvtt
+  pfhpsn[:klev+1, jl] = -pfplsn[:klev+1, jl]*yrmcst.rlstt
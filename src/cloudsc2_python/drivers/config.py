@@ -5,15 +5,18 @@ import os
 from os.path import dirname, join, normpath, splitext
 from pydantic import BaseModel, validator
 import socket
-from typing import Literal, Optional
+from typing import Literal, Optional, Union
 
-from ifs_physics_common.framework.config import DataTypes, GT4PyConfig
+from cloudsc2py.framework.config import DataTypes
+from ifs_physics_common.framework.config import GT4PyConfig
 
 
 class IOConfig(BaseModel):
     """Gathers options for I/O."""
 
     output_csv_file: Optional[str]
+    output_file: Optional[str]
+    output_compression: Optional[Literal["gzip", "lzf"]]
     host_name: Optional[str]
 
     @validator("output_csv_file")
@@ -45,8 +48,18 @@ class IOConfig(BaseModel):
         args["output_csv_file"] = output_csv_file
         return IOConfig(**args)
 
+    def with_output_compression(self, output_compression: Optional[str]) -> IOConfig:
+        args = self.dict()
+        args["output_compression"] = output_compression
+        return IOConfig(**args)
+
+    def with_output_file(self, output_file: Optional[str]) -> IOConfig:
+        args = self.dict()
+        args["output_file"] = output_file
+        return IOConfig(**args)
 
-default_io_config = IOConfig(output_file=None, host_name=None)
+
+default_io_config = IOConfig(output_file=None, output_compression=None, host_name=None)
 
 
 class PythonConfig(BaseModel):
@@ -58,15 +71,26 @@ class PythonConfig(BaseModel):
     # validation
     enable_validation: bool
     input_file: str
+    input_npy_dir: Optional[str]
     reference_file: str
+    synthetic_seed: Optional[int]
 
     # run
+    block_size: Optional[Union[int, Literal["auto"]]]
+    es_table_order: Literal[0, 1, 3]
+    fuse_saturation: bool
+    num_io_threads: int
+    num_processes: int
     num_runs: int
     num_threads: int
+    thread_scaling: bool
 
     # low-level and/or backend-related
     data_types: DataTypes
     gt4py_config: GT4PyConfig
+    numba: bool
+    packed_state: bool
+    state_alignment: Optional[int]
     sympl_enable_checks: bool
 
     @validator("gt4py_config")
@@ -74,9 +98,25 @@ class PythonConfig(BaseModel):
     def add_dtypes(cls, v, values) -> GT4PyConfig:
         return v.with_dtypes(values["data_types"])
 
+    @property
+    def backend(self) -> str:
+        """Backend of the microphysics, either "numba" or the GT4Py backend."""
+        return "numba" if self.numba else self.gt4py_config.backend
+
     def with_backend(self, backend: Optional[str]) -> PythonConfig:
         args = self.dict()
-        args["gt4py_config"] = GT4PyConfig(**args["gt4py_config"]).with_backend(backend).dict()
+        # with the Numba kernels, the other components still run on the GT4Py numpy backend
+        args["numba"] = backend == "numba"
+        args["gt4py_config"] = (
+            GT4PyConfig(**args["gt4py_config"])
+            .with_backend("numpy" if args["numba"] else backend)
+            .dict()
+        )
+        return PythonConfig(**args)
+
+    def with_block_size(self, block_size: Optional[Union[int, Literal["auto"]]]) -> PythonConfig:
+        args = self.dict()
+        args["block_size"] = block_size
         return PythonConfig(**args)
 
     def with_checks(self, enabled: bool) -> PythonConfig:
@@ -87,12 +127,39 @@ class PythonConfig(BaseModel):
         args["sympl_enable_checks"] = enabled
         return PythonConfig(**args)
 
+    def with_es_table_order(self, es_table_order: Literal[0, 1, 3]) -> PythonConfig:
+        args = self.dict()
+        args["es_table_order"] = es_table_order
+        return PythonConfig(**args)
+
+    def with_fuse_saturation(self, fuse_saturation: bool) -> PythonConfig:
+        args = self.dict()
+        args["fuse_saturation"] = fuse_saturation
+        return PythonConfig(**args)
+
+    def with_input_npy_dir(self, input_npy_dir: Optional[str]) -> PythonConfig:
+        args = self.dict()
+        args["input_npy_dir"] = input_npy_dir
+        return PythonConfig(**args)
+
     def with_num_cols(self, num_cols: Optional[int]) -> PythonConfig:
         args = self.dict()
         if num_cols is not None:
             args["num_cols"] = num_cols
         return PythonConfig(**args)
 
+    def with_num_io_threads(self, num_io_threads: Optional[int]) -> PythonConfig:
+        args = self.dict()
+        if num_io_threads is not None:
+            args["num_io_threads"] = num_io_threads
+        return PythonConfig(**args)
+
+    def with_num_processes(self, num_processes: Optional[int]) -> PythonConfig:
+        args = self.dict()
+        if num_processes is not None:
+            args["num_processes"] = num_processes
+        return PythonConfig(**args)
+
     def with_num_runs(self, num_runs: Optional[int]) -> PythonConfig:
         args = self.dict()
         if num_runs is not None:
@@ -104,11 +171,31 @@ class PythonConfig(BaseModel):
         args["num_threads"] = num_threads or os.environ.get("OMP_NUM_THREADS", 1)
         return PythonConfig(**args)
 
-    def with_precision(self, precision: Literal["double", "single"]) -> PythonConfig:
+    def with_packed_state(self, packed_state: bool) -> PythonConfig:
+        args = self.dict()
+        args["packed_state"] = packed_state
+        return PythonConfig(**args)
+
+    def with_precision(self, precision: Literal["double", "mixed", "single"]) -> PythonConfig:
         args = self.dict()
         args["data_types"] = self.data_types.with_precision(precision)
         return PythonConfig(**args)
 
+    def with_state_alignment(self, state_alignment: Optional[int]) -> PythonConfig:
+        args = self.dict()
+        args["state_alignment"] = state_alignment
+        return PythonConfig(**args)
+
+    def with_synthetic_seed(self, synthetic_seed: Optional[int]) -> PythonConfig:
+        args = self.dict()
+        args["synthetic_seed"] = synthetic_seed
+        return PythonConfig(**args)
+
+    def with_thread_scaling(self, thread_scaling: bool) -> PythonConfig:
+        args = self.dict()
+        args["thread_scaling"] = thread_scaling
+        return PythonConfig(**args)
+
     def with_validation(self, enabled: bool) -> PythonConfig:
         args = self.dict()
         args["enable_validation"] = enabled
@@ -120,11 +207,22 @@ default_python_config = PythonConfig(
     num_cols=1,
     enable_validation=True,
     input_file=join(config_files_dir, "input.h5"),
+    input_npy_dir=None,
     reference_file=join(config_files_dir, "reference.h5"),
+    synthetic_seed=None,
+    block_size=None,
+    es_table_order=0,
+    fuse_saturation=False,
+    num_io_threads=1,
+    num_processes=1,
     num_runs=15,
     num_threads=1,
-    data_types=DataTypes(bool=bool, float=np.float64, int=np.int64),
+    thread_scaling=False,
+    data_types=DataTypes(bool=bool, float=np.float64, float_acc=np.float64, int=np.int64),
     gt4py_config=GT4PyConfig(backend="numpy", rebuild=False, validate_args=True, verbose=True),
+    numba=False,
+    packed_state=False,
+    state_alignment=None,
     sympl_enable_checks=True,
 )
 
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import click
+from typing import Optional
+
+from cloudsc2py.state import get_initial_state, save_initial_state
+from cloudsc2py.utils.iox import HDF5Reader, NpyDirectory
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.timing import timing
+
+from config import PythonConfig, default_python_config
+
+
+def core(config: PythonConfig, output_dir: str) -> None:
+    # input file
+    hdf5_reader = HDF5Reader(config.input_file, config.data_types)
+
+    # grid
+    nx = config.num_cols or hdf5_reader.get_nlon()
+    nz = hdf5_reader.get_nlev()
+    computational_grid = ComputationalGrid(nx, 1, nz)
+
+    # read and expand the input data once
+    with timing("convert") as timer:
+        state = get_initial_state(
+            computational_grid,
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+            num_threads=config.num_io_threads,
+        )
+        save_initial_state(state, NpyDirectory(output_dir))
+
+    print(
+        f"Converted {nx} columns and {nz} levels to `{output_dir}` "
+        f"in {timer.get_time('convert', units='ms'):.3f} ms."
+    )
+
+
+@click.command()
+@click.option(
+    "--output-dir",
+    type=str,
+    required=True,
+    help="Path to the directory where writing the .npy files.",
+)
+@click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
+@click.option(
+    "--num-io-threads",
+    type=int,
+    default=1,
+    help="Number of threads reading the input fields concurrently.\n\nDefault: 1.",
+)
+@click.option(
+    "--precision",
+    type=str,
+    default="double",
+    help="Select either `double` (default) or `single` precision.",
+)
+def main(
+    output_dir: str, num_cols: Optional[int], num_io_threads: Optional[int], precision: str
+) -> None:
+    """
+    Convert the HDF5 input file into a directory of native .npy files.
+
+    The output directory can be passed to the drivers via --input-npy-dir, so that the
+    initial state is memory-mapped rather than decoded from HDF5 and expanded at each run.
+    """
+    config = (
+        default_python_config.with_backend("numpy")
+        .with_num_cols(num_cols)
+        .with_num_io_threads(num_io_threads)
+        .with_precision(precision)
+    )
+    core(config, output_dir)
+
+
+if __name__ == "__main__":
+    main()
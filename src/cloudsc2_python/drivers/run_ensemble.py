@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import click
+from os.path import splitext
+import numpy as np
+from typing import Optional
+
+from cloudsc2py.ensemble import get_ensemble_state, get_ensemble_statistics, scatter_members
+from cloudsc2py.physics.common.diagnostics import EtaLevels
+from cloudsc2py.physics.common.increment import StateIncrement
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL, NumbaCloudsc2NL
+from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL, NumbaCloudsc2TL
+from cloudsc2py.state import get_initial_state, get_initial_state_from_npy
+from cloudsc2py.utils.iox import HDF5Reader, HDF5Writer, NpyDirectory
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.timing import timing
+
+from config import PythonConfig, IOConfig, default_python_config, default_io_config
+from utils import print_performance, set_numba_num_threads, to_csv
+
+
+def core(
+    config: PythonConfig,
+    io_config: IOConfig,
+    num_members: int,
+    seed: int,
+    tangent_linear: bool,
+) -> PythonConfig:
+    # input file
+    hdf5_reader = HDF5Reader(config.input_file, config.data_types)
+
+    # grids: the members are laid out along the second horizontal direction
+    nx = config.num_cols or hdf5_reader.get_nlon()
+    config = config.with_num_cols(nx)
+    nz = hdf5_reader.get_nlev()
+    control_grid = ComputationalGrid(nx, 1, nz)
+    computational_grid = ComputationalGrid(nx, num_members, nz)
+
+    # control state, and the ensemble of its perturbations
+    if config.input_npy_dir is None:
+        control_state = get_initial_state(
+            control_grid,
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+            num_threads=config.num_io_threads,
+        )
+    else:
+        control_state = get_initial_state_from_npy(
+            control_grid, NpyDirectory(config.input_npy_dir), gt4py_config=config.gt4py_config
+        )
+    state = get_ensemble_state(
+        computational_grid, control_state, gt4py_config=config.gt4py_config, seed=seed
+    )
+
+    # timestep
+    dt = hdf5_reader.get_timestep()
+
+    # parameters
+    yoethf_params = hdf5_reader.get_yoethf_parameters()
+    yomcst_params = hdf5_reader.get_yomcst_parameters()
+    yrecld_params = hdf5_reader.get_yrecld_parameters()
+    yrecldp_params = hdf5_reader.get_yrecldp_parameters()
+    yrephli_params = hdf5_reader.get_yrephli_parameters()
+    yrncl_params = hdf5_reader.get_yrncl_parameters()
+    yrphnc_params = hdf5_reader.get_yrphnc_parameters()
+
+    # diagnose reference eta-levels
+    eta_levels = EtaLevels(
+        computational_grid,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    state.update(eta_levels(state))
+
+    # saturation
+    saturation = Saturation(
+        computational_grid,
+        1,
+        True,
+        yoethf_params,
+        yomcst_params,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    diagnostics = saturation(state)
+    state.update(diagnostics)
+
+    # microphysics, advancing all members in a single launch
+    if tangent_linear:
+        state_increment = StateIncrement(
+            computational_grid,
+            0.01,
+            enable_checks=config.sympl_enable_checks,
+            gt4py_config=config.gt4py_config,
+        )
+        state_i = state_increment(state)
+        state.update(state_i)
+        cloudsc2 = (NumbaCloudsc2TL if config.numba else Cloudsc2TL)(
+            computational_grid,
+            True,
+            False,
+            yoethf_params,
+            yomcst_params,
+            yrecld_params,
+            yrecldp_params,
+            yrephli_params,
+            yrncl_params,
+            yrphnc_params,
+            enable_checks=config.sympl_enable_checks,
+            gt4py_config=config.gt4py_config,
+        )
+    else:
+        state_increment = state_i = None
+        cloudsc2 = (NumbaCloudsc2NL if config.numba else Cloudsc2NL)(
+            computational_grid,
+            True,
+            False,
+            yoethf_params,
+            yomcst_params,
+            yrecld_params,
+            yrecldp_params,
+            yrephli_params,
+            yrphnc_params,
+            enable_checks=config.sympl_enable_checks,
+            gt4py_config=config.gt4py_config,
+        )
+    tendencies, diags = cloudsc2(state, dt)
+    diagnostics.update(diags)
+
+    if config.numba and config.num_threads > 1:
+        set_numba_num_threads(config.num_threads)
+
+    config.gt4py_config.reset_exec_info()
+
+    runtime_l = []
+    for i in range(config.num_runs):
+        with timing(f"run_{i}") as timer:
+            saturation(state, out=diagnostics)
+            if state_increment is not None:
+                state_increment(state, out=state_i)
+            cloudsc2(state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics)
+        runtime_l.append(timer.get_time(f"run_{i}", units="ms"))
+
+    # the MFLOPS refer to the columns of all members
+    runtime_mean, runtime_stddev, mflops_mean, mflops_stddev = print_performance(
+        nx * num_members, runtime_l
+    )
+    print(
+        f"Ensemble of {num_members} members: "
+        f"{num_members / runtime_mean * 1000:.1f} members/s, "
+        f"{nx * num_members / runtime_mean * 1000:.1f} columns/s."
+    )
+
+    # the spread of the outputs across the members
+    outputs = {"tendency_" + key: field for key, field in tendencies.items()}
+    outputs.update(diags)
+    mean, stddev = get_ensemble_statistics(outputs)
+    print("Ensemble spread (maximum standard deviation):")
+    for key in sorted(stddev):
+        print(f"-  {key}: {np.max(stddev[key]):.3e} (mean {np.mean(np.abs(mean[key])):.3e}).")
+
+    if io_config.output_file is not None:
+        # one file per member
+        root, ext = splitext(io_config.output_file)
+        for m, member_outputs in enumerate(scatter_members(outputs)):
+            with HDF5Writer(
+                f"{root}_{m:03d}{ext or '.h5'}", nx, nz, compression=io_config.output_compression
+            ) as hdf5_writer:
+                hdf5_writer.write_fields(member_outputs)
+
+    if io_config.output_csv_file is not None:
+        to_csv(
+            io_config.output_csv_file,
+            io_config.host_name,
+            ("tl" if tangent_linear else "nl") + f"-ensemble{num_members}-" + config.backend,
+            nx * num_members,
+            config.num_threads,
+            1,
+            config.num_runs,
+            runtime_mean,
+            runtime_stddev,
+            mflops_mean,
+            mflops_stddev,
+        )
+
+    return config
+
+
+@click.command()
+@click.option(
+    "--backend",
+    type=str,
+    default=None,
+    help="GT4Py backend, or `numba` to run the microphysics through the Numba kernels (the "
+    "other components running on the numpy backend)."
+    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu, numba."
+    "\n\nDefault: numpy.",
+)
+@click.option(
+    "--enable-checks/--disable-checks",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable sanity checks performed by Sympl and GT4Py.\n\nDefault: enabled.",
+)
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
+@click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
+@click.option(
+    "--num-io-threads",
+    type=int,
+    default=1,
+    help="Number of threads reading the input fields concurrently.\n\nDefault: 1.",
+)
+@click.option(
+    "--num-members",
+    type=int,
+    default=10,
+    help="Number of ensemble members, the first one being the unperturbed state.\n\nDefault: 10.",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    help="Seed of the perturbations of the members.\n\nDefault: 0.",
+)
+@click.option(
+    "--tangent-linear/--nonlinear",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Run either the tangent linear or the nonlinear microphysics.\n\nDefault: nonlinear.",
+)
+@click.option(
+    "--num-runs",
+    type=int,
+    default=1,
+    help="Number of executions.\n\nDefault: 1.",
+)
+@click.option(
+    "--num-threads",
+    type=int,
+    default=1,
+    help="Number of threads of the Numba kernels.\n\nDefault: 1.",
+)
+@click.option(
+    "--precision",
+    type=str,
+    default="double",
+    help="Select either `double` (default), `single` or `mixed` precision."
+    "\n\nIn mixed precision, the fields are single precision, but the precipitation fluxes are "
+    "accumulated in double precision.",
+)
+@click.option(
+    "--output-file",
+    type=str,
+    default=None,
+    help="Path to the HDF5 files where writing the tendencies and diagnostics, suffixed by the "
+    "member (optional).",
+)
+@click.option(
+    "--output-compression",
+    type=click.Choice(["gzip", "lzf"]),
+    default=None,
+    help="Compression filter for the HDF5 output files (optional).",
+)
+@click.option("--host-alias", type=str, default=None, help="Name of the host machine (optional).")
+@click.option(
+    "--output-csv-file",
+    type=str,
+    default=None,
+    help="Path to the CSV file where writing performance counters (optional).",
+)
+def main(
+    backend: Optional[str],
+    enable_checks: bool,
+    input_npy_dir: Optional[str],
+    num_cols: Optional[int],
+    num_io_threads: Optional[int],
+    num_members: int,
+    seed: int,
+    tangent_linear: bool,
+    num_runs: Optional[int],
+    num_threads: Optional[int],
+    precision: str,
+    output_file: Optional[str],
+    output_compression: Optional[str],
+    host_alias: Optional[str],
+    output_csv_file: Optional[str],
+) -> None:
+    """
+    Driver for the GT4Py-based implementation of CLOUDSC.
+
+    The members of an ensemble, perturbing the input state, are laid out along the second
+    horizontal direction, so that each component advances all members in a single launch.
+    """
+    config = (
+        default_python_config.with_backend(backend)
+        .with_checks(enable_checks)
+        .with_input_npy_dir(input_npy_dir)
+        .with_num_cols(num_cols)
+        .with_num_io_threads(num_io_threads)
+        .with_num_runs(num_runs)
+        .with_num_threads(num_threads)
+        .with_precision(precision)
+    )
+    io_config = (
+        default_io_config.with_output_csv_file(output_csv_file)
+        .with_output_file(output_file)
+        .with_output_compression(output_compression)
+        .with_host_name(host_alias)
+    )
+    core(config, io_config, num_members, seed, tangent_linear)
+
+
+if __name__ == "__main__":
+    main()
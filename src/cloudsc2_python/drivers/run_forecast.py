@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import click
+from os.path import splitext
+from typing import Optional
+
+from cloudsc2py.framework.parallel import ColumnParallelExecutor
+from cloudsc2py.physics.common.diagnostics import EtaLevels
+from cloudsc2py.physics.common.increment import StateUpdate
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL, NumbaCloudsc2NL
+from cloudsc2py.state import get_initial_state, get_initial_state_from_npy
+from cloudsc2py.synthetic import get_synthetic_state
+from cloudsc2py.utils.iox import HDF5Reader, HDF5Writer, NpyDirectory
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.timing import timing
+
+from config import PythonConfig, IOConfig, default_python_config, default_io_config
+from utils import print_performance, set_numba_num_threads, to_csv
+
+
+def core(
+    config: PythonConfig, io_config: IOConfig, num_steps: int, output_frequency: Optional[int]
+) -> PythonConfig:
+    # input file
+    hdf5_reader = HDF5Reader(config.input_file, config.data_types)
+
+    # grid
+    nx = config.num_cols or hdf5_reader.get_nlon()
+    config = config.with_num_cols(nx)
+    nz = hdf5_reader.get_nlev()
+    computational_grid = ComputationalGrid(nx, 1, nz)
+
+    # initial state and accumulated tendencies
+    if config.synthetic_seed is not None:
+        reference_state = get_initial_state(
+            ComputationalGrid(hdf5_reader.get_nlon(), 1, nz),
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+        )
+        state = get_synthetic_state(
+            computational_grid,
+            reference_state,
+            hdf5_reader.get_yoethf_parameters(),
+            gt4py_config=config.gt4py_config,
+            seed=config.synthetic_seed,
+        )
+    elif config.input_npy_dir is None:
+        state = get_initial_state(
+            computational_grid,
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+            num_threads=config.num_io_threads,
+        )
+    else:
+        state = get_initial_state_from_npy(
+            computational_grid,
+            NpyDirectory(config.input_npy_dir),
+            gt4py_config=config.gt4py_config,
+        )
+
+    # timestep
+    dt = hdf5_reader.get_timestep()
+
+    # parameters
+    yoethf_params = hdf5_reader.get_yoethf_parameters()
+    yomcst_params = hdf5_reader.get_yomcst_parameters()
+    yrecld_params = hdf5_reader.get_yrecld_parameters()
+    yrecldp_params = hdf5_reader.get_yrecldp_parameters()
+    yrephli_params = hdf5_reader.get_yrephli_parameters()
+    yrphnc_params = hdf5_reader.get_yrphnc_parameters()
+
+    # diagnose reference eta-levels
+    eta_levels = EtaLevels(
+        computational_grid,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    state.update(eta_levels(state))
+
+    # saturation
+    saturation = Saturation(
+        computational_grid,
+        1,
+        True,
+        yoethf_params,
+        yomcst_params,
+        enable_checks=config.sympl_enable_checks,
+        es_table_order=config.es_table_order,
+        gt4py_config=config.gt4py_config,
+    )
+    diagnostics = saturation(state)
+    state.update(diagnostics)
+
+    # microphysics
+    cloudsc2_nl_cls = NumbaCloudsc2NL if config.numba else Cloudsc2NL
+    cloudsc2_nl = cloudsc2_nl_cls(
+        computational_grid,
+        True,
+        False,
+        yoethf_params,
+        yomcst_params,
+        yrecld_params,
+        yrecldp_params,
+        yrephli_params,
+        yrphnc_params,
+        enable_checks=config.sympl_enable_checks,
+        es_table_order=config.es_table_order,
+        gt4py_config=config.gt4py_config,
+    )
+    tendencies, diags = cloudsc2_nl(state, dt)
+    diagnostics.update(diags)
+
+    # the state is advanced in place by the tendencies
+    state_update = StateUpdate(
+        computational_grid,
+        dt,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    prognostic_keys = ("f_q", "f_qi", "f_ql", "f_t")
+    update_inputs = {key: state[key] for key in prognostic_keys}
+    update_inputs.update({"f_tnd_" + key[2:]: tendencies[key] for key in prognostic_keys})
+    update_outputs = {key: state[key] for key in prognostic_keys}
+
+    if config.num_threads > 1:
+        # the columns are split among the threads
+        saturation = ColumnParallelExecutor(saturation, config.num_threads)
+        if config.numba:
+            # the Numba kernel runs the columns in parallel by itself
+            set_numba_num_threads(config.num_threads)
+        else:
+            cloudsc2_nl = ColumnParallelExecutor(cloudsc2_nl, config.num_threads)
+
+    config.gt4py_config.reset_exec_info()
+
+    # all buffers are allocated by now, and are overwritten at each step
+    hdf5_writer = None
+    runtime_l = []
+    for step in range(1, num_steps + 1):
+        with timing(f"step_{step}") as timer:
+            saturation(state, out=diagnostics)
+            cloudsc2_nl(state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics)
+            state_update(update_inputs, out=update_outputs)
+        runtime_l.append(timer.get_time(f"step_{step}", units="ms"))
+        state["time"] += dt
+
+        if io_config.output_file is not None and output_frequency and step % output_frequency == 0:
+            # the previous output is written in the background while the steps are computed
+            if hdf5_writer is not None:
+                hdf5_writer.close()
+            hdf5_writer = HDF5Writer(
+                get_output_file(io_config.output_file, step),
+                nx,
+                nz,
+                compression=io_config.output_compression,
+            )
+            hdf5_writer.write_fields(update_outputs)
+            hdf5_writer.write_fields({"tendency_" + key: tendencies[key] for key in tendencies})
+            hdf5_writer.write_fields(diagnostics)
+            print(f"Step {step}: {state['time'].isoformat()}, written.")
+
+    if hdf5_writer is not None:
+        hdf5_writer.close()
+
+    if config.num_threads > 1:
+        for component in (saturation, cloudsc2_nl):
+            if isinstance(component, ColumnParallelExecutor):
+                component.shutdown()
+
+    runtime_mean, runtime_stddev, mflops_mean, mflops_stddev = print_performance(nx, runtime_l)
+    print(
+        f"Forecast of {num_steps} steps, up to {state['time'].isoformat()}: "
+        f"{nx * num_steps / sum(runtime_l) * 1000:.1f} column-steps/s."
+    )
+
+    if io_config.output_csv_file is not None:
+        to_csv(
+            io_config.output_csv_file,
+            io_config.host_name,
+            "nl-forecast-" + config.backend,
+            nx,
+            config.num_threads,
+            1,
+            num_steps,
+            runtime_mean,
+            runtime_stddev,
+            mflops_mean,
+            mflops_stddev,
+        )
+
+    return config
+
+
+def get_output_file(output_file: str, step: int) -> str:
+    """Get the file of the output at ``step``, by appending the step to ``output_file``."""
+    root, ext = splitext(output_file)
+    return f"{root}_{step:06d}{ext or '.h5'}"
+
+
+@click.command()
+@click.option(
+    "--backend",
+    type=str,
+    default=None,
+    help="GT4Py backend, or `numba` to run the microphysics through the Numba kernel (the other "
+    "components running on the numpy backend)."
+    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu, numba."
+    "\n\nDefault: numpy.",
+)
+@click.option(
+    "--enable-checks/--disable-checks",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable sanity checks performed by Sympl and GT4Py.\n\nDefault: enabled.",
+)
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
+@click.option(
+    "--synthetic-seed",
+    type=int,
+    default=None,
+    help="Seed of the synthetic input columns, generated from the input file ones (optional).",
+)
+@click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
+@click.option(
+    "--num-io-threads",
+    type=int,
+    default=1,
+    help="Number of threads reading the input fields concurrently.\n\nDefault: 1.",
+)
+@click.option(
+    "--es-table-order",
+    type=click.Choice(["0", "1", "3"]),
+    default="0",
+    help="Evaluate the saturation vapour pressure either exactly (0), or by linear (1) or cubic "
+    "(3) interpolation in a table. The table lookup is not supported by the numpy backend."
+    "\n\nDefault: 0.",
+)
+@click.option(
+    "--num-steps",
+    type=int,
+    default=10,
+    help="Number of timesteps.\n\nDefault: 10.",
+)
+@click.option(
+    "--num-threads",
+    type=int,
+    default=1,
+    help="Number of threads."
+    "\n\nRecommended values: 24 on Piz Daint's CPUs, 128 on MLux's CPUs, 1 on GPUs."
+    "\n\nDefault: 1.",
+)
+@click.option(
+    "--precision",
+    type=str,
+    default="double",
+    help="Select either `double` (default), `single` or `mixed` precision."
+    "\n\nIn mixed precision, the fields are single precision, but the precipitation fluxes are "
+    "accumulated in double precision.",
+)
+@click.option(
+    "--output-file",
+    type=str,
+    default=None,
+    help="Path to the HDF5 files where writing the state, tendencies and diagnostics, suffixed "
+    "by the step (optional).",
+)
+@click.option(
+    "--output-frequency",
+    type=int,
+    default=None,
+    help="Number of steps between two outputs (optional).\n\nDefault: only the last step.",
+)
+@click.option(
+    "--output-compression",
+    type=click.Choice(["gzip", "lzf"]),
+    default=None,
+    help="Compression filter for the HDF5 output files (optional).",
+)
+@click.option("--host-alias", type=str, default=None, help="Name of the host machine (optional).")
+@click.option(
+    "--output-csv-file",
+    type=str,
+    default=None,
+    help="Path to the CSV file where writing performance counters (optional).",
+)
+def main(
+    backend: Optional[str],
+    enable_checks: bool,
+    input_npy_dir: Optional[str],
+    synthetic_seed: Optional[int],
+    num_cols: Optional[int],
+    num_io_threads: Optional[int],
+    es_table_order: str,
+    num_steps: int,
+    num_threads: Optional[int],
+    precision: str,
+    output_file: Optional[str],
+    output_frequency: Optional[int],
+    output_compression: Optional[str],
+    host_alias: Optional[str],
+    output_csv_file: Optional[str],
+) -> None:
+    """
+    Driver for the GT4Py-based implementation of CLOUDSC.
+
+    The state is integrated over several timesteps: at each step, the saturation specific
+    humidity is diagnosed, and the microphysics tendencies are applied to the state.
+    """
+    config = (
+        default_python_config.with_backend(backend)
+        .with_checks(enable_checks)
+        .with_input_npy_dir(input_npy_dir)
+        .with_synthetic_seed(synthetic_seed)
+        .with_num_cols(num_cols)
+        .with_num_io_threads(num_io_threads)
+        .with_es_table_order(int(es_table_order))
+        .with_num_threads(num_threads)
+        .with_precision(precision)
+    )
+    io_config = (
+        default_io_config.with_output_csv_file(output_csv_file)
+        .with_output_file(output_file)
+        .with_output_compression(output_compression)
+        .with_host_name(host_alias)
+    )
+    core(config, io_config, num_steps, output_frequency or num_steps)
+
+
+if __name__ == "__main__":
+    main()
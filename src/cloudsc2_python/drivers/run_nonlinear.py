@@ -1,19 +1,49 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import click
-from typing import Optional
+from functools import partial
+import numpy as np
+from typing import TYPE_CHECKING, Optional
 
+from cloudsc2py.framework.blocking import tune_block_size
+from cloudsc2py.framework.parallel import ColumnParallelExecutor
+from cloudsc2py.framework.storage import get_storage_pool, release_data_arrays
 from cloudsc2py.physics.common.diagnostics import EtaLevels
 from cloudsc2py.physics.common.saturation import Saturation
-from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL
+from cloudsc2py.physics.common.saturation_table import validate_es_table
+from cloudsc2py.physics.nonlinear.microphysics import (
+    Cloudsc2NL,
+    Cloudsc2NLWithSaturation,
+    NumbaCloudsc2NL,
+    NumbaCloudsc2NLWithSaturation,
+)
 from cloudsc2py.physics.nonlinear.validation import Validator
-from cloudsc2py.state import get_initial_state
-from cloudsc2py.utils.iox import HDF5Reader
+from cloudsc2py.processes import ProcessPoolEngine, get_nonlinear_components
+from cloudsc2py.state import (
+    get_initial_state,
+    get_initial_state_from_npy,
+    get_packed_storage,
+    share_state,
+)
+from cloudsc2py.synthetic import get_synthetic_state
+from cloudsc2py.utils.iox import HDF5Reader, HDF5Writer, NpyDirectory
 from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
 from ifs_physics_common.utils.timing import timing
 
 from config import PythonConfig, IOConfig, default_python_config, default_io_config
-from utils import print_performance, to_csv, to_csv_stencils
+from utils import (
+    print_performance,
+    print_scaling,
+    set_numba_num_threads,
+    to_csv,
+    to_csv_stencils,
+)
+
+if TYPE_CHECKING:
+    from datetime import timedelta
+
+    from ifs_physics_common.utils.typingx import DataArrayDict
 
 
 def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
@@ -27,7 +57,36 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     computational_grid = ComputationalGrid(nx, 1, nz)
 
     # state and accumulated tendencies
-    state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    if config.synthetic_seed is not None:
+        reference_state = get_initial_state(
+            ComputationalGrid(hdf5_reader.get_nlon(), 1, nz),
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+        )
+        state = get_synthetic_state(
+            computational_grid,
+            reference_state,
+            hdf5_reader.get_yoethf_parameters(),
+            gt4py_config=config.gt4py_config,
+            seed=config.synthetic_seed,
+        )
+    elif config.input_npy_dir is None:
+        state = get_initial_state(
+            computational_grid,
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+            num_threads=config.num_io_threads,
+            packed=config.packed_state,
+            alignment=config.state_alignment,
+        )
+    else:
+        state = get_initial_state_from_npy(
+            computational_grid,
+            NpyDirectory(config.input_npy_dir),
+            gt4py_config=config.gt4py_config,
+            packed=config.packed_state,
+            alignment=config.state_alignment,
+        )
 
     # timestep
     dt = hdf5_reader.get_timestep()
@@ -48,52 +107,165 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     )
     state.update(eta_levels(state))
 
-    # saturation
-    saturation = Saturation(
-        computational_grid,
-        1,
-        True,
-        yoethf_params,
-        yomcst_params,
-        enable_checks=config.sympl_enable_checks,
-        gt4py_config=config.gt4py_config,
-    )
-    diagnostics = saturation(state)
-    state.update(diagnostics)
+    # with block_size="auto", the block size is tuned once the microphysics is compiled
+    block_size = None if config.block_size == "auto" else config.block_size
 
-    # microphysics
-    cloudsc2_nl = Cloudsc2NL(
-        computational_grid,
-        True,
-        False,
-        yoethf_params,
-        yomcst_params,
-        yrecld_params,
-        yrecldp_params,
-        yrephli_params,
-        yrphnc_params,
-        enable_checks=config.sympl_enable_checks,
-        gt4py_config=config.gt4py_config,
-    )
+    if config.fuse_saturation:
+        # microphysics, diagnosing the saturation specific humidity on the fly
+        saturation = None
+        diagnostics = {}
+        cloudsc2_nl_cls = (
+            NumbaCloudsc2NLWithSaturation if config.numba else Cloudsc2NLWithSaturation
+        )
+        cloudsc2_nl = cloudsc2_nl_cls(
+            computational_grid,
+            1,
+            True,
+            False,
+            yoethf_params,
+            yomcst_params,
+            yrecld_params,
+            yrecldp_params,
+            yrephli_params,
+            yrphnc_params,
+            block_size=block_size,
+            enable_checks=config.sympl_enable_checks,
+            es_table_order=config.es_table_order,
+            gt4py_config=config.gt4py_config,
+        )
+    else:
+        # saturation
+        saturation = Saturation(
+            computational_grid,
+            1,
+            True,
+            yoethf_params,
+            yomcst_params,
+            enable_checks=config.sympl_enable_checks,
+            es_table_order=config.es_table_order,
+            gt4py_config=config.gt4py_config,
+        )
+        diagnostics = saturation(state)
+        state.update(diagnostics)
+
+        # microphysics
+        cloudsc2_nl_cls = NumbaCloudsc2NL if config.numba else Cloudsc2NL
+        cloudsc2_nl = cloudsc2_nl_cls(
+            computational_grid,
+            True,
+            False,
+            yoethf_params,
+            yomcst_params,
+            yrecld_params,
+            yrecldp_params,
+            yrephli_params,
+            yrphnc_params,
+            block_size=block_size,
+            enable_checks=config.sympl_enable_checks,
+            es_table_order=config.es_table_order,
+            gt4py_config=config.gt4py_config,
+        )
     tendencies, diags = cloudsc2_nl(state, dt)
     diagnostics.update(diags)
 
+    if config.block_size == "auto":
+        block_size, runtimes = tune_block_size(
+            cloudsc2_nl, state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics
+        )
+        print(
+            "Block size tuning: "
+            + ", ".join(f"{key or nx}: {value * 1e3:.3f} ms" for key, value in runtimes.items())
+            + f". Selected block size: {block_size or nx}."
+        )
+
+    if config.es_table_order > 0:
+        errors = validate_es_table(yoethf_params, yomcst_params, config.es_table_order)
+        print(
+            f"Saturation vapour pressure table (order {config.es_table_order}): max relative "
+            f"error {errors['water']:.3e} over water, {errors['ice']:.3e} over ice."
+        )
+
+    if config.thread_scaling:
+        run_thread_scaling(config, saturation, cloudsc2_nl, state, dt, tendencies, diagnostics)
+
+    engine = None
+    if config.num_processes > 1:
+        # the columns are split among the processes, which share the state and the outputs
+        factory = partial(
+            get_nonlinear_components,
+            yoethf_parameters=yoethf_params,
+            yomcst_parameters=yomcst_params,
+            yrecld_parameters=yrecld_params,
+            yrecldp_parameters=yrecldp_params,
+            yrephli_parameters=yrephli_params,
+            yrphnc_parameters=yrphnc_params,
+            enable_checks=config.sympl_enable_checks,
+            es_table_order=config.es_table_order,
+            fuse_saturation=config.fuse_saturation,
+            numba=config.numba,
+        )
+        shared_state = share_state(state, computational_grid, gt4py_config=config.gt4py_config)
+        engine = ProcessPoolEngine(
+            computational_grid,
+            shared_state,
+            factory,
+            config.num_processes,
+            gt4py_config=config.gt4py_config,
+            readonly_state=True,
+        )
+        tendencies, diagnostics = engine.tendencies, engine.diagnostics
+    elif config.num_threads > 1:
+        # the columns are split among the threads
+        if saturation is not None:
+            saturation = ColumnParallelExecutor(saturation, config.num_threads)
+        if config.numba:
+            # the Numba kernel runs the columns in parallel by itself
+            set_numba_num_threads(config.num_threads)
+        else:
+            cloudsc2_nl = ColumnParallelExecutor(cloudsc2_nl, config.num_threads)
+
     config.gt4py_config.reset_exec_info()
 
+    # the temporaries of the components are drawn from the pool at each run
+    storage_pool = get_storage_pool()
+    storage_pool.reset_statistics()
+
     runtime_l = []
     for i in range(config.num_runs):
         with timing(f"run_{i}") as timer:
-            saturation(state, out=diagnostics)
-            cloudsc2_nl(state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics)
+            if engine is not None:
+                engine(dt)
+            else:
+                if saturation is not None:
+                    saturation(state, out=diagnostics)
+                cloudsc2_nl(state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics)
         runtime_l.append(timer.get_time(f"run_{i}", units="ms"))
 
+    if io_config.output_file is not None:
+        # all runs compute the same fields, so only the last ones are written
+        with HDF5Writer(
+            io_config.output_file, nx, nz, compression=io_config.output_compression
+        ) as hdf5_writer:
+            hdf5_writer.write_fields({"tendency_" + key: tendencies[key] for key in tendencies})
+            hdf5_writer.write_fields(diagnostics)
+
+    if engine is None and config.num_threads > 1:
+        for component in (saturation, cloudsc2_nl):
+            if isinstance(component, ColumnParallelExecutor):
+                component.shutdown()
+
+    print(
+        f"Storage pool: {storage_pool.hits} hits and {storage_pool.misses} misses "
+        f"over {config.num_runs} runs."
+    )
+
     runtime_mean, runtime_stddev, mflops_mean, mflops_stddev = print_performance(nx, runtime_l)
 
     if io_config.output_csv_file is not None:
         to_csv(
             io_config.output_csv_file,
             io_config.host_name,
-            "nl-" + config.gt4py_config.backend,
+            "nl-" + config.backend,
             nx,
             config.num_threads,
             1,
@@ -104,7 +276,9 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
             mflops_stddev,
         )
 
-    if config.enable_validation:
+    if config.enable_validation and config.synthetic_seed is not None:
+        print("Validation skipped: synthetic input data has no reference.")
+    elif config.enable_validation:
         validator = Validator(config.reference_file, config.data_types)
         failing_fields = validator(tendencies, diagnostics)
         if failing_fields:
@@ -112,16 +286,81 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
         else:
             print(f"Validation completed successfully. HOORAY HOORAY!")
 
+    if engine is not None:
+        engine.close()
+        get_packed_storage(shared_state).unlink()
+
+    # give the state back to the pool, for later executions of core within the same pool
+    release_data_arrays(state)
+
     return config
 
 
+def run_thread_scaling(
+    config: PythonConfig,
+    saturation: Optional[Saturation],
+    cloudsc2_nl: Cloudsc2NL,
+    state: DataArrayDict,
+    dt: timedelta,
+    tendencies: DataArrayDict,
+    diagnostics: DataArrayDict,
+) -> None:
+    """Time the runs with 1, 2, 4, ... up to ``config.num_threads`` threads, and check that the
+    results do not depend on the number of threads."""
+    num_threads_l = sorted(
+        {2**i for i in range(config.num_threads.bit_length())} | {config.num_threads}
+    )
+    runtimes = {}
+    reference = None
+    for num_threads in num_threads_l:
+        parallel_saturation = (
+            ColumnParallelExecutor(saturation, num_threads) if saturation is not None else None
+        )
+        if config.numba:
+            set_numba_num_threads(num_threads)
+            parallel_cloudsc2_nl = cloudsc2_nl
+        else:
+            parallel_cloudsc2_nl = ColumnParallelExecutor(cloudsc2_nl, num_threads)
+        runtime_l = []
+        for i in range(config.num_runs):
+            with timing(f"scaling_{num_threads}_{i}") as timer:
+                if parallel_saturation is not None:
+                    parallel_saturation(state, out=diagnostics)
+                parallel_cloudsc2_nl(
+                    state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics
+                )
+            runtime_l.append(timer.get_time(f"scaling_{num_threads}_{i}", units="ms"))
+        runtimes[num_threads] = runtime_l
+        for executor in (parallel_saturation, parallel_cloudsc2_nl):
+            if isinstance(executor, ColumnParallelExecutor):
+                executor.shutdown()
+
+        fields = {"tendency_" + key: tendencies[key] for key in tendencies}
+        fields.update(diagnostics)
+        outputs = {key: to_numpy(field.data).copy() for key, field in fields.items()}
+        if reference is None:
+            reference = outputs
+        else:
+            mismatching_fields = [
+                key for key in reference if not np.array_equal(outputs[key], reference[key])
+            ]
+            if mismatching_fields:
+                print(
+                    f"Results with {num_threads} threads differ from the serial ones on the "
+                    f"following fields: {', '.join(mismatching_fields)}."
+                )
+
+    print_scaling(config.num_cols, runtimes)
+
+
 @click.command()
 @click.option(
     "--backend",
     type=str,
     default=None,
-    help="GT4Py backend."
-    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu."
+    help="GT4Py backend, or `numba` to run the microphysics through the Numba kernel (the other "
+    "components running on the numpy backend)."
+    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu, numba."
     "\n\nDefault: numpy.",
 )
 @click.option(
@@ -138,7 +377,61 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     default=True,
     help="Enable/disable data validation.\n\nDefault: enabled.",
 )
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
+@click.option(
+    "--synthetic-seed",
+    type=int,
+    default=None,
+    help="Seed of the synthetic input columns, generated from the input file ones (optional).",
+)
 @click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
+@click.option(
+    "--num-io-threads",
+    type=int,
+    default=1,
+    help="Number of threads reading the input fields concurrently.\n\nDefault: 1.",
+)
+@click.option(
+    "--fuse-saturation/--no-fuse-saturation",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable diagnosing the saturation specific humidity within the microphysics "
+    "stencil.\n\nDefault: disabled.",
+)
+@click.option(
+    "--block-size",
+    type=str,
+    default=None,
+    help="Number of columns processed by each stencil launch of the microphysics, or `auto` to "
+    "select the fastest among a set of block sizes (optional).\n\nDefault: all columns.",
+)
+@click.option(
+    "--es-table-order",
+    type=click.Choice(["0", "1", "3"]),
+    default="0",
+    help="Evaluate the saturation vapour pressure either exactly (0), or by linear (1) or cubic "
+    "(3) interpolation in a table. The table lookup is not supported by the numpy backend."
+    "\n\nDefault: 0.",
+)
+@click.option(
+    "--packed-state/--no-packed-state",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable packing all input fields in a single storage.\n\nDefault: disabled.",
+)
+@click.option(
+    "--state-alignment",
+    type=int,
+    default=None,
+    help="Alignment in bytes of the fields within the packed storage (optional).",
+)
 @click.option(
     "--num-runs",
     type=int,
@@ -153,11 +446,41 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     "\n\nRecommended values: 24 on Piz Daint's CPUs, 128 on MLux's CPUs, 1 on GPUs."
     "\n\nDefault: 1.",
 )
+@click.option(
+    "--num-processes",
+    type=int,
+    default=1,
+    help="Number of processes, each running the columns of a slice of the domain. The state "
+    "and the outputs are shared among the processes, without copies. Not supported by the "
+    "GPU backends.\n\nDefault: 1.",
+)
+@click.option(
+    "--thread-scaling/--no-thread-scaling",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable timing the runs with 1, 2, 4, ... up to --num-threads threads."
+    "\n\nDefault: disabled.",
+)
 @click.option(
     "--precision",
     type=str,
     default="double",
-    help="Select either `double` (default) or `single` precision.",
+    help="Select either `double` (default), `single` or `mixed` precision."
+    "\n\nIn mixed precision, the fields are single precision, but the precipitation fluxes are "
+    "accumulated in double precision.",
+)
+@click.option(
+    "--output-file",
+    type=str,
+    default=None,
+    help="Path to the HDF5 file where writing tendencies and diagnostics (optional).",
+)
+@click.option(
+    "--output-compression",
+    type=click.Choice(["gzip", "lzf"]),
+    default=None,
+    help="Compression filter for the HDF5 output file (optional).",
 )
 @click.option("--host-alias", type=str, default=None, help="Name of the host machine (optional).")
 @click.option(
@@ -176,10 +499,22 @@ def main(
     backend: Optional[str],
     enable_checks: bool,
     enable_validation: bool,
+    input_npy_dir: Optional[str],
+    synthetic_seed: Optional[int],
     num_cols: Optional[int],
+    num_io_threads: Optional[int],
+    fuse_saturation: bool,
+    block_size: Optional[str],
+    es_table_order: str,
+    packed_state: bool,
+    state_alignment: Optional[int],
     num_runs: Optional[int],
     num_threads: Optional[int],
+    num_processes: Optional[int],
+    thread_scaling: bool,
     precision: str,
+    output_file: Optional[str],
+    output_compression: Optional[str],
     host_alias: Optional[str],
     output_csv_file: Optional[str],
     output_csv_file_stencils: Optional[str],
@@ -193,18 +528,33 @@ def main(
         default_python_config.with_backend(backend)
         .with_checks(enable_checks)
         .with_validation(enable_validation)
+        .with_input_npy_dir(input_npy_dir)
+        .with_synthetic_seed(synthetic_seed)
         .with_num_cols(num_cols)
+        .with_num_io_threads(num_io_threads)
+        .with_fuse_saturation(fuse_saturation)
+        .with_block_size(block_size if block_size in (None, "auto") else int(block_size))
+        .with_es_table_order(int(es_table_order))
+        .with_packed_state(packed_state)
+        .with_state_alignment(state_alignment)
         .with_num_runs(num_runs)
         .with_num_threads(num_threads)
+        .with_num_processes(num_processes)
+        .with_thread_scaling(thread_scaling)
         .with_precision(precision)
     )
-    io_config = default_io_config.with_output_csv_file(output_csv_file).with_host_name(host_alias)
+    io_config = (
+        default_io_config.with_output_csv_file(output_csv_file)
+        .with_output_file(output_file)
+        .with_output_compression(output_compression)
+        .with_host_name(host_alias)
+    )
     config = core(config, io_config)
     if output_csv_file_stencils is not None:
         to_csv_stencils(
             output_csv_file_stencils,
             io_config.host_name,
-            "nl-" + config.gt4py_config.backend,
+            "nl-" + config.backend,
             config.num_cols,
             config.num_threads,
             config.num_runs,
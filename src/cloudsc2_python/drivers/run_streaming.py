@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import click
+from typing import Optional
+
+from cloudsc2py.physics.common.diagnostics import EtaLevels
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL
+from cloudsc2py.state import (
+    get_initial_state,
+    get_initial_state_from_npy,
+    update_initial_state,
+    update_initial_state_from_npy,
+)
+from cloudsc2py.utils.iox import HDF5Reader, HDF5Writer, NpyDirectory
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.timing import timing
+
+from config import PythonConfig, IOConfig, default_python_config, default_io_config
+from utils import print_performance, to_csv
+
+
+def core(config: PythonConfig, io_config: IOConfig, chunk_size: int) -> PythonConfig:
+    # input file
+    hdf5_reader = HDF5Reader(config.input_file, config.data_types)
+    npy_directory = None if config.input_npy_dir is None else NpyDirectory(config.input_npy_dir)
+
+    # grids: the global grid is never allocated, only the chunk-sized one
+    nx = config.num_cols or hdf5_reader.get_nlon()
+    config = config.with_num_cols(nx)
+    nz = hdf5_reader.get_nlev()
+    chunk_size = min(chunk_size, nx)
+    computational_grid = ComputationalGrid(chunk_size, 1, nz)
+
+    # state and accumulated tendencies for the first chunk
+    if npy_directory is None:
+        state = get_initial_state(
+            computational_grid,
+            hdf5_reader,
+            gt4py_config=config.gt4py_config,
+            num_threads=config.num_io_threads,
+        )
+    else:
+        state = get_initial_state_from_npy(
+            computational_grid, npy_directory, gt4py_config=config.gt4py_config
+        )
+
+    # timestep
+    dt = hdf5_reader.get_timestep()
+
+    # parameters
+    yoethf_params = hdf5_reader.get_yoethf_parameters()
+    yomcst_params = hdf5_reader.get_yomcst_parameters()
+    yrecld_params = hdf5_reader.get_yrecld_parameters()
+    yrecldp_params = hdf5_reader.get_yrecldp_parameters()
+    yrephli_params = hdf5_reader.get_yrephli_parameters()
+    yrphnc_params = hdf5_reader.get_yrphnc_parameters()
+
+    # diagnose reference eta-levels from the first column of the global grid
+    eta_levels = EtaLevels(
+        computational_grid,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    state.update(eta_levels(state))
+
+    # all components are built once, on the chunk-sized grid
+    saturation = Saturation(
+        computational_grid,
+        1,
+        True,
+        yoethf_params,
+        yomcst_params,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    diagnostics = saturation(state)
+    state.update(diagnostics)
+
+    cloudsc2_nl = Cloudsc2NL(
+        computational_grid,
+        True,
+        False,
+        yoethf_params,
+        yomcst_params,
+        yrecld_params,
+        yrecldp_params,
+        yrephli_params,
+        yrphnc_params,
+        enable_checks=config.sympl_enable_checks,
+        gt4py_config=config.gt4py_config,
+    )
+    tendencies, diags = cloudsc2_nl(state, dt)
+    diagnostics.update(diags)
+
+    config.gt4py_config.reset_exec_info()
+
+    # the output datasets span the global grid, and are filled chunk by chunk
+    outputs = {"tendency_" + key: field for key, field in tendencies.items()}
+    outputs.update(diagnostics)
+    with HDF5Writer(
+        io_config.output_file,
+        nx,
+        nz,
+        chunk_size=chunk_size,
+        compression=io_config.output_compression,
+    ) as hdf5_writer:
+        runtime_l = []
+        for start in range(0, nx, chunk_size):
+            # the last chunk may be only partially needed: its trailing columns are computed but
+            # not written
+            num_cols = min(chunk_size, nx - start)
+
+            with timing(f"read_{start}") as timer:
+                if start > 0:
+                    if npy_directory is None:
+                        update_initial_state(
+                            state, hdf5_reader, start=start, num_threads=config.num_io_threads
+                        )
+                    else:
+                        update_initial_state_from_npy(state, npy_directory, start=start)
+
+            with timing(f"run_{start}") as timer:
+                saturation(state, out=diagnostics)
+                cloudsc2_nl(state, dt, out_tendencies=tendencies, out_diagnostics=diagnostics)
+
+            # the outputs are copied and then written in the background, while the next chunk
+            # is read and computed
+            with timing(f"write_{start}") as timer:
+                hdf5_writer.write_fields(outputs, start=start, num_cols=num_cols)
+
+            read_time = timer.get_time(f"read_{start}", units="ms")
+            run_time = timer.get_time(f"run_{start}", units="ms")
+            write_time = timer.get_time(f"write_{start}", units="ms")
+            runtime_l.append(run_time * chunk_size / num_cols)
+            print(
+                f"Chunk [{start}, {start + num_cols}): "
+                f"read {read_time:.3f} ms, run {run_time:.3f} ms, write {write_time:.3f} ms, "
+                f"{num_cols / (read_time + run_time + write_time) * 1000:.1f} columns/s."
+            )
+
+    # runtimes are scaled to full chunks, so that the MFLOPS refer to chunk_size columns
+    runtime_mean, runtime_stddev, mflops_mean, mflops_stddev = print_performance(
+        chunk_size, runtime_l
+    )
+
+    if io_config.output_csv_file is not None:
+        to_csv(
+            io_config.output_csv_file,
+            io_config.host_name,
+            "nl-streaming-" + config.gt4py_config.backend,
+            nx,
+            config.num_threads,
+            chunk_size,
+            len(runtime_l),
+            runtime_mean,
+            runtime_stddev,
+            mflops_mean,
+            mflops_stddev,
+        )
+
+    return config
+
+
+@click.command()
+@click.option(
+    "--backend",
+    type=str,
+    default=None,
+    help="GT4Py backend."
+    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu."
+    "\n\nDefault: numpy.",
+)
+@click.option(
+    "--enable-checks/--disable-checks",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable sanity checks performed by Sympl and GT4Py.\n\nDefault: enabled.",
+)
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
+@click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
+@click.option(
+    "--num-io-threads",
+    type=int,
+    default=1,
+    help="Number of threads reading the input fields concurrently.\n\nDefault: 1.",
+)
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=1024,
+    help="Number of columns processed at once.\n\nDefault: 1024.",
+)
+@click.option(
+    "--num-threads",
+    type=int,
+    default=1,
+    help="Number of threads."
+    "\n\nRecommended values: 24 on Piz Daint's CPUs, 128 on MLux's CPUs, 1 on GPUs."
+    "\n\nDefault: 1.",
+)
+@click.option(
+    "--precision",
+    type=str,
+    default="double",
+    help="Select either `double` (default), `single` or `mixed` precision."
+    "\n\nIn mixed precision, the fields are single precision, but the precipitation fluxes are "
+    "accumulated in double precision.",
+)
+@click.option(
+    "--output-file",
+    type=str,
+    required=True,
+    help="Path to the HDF5 file where writing tendencies and diagnostics.",
+)
+@click.option(
+    "--output-compression",
+    type=click.Choice(["gzip", "lzf"]),
+    default=None,
+    help="Compression filter for the HDF5 output file (optional).",
+)
+@click.option("--host-alias", type=str, default=None, help="Name of the host machine (optional).")
+@click.option(
+    "--output-csv-file",
+    type=str,
+    default=None,
+    help="Path to the CSV file where writing performance counters (optional).",
+)
+def main(
+    backend: Optional[str],
+    enable_checks: bool,
+    input_npy_dir: Optional[str],
+    num_cols: Optional[int],
+    num_io_threads: Optional[int],
+    chunk_size: int,
+    num_threads: Optional[int],
+    precision: str,
+    output_file: str,
+    output_compression: Optional[str],
+    host_alias: Optional[str],
+    output_csv_file: Optional[str],
+) -> None:
+    """
+    Driver for the GT4Py-based implementation of CLOUDSC.
+
+    The domain is processed in chunks of columns, so that the memory footprint is bounded by the
+    chunk size rather than by the number of columns.
+    """
+    config = (
+        default_python_config.with_backend(backend)
+        .with_checks(enable_checks)
+        .with_input_npy_dir(input_npy_dir)
+        .with_num_cols(num_cols)
+        .with_num_io_threads(num_io_threads)
+        .with_num_threads(num_threads)
+        .with_precision(precision)
+    )
+    io_config = (
+        default_io_config.with_output_csv_file(output_csv_file)
+        .with_output_file(output_file)
+        .with_output_compression(output_compression)
+        .with_host_name(host_alias)
+    )
+    core(config, io_config, chunk_size)
+
+
+if __name__ == "__main__":
+    main()
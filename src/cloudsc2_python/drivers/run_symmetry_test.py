@@ -5,8 +5,8 @@ from typing import Optional
 
 from cloudsc2py.physics.common.diagnostics import EtaLevels
 from cloudsc2py.physics.adjoint.validation import SymmetryTest
-from cloudsc2py.state import get_initial_state
-from cloudsc2py.utils.iox import HDF5Reader
+from cloudsc2py.state import get_initial_state, get_initial_state_from_npy
+from cloudsc2py.utils.iox import HDF5Reader, NpyDirectory
 from ifs_physics_common.framework.grid import ComputationalGrid
 from ifs_physics_common.utils.timing import timing
 
@@ -25,7 +25,14 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     computational_grid = ComputationalGrid(nx, 1, nz)
 
     # state and accumulated tendencies
-    state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    if config.input_npy_dir is None:
+        state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    else:
+        state = get_initial_state_from_npy(
+            computational_grid,
+            NpyDirectory(config.input_npy_dir),
+            gt4py_config=config.gt4py_config,
+        )
 
     # timestep
     dt = hdf5_reader.get_timestep()
@@ -63,6 +70,7 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
         yrphnc_params,
         enable_checks=config.sympl_enable_checks,
         gt4py_config=config.gt4py_config,
+        numba=config.numba,
     )
     st(state, dt, enable_validation=True)
 
@@ -85,7 +93,7 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
         to_csv(
             io_config.output_csv_file,
             io_config.host_name,
-            "ad-" + config.gt4py_config.backend,
+            "ad-" + config.backend,
             nx,
             config.num_threads,
             1,
@@ -104,8 +112,9 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     "--backend",
     type=str,
     default=None,
-    help="GT4Py backend."
-    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu."
+    help="GT4Py backend, or `numba` to run the microphysics through the Numba kernels (the "
+    "other components running on the numpy backend)."
+    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu, numba."
     "\n\nDefault: numpy.",
 )
 @click.option(
@@ -115,6 +124,12 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     default=False,
     help="Enable/disable sanity checks performed by Sympl and GT4Py.\n\nDefault: enabled.",
 )
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
 @click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
 @click.option(
     "--num-runs",
@@ -152,6 +167,7 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
 def main(
     backend: Optional[str],
     enable_checks: bool,
+    input_npy_dir: Optional[str],
     num_cols: Optional[int],
     num_runs: Optional[int],
     num_threads: Optional[int],
@@ -163,6 +179,7 @@ def main(
     config = (
         default_python_config.with_backend(backend)
         .with_checks(enable_checks)
+        .with_input_npy_dir(input_npy_dir)
         .with_num_cols(num_cols)
         .with_num_runs(num_runs)
         .with_num_threads(num_threads)
@@ -174,7 +191,7 @@ def main(
         to_csv_stencils(
             output_csv_file_stencils,
             io_config.host_name,
-            "ad-" + config.gt4py_config.backend,
+            "ad-" + config.backend,
             config.num_cols,
             config.num_threads,
             config.num_runs,
@@ -7,8 +7,8 @@ from cloudsc2py.physics.common.diagnostics import EtaLevels
 from cloudsc2py.physics.common.saturation import Saturation
 from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL
 from cloudsc2py.physics.nonlinear.validation import Validator
-from cloudsc2py.state import get_initial_state
-from cloudsc2py.utils.iox import HDF5Reader
+from cloudsc2py.state import get_initial_state, get_initial_state_from_npy
+from cloudsc2py.utils.iox import HDF5Reader, NpyDirectory
 from ifs_physics_common.framework.grid import ComputationalGrid
 from ifs_physics_common.utils.timing import timing
 
@@ -26,7 +26,14 @@ def core(config: PythonConfig, io_config: IOConfig) -> None:
     computational_grid = ComputationalGrid(nx, 1, nz)
 
     # state and accumulated tendencies
-    state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    if config.input_npy_dir is None:
+        state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    else:
+        state = get_initial_state_from_npy(
+            computational_grid,
+            NpyDirectory(config.input_npy_dir),
+            gt4py_config=config.gt4py_config,
+        )
 
     # timestep
     dt = hdf5_reader.get_timestep()
@@ -135,6 +142,12 @@ def core(config: PythonConfig, io_config: IOConfig) -> None:
     default=True,
     help="Enable/disable data validation.\n\nDefault: enabled.",
 )
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
 @click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
 @click.option(
     "--num-runs",
@@ -146,7 +159,9 @@ def core(config: PythonConfig, io_config: IOConfig) -> None:
     "--precision",
     type=str,
     default="double",
-    help="Select either `double` (default) or `single` precision.",
+    help="Select either `double` (default), `single` or `mixed` precision."
+    "\n\nIn mixed precision, the fields are single precision, but the precipitation fluxes are "
+    "accumulated in double precision.",
 )
 @click.option("--host-alias", type=str, default=None, help="Name of the host machine (optional).")
 @click.option(
@@ -165,6 +180,7 @@ def main(
     backend: Optional[str],
     enable_checks: bool,
     enable_validation: bool,
+    input_npy_dir: Optional[str],
     num_cols: Optional[int],
     num_runs: Optional[int],
     precision: str,
@@ -181,6 +197,7 @@ def main(
         default_python_config.with_backend(backend)
         .with_checks(enable_checks)
         .with_validation(enable_validation)
+        .with_input_npy_dir(input_npy_dir)
         .with_num_cols(num_cols)
         .with_num_runs(num_runs)
         .with_precision(precision)
@@ -4,9 +4,9 @@ import click
 from typing import Optional
 
 from cloudsc2py.physics.common.diagnostics import EtaLevels
-from cloudsc2py.physics.tangent_linear.validation import TaylorTest
-from cloudsc2py.state import get_initial_state
-from cloudsc2py.utils.iox import HDF5Reader
+from cloudsc2py.physics.tangent_linear.validation import BatchedTaylorTest, TaylorTest
+from cloudsc2py.state import get_initial_state, get_initial_state_from_npy
+from cloudsc2py.utils.iox import HDF5Reader, NpyDirectory
 from ifs_physics_common.framework.grid import ComputationalGrid
 from ifs_physics_common.utils.timing import Timer
 
@@ -14,7 +14,7 @@ from config import IOConfig, PythonConfig, default_io_config, default_python_con
 from utils import to_csv, to_csv_stencils
 
 
-def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
+def core(config: PythonConfig, io_config: IOConfig, batched: bool = False) -> PythonConfig:
     # input file
     hdf5_reader = HDF5Reader(config.input_file, config.data_types)
 
@@ -25,7 +25,14 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     computational_grid = ComputationalGrid(nx, 1, nz)
 
     # state and accumulated tendencies
-    state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    if config.input_npy_dir is None:
+        state = get_initial_state(computational_grid, hdf5_reader, gt4py_config=config.gt4py_config)
+    else:
+        state = get_initial_state_from_npy(
+            computational_grid,
+            NpyDirectory(config.input_npy_dir),
+            gt4py_config=config.gt4py_config,
+        )
 
     # timestep
     dt = hdf5_reader.get_timestep()
@@ -47,8 +54,8 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     )
     state.update(eta_levels(state))
 
-    # taylor test
-    tt = TaylorTest(
+    # taylor test, possibly running all perturbation factors at once
+    tt = (BatchedTaylorTest if batched else TaylorTest)(
         computational_grid,
         0.01,
         tuple(float(10 ** -(i + 1)) for i in range(0, 10)),
@@ -64,6 +71,7 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
         yrphnc_params,
         enable_checks=config.sympl_enable_checks,
         gt4py_config=config.gt4py_config,
+        numba=config.numba,
     )
     norms = tt.run(state, dt)
 
@@ -88,7 +96,7 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
         to_csv(
             io_config.output_csv_file,
             io_config.host_name,
-            "tl-" + config.gt4py_config.backend,
+            ("tl-batched-" if batched else "tl-") + config.backend,
             nx,
             config.num_threads,
             1,
@@ -107,8 +115,9 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     "--backend",
     type=str,
     default=None,
-    help="GT4Py backend."
-    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu."
+    help="GT4Py backend, or `numba` to run the microphysics through the Numba kernels (the "
+    "other components running on the numpy backend)."
+    "\n\nOptions: numpy, gt:cpu_kfirst, gt:cpu_ifirst, gt:gpu, cuda, dace:cpu, dace:gpu, numba."
     "\n\nDefault: numpy.",
 )
 @click.option(
@@ -118,6 +127,12 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     default=False,
     help="Enable/disable sanity checks performed by Sympl and GT4Py.\n\nDefault: enabled.",
 )
+@click.option(
+    "--input-npy-dir",
+    type=str,
+    default=None,
+    help="Directory of pre-expanded input fields written by convert_input.py (optional).",
+)
 @click.option("--num-cols", type=int, default=None, help="Number of domain columns.\n\nDefault: 1.")
 @click.option(
     "--num-runs",
@@ -133,6 +148,15 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
     "\n\nRecommended values: 24 on Piz Daint's CPUs, 128 on MLux's CPUs, 1 on GPUs."
     "\n\nDefault: 1.",
 )
+@click.option(
+    "--batched/--no-batched",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="Enable/disable evaluating all perturbation factors in a single launch of the nonlinear "
+    "microphysics, over a grid with one index along the second horizontal direction per factor."
+    "\n\nDefault: disabled.",
+)
 @click.option(
     "--precision",
     type=str,
@@ -155,9 +179,11 @@ def core(config: PythonConfig, io_config: IOConfig) -> PythonConfig:
 def main(
     backend: Optional[str],
     enable_checks: bool,
+    input_npy_dir: Optional[str],
     num_cols: Optional[int],
     num_runs: Optional[int],
     num_threads: Optional[int],
+    batched: bool,
     precision: str,
     host_alias: Optional[str],
     output_csv_file: Optional[str],
@@ -166,18 +192,19 @@ def main(
     config = (
         default_python_config.with_backend(backend)
         .with_checks(enable_checks)
+        .with_input_npy_dir(input_npy_dir)
         .with_num_cols(num_cols)
         .with_num_runs(num_runs)
         .with_num_threads(num_threads)
         .with_precision(precision)
     )
     io_config = default_io_config.with_host_name(host_alias).with_output_csv_file(output_csv_file)
-    config = core(config, io_config)
+    config = core(config, io_config, batched)
     if output_csv_file_stencils is not None:
         to_csv_stencils(
             output_csv_file_stencils,
             io_config.host_name,
-            "tl-" + config.gt4py_config.backend,
+            ("tl-batched-" if batched else "tl-") + config.backend,
             config.num_cols,
             config.num_threads,
             config.num_runs,
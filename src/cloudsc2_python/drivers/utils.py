@@ -117,3 +117,26 @@ def print_performance(
     print(f"-  MFLOPS: {mflops_mean:.3f} \u00B1 {mflops_stddev:.3f}.")
 
     return runtime_mean, runtime_stddev, mflops_mean, mflops_stddev
+
+
+def print_scaling(num_cols: int, runtimes: dict[int, list[float]]) -> None:
+    """Print the mean runtime, the speedup and the parallel efficiency for each thread count."""
+    print(f"Scaling (number of columns: {num_cols}):")
+    base_num_threads = min(runtimes)
+    base_runtime = sum(runtimes[base_num_threads]) / len(runtimes[base_num_threads])
+    for num_threads, runtime_l in runtimes.items():
+        runtime_mean = sum(runtime_l) / len(runtime_l)
+        speedup = base_runtime / runtime_mean
+        efficiency = speedup * base_num_threads / num_threads
+        print(
+            f"-  {num_threads} threads: {runtime_mean:.3f} ms, speedup {speedup:.2f}, "
+            f"efficiency {efficiency:.0%}."
+        )
+
+
+def set_numba_num_threads(num_threads: int) -> None:
+    """Set the number of threads running the columns within the Numba kernels."""
+    # Numba is an optional dependency, needed by the numba backend only
+    import numba
+
+    numba.set_num_threads(min(num_threads, numba.config.NUMBA_NUM_THREADS))
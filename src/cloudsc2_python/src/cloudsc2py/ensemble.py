@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import numpy as np
+from typing import TYPE_CHECKING
+
+from cloudsc2py.state import allocate_state, allocate_tendencies
+from ifs_physics_common.framework.grid import I, J, K
+from ifs_physics_common.utils.numpyx import assign, to_numpy
+
+if TYPE_CHECKING:
+    from ifs_physics_common.framework.config import GT4PyConfig
+    from ifs_physics_common.framework.grid import ComputationalGrid
+    from ifs_physics_common.utils.typingx import DataArrayDict
+
+
+def get_ensemble_state(
+    computational_grid: ComputationalGrid,
+    control_state: DataArrayDict,
+    *,
+    gt4py_config: GT4PyConfig,
+    seed: int = 0,
+    t_stddev: float = 0.5,
+    q_stddev: float = 0.05,
+) -> DataArrayDict:
+    """Lay out the members of an ensemble along the second horizontal direction.
+
+    ``computational_grid`` has as many columns as ``control_state`` (e.g. the state returned by
+    ``get_initial_state``) along the first horizontal direction, and one member per index along
+    the second one, so that a single launch of the components advances the whole ensemble.
+    Member 0 is the control state. The other members perturb the temperature by Gaussian noise
+    with standard deviation ``t_stddev`` (in K), and the specific humidity by lognormal factors
+    with standard deviation ``q_stddev``. The perturbations of member ``m`` only depend on
+    ``seed`` and ``m``, and not on the ensemble size.
+    """
+    ni, num_members, nk = computational_grid.grids[I, J, K].shape
+
+    state = allocate_state(computational_grid, gt4py_config=gt4py_config)
+    tendencies = allocate_tendencies(computational_grid, gt4py_config=gt4py_config)
+    state["f_tnd_cml_t"] = tendencies["f_t"]
+    state["f_tnd_cml_q"] = tendencies["f_q"]
+    state["f_tnd_cml_ql"] = tendencies["f_ql"]
+    state["f_tnd_cml_qi"] = tendencies["f_qi"]
+
+    # the control state, broadcast to all members
+    # f_ql and f_qi are views of f5_clv
+    for key in (key for key in state if key not in ("f_ql", "f_qi")):
+        field = state[key].data
+        control = to_numpy(control_state[key].data)[:, 0]
+        mk = min(field.shape[2], control.shape[1])
+        assign(field[:, :, :mk], control[:, np.newaxis, :mk])
+
+    # all members but the control one are perturbed in place
+    f_t = state["f_t"].data
+    f_q = state["f_q"].data
+    for m in range(1, num_members):
+        rng = np.random.default_rng((seed, m))
+        f_t[:, m] += rng.normal(0, t_stddev, size=f_t[:, m].shape)
+        f_q[:, m] *= rng.lognormal(0, q_stddev, size=f_q[:, m].shape)
+
+    state["time"] = control_state["time"]
+
+    return state
+
+
+def scatter_members(fields: DataArrayDict) -> list[DataArrayDict]:
+    """Split the fields of an ensemble laid out by ``get_ensemble_state`` (e.g. the state, or the
+    tendencies and diagnostics of the components) into one dictionary per member.
+
+    The fields of each member are views with a single index along the second horizontal
+    direction; the fields without that direction (e.g. ``f_eta`` and ``time``) are shared.
+    """
+    num_members = max(field.shape[1] for field in fields.values() if is_ensemble_field(field))
+    return [
+        {
+            key: field[:, m : m + 1] if is_ensemble_field(field) else field
+            for key, field in fields.items()
+        }
+        for m in range(num_members)
+    ]
+
+
+def get_ensemble_statistics(
+    fields: DataArrayDict,
+) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+    """Compute the ensemble mean and standard deviation of each field laid out by
+    ``get_ensemble_state``, as NumPy arrays without the member direction."""
+    mean = {}
+    stddev = {}
+    for key, field in fields.items():
+        if is_ensemble_field(field):
+            data = to_numpy(field.data)
+            mean[key] = data.mean(axis=1)
+            stddev[key] = data.std(axis=1, ddof=1 if data.shape[1] > 1 else 0)
+    return mean, stddev
+
+
+def is_ensemble_field(field: object) -> bool:
+    return getattr(field, "ndim", 0) >= 3
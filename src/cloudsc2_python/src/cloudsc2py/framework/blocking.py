@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import timeit
+from typing import TYPE_CHECKING
+
+from ifs_physics_common.framework.grid import I, J, K
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from concurrent.futures import Executor
+    from typing import Any, Optional
+
+    from gt4py.cartesian import StencilObject
+
+
+def get_column_blocks(
+    shape: tuple[int, int, int], block_size: Optional[int] = None
+) -> Iterator[tuple[tuple[int, int, int], tuple[int, int, int]]]:
+    """Split the domain ``shape`` into blocks of at most ``block_size`` consecutive columns along
+    the first horizontal direction, and yield the ``origin`` and ``domain`` of each block.
+
+    With ``block_size=None`` (or larger than the number of columns), the whole domain is a single
+    block. Like NPROMA blocks in the FORTRAN code, the last block may be smaller.
+    """
+    ni, nj, nk = shape
+    if block_size is not None and block_size <= 0:
+        raise RuntimeError(f"The block size must be positive, got {block_size}.")
+    block_size = min(block_size or ni, ni)
+    for start in range(0, ni, block_size):
+        yield (start, 0, 0), (min(block_size, ni - start), nj, nk)
+
+
+def launch_column_blocks(
+    stencil: StencilObject,
+    shape: tuple[int, int, int],
+    block_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    **kwargs: Any,
+) -> None:
+    """Launch ``stencil`` with the arguments ``kwargs`` over each block of columns given by
+    ``get_column_blocks(shape, block_size)``.
+
+    With ``executor`` (e.g. a ``ThreadPoolExecutor``), the blocks are launched concurrently. The
+    blocks being disjoint, the results are the same as for the serial launches.
+    """
+    blocks = get_column_blocks(shape, block_size)
+    if executor is None:
+        for origin, domain in blocks:
+            stencil(origin=origin, domain=domain, **kwargs)
+    else:
+        # the timings of concurrent launches would get mixed up in exec_info
+        kwargs["exec_info"] = None
+        futures = [
+            executor.submit(stencil, origin=origin, domain=domain, **kwargs)
+            for origin, domain in blocks
+        ]
+        for future in futures:
+            future.result()
+
+
+def get_block_size_candidates(num_cols: int, min_block_size: int = 8) -> list[Optional[int]]:
+    """Get the block sizes tried by ``tune_block_size`` by default: the whole domain (``None``),
+    and the powers of two from the number of columns down to ``min_block_size``."""
+    candidates: list[Optional[int]] = [None]
+    block_size = min_block_size
+    while block_size < num_cols:
+        candidates.insert(1, block_size)
+        block_size *= 2
+    return candidates
+
+
+def tune_block_size(
+    component: Any,
+    *args: Any,
+    candidates: Optional[Sequence[Optional[int]]] = None,
+    num_runs: int = 3,
+    max_slowdown: float = 2.0,
+    **kwargs: Any,
+) -> tuple[Optional[int], dict[Optional[int], float]]:
+    """Time ``component(*args, **kwargs)`` for each block size in ``candidates``, and set the
+    ``block_size`` of ``component`` to the fastest one.
+
+    The block sizes default to ``get_block_size_candidates``, from the largest to the smallest.
+    Each block size is first run once for warm-up, then timed ``num_runs`` times, retaining the
+    best time. The search stops at the first block size more than ``max_slowdown`` times slower
+    than the best one so far: with backends with a large launch overhead (e.g. numpy), smaller
+    blocks are only going to be slower. Since the optimal block size depends on the backend,
+    the tuning should be repeated for each backend. Return the best block size, and the best
+    runtime in seconds of each block size tried.
+    """
+    if candidates is None:
+        num_cols = component.computational_grid.grids[I, J, K].shape[0]
+        candidates = get_block_size_candidates(num_cols)
+
+    def run() -> None:
+        component(*args, **kwargs)
+
+    runtimes: dict[Optional[int], float] = {}
+    for block_size in candidates:
+        component.block_size = block_size
+        run()
+        runtimes[block_size] = min(timeit.repeat(run, repeat=num_runs, number=1))
+        if runtimes[block_size] > max_slowdown * min(runtimes.values()):
+            break
+    component.block_size = min(runtimes, key=runtimes.get)
+    return component.block_size, runtimes
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import numpy as np
+from typing import Literal, Type
+
+from ifs_physics_common.framework.config import DataTypes as BaseDataTypes
+
+
+class DataTypes(BaseDataTypes):
+    """Like ``ifs_physics_common.framework.config.DataTypes``, with an additional ``float_acc``
+    type for the quantities accumulated along the vertical.
+
+    In ``mixed`` precision, all fields are single precision except those of type ``float_acc``.
+    Note that GT4Py types the float literals of the stencils according to the environment
+    variable ``GT4PY_LITERAL_FLOAT_PRECISION`` (64 by default), so that it should be set to 32 for
+    the temporaries combining a field with a literal to be single precision as well.
+    """
+
+    float_acc: Type = np.float64
+
+    def with_precision(self, precision: Literal["double", "mixed", "single"]) -> DataTypes:
+        args = super().with_precision("single" if precision == "mixed" else precision).dict()
+        args["float_acc"] = np.float32 if precision == "single" else np.float64
+        return DataTypes(**args)
+
+
+def get_precision_externals(data_types: BaseDataTypes) -> dict[str, bool]:
+    """Get the externals telling the stencils whether they run in ``mixed`` precision.
+
+    In that case, the arguments of the saturation exponentials are evaluated in double precision
+    (see ``foeew_exact``), while the other temporaries keep the precision of the fields.
+    """
+    float_acc = getattr(data_types, "float_acc", data_types.float)
+    return {"MIXED_PRECISION": np.dtype(float_acc) != np.dtype(data_types.float)}
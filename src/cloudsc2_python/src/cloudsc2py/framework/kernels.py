@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import inspect
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any, Optional
+
+    KernelBuilder = Callable[[dict[str, Any]], Callable[..., None]]
+
+
+_kernel_builders: dict[str, KernelBuilder] = {}
+_kernels: dict[tuple[str, tuple[tuple[str, Any], ...]], NumbaKernel] = {}
+
+# the stencils whose Numba kernels are registered on import of the modules
+_kernel_modules = {
+    "cloudsc2_nl": "cloudsc2py.physics.nonlinear.kernels",
+    "cloudsc2_tl": "cloudsc2py.physics.tangent_linear.kernels",
+    "cloudsc2_ad": "cloudsc2py.physics.adjoint.kernels",
+}
+
+
+def kernel_collection(name: str) -> Callable[[KernelBuilder], KernelBuilder]:
+    """Register the function building the Numba kernel of the stencil ``name`` out of the
+    externals, as ``stencil_collection`` does for the stencil definitions."""
+
+    def core(builder: KernelBuilder) -> KernelBuilder:
+        _kernel_builders[name] = builder
+        return builder
+
+    return core
+
+
+class NumbaKernel:
+    """A Numba kernel, callable with the same arguments as the GT4Py stencil it replaces.
+
+    The first five arguments of ``function`` are the index of the first column along both
+    horizontal directions, the number of columns along both horizontal directions and the number
+    of vertical levels; these are filled from ``origin`` and ``domain``. The other arguments are
+    looked up by name among the stencil arguments, so that the arguments of the stencil not used
+    by the kernel (e.g. its scratch temporaries) are discarded.
+    """
+
+    arg_names: tuple[str, ...]
+    backend: str = "numba"
+    function: Callable[..., None]
+    name: str
+
+    def __init__(self, name: str, function: Callable[..., None]) -> None:
+        self.name = name
+        self.function = function
+        py_func = getattr(function, "py_func", function)
+        self.arg_names = tuple(inspect.signature(py_func).parameters)[5:]
+
+    def __call__(
+        self,
+        *,
+        origin: tuple[int, int, int] = (0, 0, 0),
+        domain: tuple[int, int, int],
+        validate_args: bool = False,
+        exec_info: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if exec_info is not None:
+            exec_info["call_start_time"] = time.perf_counter()
+
+        # the stencils are launched over the half levels
+        self.function(
+            origin[0],
+            origin[1],
+            domain[0],
+            domain[1],
+            domain[2] - 1,
+            *(kwargs[name] for name in self.arg_names),
+        )
+
+        if exec_info is not None:
+            exec_info["call_end_time"] = time.perf_counter()
+            if exec_info.setdefault("__aggregate_data", False):
+                # same performance counters as the GT4Py stencils
+                info = exec_info.setdefault(f"numba_{self.name}", {})
+                info["call_time"] = exec_info["call_end_time"] - exec_info["call_start_time"]
+                info["total_call_time"] = info.get("total_call_time", 0.0) + info["call_time"]
+                info["ncalls"] = info.get("ncalls", 0) + 1
+
+
+def compile_kernel(name: str, externals: Optional[dict[str, Any]] = None) -> NumbaKernel:
+    """Build the Numba kernel replacing the stencil ``name``, compiled with ``externals``.
+
+    The kernels are cached by name and externals, so that the components sharing the same
+    externals share the kernel. Numba compiles each kernel at its first call.
+    """
+    if name not in _kernel_builders and name in _kernel_modules:
+        # the kernels require Numba, hence they are imported on demand
+        __import__(_kernel_modules[name])
+    if name not in _kernel_builders:
+        raise RuntimeError(f"No Numba kernel is available for the stencil {name}.")
+    externals = externals or {}
+    key = (name, tuple(sorted(externals.items())))
+    if key not in _kernels:
+        _kernels[key] = NumbaKernel(name, _kernel_builders[name](externals))
+    return _kernels[key]
+
+
+class NumbaComponent:
+    """Mixin for the components, making ``compile_stencil`` build the Numba kernels in place of
+    the GT4Py stencils. This requires the storages to be allocated on the CPU."""
+
+    def compile_stencil(self, name: str, externals: Optional[dict[str, Any]] = None) -> NumbaKernel:
+        return compile_kernel(name, externals)
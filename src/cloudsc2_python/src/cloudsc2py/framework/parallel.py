@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from ifs_physics_common.framework.grid import I, J, K
+
+if TYPE_CHECKING:
+    from typing import Any, Optional, Union
+
+    from ifs_physics_common.framework.components import (
+        DiagnosticComponent,
+        ImplicitTendencyComponent,
+    )
+
+
+class ColumnParallelExecutor:
+    """Run a component with its columns split among the threads of a pool.
+
+    The wrapped component must launch its stencils via ``launch_column_blocks``, passing its
+    ``block_size`` and ``executor`` attributes (as e.g. ``Saturation`` and ``Cloudsc2NL`` do).
+    Within each call, the columns are split into disjoint blocks, which are processed
+    concurrently. The blocks have ``block_size`` columns if given, otherwise the block size
+    already set on the component (e.g. by ``tune_block_size``), otherwise one block is used per
+    thread. This pays off with the backends releasing the GIL during the computations (e.g.
+    numpy, on large enough blocks). The blocks being disjoint, the results are the same as for
+    the serial run.
+    """
+
+    block_size: Optional[int]
+    component: Union[DiagnosticComponent, ImplicitTendencyComponent]
+    num_threads: int
+    thread_pool: Optional[ThreadPoolExecutor]
+
+    def __init__(
+        self,
+        component: Union[DiagnosticComponent, ImplicitTendencyComponent],
+        num_threads: int,
+        block_size: Optional[int] = None,
+    ) -> None:
+        if not hasattr(component, "executor"):
+            raise RuntimeError(
+                f"{type(component).__name__} does not support the column-parallel execution."
+            )
+        if num_threads <= 0:
+            raise RuntimeError(f"The number of threads must be positive, got {num_threads}.")
+        self.component = component
+        self.num_threads = num_threads
+        self.block_size = block_size
+        self.thread_pool = ThreadPoolExecutor(num_threads) if num_threads > 1 else None
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """Call the component with the same arguments as the component itself."""
+        component = self.component
+        block_size, executor = component.block_size, component.executor
+        component.block_size = self.block_size or block_size or self.get_default_block_size()
+        component.executor = self.thread_pool
+        try:
+            return component(*args, **kwargs)
+        finally:
+            component.block_size, component.executor = block_size, executor
+
+    def get_default_block_size(self) -> int:
+        """Get the block size splitting the columns evenly among the threads."""
+        num_cols = self.component.computational_grid.grids[I, J, K].shape[0]
+        return -(-num_cols // self.num_threads)
+
+    def __enter__(self) -> ColumnParallelExecutor:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Release the threads of the pool."""
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown()
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import sys
+import threading
+from typing import TYPE_CHECKING
+import weakref
+
+from gt4py.cartesian.backend import from_name
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
+from ifs_physics_common.framework.storage import get_data_array, zeros
+from ifs_physics_common.utils.numpyx import assign
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator, Sequence
+    from typing import Literal, Optional
+
+    from ifs_physics_common.framework.config import GT4PyConfig
+    from ifs_physics_common.framework.grid import DimSymbol
+    from ifs_physics_common.utils.typingx import DataArray, DataArrayDict, Storage
+
+
+class StoragePool:
+    """A pool of storages, keyed by grid, dimensions, data shape, dtype and backend.
+
+    Storages are handed out by ``acquire`` and put back into the pool by ``release``, so that
+    they can be re-used by later requests with the same key. The pool can be shared among
+    threads.
+    """
+
+    hits: int
+    misses: int
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._storages: dict[Hashable, list[Storage]] = {}
+        # the storages handed out are tracked through weak references, so that those never
+        # released can still be garbage collected
+        self._keys: dict[int, tuple[Hashable, weakref.ref]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        computational_grid: ComputationalGrid,
+        grid_id: tuple[DimSymbol, ...],
+        data_shape: Optional[tuple[int, ...]] = None,
+        *,
+        gt4py_config: GT4PyConfig,
+        dtype: Literal["bool", "float", "float_acc", "int"],
+        zero: bool = False,
+    ) -> Storage:
+        """Get a storage from the pool, or allocate a new one if none is available.
+
+        A re-used storage is filled with zeros only if ``zero=True``.
+        """
+        key = (
+            computational_grid.grids[grid_id].shape,
+            grid_id,
+            tuple(data_shape or ()),
+            getattr(gt4py_config.dtypes, dtype),
+            gt4py_config.backend,
+        )
+        with self._lock:
+            storages = self._storages.get(key, None)
+            storage = storages.pop() if storages else None
+            if storage is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        # the storage is filled or allocated without holding the lock
+        if storage is not None:
+            if zero:
+                storage[...] = 0
+        else:
+            storage = zeros(
+                computational_grid, grid_id, data_shape, gt4py_config=gt4py_config, dtype=dtype
+            )
+
+        with self._lock:
+            self._keys[id(storage)] = (key, weakref.ref(storage))
+        return storage
+
+    def release(self, storage: Storage) -> None:
+        """Put a storage handed out by ``acquire`` back into the pool; ignore any other storage."""
+        with self._lock:
+            key, ref = self._keys.get(id(storage), (None, None))
+            if ref is not None and ref() is storage:
+                del self._keys[id(storage)]
+                self._storages.setdefault(key, []).append(storage)
+
+    def clear(self) -> None:
+        """Drop all storages held by the pool."""
+        with self._lock:
+            self._storages.clear()
+            self._keys.clear()
+
+    def get_statistics(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "available": sum(len(storages) for storages in self._storages.values()),
+                "in_use": sum(ref() is not None for _, ref in self._keys.values()),
+            }
+
+    def reset_statistics(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+_storage_pool = StoragePool()
+
+
+def get_storage_pool() -> StoragePool:
+    """Get the pool currently in use."""
+    return _storage_pool
+
+
+@contextmanager
+def managed_temporary_storage_pool() -> Iterator[StoragePool]:
+    """Draw all storages from a fresh pool within the context, and drop them upon exit."""
+    global _storage_pool
+    previous_storage_pool, _storage_pool = _storage_pool, StoragePool()
+    try:
+        yield _storage_pool
+    finally:
+        _storage_pool.clear()
+        _storage_pool = previous_storage_pool
+
+
+@contextmanager
+def managed_temporary_storage(
+    computational_grid: ComputationalGrid,
+    *args: tuple[tuple[DimSymbol, ...], Literal["bool", "float", "float_acc", "int"]],
+    gt4py_config: GT4PyConfig,
+) -> Iterator[list[Storage]]:
+    """Borrow one storage from the pool for each pair (grid_id, dtype) in ``args``."""
+    storage_pool = get_storage_pool()
+    storages = [
+        storage_pool.acquire(computational_grid, grid_id, gt4py_config=gt4py_config, dtype=dtype)
+        for grid_id, dtype in args
+    ]
+    try:
+        yield storages
+    finally:
+        for storage in storages:
+            storage_pool.release(storage)
+
+
+def allocate_data_array(
+    computational_grid: ComputationalGrid,
+    grid_id: tuple[DimSymbol, ...],
+    units: str,
+    data_shape: Optional[tuple[int, ...]] = None,
+    data_dims: Optional[tuple[str, ...]] = None,
+    *,
+    gt4py_config: GT4PyConfig,
+    dtype: Literal["bool", "float", "float_acc", "int"],
+) -> DataArray:
+    """Like ``ifs_physics_common.framework.storage.allocate_data_array``, but using the pool."""
+    buffer = get_storage_pool().acquire(
+        computational_grid, grid_id, data_shape, gt4py_config=gt4py_config, dtype=dtype, zero=True
+    )
+    return get_data_array(buffer, computational_grid, grid_id, units, data_dims=data_dims)
+
+
+def release_data_arrays(data_array_dict: DataArrayDict) -> None:
+    """Give the storages underlying ``data_array_dict`` back to the pool.
+
+    A data array viewing a storage of the pool (e.g. the cloud variables) records the storage
+    in its ``pooled_storage`` attribute, which is released in place of the view.
+    """
+    storage_pool = get_storage_pool()
+    for data_array in data_array_dict.values():
+        storage = getattr(data_array, "attrs", {}).get("pooled_storage", None)
+        if storage is None:
+            storage = getattr(data_array, "data", data_array)
+        storage_pool.release(storage)
+
+
+class PackedStorage:
+    """A single storage packing several (I, J, K) and (I, J, K - 1/2) fields.
+
+    Each field occupies a slot of ``num_levels`` consecutive levels of a storage with
+    ``len(names) * num_levels`` levels, ``num_levels`` being the number of levels of the
+    (I, J, K - 1/2) storages possibly rounded up for alignment. Since only the vertical axis is
+    split, each field is a view of the storage, and the whole set of fields can be copied or
+    written at once. Note that this is not a struct-of-arrays layout: on the backends with K as
+    the innermost dimension (e.g. numpy and gt:cpu_kfirst), the slots of a column are contiguous,
+    so that the fields are interleaved column by column.
+
+    With ``alignment`` (in bytes), the first level of each slot is aligned accordingly with
+    respect to the first level of the storage. This is an alignment in memory for the
+    backends with K as the innermost dimension (e.g. numpy and gt:cpu_kfirst).
+    """
+
+    alignment: Optional[int]
+    # the storage this one is a view of, if any
+    base: Optional[PackedStorage] = None
+    buffer: Storage
+    computational_grid: ComputationalGrid
+    dtype: Literal["float", "float_acc"]
+    gt4py_config: GT4PyConfig
+    num_levels: int
+    slots: dict[str, int]
+    storage_levels: dict[tuple[DimSymbol, ...], int]
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        names: Sequence[str],
+        *,
+        gt4py_config: GT4PyConfig,
+        dtype: Literal["float", "float_acc"] = "float",
+        alignment: Optional[int] = None,
+        buffer: Optional[Storage] = None,
+    ) -> None:
+        """With ``buffer``, the fields are views of ``buffer`` rather than of a new storage."""
+        ni, nj, nk = computational_grid.grids[I, J, K].shape
+        # the storages allocated by zeros may have more levels than the grid, and the views
+        # must have as many levels to be interchangeable with them
+        self.storage_levels = {
+            grid_id: zeros(
+                ComputationalGrid(1, 1, nk), grid_id, gt4py_config=gt4py_config, dtype=dtype
+            ).shape[2]
+            for grid_id in ((I, J, K), (I, J, K - 1 / 2))
+        }
+        itemsize = np.dtype(getattr(gt4py_config.dtypes, dtype)).itemsize
+        if alignment is not None and (alignment <= 0 or alignment % itemsize != 0):
+            raise RuntimeError(
+                f"The alignment must be a positive multiple of {itemsize} bytes, "
+                f"got {alignment}."
+            )
+        step = (alignment or itemsize) // itemsize
+
+        self.alignment = alignment
+        self.computational_grid = computational_grid
+        self.dtype = dtype
+        self.gt4py_config = gt4py_config
+        self.num_levels = -(-max(self.storage_levels.values()) // step) * step
+        self.slots = {name: slot for slot, name in enumerate(names)}
+        shape = (ni, nj, len(self.slots) * self.num_levels)
+        if buffer is None:
+            buffer = self.allocate_buffer(shape)
+        elif buffer.shape != shape:
+            raise RuntimeError(f"The buffer has shape {buffer.shape}, but {shape} is required.")
+        self.buffer = buffer
+
+    def allocate_buffer(self, shape: tuple[int, int, int]) -> Storage:
+        # zeros may add levels to the storage, which must not be part of any slot
+        return zeros(
+            ComputationalGrid(*shape), (I, J, K), gt4py_config=self.gt4py_config, dtype=self.dtype
+        )[:, :, : shape[2]]
+
+    def get_field(self, name: str, grid_id: tuple[DimSymbol, ...] = (I, J, K)) -> Storage:
+        """Get the view of the storage standing for the field ``name``."""
+        start = self.slots[name] * self.num_levels
+        return self.buffer[:, :, start : start + self.storage_levels[grid_id]]
+
+    def get_columns(self, start: int, stop: int) -> PackedStorage:
+        """Get the fields of the columns from ``start`` to ``stop`` (excluded), as a packed storage
+        sharing the memory of this one."""
+        _, nj, nk = self.computational_grid.grids[I, J, K].shape
+        out = PackedStorage(
+            ComputationalGrid(stop - start, nj, nk),
+            list(self.slots),
+            gt4py_config=self.gt4py_config,
+            dtype=self.dtype,
+            alignment=self.alignment,
+            buffer=self.buffer[start:stop],
+        )
+        out.base = self
+        return out
+
+    def get_stacked_fields(self, names: Sequence[str]) -> Storage:
+        """Get the (I, J, K) fields ``names``, which must occupy consecutive slots, as a single
+        field with a trailing data dimension.
+        """
+        ni, nj, _ = self.buffer.shape
+        nk = self.storage_levels[I, J, K]
+        start = self.slots[names[0]]
+        if [self.slots[name] for name in names] != list(range(start, start + len(names))):
+            raise RuntimeError(f"The fields {', '.join(names)} are not packed consecutively.")
+        # splitting an axis never requires a copy, so this is a view of buffer
+        fields = self.buffer.reshape((ni, nj, len(self.slots), self.num_levels))
+        return fields[:, :, start : start + len(names), :nk].transpose((0, 1, 3, 2))
+
+    def get_data_array(self, name: str, grid_id: tuple[DimSymbol, ...], units: str) -> DataArray:
+        data_array = get_data_array(
+            self.get_field(name, grid_id), self.computational_grid, grid_id, units
+        )
+        data_array.attrs["packed_storage"] = self
+        return data_array
+
+    def snapshot(self, out: Optional[Storage] = None) -> Storage:
+        """Copy all fields at once into ``out``, or into a new storage."""
+        if out is None:
+            out = self.buffer.copy()
+        else:
+            assign(out, self.buffer)
+        return out
+
+    def restore(self, snapshot: Storage) -> None:
+        """Overwrite all fields at once with a snapshot."""
+        assign(self.buffer, snapshot)
+
+
+class SharedPackedStorage(PackedStorage):
+    """A ``PackedStorage`` in a block of shared memory, which other processes can attach to.
+
+    The block is either created, or attached to by the name ``shared_memory_name``, given
+    by the ``spec`` of the creating instance. Only the backends with storages in host memory
+    are supported. The process creating the block is responsible for ``unlink``-ing it, and
+    any process should ``close`` it once done.
+    """
+
+    readonly: bool
+    shared_memory: SharedMemory
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        names: Sequence[str],
+        *,
+        gt4py_config: GT4PyConfig,
+        dtype: Literal["float", "float_acc"] = "float",
+        alignment: Optional[int] = None,
+        shared_memory_name: Optional[str] = None,
+        readonly: bool = False,
+        track: bool = True,
+    ) -> None:
+        """With ``track=False``, the block is not unlinked at exit by the resource tracker of this
+        process. This is needed by independent processes attaching to the block, since the
+        block would otherwise be unlinked as soon as the first of them exits.
+        """
+        self.readonly = readonly
+        self._shared_memory_name = shared_memory_name
+        self._track = track
+        super().__init__(
+            computational_grid, names, gt4py_config=gt4py_config, dtype=dtype, alignment=alignment
+        )
+
+    @classmethod
+    def attach(
+        cls,
+        spec: dict,
+        *,
+        gt4py_config: GT4PyConfig,
+        readonly: bool = False,
+        track: bool = True,
+    ) -> SharedPackedStorage:
+        """Attach to the block of shared memory of the storage with the given ``spec``."""
+        return cls(
+            ComputationalGrid(*spec["shape"]),
+            spec["names"],
+            gt4py_config=gt4py_config,
+            dtype=spec["dtype"],
+            alignment=spec["alignment"],
+            shared_memory_name=spec["shared_memory_name"],
+            readonly=readonly,
+            track=track,
+        )
+
+    @property
+    def spec(self) -> dict:
+        """The (picklable) arguments for other processes to ``attach`` to this storage."""
+        return {
+            "shape": self.computational_grid.grids[I, J, K].shape,
+            "names": list(self.slots),
+            "dtype": self.dtype,
+            "alignment": self.alignment,
+            "shared_memory_name": self.shared_memory.name,
+        }
+
+    def allocate_buffer(self, shape: tuple[int, int, int]) -> Storage:
+        storage_info = from_name(self.gt4py_config.backend).storage_info
+        if storage_info["device"] != "cpu":
+            raise RuntimeError(
+                f"The backend {self.gt4py_config.backend} does not support shared memory."
+            )
+        dtype = np.dtype(getattr(self.gt4py_config.dtypes, self.dtype))
+        size = int(np.prod(shape)) * dtype.itemsize
+        if self._shared_memory_name is None:
+            self.shared_memory = SharedMemory(create=True, size=size)
+        elif self._track or sys.version_info < (3, 13):
+            self.shared_memory = SharedMemory(name=self._shared_memory_name)
+            if not self._track:
+                resource_tracker.unregister(self.shared_memory._name, "shared_memory")
+        else:
+            self.shared_memory = SharedMemory(name=self._shared_memory_name, track=False)
+
+        # lay out the buffer as the storages of the backend, from the fastest varying axis
+        layout_map = storage_info["layout_map"](("I", "J", "K"))
+        strides = [0, 0, 0]
+        stride = dtype.itemsize
+        for axis in sorted(range(3), key=lambda axis: layout_map[axis], reverse=True):
+            strides[axis] = stride
+            stride *= shape[axis]
+        buffer = np.ndarray(shape, dtype, buffer=self.shared_memory.buf, strides=strides)
+        buffer.flags.writeable = not self.readonly
+        return buffer
+
+    def close(self) -> None:
+        """Detach from the block of shared memory. All views of the storage must be dropped
+        beforehand."""
+        self.buffer = None
+        self.shared_memory.close()
+
+    def unlink(self) -> None:
+        """Destroy the block of shared memory."""
+        self.shared_memory.unlink()
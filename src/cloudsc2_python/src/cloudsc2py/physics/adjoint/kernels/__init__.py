@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+import cloudsc2py.physics.adjoint.kernels.cloudsc2
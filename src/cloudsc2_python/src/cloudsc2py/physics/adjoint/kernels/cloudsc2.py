@@ -0,0 +1,1215 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from collections import namedtuple
+import math
+from numba import njit, prange
+import numpy as np
+from typing import TYPE_CHECKING
+
+from cloudsc2py.framework.kernels import kernel_collection
+from cloudsc2py.physics.adjoint.kernels.cuadjtqs import build_cuadjtqs_ad
+from cloudsc2py.physics.nonlinear.kernels.cloudsc2 import critical_relative_humidity
+from cloudsc2py.physics.nonlinear.kernels.cuadjtqs import build_cuadjtqs_nl
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+Trajectory = namedtuple(
+    "Trajectory",
+    [
+        "b",
+        "beta",
+        "cldi",
+        "cldl",
+        "clc",
+        "clc2",
+        "condi1",
+        "condi2",
+        "condl1",
+        "condl2",
+        "cons",
+        "cor",
+        "corqs",
+        "covpclr",
+        "covpclr1",
+        "covptot",
+        "covptot1",
+        "crh2",
+        "dp",
+        "dpr",
+        "dpr1",
+        "dq",
+        "dqc",
+        "dqsdtemp",
+        "dqsdz",
+        "dr2",
+        "dtdzmo",
+        "dtgdp",
+        "esdp1",
+        "evap",
+        "evapr",
+        "evaps",
+        "fac",
+        "fac1",
+        "fac2",
+        "fac3",
+        "fac4",
+        "faci",
+        "facw",
+        "foeew",
+        "fwat",
+        "fwatr1",
+        "fwatr2",
+        "gdp",
+        "itmp11",
+        "itmp12",
+        "itmp2",
+        "ldcp",
+        "lfdcp",
+        "lo3",
+        "lsdcp",
+        "ltmp1",
+        "ltmp2",
+        "lude",
+        "lvdcp",
+        "out_covptot",
+        "prr",
+        "prs",
+        "prtot",
+        "preclr",
+        "preclr1",
+        "q",
+        "q2",
+        "qc3",
+        "qcd",
+        "qcrit",
+        "qe",
+        "qiwc",
+        "qiwc1",
+        "qlim",
+        "qlwc",
+        "qlwc1",
+        "qold",
+        "qpd",
+        "qsat",
+        "qt",
+        "rfln",
+        "rfln2",
+        "rfreeze1",
+        "rfreeze3",
+        "rho",
+        "rodqsdp",
+        "scalm",
+        "sfln",
+        "sfln2",
+        "snmlt",
+        "supsat",
+        "t",
+        "t2",
+        "t3",
+        "tmp3",
+        "tnd_q",
+        "tnd_qi",
+        "tnd_ql",
+        "tnd_t",
+        "z2s",
+    ],
+)
+
+
+@ported_function(from_file="cloudsc2_ad/cloudsc2ad.F90", from_line=346, to_line=1740)
+@kernel_collection("cloudsc2_ad")
+def build_cloudsc2_ad(externals: dict[str, Any]) -> Callable[..., None]:
+    """Build the Numba counterpart of the ``cloudsc2_ad`` stencil.
+
+    Rather than storing the whole trajectory, the forward sweep only records the fluxes entering
+    each level; the backward sweep then recomputes the trajectory of one level at a time. Unlike
+    the stencil, the kernel does not modify its input fields.
+    """
+    LDRAIN1D = externals["LDRAIN1D"]
+    LEVAPLS2 = externals["LEVAPLS2"]
+    LREGCL = externals["LREGCL"]
+    NLEV = externals["NLEV"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    R5IES = externals["R5IES"]
+    R5LES = externals["R5LES"]
+    RCLCRIT = externals["RCLCRIT"]
+    RCPD = externals["RCPD"]
+    RD = externals["RD"]
+    RETV = externals["RETV"]
+    RG = externals["RG"]
+    RKCONV = externals["RKCONV"]
+    RLMIN = externals["RLMIN"]
+    RLMLT = externals["RLMLT"]
+    RLPTRC = externals["RLPTRC"]
+    RLSTT = externals["RLSTT"]
+    RLVTT = externals["RLVTT"]
+    RPECONS = externals["RPECONS"]
+    RTICE = externals["RTICE"]
+    RTT = externals["RTT"]
+    RVTMP2 = externals["RVTMP2"]
+    ZEPS1 = externals["ZEPS1"]
+    ZEPS2 = externals["ZEPS2"]
+    ZQMAX = externals["ZQMAX"]
+    ZSCAL = externals["ZSCAL"]
+    cuadjtqs_ad = build_cuadjtqs_ad(externals)
+    cuadjtqs_nl = build_cuadjtqs_nl(externals)
+    # the saturation table is never looked up, since the externals do not enable it
+    es_table = np.zeros((1, 4))
+
+    @njit
+    def forward(
+        t2,
+        q2,
+        ql,
+        qi,
+        ap,
+        aph0,
+        aph1,
+        eta,
+        lude0,
+        lu1,
+        mfu,
+        mfd,
+        qsat0,
+        aph_s,
+        trpaus,
+        rfl,
+        sfl,
+        covptotp,
+        dt,
+    ):
+        # set up constants required
+        ckcodtl = 2 * RKCONV * dt
+        ckcodti = 5 * RKCONV * dt
+        cons2 = 1 / (RG * dt)
+        cons3 = RLVTT / RCPD
+        meltp2 = RTT + 2
+
+        # parameter for cloud formation
+        scalm = ZSCAL * max(eta - 0.2, ZEPS1) ** 0.2
+
+        # thermodynamic constants
+        dp = aph1 - aph0
+        zz = RCPD + RCPD * RVTMP2 * q2
+        lfdcp = RLMLT / zz
+        lsdcp = RLSTT / zz
+        lvdcp = RLVTT / zz
+
+        # calculate dqs/dT correction factor
+        if t2 < RTT:
+            fwat = 0.545 * (math.tanh(0.17 * (t2 - RLPTRC)) + 1)
+            z3es = R3IES
+            z4es = R4IES
+        else:
+            fwat = 1.0
+            z3es = R3LES
+            z4es = R4LES
+        foeew = R2ES * math.exp(z3es * (t2 - RTT) / (t2 - z4es))
+        esdp1 = foeew / ap
+        esdp = min(esdp1, ZQMAX)
+        facw = R5LES / (t2 - R4LES) ** 2
+        faci = R5IES / (t2 - R4IES) ** 2
+        fac = fwat * facw + (1 - fwat) * faci
+        cor = 1 / (1 - RETV * esdp)
+        dqsdtemp = fac * cor * qsat0
+        corqs = 1 + cons3 * dqsdtemp
+
+        # use clipped state
+        qlim = min(q2, qsat0)
+
+        # set up critical value of humidity
+        crh2 = critical_relative_humidity(eta, trpaus)
+
+        # allow ice supersaturation at cold temperatures
+        if t2 < RTICE:
+            supsat = 1.8 - 0.003 * t2
+        else:
+            supsat = 1.0
+        qsat = qsat0 * supsat
+        qcrit = crh2 * qsat
+
+        # simple uniform distribution of total water from Leutreut & Li (1990)
+        qt = q2 + ql + qi
+        if qt <= qcrit:
+            clc = 0.0
+            qc1 = 0.0
+            qcd = 0.0
+            qpd = 0.0
+            tmp3 = 0.0
+        elif qt >= qsat:
+            clc = 1.0
+            qc1 = (1 - scalm) * (qsat - qcrit)
+            qcd = 0.0
+            qpd = 0.0
+            tmp3 = 0.0
+        else:
+            qcd = qsat - qcrit
+            qpd = qsat - qt
+            tmp3 = math.sqrt(qpd / (qcd - scalm * (qt - qcrit)))
+            clc = 1 - tmp3
+            qc1 = (scalm * qpd + (1 - scalm) * qcd) * clc**2
+
+        # add convective component
+        gdp = RG / (aph1 - aph0)
+        lude = dt * lude0 * gdp
+        if lude >= RLMIN and lu1 >= ZEPS2:
+            clc2 = clc + (1 - clc) * (1 - math.exp(-lude / lu1))
+            qc2 = qc1 + lude
+        else:
+            clc2 = clc
+            qc2 = qc1
+
+        # add compensating subsidence component
+        fac1 = 1 / (RD * t2)
+        rho = ap * fac1
+        fac2 = 1 / (ap - RETV * foeew)
+        rodqsdp = -rho * qsat0 * fac2
+        ldcp = fwat * lvdcp + (1 - fwat) * lsdcp
+        fac3 = 1 / (1 + ldcp * dqsdtemp)
+        dtdzmo = RG * (1 / RCPD - ldcp * rodqsdp) * fac3
+        dqsdz = dqsdtemp * dtdzmo - RG * rodqsdp
+        fac4 = 1 / rho
+        lo3 = dt * dqsdz * (mfu + mfd) * fac4 < qc2
+        dqc = min(dt * dqsdz * (mfu + mfd) * fac4, qc2)
+        qc3 = qc2 - dqc
+
+        # new cloud liquid/ice contents and condensation rates (liquid/ice)
+        qlwc1 = qc3 * fwat
+        qiwc1 = qc3 * (1 - fwat)
+        condl1 = (qlwc1 - ql) / dt
+        condi1 = (qiwc1 - qi) / dt
+
+        # calculate precipitation overlap
+        # simple form based on Maximum Overlap
+        covptot1 = max(covptotp, clc2)
+        covptot = covptot1
+        covpclr1 = covptot - clc2
+        covpclr = max(covpclr1, 0.0)
+
+        # melting of incoming snow
+        if sfl != 0:
+            cons = cons2 * dp / lfdcp
+            z2s = cons * max(t2 - meltp2, 0.0)
+            snmlt = min(sfl, z2s)
+            rfln = rfl + snmlt
+            sfln = sfl - snmlt
+            t = t2 - snmlt / cons
+        else:
+            cons = 0.0
+            z2s = 0.0
+            snmlt = 0.0
+            rfln = rfl
+            sfln = sfl
+            t = t2
+
+        # diagnostic calculation of rain production from cloud liquid water
+        if clc2 > ZEPS2:
+            if LEVAPLS2 or LDRAIN1D:
+                lcrit = 1.9 * RCLCRIT
+            else:
+                lcrit = 2.0 * RCLCRIT
+            cldl = qlwc1 / clc2
+            ltmp1 = math.exp(-((cldl / lcrit) ** 2))
+            dl = ckcodtl * (1 - ltmp1)
+            ltmp2 = math.exp(-dl)
+            qlnew = clc2 * cldl * ltmp2
+            prr = qlwc1 - qlnew
+            qlwc = qlwc1 - prr
+        else:
+            cldl = 0.0
+            ltmp1 = 0.0
+            ltmp2 = 0.0
+            prr = 0.0
+            qlwc = qlwc1
+
+        # diagnostic calculation of snow production from cloud ice
+        if clc2 > ZEPS2:
+            if LEVAPLS2 or LDRAIN1D:
+                icrit = 0.0001
+            else:
+                icrit = 2 * RCLCRIT
+            cldi = qiwc1 / clc2
+            itmp11 = math.exp(-((cldi / icrit) ** 2))
+            itmp12 = math.exp(0.025 * (t - RTT))
+            di = ckcodti * itmp12 * (1 - itmp11)
+            itmp2 = math.exp(-di)
+            qinew = clc2 * cldi * itmp2
+            prs = qiwc1 - qinew
+            qiwc = qiwc1 - prs
+        else:
+            cldi = 0.0
+            itmp11 = 0.0
+            itmp12 = 0.0
+            itmp2 = 0.0
+            prs = 0.0
+            qiwc = qiwc1
+
+        # new precipitation (rain + snow)
+        dr1 = cons2 * dp * (prr + prs)
+
+        # rain fraction (different from cloud liquid water fraction!)
+        if t < RTT:
+            rfreeze1 = cons2 * dp * prr
+            fwatr1 = 0.0
+        else:
+            rfreeze1 = 0.0
+            fwatr1 = 1.0
+        rfln += fwatr1 * dr1
+        sfln += (1 - fwatr1) * dr1
+        rfln2 = rfln
+        sfln2 = sfln
+
+        # precipitation evaporation
+        prtot = rfln + sfln
+        evap = prtot > ZEPS2 and covpclr > ZEPS2 and (LEVAPLS2 or LDRAIN1D)
+        if evap:
+            preclr1 = prtot * covpclr / covptot1
+
+            # this is the humidity in the moistest zcovpclr region
+            qe = qsat0 - (qsat0 - qlim) * covpclr / (1 - clc2) ** 2
+            beta = RG * RPECONS * (math.sqrt(ap / aph_s) / 0.00509 * preclr1 / covpclr) ** 0.5777
+
+            # implicit solution
+            b = dt * beta * (qsat0 - qe) / (1 + dt * beta * corqs)
+
+            dtgdp = dt * RG / (aph1 - aph0)
+            dpr1 = covpclr * b / dtgdp
+            dpr = min(dpr1, preclr1)
+
+            # take away from clear sky flux
+            preclr = preclr1 - dpr
+            if preclr <= 0:
+                covptot = clc2
+            out_covptot = covptot
+
+            # warm proportion
+            evapr = dpr * rfln2 / prtot
+            rfln -= evapr
+
+            # ice proportion
+            evaps = dpr * sfln2 / prtot
+            sfln -= evaps
+        else:
+            preclr1 = 0.0
+            qe = 0.0
+            beta = 0.0
+            b = 0.0
+            dtgdp = 0.0
+            dpr1 = 0.0
+            dpr = 0.0
+            preclr = 0.0
+            out_covptot = 0.0
+            evapr = 0.0
+            evaps = 0.0
+
+        # update of T and Q tendencies
+        dqdt = -(condl1 + condi1) + (lude0 + evapr + evaps) * gdp
+        dtdt = (
+            lvdcp * condl1
+            + lsdcp * condi1
+            - (
+                lvdcp * evapr
+                + lsdcp * evaps
+                + lude0 * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                - (lsdcp - lvdcp) * rfreeze1
+            )
+            * gdp
+        )
+
+        # first guess T and Q
+        t3 = t + dt * dtdt
+        qold = q2 + dt * dqdt
+
+        # clipping of final qv
+        t, q = cuadjtqs_nl(ap, t3, qold, es_table)
+
+        # update rain fraction and freezing
+        dq = max(qold - q, 0.0)
+        dr2 = cons2 * dp * dq
+        if t3 < RTT:
+            rfreeze2 = fwat * dr2
+            fwatr2 = 0.0
+        else:
+            rfreeze2 = 0.0
+            fwatr2 = 1.0
+        condl2 = condl1 + fwatr2 * dq / dt
+        condi2 = condi1 + (1 - fwatr2) * dq / dt
+        rfln += fwatr2 * dr2
+        sfln += (1 - fwatr2) * dr2
+        rfreeze3 = rfreeze1 + rfreeze2
+
+        # calculate output tendencies
+        tnd_q = -(condl2 + condi2) + (lude0 + evapr + evaps) * gdp
+        tnd_t = (
+            lvdcp * condl2
+            + lsdcp * condi2
+            - (
+                lvdcp * evapr
+                + lsdcp * evaps
+                + lude0 * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                - (lsdcp - lvdcp) * rfreeze3
+            )
+            * gdp
+        )
+        tnd_ql = (qlwc - ql) / dt
+        tnd_qi = (qiwc - qi) / dt
+
+        return Trajectory(
+            b=b,
+            beta=beta,
+            cldi=cldi,
+            cldl=cldl,
+            clc=clc,
+            clc2=clc2,
+            condi1=condi1,
+            condi2=condi2,
+            condl1=condl1,
+            condl2=condl2,
+            cons=cons,
+            cor=cor,
+            corqs=corqs,
+            covpclr=covpclr,
+            covpclr1=covpclr1,
+            covptot=covptot,
+            covptot1=covptot1,
+            crh2=crh2,
+            dp=dp,
+            dpr=dpr,
+            dpr1=dpr1,
+            dq=dq,
+            dqc=dqc,
+            dqsdtemp=dqsdtemp,
+            dqsdz=dqsdz,
+            dr2=dr2,
+            dtdzmo=dtdzmo,
+            dtgdp=dtgdp,
+            esdp1=esdp1,
+            evap=evap,
+            evapr=evapr,
+            evaps=evaps,
+            fac=fac,
+            fac1=fac1,
+            fac2=fac2,
+            fac3=fac3,
+            fac4=fac4,
+            faci=faci,
+            facw=facw,
+            foeew=foeew,
+            fwat=fwat,
+            fwatr1=fwatr1,
+            fwatr2=fwatr2,
+            gdp=gdp,
+            itmp11=itmp11,
+            itmp12=itmp12,
+            itmp2=itmp2,
+            ldcp=ldcp,
+            lfdcp=lfdcp,
+            lo3=lo3,
+            lsdcp=lsdcp,
+            ltmp1=ltmp1,
+            ltmp2=ltmp2,
+            lude=lude,
+            lvdcp=lvdcp,
+            out_covptot=out_covptot,
+            prr=prr,
+            prs=prs,
+            prtot=prtot,
+            preclr=preclr,
+            preclr1=preclr1,
+            q=q,
+            q2=q2,
+            qc3=qc3,
+            qcd=qcd,
+            qcrit=qcrit,
+            qe=qe,
+            qiwc=qiwc,
+            qiwc1=qiwc1,
+            qlim=qlim,
+            qlwc=qlwc,
+            qlwc1=qlwc1,
+            qold=qold,
+            qpd=qpd,
+            qsat=qsat,
+            qt=qt,
+            rfln=rfln,
+            rfln2=rfln2,
+            rfreeze1=rfreeze1,
+            rfreeze3=rfreeze3,
+            rho=rho,
+            rodqsdp=rodqsdp,
+            scalm=scalm,
+            sfln=sfln,
+            sfln2=sfln2,
+            snmlt=snmlt,
+            supsat=supsat,
+            t=t,
+            t2=t2,
+            t3=t3,
+            tmp3=tmp3,
+            tnd_q=tnd_q,
+            tnd_qi=tnd_qi,
+            tnd_ql=tnd_ql,
+            tnd_t=tnd_t,
+            z2s=z2s,
+        )
+
+    @njit(parallel=True)
+    def cloudsc2_ad(
+        i0,
+        j0,
+        ni,
+        nj,
+        nk,
+        in_ap,
+        in_aph,
+        in_clc_i,
+        in_covptot_i,
+        in_eta,
+        in_fhpsl_i,
+        in_fhpsn_i,
+        in_fplsl_i,
+        in_fplsn_i,
+        in_lu,
+        in_lude,
+        in_mfd,
+        in_mfu,
+        in_q,
+        in_qi,
+        in_ql,
+        in_qsat,
+        in_supsat,
+        in_t,
+        in_tnd_cml_q,
+        in_tnd_cml_qi,
+        in_tnd_cml_ql,
+        in_tnd_cml_t,
+        in_tnd_q_i,
+        in_tnd_qi_i,
+        in_tnd_ql_i,
+        in_tnd_t_i,
+        out_ap_i,
+        out_aph_i,
+        out_clc,
+        out_covptot,
+        out_fhpsl,
+        out_fhpsn,
+        out_fplsl,
+        out_fplsn,
+        out_lu_i,
+        out_lude_i,
+        out_mfd_i,
+        out_mfu_i,
+        out_q_i,
+        out_qi_i,
+        out_ql_i,
+        out_qsat_i,
+        out_supsat_i,
+        out_t_i,
+        out_tnd_cml_q_i,
+        out_tnd_cml_qi_i,
+        out_tnd_cml_ql_i,
+        out_tnd_cml_t_i,
+        out_tnd_q,
+        out_tnd_qi,
+        out_tnd_ql,
+        out_tnd_t,
+        tmp_aph_s,
+        tmp_aph_s_i,
+        dt,
+    ):
+        # set up constants
+        ckcodtl = 2 * RKCONV * dt
+        ckcodti = 5 * RKCONV * dt
+        ckcodtla = ckcodtl / 100
+        ckcodtia = ckcodti / 100
+        cons2 = 1 / (RG * dt)
+        cons3 = RLVTT / RCPD
+        meltp2 = RTT + 2
+
+        for col in prange(ni * nj):
+            i = i0 + col // nj
+            j = j0 + col % nj
+            aph_s = tmp_aph_s[i, j]
+
+            # eta value at tropopause
+            trpaus = 0.1
+            for k in range(nk - 1):
+                t = in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k]
+                t_below = in_t[i, j, k + 1] + dt * in_tnd_cml_t[i, j, k + 1]
+                if in_eta[k] > 0.1 and in_eta[k] < 0.4 and t > t_below:
+                    trpaus = in_eta[k]
+
+            # precipitation fluxes and total cloud cover entering each level
+            rfl = np.empty(nk)
+            sfl = np.empty(nk)
+            covptotp = np.empty(nk)
+
+            # === forward sweep
+
+            rfln = 0.0
+            sfln = 0.0
+            covptot = 0.0
+            for k in range(nk):
+                rfl[k] = rfln
+                sfl[k] = sfln
+                covptotp[k] = covptot
+                tr = forward(
+                    in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k],
+                    in_q[i, j, k] + dt * in_tnd_cml_q[i, j, k] + in_supsat[i, j, k],
+                    in_ql[i, j, k] + dt * in_tnd_cml_ql[i, j, k],
+                    in_qi[i, j, k] + dt * in_tnd_cml_qi[i, j, k],
+                    in_ap[i, j, k],
+                    in_aph[i, j, k],
+                    in_aph[i, j, k + 1],
+                    in_eta[k],
+                    in_lude[i, j, k],
+                    in_lu[i, j, k + 1],
+                    in_mfu[i, j, k],
+                    in_mfd[i, j, k],
+                    in_qsat[i, j, k],
+                    aph_s,
+                    trpaus,
+                    rfl[k],
+                    sfl[k],
+                    covptotp[k],
+                    dt,
+                )
+                out_clc[i, j, k] = tr.clc2
+                out_covptot[i, j, k] = tr.out_covptot
+                out_tnd_q[i, j, k] = tr.tnd_q
+                out_tnd_t[i, j, k] = tr.tnd_t
+                out_tnd_ql[i, j, k] = tr.tnd_ql
+                out_tnd_qi[i, j, k] = tr.tnd_qi
+                rfln = tr.rfln
+                sfln = tr.sfln
+                covptot = tr.covptot
+
+            # enthalpy fluxes due to precipitation
+            out_fplsl[i, j, 0] = 0.0
+            out_fplsn[i, j, 0] = 0.0
+            out_fhpsl[i, j, 0] = 0.0
+            out_fhpsn[i, j, 0] = 0.0
+            for k in range(1, nk + 1):
+                out_fplsl[i, j, k] = rfl[k] if k < nk else rfln
+                out_fplsn[i, j, k] = sfl[k] if k < nk else sfln
+                out_fhpsl[i, j, k] = -out_fplsl[i, j, k] * RLVTT
+                out_fhpsn[i, j, k] = -out_fplsn[i, j, k] * RLSTT
+
+            # === backward sweep
+
+            covptot_i = 0.0
+            rfl_i = 0.0
+            sfl_i = 0.0
+            aph_s_i = 0.0
+            tmp_rfln_i = 0.0
+            tmp_sfln_i = 0.0
+            daph_i_below = 0.0
+            dp_i_below = 0.0
+            daph_i = 0.0
+            dp_i = 0.0
+            daph_i_bottom = 0.0
+            dp_i_bottom = 0.0
+            for k in range(nk - 1, -1, -1):
+                ap = in_ap[i, j, k]
+                aph0 = in_aph[i, j, k]
+                aph1 = in_aph[i, j, k + 1]
+                lude0 = in_lude[i, j, k]
+                lu1 = in_lu[i, j, k + 1]
+                mfu = in_mfu[i, j, k]
+                mfd = in_mfd[i, j, k]
+                qsat0 = in_qsat[i, j, k]
+                tr = forward(
+                    in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k],
+                    in_q[i, j, k] + dt * in_tnd_cml_q[i, j, k] + in_supsat[i, j, k],
+                    in_ql[i, j, k] + dt * in_tnd_cml_ql[i, j, k],
+                    in_qi[i, j, k] + dt * in_tnd_cml_qi[i, j, k],
+                    ap,
+                    aph0,
+                    aph1,
+                    in_eta[k],
+                    lude0,
+                    lu1,
+                    mfu,
+                    mfd,
+                    qsat0,
+                    aph_s,
+                    trpaus,
+                    rfl[k],
+                    sfl[k],
+                    covptotp[k],
+                    dt,
+                )
+                clc = tr.clc
+                clc2 = tr.clc2
+                dp = tr.dp
+                fwat = tr.fwat
+                gdp = tr.gdp
+                lsdcp = tr.lsdcp
+                lvdcp = tr.lvdcp
+                clc_i = in_clc_i[i, j, k]
+                lude_i_out = out_lude_i[i, j, k]
+
+                # incrementation of T and q, and fluxes swap
+                tmp_rfln_i += rfl_i + in_fplsl_i[i, j, k + 1] - in_fhpsl_i[i, j, k + 1] * RLVTT
+                tmp_sfln_i += sfl_i + in_fplsn_i[i, j, k + 1] - in_fhpsn_i[i, j, k + 1] * RLSTT
+
+                # qice tendency
+                qi_i = -in_tnd_qi_i[i, j, k] / dt
+                qiwc_i = in_tnd_qi_i[i, j, k] / dt
+
+                # qliq tendency
+                ql_i = -in_tnd_ql_i[i, j, k] / dt
+                qlwc_i = in_tnd_ql_i[i, j, k] / dt
+
+                # T tendency
+                tnd_t_i = in_tnd_t_i[i, j, k]
+                gdp_i = -tnd_t_i * (
+                    lvdcp * tr.evapr
+                    + lsdcp * tr.evaps
+                    + lude0 * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                    - (lsdcp - lvdcp) * tr.rfreeze3
+                )
+                condl_i = tnd_t_i * lvdcp
+                condi_i = tnd_t_i * lsdcp
+                evapr_i = -tnd_t_i * lvdcp * gdp
+                evaps_i = -tnd_t_i * lsdcp * gdp
+                lvdcp_i = tnd_t_i * (tr.condl2 - tr.evapr * gdp)
+                lsdcp_i = tnd_t_i * (tr.condi2 - tr.evaps * gdp)
+                lude_i_out -= tnd_t_i * gdp * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                lvdcp_i -= tnd_t_i * lude0 * gdp * fwat
+                lsdcp_i -= tnd_t_i * lude0 * gdp * (1 - fwat)
+                fwat_i = -tnd_t_i * lude0 * gdp * (lvdcp - lsdcp)
+                lvdcp_i -= tnd_t_i * tr.rfreeze3 * gdp
+                lsdcp_i += tnd_t_i * tr.rfreeze3 * gdp
+                rfreeze_i = tnd_t_i * (lsdcp - lvdcp) * gdp
+
+                # q tendency
+                tnd_q_i = in_tnd_q_i[i, j, k]
+                gdp_i += tnd_q_i * (lude0 + tr.evapr + tr.evaps)
+                lude_i_out += tnd_q_i * gdp
+                evapr_i += tnd_q_i * gdp
+                evaps_i += tnd_q_i * gdp
+                condl_i -= tnd_q_i
+                condi_i -= tnd_q_i
+
+                # clipping of final qv
+                rn_i = tmp_rfln_i
+                sn_i = tmp_sfln_i
+
+                # note: the extra condensation due to the adjustment goes directly
+                # to precipitation
+                dq_i = (tr.fwatr2 * condl_i + (1 - tr.fwatr2) * condi_i) / dt
+                dr2_i = tr.fwatr2 * rn_i + (1 - tr.fwatr2) * sn_i
+
+                # update rain fraction and freezing
+                # note: impact of new temperature t_i on fwat_i is neglected here
+                if tr.t3 < RTT:
+                    fwat_i += tr.dr2 * rfreeze_i
+                    dr2_i += fwat * rfreeze_i
+
+                dq_i += cons2 * dp * dr2_i
+                dp_i = cons2 * tr.dq * dr2_i
+
+                if tr.qold >= tr.q:
+                    # regularization
+                    if LREGCL:
+                        dq_i *= 0.7
+                    qold_i = dq_i
+                    q_i = -dq_i
+                else:
+                    qold_i = 0.0
+                    q_i = 0.0
+
+                ap_i, _, t_i, _, q_i = cuadjtqs_ad(ap, 0.0, tr.t3, 0.0, tr.qold, q_i)
+
+                # first guess T and q
+                q_i += qold_i
+                dqdt_i = dt * q_i
+                dtdt_i = dt * t_i
+
+                # incrementation of T and q
+                # T tendency
+                gdp_i -= dtdt_i * (
+                    lvdcp * tr.evapr
+                    + lsdcp * tr.evaps
+                    + lude0 * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                    - (lsdcp - lvdcp) * tr.rfreeze1
+                )
+                condl_i += dtdt_i * lvdcp
+                condi_i += dtdt_i * lsdcp
+                evapr_i -= dtdt_i * lvdcp * gdp
+                evaps_i -= dtdt_i * lsdcp * gdp
+                lvdcp_i += dtdt_i * (tr.condl1 - tr.evapr * gdp)
+                lsdcp_i += dtdt_i * (tr.condi1 - tr.evaps * gdp)
+                lude_i_out -= dtdt_i * gdp * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                lvdcp_i -= dtdt_i * lude0 * gdp * fwat
+                lsdcp_i -= dtdt_i * lude0 * gdp * (1 - fwat)
+                fwat_i -= dtdt_i * lude0 * gdp * (lvdcp - lsdcp)
+                lvdcp_i -= dtdt_i * tr.rfreeze1 * gdp
+                lsdcp_i += dtdt_i * tr.rfreeze1 * gdp
+                rfreeze_i += dtdt_i * (lsdcp - lvdcp) * gdp
+
+                # q tendency
+                gdp_i += dqdt_i * (lude0 + tr.evapr + tr.evaps)
+                lude_i_out += dqdt_i * gdp
+                evapr_i += dqdt_i * gdp
+                evaps_i += dqdt_i * gdp
+                condl_i -= dqdt_i
+                condi_i -= dqdt_i
+
+                if tr.evap:
+                    covpclr = tr.covpclr
+                    covptot1 = tr.covptot1
+                    dpr = tr.dpr
+                    preclr1 = tr.preclr1
+                    prtot = tr.prtot
+
+                    # ice proportion
+                    evaps_i -= tmp_sfln_i
+                    tmp_sfln_i += dpr * evaps_i / prtot
+                    dpr_i = tr.sfln2 * evaps_i / prtot
+                    prtot_i = -dpr * tr.sfln2 * evaps_i / prtot**2
+
+                    # warm proportion
+                    evapr_i -= tmp_rfln_i
+                    tmp_rfln_i += dpr * evapr_i / prtot
+                    dpr_i += tr.rfln2 * evapr_i / prtot
+                    prtot_i -= dpr * tr.rfln2 * evapr_i / prtot**2
+
+                    # take away from clear sky flux
+                    covptot_i += in_covptot_i[i, j, k]
+                    if tr.preclr <= 0:
+                        clc_i += covptot_i
+                        covptot_i = 0.0
+
+                    if tr.dpr1 > preclr1:
+                        preclr_i = dpr_i
+                        dpr_i = 0.0
+                    else:
+                        preclr_i = 0.0
+
+                    b_i = covpclr * dpr_i / tr.dtgdp
+                    covpclr_i = tr.b * dpr_i / tr.dtgdp
+                    dtgdp_i = -covpclr * tr.b * dpr_i / tr.dtgdp**2
+                    daph_i = dt * RG * dtgdp_i / (aph1 - aph0)
+
+                    # implicit solution
+                    tmp1 = 1 + dt * tr.beta * tr.corqs
+                    beta_i = (
+                        dt * (qsat0 - tr.qe) * b_i / tmp1
+                        - (dt**2) * tr.beta * (qsat0 - tr.qe) * tr.corqs * b_i / tmp1**2
+                    )
+                    qsat0_i = dt * tr.beta * b_i / tmp1
+                    qe_i = -dt * tr.beta * b_i / tmp1
+                    corqs_i = -(dt**2) * tr.beta * (qsat0 - tr.qe) * tr.beta * b_i / tmp1**2
+
+                    # this is the humidity in the moistest covpclr region
+                    xx = (
+                        0.5777
+                        * (RG * RPECONS / 0.00509)
+                        * (0.00509 * covpclr / (preclr1 * math.sqrt(ap / aph_s))) ** 0.4223
+                    )
+                    preclr_i += xx * math.sqrt(ap / aph_s) * beta_i / covpclr
+                    ap_i += 0.5 * xx * preclr1 * beta_i / (covpclr * math.sqrt(ap * aph_s))
+                    aph_s_i -= (
+                        0.5 * xx * preclr1 * math.sqrt(ap / aph_s) * beta_i / (covpclr * aph_s)
+                    )
+                    covpclr_i += (
+                        -(xx * preclr1 * math.sqrt(ap / aph_s) * beta_i / covpclr**2)
+                        - (qsat0 - tr.qlim) * qe_i / (1 - clc2) ** 2
+                    ) + prtot * preclr_i / covptot1
+                    qsat0_i += qe_i - covpclr * qe_i / (1 - clc2) ** 2
+                    qlim_i = covpclr * qe_i / (1 - clc2) ** 2
+                    clc_i -= 2 * (qsat0 - tr.qlim) * covpclr * qe_i / (1 - clc2) ** 3
+                    prtot_i += covpclr * preclr_i / covptot1
+                    covptot_i -= prtot * covpclr * preclr_i / covptot1**2
+                else:
+                    corqs_i = 0.0
+                    covpclr_i = 0.0
+                    covptot_i = 0.0
+                    daph_i = 0.0
+                    qsat0_i = 0.0
+                    prtot_i = 0.0
+                    qlim_i = 0.0
+
+                # new precipitation
+                tmp_rfln_i += prtot_i
+                tmp_sfln_i += prtot_i
+                dr_i = tr.fwatr1 * tmp_rfln_i + (1 - tr.fwatr1) * tmp_sfln_i
+
+                # update rain fraction and freezing
+                # note: impact of new temperature t_i on fwat_i in neglected here
+                if tr.t < RTT:
+                    dp_i += rfreeze_i * cons2 * tr.prr
+                    prr_i = rfreeze_i * cons2 * dp
+                else:
+                    prr_i = 0.0
+                prr_i += cons2 * dp * dr_i
+                prs_i = cons2 * dp * dr_i
+                dp_i += cons2 * (tr.prr + tr.prs) * dr_i
+
+                if clc2 > ZEPS2:
+                    # diagnostic calculation of rain production from cloud ice
+                    if LEVAPLS2 or LDRAIN1D:
+                        icrit = 0.0001
+                    else:
+                        icrit = 2 * RCLCRIT
+                    prs_i -= qiwc_i
+                    qiwc_i += prs_i
+                    qinew_i = -prs_i
+                    clc_i += qinew_i * tr.cldi * tr.itmp2
+                    cldi_i = qinew_i * clc2 * tr.itmp2
+                    di_i = -qinew_i * clc2 * tr.cldi * tr.itmp2
+
+                    # regularization
+                    if LREGCL:
+                        itmp4 = ckcodtia
+                    else:
+                        itmp4 = ckcodti
+                    t_i += 0.025 * itmp4 * tr.itmp12 * (1 - tr.itmp11) * di_i
+                    cldi_i += 2 * itmp4 * tr.itmp12 * tr.itmp11 * tr.cldi * di_i / icrit**2
+
+                    qiwc_i += cldi_i / clc2
+                    clc_i -= tr.qiwc1 * cldi_i / clc2**2
+
+                    # diagnostic calculation of rain production from cloud liquid water
+                    if LEVAPLS2 or LDRAIN1D:
+                        lcrit = 1.9 * RCLCRIT
+                    else:
+                        lcrit = 2 * RCLCRIT
+                    prr_i -= qlwc_i
+                    qlwc_i += prr_i
+                    qlnew_i = -prr_i
+                    clc_i += qlnew_i * tr.cldl * tr.ltmp2
+                    cldl_i = qlnew_i * clc2 * tr.ltmp2
+                    dl_i = -qlnew_i * clc2 * tr.cldl * tr.ltmp2
+
+                    # regularization
+                    if LREGCL:
+                        ltmp4 = ckcodtla
+                    else:
+                        ltmp4 = ckcodtl
+                    cldl_i += 2 * ltmp4 * tr.ltmp1 * tr.cldl * dl_i / lcrit**2
+
+                    qlwc_i += cldl_i / clc2
+                    clc_i -= tr.qlwc1 * cldl_i / clc2**2
+
+                # melting of incoming snow
+                rfl_i = tmp_rfln_i
+                tmp_rfln_i = 0.0
+                sfl_i = tmp_sfln_i
+                tmp_sfln_i = 0.0
+                if sfl[k] != 0.0:
+                    cons = tr.cons
+                    snmlt_i = -t_i / cons + rfl_i - sfl_i
+                    cons_i = t_i * tr.snmlt / cons**2
+
+                    if sfl[k] <= tr.z2s:
+                        sfl_i += snmlt_i
+                        z2s_i = 0.0
+                    else:
+                        z2s_i = snmlt_i
+
+                    if tr.t2 > meltp2:
+                        t_i += cons * z2s_i
+                        cons_i += (tr.t2 - meltp2) * z2s_i
+
+                    dp_i += cons2 * cons_i / tr.lfdcp
+                    lfdcp_i = -cons2 * dp * cons_i / tr.lfdcp**2
+                else:
+                    lfdcp_i = 0.0
+
+                # calculate precipitation overlap
+                # simple form based on Maximum Overlap
+                if tr.covpclr1 < 0:
+                    covpclr_i = 0.0
+                covptot_i += covpclr_i
+                clc_i -= covpclr_i
+
+                if clc2 > tr.covptot:
+                    clc_i += covptot_i
+                    covptot_i = 0.0
+
+                # new cloud liquid/ice contents and condensation rates (liquid/ice)
+                qiwc_i += condi_i / dt
+                qi_i -= condi_i / dt
+                qlwc_i += condl_i / dt
+                ql_i -= condl_i / dt
+                qc_i = fwat * qlwc_i + (1 - fwat) * qiwc_i
+                fwat_i += tr.qc3 * (qlwc_i - qiwc_i)
+
+                # add compensating subsidence component
+                dqc_i = -qc_i
+                if tr.lo3:
+                    if LREGCL:
+                        # regularization
+                        dqc_i *= 0.1
+                    dqsdz_i = dt * dqc_i * (mfd + mfu) * tr.fac4
+                    out_mfd_i[i, j, k] = dt * dqc_i * tr.dqsdz * tr.fac4
+                    out_mfu_i[i, j, k] = dt * dqc_i * tr.dqsdz * tr.fac4
+                    rho_i = -dqc_i * tr.dqc * tr.fac4
+                else:
+                    qc_i += dqc_i
+                    dqsdz_i = 0.0
+                    out_mfd_i[i, j, k] = 0.0
+                    out_mfu_i[i, j, k] = 0.0
+                    rho_i = 0.0
+
+                ldcp = tr.ldcp
+                fac3 = tr.fac3
+                dtdzmo_i = dqsdz_i * tr.dqsdtemp
+                dqsdtemp_i = dqsdz_i * tr.dtdzmo - tr.dtdzmo * dtdzmo_i * ldcp * fac3
+                rodqsdp_i = -RG * (dqsdz_i + dtdzmo_i * ldcp * fac3)
+                ldcp_i = -dtdzmo_i * (RG * tr.rodqsdp + tr.dtdzmo * tr.dqsdtemp) * fac3
+                fwat_i += ldcp_i * (lvdcp - lsdcp)
+                lvdcp_i += fwat * ldcp_i
+                lsdcp_i += (1 - fwat) * ldcp_i
+                rho_i -= rodqsdp_i * qsat0 * tr.fac2
+                qsat0_i -= rodqsdp_i * tr.rho * tr.fac2
+                ap_i += rodqsdp_i * tr.rho * qsat0 * tr.fac2**2 + rho_i * tr.fac1
+                foeew_i = -RETV * rodqsdp_i * tr.rho * qsat0 * tr.fac2**2
+                t_i -= rho_i * ap * tr.fac1 / tr.t2
+
+                # add convective component
+                lude = tr.lude
+                if k < NLEV - 1 and lude >= RLMIN and lu1 >= ZEPS2:
+                    tmp2 = math.exp(-lude / lu1)
+                    lude_i = qc_i + (1 - clc) / lu1 * tmp2 * clc_i
+                    dlu_i = (1 - clc) * lude / lu1**2 * tmp2 * clc_i
+                    clc_i *= 1 - (1 - tmp2)
+                else:
+                    lude_i = 0.0
+                    dlu_i = 0.0
+
+                lude_i_out += dt * gdp * lude_i
+                gdp_i += dt * lude0 * lude_i
+                daph_i += RG * gdp_i / (aph1 - aph0) ** 2
+
+                # simple uniform distribution of total water from Letreut & Li (1990)
+                qt = tr.qt
+                qcrit = tr.qcrit
+                qt_i = 0.0
+                if qt < qcrit:
+                    qsat_i = 0.0
+                    qcrit_i = 0.0
+                elif qt >= tr.qsat:
+                    qsat_i = (1 - tr.scalm) * qc_i
+                    qcrit_i = -(1 - tr.scalm) * qc_i
+                else:
+                    scalm = tr.scalm
+                    qcd = tr.qcd
+                    qpd = tr.qpd
+                    tmp3 = tr.tmp3
+                    qpd_i = scalm * qc_i * clc**2
+                    qcd_i = (1 - scalm) * qc_i * clc**2
+                    clc_i += 2 * (scalm * qpd + (1 - scalm) * qcd) * clc * qc_i
+
+                    if LREGCL:
+                        # regularization of cloud fraction
+                        rat = qpd / qcd
+                        yyy = min(
+                            0.3, 3.5 * math.sqrt(rat * (1 - scalm * (1 - rat)) ** 3) / (1 - scalm)
+                        )
+                        clc_i *= yyy
+
+                    qpd_i -= 0.5 / tmp3 * clc_i / (qcd - scalm * (qt - qcrit))
+                    qcd_i += 0.5 / tmp3 * qpd * clc_i / (qcd - scalm * (qt - qcrit)) ** 2
+                    qt_i = (
+                        -0.5 / tmp3 * (qpd * scalm * clc_i) / (qcd - scalm * (qt - qcrit)) ** 2
+                    ) - qpd_i
+                    qcrit_i = (
+                        0.5 / tmp3 * (qpd * scalm * clc_i) / (qcd - scalm * (qt - qcrit)) ** 2
+                    ) - qcd_i
+                    qsat_i = qcd_i + qpd_i
+
+                q_i += qt_i
+                ql_i += qt_i
+                qi_i += qt_i
+
+                # set up critical value of humidity
+                qsat_i += qcrit_i * tr.crh2
+                qsat0_i += qsat_i * tr.supsat
+                supsat_i = qsat_i * qsat0
+
+                # allow ice supersaturation at cold temperatures
+                t2 = tr.t2
+                if t2 < RTICE:
+                    t_i -= 0.003 * supsat_i
+
+                # use clipped state
+                if tr.q2 > qsat0:
+                    qsat0_i += qlim_i
+                else:
+                    q_i += qlim_i
+
+                # calculate dqs/dT correction factor
+                fac = tr.fac
+                cor = tr.cor
+                dqsdtemp_i += cons3 * corqs_i
+                qsat0_i += fac * cor * dqsdtemp_i
+                cor_i = fac * qsat0 * dqsdtemp_i
+                fac_i = cor * qsat0 * dqsdtemp_i
+                esdp_i = RETV * cor_i * cor**2
+                facw_i = fwat * fac_i
+                faci_i = (1 - fwat) * fac_i
+                fwat_i += (tr.facw - tr.faci) * fac_i
+                t_i -= 2 * (R5IES * faci_i / (t2 - R4IES) ** 3 + R5LES * facw_i / (t2 - R4LES) ** 3)
+
+                if tr.esdp1 > ZQMAX:
+                    esdp_i = 0.0
+                foeew_i += esdp_i / ap
+                ap_i -= esdp_i * tr.foeew / ap**2
+
+                if t2 < RTT:
+                    z3es = R3IES
+                    z4es = R4IES
+                else:
+                    z3es = R3LES
+                    z4es = R4LES
+                t_i += z3es * (RTT - z4es) * foeew_i * tr.foeew / (t2 - z4es) ** 2
+
+                if t2 < RTT:
+                    t_i += 0.545 * 0.17 * fwat_i / math.cosh(0.17 * (t2 - RLPTRC)) ** 2
+
+                # account for the dependency of the latent heats on q
+                zz = RLVTT * lvdcp_i + RLSTT * lsdcp_i + RLMLT * lfdcp_i
+                q_i += -zz * RCPD * RVTMP2 / (RCPD + RCPD * RVTMP2 * tr.q) ** 2
+
+                out_ap_i[i, j, k] = ap_i
+                out_lude_i[i, j, k] = lude_i_out
+                out_q_i[i, j, k] = q_i
+                out_qi_i[i, j, k] = qi_i
+                out_ql_i[i, j, k] = ql_i
+                out_qsat_i[i, j, k] = qsat0_i
+                out_t_i[i, j, k] = t_i
+                out_supsat_i[i, j, k] = dt * q_i
+                out_tnd_cml_t_i[i, j, k] = dt * t_i
+                out_tnd_cml_q_i[i, j, k] = dt * q_i
+                out_tnd_cml_ql_i[i, j, k] = dt * ql_i
+                out_tnd_cml_qi_i[i, j, k] = dt * qi_i
+
+                # apply corrections to staggered fields
+                out_lu_i[i, j, k + 1] = -dlu_i
+                if k == nk - 1:
+                    daph_i_bottom = daph_i
+                    dp_i_bottom = dp_i
+                else:
+                    out_aph_i[i, j, k + 1] = daph_i_below - daph_i - dp_i_below + dp_i
+                daph_i_below = daph_i
+                dp_i_below = dp_i
+
+            aph_s_i += -daph_i_bottom + dp_i_bottom
+            tmp_aph_s_i[i, j] = aph_s_i
+            out_aph_i[i, j, nk] = aph_s_i
+            out_aph_i[i, j, 0] = daph_i - dp_i
+            out_lu_i[i, j, 0] = 0.0
+
+    return cloudsc2_ad
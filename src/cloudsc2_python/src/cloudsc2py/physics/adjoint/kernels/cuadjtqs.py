@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import math
+from numba import njit
+from typing import TYPE_CHECKING
+
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+@ported_function(from_file="cloudsc2_ad/cuadjtqsad.F90", from_line=10, to_line=871)
+def build_cuadjtqs_ad(externals: dict[str, Any]) -> Callable[..., tuple[float, ...]]:
+    """Build the Numba counterpart of ``cuadjtqs_ad``."""
+    ICALL = externals["ICALL"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    R5ALSCP = externals["R5ALSCP"]
+    R5ALVCP = externals["R5ALVCP"]
+    RALSDCP = externals["RALSDCP"]
+    RALVDCP = externals["RALVDCP"]
+    RETV = externals["RETV"]
+    RTT = externals["RTT"]
+    ZQMAX = externals["ZQMAX"]
+
+    @njit
+    def cuadjtqs_ad_0(ap, t, q, z3es, z4es, z5alcp, zaldcp):
+        foeew = R2ES * math.exp(z3es * (t - RTT) / (t - z4es))
+        qsat0 = foeew / ap
+        ltest = qsat0 > ZQMAX
+        if ltest:
+            qsat0 = ZQMAX
+        cor = 1 / (1 - RETV * qsat0)
+        qsat = qsat0 * cor
+        z2s = z5alcp / (t - z4es) ** 2
+        cond1 = (q - qsat) / (1 + qsat * cor * z2s)
+        return t + zaldcp * cond1, q - cond1, foeew, qsat0, qsat, cor, z2s, ltest
+
+    @njit
+    def cuadjtqs_ad_1(
+        ap, t_i, q_i, targ, q, foeew, qsat0, qsat, cor, z2s, ltest, z3es, z4es, z5alcp, zaldcp
+    ):
+        cond1_i = -q_i + zaldcp * t_i
+        q_i += cond1_i / (1 + qsat * cor * z2s)
+        qsat_i = (
+            -cond1_i / (1 + qsat * cor * z2s)
+            - cond1_i * (q - qsat) * cor * z2s / (1 + qsat * cor * z2s) ** 2
+        )
+        cor_i = -cond1_i * (q - qsat) * qsat * z2s / (1 + qsat * cor * z2s) ** 2
+        z2s_i = -cond1_i * (q - qsat) * qsat * cor / (1 + qsat * cor * z2s) ** 2
+        targ_i = -2 * z2s_i * z5alcp / (targ - z4es) ** 3
+        cor_i += qsat_i * qsat0
+        qsat_i *= cor
+        qsat_i += cor_i * RETV / (1 - RETV * qsat0) ** 2
+        if ltest:
+            qsat_i = 0.0
+        foeew_i = qsat_i / ap
+        qp_i = qsat_i * foeew
+        targ_i += (
+            foeew_i
+            * R2ES
+            * z3es
+            * (RTT - z4es)
+            * math.exp(z3es * (targ - RTT) / (targ - z4es))
+            / (targ - z4es) ** 2
+        )
+        return t_i + targ_i, q_i, qp_i
+
+    @njit
+    def cuadjtqs_ad(ap, ap_i, t, t_i, q, q_i):
+        if t > RTT:
+            z3es = R3LES
+            z4es = R4LES
+            z5alcp = R5ALVCP
+            zaldcp = RALVDCP
+        else:
+            z3es = R3IES
+            z4es = R4IES
+            z5alcp = R5ALSCP
+            zaldcp = RALSDCP
+
+        if ICALL == 0:
+            t_b = t
+            q_b = q
+            t, q, foeew_b, qsat_d, qsat_b, cor_b, z2s_b, ltest2 = cuadjtqs_ad_0(
+                ap, t, q, z3es, z4es, z5alcp, zaldcp
+            )
+            t_a = t
+            q_a = q
+            t, q, foeew_a, qsat_c, qsat_a, cor_a, z2s_a, ltest1 = cuadjtqs_ad_0(
+                ap, t, q, z3es, z4es, z5alcp, zaldcp
+            )
+
+            t_i, q_i, qp_i_a = cuadjtqs_ad_1(
+                ap,
+                t_i,
+                q_i,
+                t_a,
+                q_a,
+                foeew_a,
+                qsat_c,
+                qsat_a,
+                cor_a,
+                z2s_a,
+                ltest1,
+                z3es,
+                z4es,
+                z5alcp,
+                zaldcp,
+            )
+            t_i, q_i, qp_i_b = cuadjtqs_ad_1(
+                ap,
+                t_i,
+                q_i,
+                t_b,
+                q_b,
+                foeew_b,
+                qsat_d,
+                qsat_b,
+                cor_b,
+                z2s_b,
+                ltest2,
+                z3es,
+                z4es,
+                z5alcp,
+                zaldcp,
+            )
+            ap_i -= (qp_i_a + qp_i_b) / ap**2
+        return ap_i, t, t_i, q, q_i
+
+    return cuadjtqs_ad
@@ -5,13 +5,18 @@ from itertools import repeat
 import numpy as np
 from typing import TYPE_CHECKING
 
+from cloudsc2py.framework.blocking import launch_column_blocks
+from cloudsc2py.framework.config import get_precision_externals
+from cloudsc2py.framework.kernels import NumbaComponent
+from cloudsc2py.framework.storage import managed_temporary_storage
 from ifs_physics_common.framework.components import ImplicitTendencyComponent
 from ifs_physics_common.framework.grid import I, J, K
-from ifs_physics_common.framework.storage import managed_temporary_storage, zeros
+from ifs_physics_common.framework.storage import zeros
 from ifs_physics_common.utils.f2py import ported_method
 from ifs_physics_common.utils.numpyx import assign
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
     from datetime import timedelta
     from typing import Optional
 
@@ -23,7 +28,9 @@ if TYPE_CHECKING:
 
 
 class Cloudsc2AD(ImplicitTendencyComponent):
+    block_size: Optional[int]
     cloudsc2: StencilObject
+    executor: Optional[Executor] = None
     klevel: Storage
 
     def __init__(
@@ -39,10 +46,12 @@ class Cloudsc2AD(ImplicitTendencyComponent):
         yrncl_parameters: Optional[ParameterDict] = None,
         yrphnc_parameters: Optional[ParameterDict] = None,
         *,
+        block_size: Optional[int] = None,
         enable_checks: bool = True,
         gt4py_config: GT4PyConfig,
     ) -> None:
         super().__init__(computational_grid, enable_checks=enable_checks, gt4py_config=gt4py_config)
+        self.block_size = block_size
 
         nk = self.computational_grid.grids[I, J, K].shape[2]
         self.klevel = zeros(
@@ -67,6 +76,7 @@ class Cloudsc2AD(ImplicitTendencyComponent):
         externals.update(yrephli_parameters or {})
         externals.update(yrncl_parameters or {})
         externals.update(yrphnc_parameters or {})
+        externals.update(get_precision_externals(gt4py_config.dtypes))
         self.cloudsc2 = self.compile_stencil("cloudsc2_ad", externals)
 
     @cached_property
@@ -152,7 +162,13 @@ class Cloudsc2AD(ImplicitTendencyComponent):
             self.computational_grid, *repeat(((I, J), "float"), 8), gt4py_config=self.gt4py_config
         ) as (aph_s, aph_s_i, covptotp, rfln, rfln_i, sfln, sfln_i, trpaus):
             aph_s[...] = state["f_aph"][..., -1]
-            self.cloudsc2(
+            # with block_size, the columns are processed in blocks, like NPROMA blocks, possibly
+            # concurrently by executor
+            launch_column_blocks(
+                self.cloudsc2,
+                self.computational_grid.grids[I, J, K - 1 / 2].shape,
+                self.block_size,
+                self.executor,
                 in_ap=state["f_ap"],
                 in_aph=state["f_aph"],
                 in_clc_i=state["f_clc_i"],
@@ -216,8 +232,10 @@ class Cloudsc2AD(ImplicitTendencyComponent):
                 tmp_sfln_i=sfln_i,
                 tmp_trpaus=trpaus,
                 dt=timestep.total_seconds(),
-                origin=(0, 0, 0),
-                domain=self.computational_grid.grids[I, J, K - 1 / 2].shape,
                 validate_args=self.gt4py_config.validate_args,
                 exec_info=self.gt4py_config.exec_info,
             )
+
+
+class NumbaCloudsc2AD(NumbaComponent, Cloudsc2AD):
+    """Like ``Cloudsc2AD``, but running the Numba kernel in place of the ``cloudsc2_ad`` stencil."""
@@ -769,6 +769,9 @@ def cloudsc2_ad_def(
                 dp_i += cons2 * cons_i / lfdcp
                 lfdcp_i = -cons2 * dp * cons_i / lfdcp**2
             else:
+                # the fluxes are carried over to the level above by tmp_rfln_i and tmp_sfln_i
+                rfl_i = 0.0
+                sfl_i = 0.0
                 lfdcp_i = 0.0
 
             # calculate precipitation overlap
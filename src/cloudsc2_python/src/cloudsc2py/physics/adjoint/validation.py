@@ -4,10 +4,10 @@ import numpy as np
 import sys
 from typing import TYPE_CHECKING
 
-from cloudsc2py.physics.adjoint.microphysics import Cloudsc2AD
+from cloudsc2py.physics.adjoint.microphysics import Cloudsc2AD, NumbaCloudsc2AD
 from cloudsc2py.physics.common.increment import StateIncrement
 from cloudsc2py.physics.common.saturation import Saturation
-from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL
+from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL, NumbaCloudsc2TL
 from ifs_physics_common.utils.f2py import ported_method
 from ifs_physics_common.utils.numpyx import to_numpy
 
@@ -38,6 +38,7 @@ class SymmetryTest:
         *,
         enable_checks: bool = True,
         gt4py_config: GT4PyConfig,
+        numba: bool = False,
     ) -> None:
         self.f = factor
 
@@ -52,8 +53,8 @@ class SymmetryTest:
             gt4py_config=gt4py_config,
         )
 
-        # microphysics
-        self.cloudsc2_tl = Cloudsc2TL(
+        # microphysics, possibly running the Numba kernels
+        self.cloudsc2_tl = (NumbaCloudsc2TL if numba else Cloudsc2TL)(
             computational_grid,
             lphylin,
             ldrain1d,
@@ -67,7 +68,7 @@ class SymmetryTest:
             enable_checks=enable_checks,
             gt4py_config=gt4py_config,
         )
-        self.cloudsc2_ad = Cloudsc2AD(
+        self.cloudsc2_ad = (NumbaCloudsc2AD if numba else Cloudsc2AD)(
             computational_grid,
             lphylin,
             ldrain1d,
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 from functools import cached_property
+from gt4py.storage import from_array
+import numpy as np
 from typing import TYPE_CHECKING
 
 from ifs_physics_common.framework.components import DiagnosticComponent
@@ -8,6 +10,8 @@ from ifs_physics_common.framework.grid import I, J, K
 from ifs_physics_common.utils.f2py import ported_method
 
 if TYPE_CHECKING:
+    from datetime import timedelta
+
     from ifs_physics_common.framework.config import GT4PyConfig
     from ifs_physics_common.framework.grid import ComputationalGrid
     from ifs_physics_common.utils.typingx import PropertyDict, StorageDict
@@ -244,3 +248,115 @@ class PerturbedState(DiagnosticComponent):
             validate_args=self.gt4py_config.validate_args,
             exec_info=self.gt4py_config.exec_info,
         )
+
+
+class PerturbedStates(PerturbedState):
+    """Like ``PerturbedState``, but for all ``factors`` at once.
+
+    The perturbed states are laid out along the second horizontal direction of
+    ``computational_grid``, one index per factor, and generated by a single stencil launch. The
+    input state and increments have a single index along that direction.
+    """
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        factors: tuple[float, ...],
+        *,
+        enable_checks: bool = True,
+        gt4py_config: GT4PyConfig,
+    ):
+        # the properties are those of PerturbedState, but not the stencil
+        DiagnosticComponent.__init__(
+            self, computational_grid, enable_checks=enable_checks, gt4py_config=gt4py_config
+        )
+        nj = computational_grid.grids[I, J, K].shape[1]
+        if len(factors) != nj:
+            raise RuntimeError(
+                f"The grid has {nj} indices along the second horizontal direction, but "
+                f"{len(factors)} factors are given."
+            )
+        self.f = factors
+        self.factors = from_array(
+            np.array(factors),
+            gt4py_config.dtypes.float,
+            backend=gt4py_config.backend,
+            aligned_index=(0,),
+            dimensions=("J",),
+        )
+        self.perturbed_states = self.compile_stencil("perturbed_states")
+
+    def array_call(self, state: StorageDict, out: StorageDict) -> None:
+        self.perturbed_states(
+            **{"in_" + key[2:]: state[key][:, 0] for key in self._input_properties},
+            **{"out_" + key[2:]: out[key] for key in self._diagnostic_properties},
+            factors=self.factors,
+            origin=(0, 0, 0),
+            domain=self.computational_grid.grids[I, J, K - 1 / 2].shape,
+            validate_args=self.gt4py_config.validate_args,
+            exec_info=self.gt4py_config.exec_info,
+        )
+
+
+class StateUpdate(DiagnosticComponent):
+    """Advance the temperature, the specific humidity and the cloud liquid and ice by the
+    microphysics tendencies over ``timestep``.
+
+    The tendencies are input as ``f_tnd_t``, ``f_tnd_q``, ``f_tnd_ql`` and ``f_tnd_qi``. The
+    update being pointwise, the state fields can be passed as ``out`` to be advanced in place.
+    """
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        timestep: timedelta,
+        *,
+        enable_checks: bool = True,
+        gt4py_config: GT4PyConfig,
+    ) -> None:
+        super().__init__(computational_grid, enable_checks=enable_checks, gt4py_config=gt4py_config)
+        self.dt = timestep.total_seconds()
+        self.update = self.compile_stencil("state_update")
+
+    @cached_property
+    def _input_properties(self) -> PropertyDict:
+        return {
+            "f_q": {"grid": (I, J, K), "units": "g g^-1"},
+            "f_qi": {"grid": (I, J, K), "units": "g g^-1"},
+            "f_ql": {"grid": (I, J, K), "units": "g g^-1"},
+            "f_t": {"grid": (I, J, K), "units": "K"},
+            "f_tnd_q": {"grid": (I, J, K), "units": "g g^-1 s^-1"},
+            "f_tnd_qi": {"grid": (I, J, K), "units": "g g^-1 s^-1"},
+            "f_tnd_ql": {"grid": (I, J, K), "units": "g g^-1 s^-1"},
+            "f_tnd_t": {"grid": (I, J, K), "units": "K s^-1"},
+        }
+
+    @cached_property
+    def _diagnostic_properties(self) -> PropertyDict:
+        return {
+            "f_q": {"grid": (I, J, K), "units": "g g^-1"},
+            "f_qi": {"grid": (I, J, K), "units": "g g^-1"},
+            "f_ql": {"grid": (I, J, K), "units": "g g^-1"},
+            "f_t": {"grid": (I, J, K), "units": "K"},
+        }
+
+    def array_call(self, state: StorageDict, out: StorageDict) -> None:
+        self.update(
+            in_q=state["f_q"],
+            in_qi=state["f_qi"],
+            in_ql=state["f_ql"],
+            in_t=state["f_t"],
+            in_tnd_q=state["f_tnd_q"],
+            in_tnd_qi=state["f_tnd_qi"],
+            in_tnd_ql=state["f_tnd_ql"],
+            in_tnd_t=state["f_tnd_t"],
+            out_q=out["f_q"],
+            out_qi=out["f_qi"],
+            out_ql=out["f_ql"],
+            out_t=out["f_t"],
+            dt=self.dt,
+            origin=(0, 0, 0),
+            domain=self.computational_grid.grids[I, J, K].shape,
+            validate_args=self.gt4py_config.validate_args,
+            exec_info=self.gt4py_config.exec_info,
+        )
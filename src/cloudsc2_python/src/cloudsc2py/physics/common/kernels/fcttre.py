@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import math
+from numba import njit
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+@ported_function(from_file="common/include/fcttre.func.h", from_line=73, to_line=131)
+def build_fcttre(externals: dict[str, Any]) -> SimpleNamespace:
+    """Build the Numba counterparts of the functions in ``common.stencils.fcttre``, with the
+    constants taken from ``externals``."""
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    RTICE = externals["RTICE"]
+    RTICECU = externals["RTICECU"]
+    RTT = externals["RTT"]
+    RTWAT = externals["RTWAT"]
+    RTWAT_RTICE_R = externals["RTWAT_RTICE_R"]
+    RTWAT_RTICECU_R = externals["RTWAT_RTICECU_R"]
+    ES_TABLE_ORDER = externals.get("ES_TABLE_ORDER", 0)
+    ES_TABLE_RDT = externals.get("ES_TABLE_RDT", 0.0)
+    ES_TABLE_SIZE = externals.get("ES_TABLE_SIZE", 0)
+    ES_TABLE_TMIN = externals.get("ES_TABLE_TMIN", 0.0)
+
+    @njit
+    def foealfa(t):
+        return min(1.0, ((max(RTICE, min(RTWAT, t)) - RTICE) * RTWAT_RTICE_R) ** 2)
+
+    @njit
+    def foealfcu(t):
+        return min(1.0, ((max(RTICECU, min(RTWAT, t)) - RTICECU) * RTWAT_RTICECU_R) ** 2)
+
+    @njit
+    def foeewm(t):
+        return R2ES * (
+            foealfa(t) * math.exp(R3LES * (t - RTT) / (t - R4LES))
+            + (1 - foealfa(t)) * (math.exp(R3IES * (t - RTT) / (t - R4IES)))
+        )
+
+    @njit
+    def foeewmcu(t):
+        return R2ES * (
+            foealfcu(t) * math.exp(R3LES * (t - RTT) / (t - R4LES))
+            + (1 - foealfcu(t)) * (math.exp(R3IES * (t - RTT) / (t - R4IES)))
+        )
+
+    @njit
+    def foeew_table(t, es_table, col):
+        # temperatures outside the table range are extrapolated from the first/last interval
+        x = (t - ES_TABLE_TMIN) * ES_TABLE_RDT
+        i = int(max(0.0, min(ES_TABLE_SIZE - 2.0, x)))
+        w = x - i
+        if ES_TABLE_ORDER == 1:
+            out = (1 - w) * es_table[i, col] + w * es_table[i + 1, col]
+        else:
+            # cubic Hermite interpolation, using the tabulated derivatives
+            out = (1 - w) * (1 - w) * (
+                (1 + 2 * w) * es_table[i, col] + w * es_table[i, col + 1] / ES_TABLE_RDT
+            ) + w * w * (
+                (3 - 2 * w) * es_table[i + 1, col]
+                - (1 - w) * es_table[i + 1, col + 1] / ES_TABLE_RDT
+            )
+        return out
+
+    @njit
+    def foeewm_table(t, es_table):
+        return foealfa(t) * foeew_table(t, es_table, 0) + (1 - foealfa(t)) * foeew_table(
+            t, es_table, 2
+        )
+
+    @njit
+    def foeewmcu_table(t, es_table):
+        return foealfcu(t) * foeew_table(t, es_table, 0) + (1 - foealfcu(t)) * foeew_table(
+            t, es_table, 2
+        )
+
+    return SimpleNamespace(
+        foealfa=foealfa,
+        foealfcu=foealfcu,
+        foeewm=foeewm,
+        foeewmcu=foeewmcu,
+        foeew_table=foeew_table,
+        foeewm_table=foeewm_table,
+        foeewmcu_table=foeewmcu_table,
+    )
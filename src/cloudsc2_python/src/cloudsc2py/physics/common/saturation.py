@@ -3,17 +3,29 @@ from __future__ import annotations
 from functools import cached_property
 from typing import Optional, TYPE_CHECKING
 
+from cloudsc2py.framework.blocking import launch_column_blocks
+from cloudsc2py.framework.config import get_precision_externals
+from cloudsc2py.physics.common.saturation_table import allocate_es_table, get_es_table_externals
 from ifs_physics_common.framework.components import DiagnosticComponent
 from ifs_physics_common.framework.grid import I, J, K
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     from ifs_physics_common.framework.config import GT4PyConfig
     from ifs_physics_common.framework.grid import ComputationalGrid
     from ifs_physics_common.utils.typingx import ParameterDict, PropertyDict, StorageDict
 
 
 class Saturation(DiagnosticComponent):
-    """Perform the moist saturation adjustment."""
+    """Perform the moist saturation adjustment.
+
+    With ``es_table_order`` 1 or 3, the saturation vapour pressure is interpolated (linearly or
+    cubically) in a table rather than evaluated exactly (see ``saturation_table``).
+    """
+
+    block_size: Optional[int]
+    executor: Optional[Executor] = None
 
     def __init__(
         self,
@@ -23,15 +35,23 @@ class Saturation(DiagnosticComponent):
         yoethf_parameters: Optional[ParameterDict] = None,
         yomcst_parameters: Optional[ParameterDict] = None,
         *,
+        block_size: Optional[int] = None,
         enable_checks: bool = True,
+        es_table_order: int = 0,
         gt4py_config: GT4PyConfig,
     ) -> None:
         super().__init__(computational_grid, enable_checks=enable_checks, gt4py_config=gt4py_config)
+        self.block_size = block_size
 
         externals = {"KFLAG": kflag, "LPHYLIN": lphylin, "QMAX": 0.5}
         externals.update(yoethf_parameters or {})
         externals.update(yomcst_parameters or {})
+        externals.update(get_es_table_externals(es_table_order))
+        externals.update(get_precision_externals(gt4py_config.dtypes))
         self.saturation = self.compile_stencil("saturation", externals)
+        self.es_table = allocate_es_table(
+            yoethf_parameters, yomcst_parameters, es_table_order, gt4py_config=gt4py_config
+        )
 
     @cached_property
     def _input_properties(self) -> PropertyDict:
@@ -45,12 +65,15 @@ class Saturation(DiagnosticComponent):
         return {"f_qsat": {"grid": (I, J, K), "units": "g g^-1"}}
 
     def array_call(self, state: StorageDict, out: StorageDict) -> None:
-        self.saturation(
+        launch_column_blocks(
+            self.saturation,
+            self.computational_grid.grids[I, J, K].shape,
+            self.block_size,
+            self.executor,
             in_ap=state["f_ap"],
             in_t=state["f_t"],
             out_qsat=out["f_qsat"],
-            origin=(0, 0, 0),
-            domain=self.computational_grid.grids[I, J, K].shape,
+            es_table=self.es_table,
             validate_args=self.gt4py_config.validate_args,
             exec_info=self.gt4py_config.exec_info,
         )
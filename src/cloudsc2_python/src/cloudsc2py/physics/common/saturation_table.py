@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import numpy as np
+from typing import TYPE_CHECKING
+
+from gt4py.storage import from_array
+
+if TYPE_CHECKING:
+    from typing import Literal, Optional
+
+    from ifs_physics_common.framework.config import GT4PyConfig
+    from ifs_physics_common.utils.typingx import ParameterDict, Storage
+
+
+# temperature range covered by the table of the saturation vapour pressure
+ES_TABLE_TMIN = 150.0
+ES_TABLE_TMAX = 350.0
+ES_TABLE_SIZE = 801
+
+
+def get_es_table_externals(order: Literal[0, 1, 3]) -> dict[str, float]:
+    """Get the externals selecting the evaluation of the saturation vapour pressure.
+
+    ``order`` is either 0 (exact evaluation), 1 (linear interpolation in the table) or 3
+    (cubic Hermite interpolation in the table).
+    """
+    if order not in (0, 1, 3):
+        raise RuntimeError(f"Invalid order {order} for the table lookup, options are: 0, 1, 3.")
+    return {
+        "ES_TABLE_ORDER": order,
+        "ES_TABLE_RDT": (ES_TABLE_SIZE - 1) / (ES_TABLE_TMAX - ES_TABLE_TMIN),
+        "ES_TABLE_SIZE": ES_TABLE_SIZE,
+        "ES_TABLE_TMIN": ES_TABLE_TMIN,
+    }
+
+
+def get_es_table(
+    yoethf_parameters: ParameterDict, yomcst_parameters: ParameterDict, t: np.ndarray = None
+) -> np.ndarray:
+    """Tabulate the saturation vapour pressure and its derivative with respect to temperature.
+
+    The columns are: saturation vapour pressure over water, its derivative, saturation vapour
+    pressure over ice, its derivative. The rows correspond to the temperatures ``t``, by
+    default ``ES_TABLE_SIZE`` equispaced temperatures from ``ES_TABLE_TMIN`` to ``ES_TABLE_TMAX``.
+    The derivative of the saturation specific humidity follows as ``des/dT / p``, up to the
+    correction for the virtual effects.
+    """
+    if t is None:
+        t = np.linspace(ES_TABLE_TMIN, ES_TABLE_TMAX, ES_TABLE_SIZE)
+    r2es = yoethf_parameters["R2ES"]
+    rtt = yomcst_parameters["RTT"]
+    out = np.zeros((t.size, 4))
+    for col, (r3es, r4es) in enumerate(
+        (
+            (yoethf_parameters["R3LES"], yoethf_parameters["R4LES"]),
+            (yoethf_parameters["R3IES"], yoethf_parameters["R4IES"]),
+        )
+    ):
+        out[:, 2 * col] = r2es * np.exp(r3es * (t - rtt) / (t - r4es))
+        out[:, 2 * col + 1] = out[:, 2 * col] * r3es * (rtt - r4es) / (t - r4es) ** 2
+    return out
+
+
+def allocate_es_table(
+    yoethf_parameters: Optional[ParameterDict],
+    yomcst_parameters: Optional[ParameterDict],
+    order: Literal[0, 1, 3],
+    *,
+    backend: Optional[str] = None,
+    gt4py_config: GT4PyConfig,
+) -> Storage:
+    """Allocate the table to pass to the stencils compiled with ``get_es_table_externals(order)``.
+
+    With ``order=0`` the table is never accessed, and is filled with zeros. ``backend`` is the
+    backend of the stencils (e.g. "numba" for the Numba kernels), by default the GT4Py backend.
+    """
+    if order == 0:
+        table = np.zeros((ES_TABLE_SIZE, 4))
+    elif (backend or gt4py_config.backend) == "numpy":
+        # the numpy backend does not support indexing the table at run time
+        raise RuntimeError("The table lookup is not supported by the numpy backend.")
+    else:
+        table = get_es_table(yoethf_parameters, yomcst_parameters)
+    return from_array(
+        table, gt4py_config.dtypes.float, backend=gt4py_config.backend, aligned_index=(0, 0)
+    )
+
+
+def interpolate_es_table(table: np.ndarray, t: np.ndarray, col: int, order: int) -> np.ndarray:
+    """Evaluate the saturation vapour pressure (col=0: over water, col=2: over ice) at ``t`` as
+    done by the stencils, but with NumPy."""
+    rdt = get_es_table_externals(order)["ES_TABLE_RDT"]
+    x = (t - ES_TABLE_TMIN) * rdt
+    i = np.clip(x, 0, ES_TABLE_SIZE - 2).astype(int)
+    w = x - i
+    f0, f1 = table[i, col], table[i + 1, col]
+    if order == 1:
+        return (1 - w) * f0 + w * f1
+    d0, d1 = table[i, col + 1], table[i + 1, col + 1]
+    return (1 - w) ** 2 * ((1 + 2 * w) * f0 + w * d0 / rdt) + w**2 * (
+        (3 - 2 * w) * f1 - (1 - w) * d1 / rdt
+    )
+
+
+def validate_es_table(
+    yoethf_parameters: ParameterDict,
+    yomcst_parameters: ParameterDict,
+    order: Literal[1, 3],
+    num_points: int = 100001,
+) -> dict[str, float]:
+    """Compare the table lookup against the exact evaluation over the table range.
+
+    Return the maximum relative error of the saturation vapour pressure over water and ice.
+    With the default table (0.25 K spacing), this is about 7e-4 for linear interpolation and
+    6e-8 for cubic interpolation, i.e. within the single precision round-off. The error is
+    largest at the cold end of the table, where the relative curvature is largest.
+    """
+    table = get_es_table(yoethf_parameters, yomcst_parameters)
+    t = np.linspace(ES_TABLE_TMIN, ES_TABLE_TMAX, num_points)
+    exact = get_es_table(yoethf_parameters, yomcst_parameters, t)
+    return {
+        name: float(np.max(np.abs(interpolate_es_table(table, t, col, order) / exact[:, col] - 1)))
+        for name, col in (("water", 0), ("ice", 2))
+    }
@@ -4,3 +4,4 @@ from .fcttre import *
 from .perturbed_state import *
 from .saturation import *
 from .state_increment import *
+from .state_update import *
@@ -23,15 +23,33 @@ def foealfcu(t):
     return min(1.0, ((max(RTICECU, min(RTWAT, t)) - RTICECU) * RTWAT_RTICECU_R) ** 2)
 
 
+@function_collection("foeew_exact")
+@gtscript.function
+def foeew_exact(t, z3es, z4es):
+    """The saturation vapour pressure over water (``z3es=R3LES, z4es=R4LES``) or over ice
+    (``z3es=R3IES, z4es=R4IES``).
+
+    In mixed precision the argument of the exponential is evaluated in double precision, and
+    only the result is rounded to single precision.
+    """
+    from __externals__ import MIXED_PRECISION, R2ES, RTT
+
+    if __INLINED(MIXED_PRECISION):
+        t_acc = float64(t)
+        out = float32(R2ES * exp(z3es * (t_acc - RTT) / (t_acc - z4es)))
+    else:
+        out = R2ES * exp(z3es * (t - RTT) / (t - z4es))
+    return out
+
+
 @ported_function(from_file="common/include/fcttre.func.h", from_line=80, to_line=83)
 @function_collection("foeewm")
 @gtscript.function
 def foeewm(t):
-    from __externals__ import R2ES, R3IES, R3LES, R4IES, R4LES, RTT
+    from __externals__ import R3IES, R3LES, R4IES, R4LES
 
-    return R2ES * (
-        foealfa(t) * exp(R3LES * (t - RTT) / (t - R4LES))
-        + (1 - foealfa(t)) * (exp(R3IES * (t - RTT) / (t - R4IES)))
+    return foealfa(t) * foeew_exact(t, R3LES, R4LES) + (1 - foealfa(t)) * foeew_exact(
+        t, R3IES, R4IES
     )
 
 
@@ -39,9 +57,44 @@ def foeewm(t):
 @function_collection("foeewmcu")
 @gtscript.function
 def foeewmcu(t):
-    from __externals__ import R2ES, R3IES, R3LES, R4IES, R4LES, RTT
+    from __externals__ import R3IES, R3LES, R4IES, R4LES
+
+    return foealfcu(t) * foeew_exact(t, R3LES, R4LES) + (1 - foealfcu(t)) * foeew_exact(
+        t, R3IES, R4IES
+    )
+
 
-    return R2ES * (
-        foealfcu(t) * exp(R3LES * (t - RTT) / (t - R4LES))
-        + (1 - foealfcu(t)) * (exp(R3IES * (t - RTT) / (t - R4IES)))
+@function_collection("foeew_table")
+@gtscript.function
+def foeew_table(t, es_table, col):
+    from __externals__ import ES_TABLE_ORDER, ES_TABLE_RDT, ES_TABLE_SIZE, ES_TABLE_TMIN
+
+    # temperatures outside the table range are extrapolated from the first/last interval
+    x = (t - ES_TABLE_TMIN) * ES_TABLE_RDT
+    i = int32(max(0.0, min(ES_TABLE_SIZE - 2.0, x)))
+    w = x - i
+    if __INLINED(ES_TABLE_ORDER == 1):
+        out = (1 - w) * es_table.A[i, col] + w * es_table.A[i + 1, col]
+    else:
+        # cubic Hermite interpolation, using the tabulated derivatives
+        out = (1 - w) * (1 - w) * (
+            (1 + 2 * w) * es_table.A[i, col] + w * es_table.A[i, col + 1] / ES_TABLE_RDT
+        ) + w * w * (
+            (3 - 2 * w) * es_table.A[i + 1, col]
+            - (1 - w) * es_table.A[i + 1, col + 1] / ES_TABLE_RDT
+        )
+    return out
+
+
+@function_collection("foeewm_table")
+@gtscript.function
+def foeewm_table(t, es_table):
+    return foealfa(t) * foeew_table(t, es_table, 0) + (1 - foealfa(t)) * foeew_table(t, es_table, 2)
+
+
+@function_collection("foeewmcu_table")
+@gtscript.function
+def foeewmcu_table(t, es_table):
+    return foealfcu(t) * foeew_table(t, es_table, 0) + (1 - foealfcu(t)) * foeew_table(
+        t, es_table, 2
     )
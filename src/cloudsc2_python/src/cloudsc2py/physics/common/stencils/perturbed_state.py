@@ -74,3 +74,75 @@ def pertubed_state_def(
         out_tnd_cml_ql[0, 0, 0] = in_tnd_cml_ql + f * in_tnd_cml_ql_i
         out_tnd_cml_qi[0, 0, 0] = in_tnd_cml_qi + f * in_tnd_cml_qi_i
         out_supsat[0, 0, 0] = in_supsat + f * in_supsat_i
+
+
+@stencil_collection("perturbed_states")
+def perturbed_states_def(
+    in_aph: gtscript.Field[gtscript.IK, "float"],
+    in_aph_i: gtscript.Field[gtscript.IK, "float"],
+    in_ap: gtscript.Field[gtscript.IK, "float"],
+    in_ap_i: gtscript.Field[gtscript.IK, "float"],
+    in_q: gtscript.Field[gtscript.IK, "float"],
+    in_q_i: gtscript.Field[gtscript.IK, "float"],
+    in_qsat: gtscript.Field[gtscript.IK, "float"],
+    in_qsat_i: gtscript.Field[gtscript.IK, "float"],
+    in_t: gtscript.Field[gtscript.IK, "float"],
+    in_t_i: gtscript.Field[gtscript.IK, "float"],
+    in_ql: gtscript.Field[gtscript.IK, "float"],
+    in_ql_i: gtscript.Field[gtscript.IK, "float"],
+    in_qi: gtscript.Field[gtscript.IK, "float"],
+    in_qi_i: gtscript.Field[gtscript.IK, "float"],
+    in_lude: gtscript.Field[gtscript.IK, "float"],
+    in_lude_i: gtscript.Field[gtscript.IK, "float"],
+    in_lu: gtscript.Field[gtscript.IK, "float"],
+    in_lu_i: gtscript.Field[gtscript.IK, "float"],
+    in_mfu: gtscript.Field[gtscript.IK, "float"],
+    in_mfu_i: gtscript.Field[gtscript.IK, "float"],
+    in_mfd: gtscript.Field[gtscript.IK, "float"],
+    in_mfd_i: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_t: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_t_i: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_q: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_q_i: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_ql: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_ql_i: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_qi: gtscript.Field[gtscript.IK, "float"],
+    in_tnd_cml_qi_i: gtscript.Field[gtscript.IK, "float"],
+    in_supsat: gtscript.Field[gtscript.IK, "float"],
+    in_supsat_i: gtscript.Field[gtscript.IK, "float"],
+    out_aph: gtscript.Field["float"],
+    out_ap: gtscript.Field["float"],
+    out_q: gtscript.Field["float"],
+    out_qsat: gtscript.Field["float"],
+    out_t: gtscript.Field["float"],
+    out_ql: gtscript.Field["float"],
+    out_qi: gtscript.Field["float"],
+    out_lude: gtscript.Field["float"],
+    out_lu: gtscript.Field["float"],
+    out_mfu: gtscript.Field["float"],
+    out_mfd: gtscript.Field["float"],
+    out_tnd_cml_t: gtscript.Field["float"],
+    out_tnd_cml_q: gtscript.Field["float"],
+    out_tnd_cml_ql: gtscript.Field["float"],
+    out_tnd_cml_qi: gtscript.Field["float"],
+    out_supsat: gtscript.Field["float"],
+    factors: gtscript.Field[gtscript.J, "float"],
+):
+    # the base state and the increment are broadcast along J, one index per factor
+    with computation(PARALLEL), interval(...):
+        out_aph[0, 0, 0] = in_aph + factors * in_aph_i
+        out_ap[0, 0, 0] = in_ap + factors * in_ap_i
+        out_q[0, 0, 0] = in_q + factors * in_q_i
+        out_qsat[0, 0, 0] = in_qsat + factors * in_qsat_i
+        out_t[0, 0, 0] = in_t + factors * in_t_i
+        out_ql[0, 0, 0] = in_ql + factors * in_ql_i
+        out_qi[0, 0, 0] = in_qi + factors * in_qi_i
+        out_lude[0, 0, 0] = in_lude + factors * in_lude_i
+        out_lu[0, 0, 0] = in_lu + factors * in_lu_i
+        out_mfu[0, 0, 0] = in_mfu + factors * in_mfu_i
+        out_mfd[0, 0, 0] = in_mfd + factors * in_mfd_i
+        out_tnd_cml_t[0, 0, 0] = in_tnd_cml_t + factors * in_tnd_cml_t_i
+        out_tnd_cml_q[0, 0, 0] = in_tnd_cml_q + factors * in_tnd_cml_q_i
+        out_tnd_cml_ql[0, 0, 0] = in_tnd_cml_ql + factors * in_tnd_cml_ql_i
+        out_tnd_cml_qi[0, 0, 0] = in_tnd_cml_qi + factors * in_tnd_cml_qi_i
+        out_supsat[0, 0, 0] = in_supsat + factors * in_supsat_i
@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
 from gt4py.cartesian import gtscript
 
-from cloudsc2py.physics.common.stencils.fcttre import foealfa, foeewm, foeewmcu
+from cloudsc2py.physics.common.saturation_table import ES_TABLE_SIZE
+from cloudsc2py.physics.common.stencils.fcttre import (
+    foealfa,
+    foeew_exact,
+    foeew_table,
+    foeewm,
+    foeewm_table,
+    foeewmcu,
+    foeewmcu_table,
+)
 from ifs_physics_common.framework.stencil import stencil_collection
 from ifs_physics_common.utils.f2py import ported_function
 
@@ -9,21 +18,44 @@ from ifs_physics_common.utils.f2py import ported_function
 @ported_function(from_file="clouds2_nl/satur.F90", from_line=106, to_line=140)
 @stencil_collection("saturation")
 def saturation_def(
-    in_ap: gtscript.Field["float"], in_t: gtscript.Field["float"], out_qsat: gtscript.Field["float"]
+    in_ap: gtscript.Field["float"],
+    in_t: gtscript.Field["float"],
+    out_qsat: gtscript.Field["float"],
+    es_table: gtscript.GlobalTable[("float", (ES_TABLE_SIZE, 4))],
 ):
-    from __externals__ import KFLAG, LPHYLIN, QMAX, R2ES, R3IES, R3LES, R4IES, R4LES, RETV, RTT
+    from __externals__ import (
+        ES_TABLE_ORDER,
+        KFLAG,
+        LPHYLIN,
+        QMAX,
+        R3IES,
+        R3LES,
+        R4IES,
+        R4LES,
+        RETV,
+    )
 
     with computation(PARALLEL), interval(...):
         if LPHYLIN:
             alfa = foealfa(in_t)
-            foeewl = R2ES * exp(R3LES * (in_t - RTT) / (in_t - R4LES))
-            foeewi = R2ES * exp(R3IES * (in_t - RTT) / (in_t - R4IES))
+            if __INLINED(ES_TABLE_ORDER == 0):
+                foeewl = foeew_exact(in_t, R3LES, R4LES)
+                foeewi = foeew_exact(in_t, R3IES, R4IES)
+            else:
+                foeewl = foeew_table(in_t, es_table, 0)
+                foeewi = foeew_table(in_t, es_table, 2)
             foeew = alfa * foeewl + (1 - alfa) * foeewi
             qs = min(foeew / in_ap, QMAX)
         else:
             if KFLAG == 1:
-                ew = foeewmcu(in_t)
+                if __INLINED(ES_TABLE_ORDER == 0):
+                    ew = foeewmcu(in_t)
+                else:
+                    ew = foeewmcu_table(in_t, es_table)
             else:
-                ew = foeewm(in_t)
+                if __INLINED(ES_TABLE_ORDER == 0):
+                    ew = foeewm(in_t)
+                else:
+                    ew = foeewm_table(in_t, es_table)
             qs = min(ew / in_ap, QMAX)
         out_qsat[0, 0, 0] = qs / (1.0 - RETV * qs)
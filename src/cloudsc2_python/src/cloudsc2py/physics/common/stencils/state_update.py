@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from gt4py.cartesian import gtscript
+
+from ifs_physics_common.framework.stencil import stencil_collection
+
+
+@stencil_collection("state_update")
+def state_update_def(
+    in_q: gtscript.Field["float"],
+    in_qi: gtscript.Field["float"],
+    in_ql: gtscript.Field["float"],
+    in_t: gtscript.Field["float"],
+    in_tnd_q: gtscript.Field["float"],
+    in_tnd_qi: gtscript.Field["float"],
+    in_tnd_ql: gtscript.Field["float"],
+    in_tnd_t: gtscript.Field["float"],
+    out_q: gtscript.Field["float"],
+    out_qi: gtscript.Field["float"],
+    out_ql: gtscript.Field["float"],
+    out_t: gtscript.Field["float"],
+    *,
+    dt: "float",
+):
+    # pointwise, so that the outputs may alias the inputs
+    with computation(PARALLEL), interval(...):
+        out_q[0, 0, 0] = in_q + dt * in_tnd_q
+        out_qi[0, 0, 0] = in_qi + dt * in_tnd_qi
+        out_ql[0, 0, 0] = in_ql + dt * in_tnd_ql
+        out_t[0, 0, 0] = in_t + dt * in_tnd_t
@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import math
+from numba import njit, prange
+from typing import TYPE_CHECKING
+
+from cloudsc2py.framework.kernels import kernel_collection
+from cloudsc2py.physics.common.kernels.fcttre import build_fcttre
+from cloudsc2py.physics.nonlinear.kernels.cuadjtqs import build_cuadjtqs_nl
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+def build_diagnose_qsat(externals: dict[str, Any]) -> Callable[..., float]:
+    """Build the Numba counterpart of ``diagnose_qsat``."""
+    ES_TABLE_ORDER = externals.get("ES_TABLE_ORDER", 0)
+    KFLAG = externals["KFLAG"]
+    LPHYLIN = externals["LPHYLIN"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    RETV = externals["RETV"]
+    RTT = externals["RTT"]
+    ZQMAX = externals["ZQMAX"]
+    fcttre = build_fcttre(externals)
+    foealfa = fcttre.foealfa
+    foeew_table = fcttre.foeew_table
+    foeewm = fcttre.foeewm
+    foeewm_table = fcttre.foeewm_table
+    foeewmcu = fcttre.foeewmcu
+    foeewmcu_table = fcttre.foeewmcu_table
+
+    @njit
+    def diagnose_qsat(ap, t, es_table):
+        if LPHYLIN:
+            alfa = foealfa(t)
+            if ES_TABLE_ORDER == 0:
+                foeewl = R2ES * math.exp(R3LES * (t - RTT) / (t - R4LES))
+                foeewi = R2ES * math.exp(R3IES * (t - RTT) / (t - R4IES))
+            else:
+                foeewl = foeew_table(t, es_table, 0)
+                foeewi = foeew_table(t, es_table, 2)
+            foeew = alfa * foeewl + (1 - alfa) * foeewi
+            qs = min(foeew / ap, ZQMAX)
+        else:
+            if KFLAG == 1:
+                if ES_TABLE_ORDER == 0:
+                    ew = foeewmcu(t)
+                else:
+                    ew = foeewmcu_table(t, es_table)
+            else:
+                if ES_TABLE_ORDER == 0:
+                    ew = foeewm(t)
+                else:
+                    ew = foeewm_table(t, es_table)
+            qs = min(ew / ap, ZQMAX)
+        return qs / (1.0 - RETV * qs)
+
+    return diagnose_qsat
+
+
+@njit
+def critical_relative_humidity(eta, trpaus):
+    """The Numba counterpart of ``critical_relative_humidity``."""
+    rh1 = 1.0
+    rh2 = 0.35 + 0.14 * ((trpaus - 0.25) / 0.15) ** 2 + 0.04 * min(trpaus - 0.25, 0.0) / 0.15
+    rh3 = 1.0
+    if eta < trpaus:
+        crh2 = rh3
+    else:
+        deta2 = 0.3
+        bound1 = trpaus + deta2
+        if eta < bound1:
+            crh2 = rh3 + (rh2 - rh3) * (eta - trpaus) / deta2
+        else:
+            deta1 = 0.09 + 0.16 * (0.4 - trpaus) / 0.3
+            bound2 = 1 - deta1
+            if eta < bound2:
+                crh2 = rh2
+            else:
+                crh2 = rh1 + (rh2 - rh1) * math.sqrt((1 - eta) / deta1)
+    return crh2
+
+
+@ported_function(from_file="cloudsc2_nl/cloudsc2.F90", from_line=235, to_line=735)
+@kernel_collection("cloudsc2_nl")
+def build_cloudsc2_nl(externals: dict[str, Any]) -> Callable[..., None]:
+    """Build the Numba counterpart of the ``cloudsc2_nl`` stencil.
+
+    Each column is processed top-down by a single thread, keeping the fluxes carried from one
+    level to the next in local variables. The columns are distributed among the threads.
+    """
+    ES_TABLE_ORDER = externals.get("ES_TABLE_ORDER", 0)
+    FUSE_SATURATION = externals["FUSE_SATURATION"]
+    LDRAIN1D = externals["LDRAIN1D"]
+    LEVAPLS2 = externals["LEVAPLS2"]
+    LPHYLIN = externals["LPHYLIN"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    R5IES = externals["R5IES"]
+    R5LES = externals["R5LES"]
+    RCLCRIT = externals["RCLCRIT"]
+    RCPD = externals["RCPD"]
+    RD = externals["RD"]
+    RETV = externals["RETV"]
+    RG = externals["RG"]
+    RKCONV = externals["RKCONV"]
+    RLMIN = externals["RLMIN"]
+    RLMLT = externals["RLMLT"]
+    RLPTRC = externals["RLPTRC"]
+    RLSTT = externals["RLSTT"]
+    RLVTT = externals["RLVTT"]
+    RPECONS = externals["RPECONS"]
+    RTICE = externals["RTICE"]
+    RTT = externals["RTT"]
+    RVTMP2 = externals["RVTMP2"]
+    ZEPS1 = externals["ZEPS1"]
+    ZEPS2 = externals["ZEPS2"]
+    ZQMAX = externals["ZQMAX"]
+    ZSCAL = externals["ZSCAL"]
+    fcttre = build_fcttre(externals)
+    foealfa = fcttre.foealfa
+    foeew_table = fcttre.foeew_table
+    foeewm = fcttre.foeewm
+    foeewm_table = fcttre.foeewm_table
+    cuadjtqs_nl = build_cuadjtqs_nl(externals)
+    diagnose_qsat = build_diagnose_qsat(externals)
+
+    @njit(parallel=True)
+    def cloudsc2_nl(
+        i0,
+        j0,
+        ni,
+        nj,
+        nk,
+        in_ap,
+        in_aph,
+        in_eta,
+        in_lu,
+        in_lude,
+        in_mfd,
+        in_mfu,
+        in_q,
+        in_qi,
+        in_ql,
+        in_qsat,
+        in_supsat,
+        in_t,
+        in_tnd_cml_q,
+        in_tnd_cml_qi,
+        in_tnd_cml_ql,
+        in_tnd_cml_t,
+        out_clc,
+        out_covptot,
+        out_fhpsl,
+        out_fhpsn,
+        out_fplsl,
+        out_fplsn,
+        out_tnd_q,
+        out_tnd_qi,
+        out_tnd_ql,
+        out_tnd_t,
+        tmp_aph_s,
+        es_table,
+        dt,
+    ):
+        for col in prange(ni * nj):
+            i = i0 + col // nj
+            j = j0 + col % nj
+
+            # eta value at tropopause
+            trpaus = 0.1
+            for k in range(nk - 1):
+                t = in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k]
+                t_below = in_t[i, j, k + 1] + dt * in_tnd_cml_t[i, j, k + 1]
+                if in_eta[k] > 0.1 and in_eta[k] < 0.4 and t > t_below:
+                    trpaus = in_eta[k]
+
+            # set to zero precipitation fluxes at the top
+            rfl = 0.0
+            sfl = 0.0
+            covptot = 0.0
+
+            for k in range(nk):
+                ap = in_ap[i, j, k]
+
+                # saturation specific humidity: either diagnosed from the input temperature, or
+                # read from the output of the saturation stencil
+                if FUSE_SATURATION:
+                    qsat0 = diagnose_qsat(ap, in_t[i, j, k], es_table)
+                else:
+                    qsat0 = in_qsat[i, j, k]
+
+                # first guess values for T, q, ql and qi
+                t = in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k]
+                q = in_q[i, j, k] + dt * in_tnd_cml_q[i, j, k] + in_supsat[i, j, k]
+                ql = in_ql[i, j, k] + dt * in_tnd_cml_ql[i, j, k]
+                qi = in_qi[i, j, k] + dt * in_tnd_cml_qi[i, j, k]
+
+                # set up constants required
+                ckcodtl = 2 * RKCONV * dt
+                ckcodti = 5 * RKCONV * dt
+                cons2 = 1 / (RG * dt)
+                cons3 = RLVTT / RCPD
+                meltp2 = RTT + 2
+
+                # parameter for cloud formation
+                scalm = ZSCAL * max(in_eta[k] - 0.2, ZEPS1) ** 0.2
+
+                # thermodynamic constants
+                dp = in_aph[i, j, k + 1] - in_aph[i, j, k]
+                zz = RCPD + RCPD * RVTMP2 * q
+                lfdcp = RLMLT / zz
+                lsdcp = RLSTT / zz
+                lvdcp = RLVTT / zz
+
+                # clear cloud and freezing arrays
+                clc = 0.0
+                out_covptot[i, j, k] = 0.0
+
+                # calculate dqs/dT correction factor
+                if LPHYLIN or LDRAIN1D:
+                    if t < RTT:
+                        fwat = 0.545 * (math.tanh(0.17 * (t - RLPTRC)) + 1)
+                        z3es = R3IES
+                        z4es = R4IES
+                    else:
+                        fwat = 1.0
+                        z3es = R3LES
+                        z4es = R4LES
+                    if ES_TABLE_ORDER == 0:
+                        foeew = R2ES * math.exp(z3es * (t - RTT) / (t - z4es))
+                    else:
+                        if t < RTT:
+                            foeew = foeew_table(t, es_table, 2)
+                        else:
+                            foeew = foeew_table(t, es_table, 0)
+                    esdp = min(foeew / ap, ZQMAX)
+                else:
+                    fwat = foealfa(t)
+                    if ES_TABLE_ORDER == 0:
+                        foeew = foeewm(t)
+                    else:
+                        foeew = foeewm_table(t, es_table)
+                    esdp = foeew / ap
+                facw = R5LES / ((t - R4LES) ** 2)
+                faci = R5IES / ((t - R4IES) ** 2)
+                fac = fwat * facw + (1 - fwat) * faci
+                dqsdtemp = fac * qsat0 / (1 - RETV * esdp)
+                corqs = 1 + cons3 * dqsdtemp
+
+                # use clipped state
+                qlim = min(q, qsat0)
+
+                # set up critical value of humidity
+                crh2 = critical_relative_humidity(in_eta[k], trpaus)
+
+                # allow ice supersaturation at cold temperatures
+                if t < RTICE:
+                    qsat = qsat0 * (1.8 - 0.003 * t)
+                else:
+                    qsat = qsat0
+                qcrit = crh2 * qsat
+
+                # simple uniform distribution of total water from Leutreut & Li (1990)
+                qt = q + ql + qi
+                if qt < qcrit:
+                    clc = 0.0
+                    qc = 0.0
+                elif qt >= qsat:
+                    clc = 1.0
+                    qc = (1 - scalm) * (qsat - qcrit)
+                else:
+                    qpd = qsat - qt
+                    qcd = qsat - qcrit
+                    clc = 1 - math.sqrt(qpd / (qcd - scalm * (qt - qcrit)))
+                    qc = (scalm * qpd + (1 - scalm) * qcd) * (clc**2)
+
+                # add convective component
+                gdp = RG / (in_aph[i, j, k + 1] - in_aph[i, j, k])
+                lude = dt * in_lude[i, j, k] * gdp
+                lo1 = lude >= RLMIN and in_lu[i, j, k + 1] >= ZEPS2
+                if lo1:
+                    clc += (1 - clc) * (1 - math.exp(-lude / in_lu[i, j, k + 1]))
+                    qc += lude
+
+                # add compensating subsidence component
+                rho = ap / (RD * t)
+                rodqsdp = -rho * qsat0 / (ap - RETV * foeew)
+                ldcp = fwat * lvdcp + (1 - fwat) * lsdcp
+                dtdzmo = RG * (1 / RCPD - ldcp * rodqsdp) / (1 + ldcp * dqsdtemp)
+                dqsdz = dqsdtemp * dtdzmo - RG * rodqsdp
+                dqc = min(dt * dqsdz * (in_mfu[i, j, k] + in_mfd[i, j, k]) / rho, qc)
+                qc -= dqc
+
+                # new cloud liquid/ice contents and condensation rates (liquid/ice)
+                qlwc = qc * fwat
+                qiwc = qc * (1 - fwat)
+                condl = (qlwc - ql) / dt
+                condi = (qiwc - qi) / dt
+
+                # calculate precipitation overlap
+                # simple form based on Maximum Overlap
+                covptot = max(covptot, clc)
+                covpclr = max(covptot - clc, 0.0)
+
+                # melting of incoming snow
+                if sfl != 0:
+                    cons = cons2 * dp / lfdcp
+                    snmlt = min(sfl, cons * max(t - meltp2, 0.0))
+                    rfln = rfl + snmlt
+                    sfln = sfl - snmlt
+                    t -= snmlt / cons
+                else:
+                    rfln = rfl
+                    sfln = sfl
+
+                # diagnostic calculation of rain production from cloud liquid water
+                if clc > ZEPS2:
+                    if LEVAPLS2 or LDRAIN1D:
+                        lcrit = 1.9 * RCLCRIT
+                    else:
+                        lcrit = 2.0 * RCLCRIT
+                    cldl = qlwc / clc
+                    dl = ckcodtl * (1 - math.exp(-((cldl / lcrit) ** 2)))
+                    prr = qlwc - clc * cldl * math.exp(-dl)
+                    qlwc -= prr
+                else:
+                    prr = 0.0
+
+                # diagnostic calculation of snow production from cloud ice
+                if clc > ZEPS2:
+                    if LEVAPLS2 or LDRAIN1D:
+                        icrit = 0.0001
+                    else:
+                        icrit = 2 * RCLCRIT
+                    cldi = qiwc / clc
+                    di = (
+                        ckcodti
+                        * math.exp(0.025 * (t - RTT))
+                        * (1 - math.exp(-((cldi / icrit) ** 2)))
+                    )
+                    prs = qiwc - clc * cldi * math.exp(-di)
+                    qiwc -= prs
+                else:
+                    prs = 0.0
+
+                # new precipitation (rain + snow)
+                dr = cons2 * dp * (prr + prs)
+
+                # rain fraction (different from cloud liquid water fraction!)
+                if t < RTT:
+                    rfreeze = cons2 * dp * prr
+                    fwatr = 0.0
+                else:
+                    rfreeze = 0.0
+                    fwatr = 1.0
+                rfln += fwatr * dr
+                sfln += (1 - fwatr) * dr
+
+                # precipitation evaporation
+                prtot = rfln + sfln
+                if prtot > ZEPS2 and covpclr > ZEPS2 and (LEVAPLS2 or LDRAIN1D):
+                    preclr = prtot * covpclr / covptot
+
+                    # this is the humidity in the moisest zcovpclr region
+                    qe = qsat0 - (qsat0 - qlim) * covpclr / ((1 - clc) ** 2)
+                    beta = (
+                        RG
+                        * RPECONS
+                        * (math.sqrt(ap / tmp_aph_s[i, j]) / 0.00509 * preclr / covpclr) ** 0.5777
+                    )
+
+                    # implicit solution
+                    b = dt * beta * (qsat0 - qe) / (1 + dt * beta * corqs)
+
+                    dtgdp = dt * RG / (in_aph[i, j, k + 1] - in_aph[i, j, k])
+                    dpr = min(covpclr * b / dtgdp, preclr)
+                    preclr -= dpr
+                    if preclr <= 0:
+                        covptot = clc
+                    out_covptot[i, j, k] = covptot
+
+                    # warm proportion
+                    evapr = dpr * rfln / prtot
+                    rfln -= evapr
+
+                    # ice proportion
+                    evaps = dpr * sfln / prtot
+                    sfln -= evaps
+                else:
+                    evapr = 0.0
+                    evaps = 0.0
+
+                # first guess T and Q, updated due to:
+                # - condensation/evaporation of cloud water/ice
+                # - detrainment of convective cloud condensate
+                # - evaporation of precipitation
+                # - freezing of rain (impact on T only)
+                dqdt = -(condl + condi) + (in_lude[i, j, k] + evapr + evaps) * gdp
+                dtdt = (
+                    lvdcp * condl
+                    + lsdcp * condi
+                    - (
+                        lvdcp * evapr
+                        + lsdcp * evaps
+                        + in_lude[i, j, k] * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                        - (lsdcp - lvdcp) * rfreeze
+                    )
+                    * gdp
+                )
+                t += dt * dtdt
+                q += dt * dqdt
+                qold = q
+
+                # clipping of final qv
+                t, q = cuadjtqs_nl(ap, t, q, es_table)
+
+                # update rain fraction and freezing
+                dq = max(qold - q, 0.0)
+                dr2 = cons2 * dp * dq
+                if t < RTT:
+                    rfreeze2 = fwat * dr2
+                    fwatr = 0.0
+                else:
+                    rfreeze2 = 0.0
+                    fwatr = 1.0
+                rn = fwatr * dr2
+                sn = (1 - fwatr) * dr2
+                condl += fwatr * dq / dt
+                condi += (1 - fwatr) * dq / dt
+                rfln += rn
+                sfln += sn
+                rfreeze += rfreeze2
+
+                # calculate output tendencies
+                out_clc[i, j, k] = clc
+                out_tnd_q[i, j, k] = -(condl + condi) + (in_lude[i, j, k] + evapr + evaps) * gdp
+                out_tnd_t[i, j, k] = (
+                    lvdcp * condl
+                    + lsdcp * condi
+                    - (
+                        lvdcp * evapr
+                        + lsdcp * evaps
+                        + in_lude[i, j, k] * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                        - (lsdcp - lvdcp) * rfreeze
+                    )
+                    * gdp
+                )
+                out_tnd_ql[i, j, k] = (qlwc - ql) / dt
+                out_tnd_qi[i, j, k] = (qiwc - qi) / dt
+
+                # enthalpy fluxes due to precipitation, on the half level below
+                out_fplsl[i, j, k + 1] = rfln
+                out_fplsn[i, j, k + 1] = sfln
+                out_fhpsl[i, j, k + 1] = -out_fplsl[i, j, k + 1] * RLVTT
+                out_fhpsn[i, j, k + 1] = -out_fplsn[i, j, k + 1] * RLSTT
+
+                # record rain flux for next level
+                rfl = rfln
+                sfl = sfln
+
+            out_fplsl[i, j, 0] = 0.0
+            out_fplsn[i, j, 0] = 0.0
+            out_fhpsl[i, j, 0] = 0.0
+            out_fhpsn[i, j, 0] = 0.0
+
+    return cloudsc2_nl
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import math
+from numba import njit
+from typing import TYPE_CHECKING
+
+from cloudsc2py.physics.common.kernels.fcttre import build_fcttre
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+@ported_function(from_file="cloudsc2_nl/cloudsc2.F90", from_line=630, to_line=669)
+def build_cuadjtqs_nl(externals: dict[str, Any]) -> Callable[..., tuple[float, float]]:
+    """Build the Numba counterpart of ``cuadjtqs_nl``, or of ``cuadjtqs_nl_table`` if the
+    externals select the table lookup."""
+    ICALL = externals["ICALL"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    R5ALSCP = externals["R5ALSCP"]
+    R5ALVCP = externals["R5ALVCP"]
+    RALSDCP = externals["RALSDCP"]
+    RALVDCP = externals["RALVDCP"]
+    RETV = externals["RETV"]
+    RTT = externals["RTT"]
+    ZQMAX = externals["ZQMAX"]
+    ES_TABLE_ORDER = externals.get("ES_TABLE_ORDER", 0)
+    foeew_table = build_fcttre(externals).foeew_table
+
+    @njit
+    def cuadjtqs_nl_0(ap, t, q, es_table, col, z3es, z4es, z5alcp, zaldcp):
+        if ES_TABLE_ORDER == 0:
+            foeew = R2ES * math.exp(z3es * (t - RTT) / (t - z4es))
+        else:
+            foeew = foeew_table(t, es_table, col)
+        qsat = min(foeew / ap, ZQMAX)
+        cor = 1 / (1 - RETV * qsat)
+        qsat *= cor
+        z2s = z5alcp / (t - z4es) ** 2
+        cond = (q - qsat) / (1 + qsat * cor * z2s)
+        t += zaldcp * cond
+        q -= cond
+        return t, q
+
+    @njit
+    def cuadjtqs_nl(ap, t, q, es_table):
+        if t > RTT:
+            col = 0
+            z3es = R3LES
+            z4es = R4LES
+            z5alcp = R5ALVCP
+            zaldcp = RALVDCP
+        else:
+            col = 2
+            z3es = R3IES
+            z4es = R4IES
+            z5alcp = R5ALSCP
+            zaldcp = RALSDCP
+
+        if ICALL == 0:
+            t, q = cuadjtqs_nl_0(ap, t, q, es_table, col, z3es, z4es, z5alcp, zaldcp)
+            t, q = cuadjtqs_nl_0(ap, t, q, es_table, col, z3es, z4es, z5alcp, zaldcp)
+        return t, q
+
+    return cuadjtqs_nl
@@ -4,12 +4,17 @@ from functools import cached_property
 from itertools import repeat
 from typing import TYPE_CHECKING
 
+from cloudsc2py.framework.blocking import launch_column_blocks
+from cloudsc2py.framework.config import get_precision_externals
+from cloudsc2py.framework.kernels import NumbaComponent
+from cloudsc2py.framework.storage import managed_temporary_storage
+from cloudsc2py.physics.common.saturation_table import allocate_es_table, get_es_table_externals
 from ifs_physics_common.framework.components import ImplicitTendencyComponent
 from ifs_physics_common.framework.grid import I, J, K
-from ifs_physics_common.framework.storage import managed_temporary_storage
 from ifs_physics_common.utils.f2py import ported_method
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
     from datetime import timedelta
     from typing import Optional
 
@@ -17,11 +22,24 @@ if TYPE_CHECKING:
 
     from ifs_physics_common.framework.config import GT4PyConfig
     from ifs_physics_common.framework.grid import ComputationalGrid
-    from ifs_physics_common.utils.typingx import ParameterDict, PropertyDict, StorageDict
+    from ifs_physics_common.utils.typingx import (
+        ParameterDict,
+        PropertyDict,
+        Storage,
+        StorageDict,
+    )
 
 
 class Cloudsc2NL(ImplicitTendencyComponent):
+    block_size: Optional[int]
     cloudsc2: StencilObject
+    executor: Optional[Executor] = None
+    es_table: Storage
+
+    # if True, the saturation specific humidity is diagnosed within the stencil rather than
+    # read from the state
+    fuse_saturation: bool = False
+    kflag: int = 1
 
     def __init__(
         self,
@@ -35,10 +53,13 @@ class Cloudsc2NL(ImplicitTendencyComponent):
         yrephli_parameters: Optional[ParameterDict] = None,
         yrphnc_parameters: Optional[ParameterDict] = None,
         *,
+        block_size: Optional[int] = None,
         enable_checks: bool = True,
+        es_table_order: int = 0,
         gt4py_config: GT4PyConfig,
     ) -> None:
         super().__init__(computational_grid, enable_checks=enable_checks, gt4py_config=gt4py_config)
+        self.block_size = block_size
 
         externals = {}
         externals.update(yoethf_parameters or {})
@@ -49,7 +70,9 @@ class Cloudsc2NL(ImplicitTendencyComponent):
         externals.update(yrphnc_parameters or {})
         externals.update(
             {
+                "FUSE_SATURATION": self.fuse_saturation,
                 "ICALL": 0,
+                "KFLAG": self.kflag,
                 "LPHYLIN": lphylin,
                 "LDRAIN1D": ldrain1d,
                 "ZEPS1": 1e-12,
@@ -58,7 +81,16 @@ class Cloudsc2NL(ImplicitTendencyComponent):
                 "ZSCAL": 0.9,
             }
         )
+        externals.update(get_es_table_externals(es_table_order))
+        externals.update(get_precision_externals(gt4py_config.dtypes))
         self.cloudsc2 = self.compile_stencil("cloudsc2_nl", externals)
+        self.es_table = allocate_es_table(
+            yoethf_parameters,
+            yomcst_parameters,
+            es_table_order,
+            backend=self.cloudsc2.backend,
+            gt4py_config=gt4py_config,
+        )
 
     @cached_property
     @ported_method(from_file="cloudsc2_nl/cloudsc_driver_mod.F90", from_line=94, to_line=107)
@@ -114,11 +146,22 @@ class Cloudsc2NL(ImplicitTendencyComponent):
         out_diagnostics: StorageDict,
         overwrite_tendencies: dict[str, bool],
     ) -> None:
+        # the precipitation fluxes are accumulated in (possibly) higher precision
         with managed_temporary_storage(
-            self.computational_grid, *repeat(((I, J), "float"), 5), gt4py_config=self.gt4py_config
+            self.computational_grid,
+            ((I, J), "float"),
+            *repeat(((I, J), "float_acc"), 3),
+            ((I, J), "float"),
+            gt4py_config=self.gt4py_config,
         ) as (aph_s, rfl, sfl, covptot, trpaus):
             aph_s[...] = state["f_aph"][..., -1]
-            self.cloudsc2(
+            # with block_size, the columns are processed in blocks, like NPROMA blocks, possibly
+            # concurrently by executor
+            launch_column_blocks(
+                self.cloudsc2,
+                self.computational_grid.grids[I, J, K - 1 / 2].shape,
+                self.block_size,
+                self.executor,
                 in_ap=state["f_ap"],
                 in_aph=state["f_aph"],
                 in_eta=state["f_eta"],
@@ -129,7 +172,8 @@ class Cloudsc2NL(ImplicitTendencyComponent):
                 in_q=state["f_q"],
                 in_qi=state["f_qi"],
                 in_ql=state["f_ql"],
-                in_qsat=state["f_qsat"],
+                # with fuse_saturation=True, in_qsat is never accessed
+                in_qsat=state["f_t" if self.fuse_saturation else "f_qsat"],
                 in_supsat=state["f_supsat"],
                 in_t=state["f_t"],
                 in_tnd_cml_q=state["f_tnd_cml_q"],
@@ -151,9 +195,69 @@ class Cloudsc2NL(ImplicitTendencyComponent):
                 tmp_rfl=rfl,
                 tmp_sfl=sfl,
                 tmp_trpaus=trpaus,
-                dt=timestep.total_seconds(),
-                origin=(0, 0, 0),
-                domain=self.computational_grid.grids[I, J, K - 1 / 2].shape,
+                es_table=self.es_table,
+                dt=self.gt4py_config.dtypes.float(timestep.total_seconds()),
                 validate_args=self.gt4py_config.validate_args,
                 exec_info=self.gt4py_config.exec_info,
             )
+
+
+class Cloudsc2NLWithSaturation(Cloudsc2NL):
+    """Like ``Cloudsc2NL``, but diagnosing the saturation specific humidity within the stencil,
+    as done by ``Saturation``, instead of reading it from the state.
+
+    This saves ``f_qsat`` being written to and read back from memory.
+    """
+
+    fuse_saturation = True
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        kflag: int,
+        lphylin: bool,
+        ldrain1d: bool,
+        yoethf_parameters: Optional[ParameterDict] = None,
+        yomcst_parameters: Optional[ParameterDict] = None,
+        yrecld_parameters: Optional[ParameterDict] = None,
+        yrecldp_parameters: Optional[ParameterDict] = None,
+        yrephli_parameters: Optional[ParameterDict] = None,
+        yrphnc_parameters: Optional[ParameterDict] = None,
+        *,
+        block_size: Optional[int] = None,
+        enable_checks: bool = True,
+        es_table_order: int = 0,
+        gt4py_config: GT4PyConfig,
+    ) -> None:
+        self.kflag = kflag
+        super().__init__(
+            computational_grid,
+            lphylin,
+            ldrain1d,
+            yoethf_parameters,
+            yomcst_parameters,
+            yrecld_parameters,
+            yrecldp_parameters,
+            yrephli_parameters,
+            yrphnc_parameters,
+            block_size=block_size,
+            enable_checks=enable_checks,
+            es_table_order=es_table_order,
+            gt4py_config=gt4py_config,
+        )
+
+    @cached_property
+    def _input_properties(self) -> PropertyDict:
+        return {key: value for key, value in super()._input_properties.items() if key != "f_qsat"}
+
+
+class NumbaCloudsc2NL(NumbaComponent, Cloudsc2NL):
+    """Like ``Cloudsc2NL``, but running the Numba kernel in place of the ``cloudsc2_nl`` stencil.
+
+    The kernel processes each column top-down within a single thread, and the columns in parallel
+    over the Numba threads. The storages must be allocated on the CPU.
+    """
+
+
+class NumbaCloudsc2NLWithSaturation(NumbaComponent, Cloudsc2NLWithSaturation):
+    """Like ``Cloudsc2NLWithSaturation``, but running the Numba kernel."""
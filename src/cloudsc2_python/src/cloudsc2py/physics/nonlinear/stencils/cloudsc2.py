@@ -1,12 +1,88 @@
 # -*- coding: utf-8 -*-
 from gt4py.cartesian import gtscript
 
-from cloudsc2py.physics.common.stencils.fcttre import foealfa, foeewm
-from cloudsc2py.physics.nonlinear.stencils.cuadjtqs import cuadjtqs_nl
-from ifs_physics_common.framework.stencil import stencil_collection
+from cloudsc2py.physics.common.saturation_table import ES_TABLE_SIZE
+from cloudsc2py.physics.common.stencils.fcttre import (
+    foealfa,
+    foeew_exact,
+    foeew_table,
+    foeewm,
+    foeewm_table,
+    foeewmcu,
+    foeewmcu_table,
+)
+from cloudsc2py.physics.nonlinear.stencils.cuadjtqs import cuadjtqs_nl, cuadjtqs_nl_table
+from ifs_physics_common.framework.stencil import function_collection, stencil_collection
 from ifs_physics_common.utils.f2py import ported_function
 
 
+@function_collection("cloudsc2_nl_qsat")
+@gtscript.function
+def diagnose_qsat(ap, t, es_table):
+    """Diagnose the saturation specific humidity from the temperature, as done by the saturation
+    stencil."""
+    from __externals__ import (
+        ES_TABLE_ORDER,
+        KFLAG,
+        LPHYLIN,
+        R3IES,
+        R3LES,
+        R4IES,
+        R4LES,
+        RETV,
+        ZQMAX,
+    )
+
+    if LPHYLIN:
+        alfa = foealfa(t)
+        if __INLINED(ES_TABLE_ORDER == 0):
+            foeewl = foeew_exact(t, R3LES, R4LES)
+            foeewi = foeew_exact(t, R3IES, R4IES)
+        else:
+            foeewl = foeew_table(t, es_table, 0)
+            foeewi = foeew_table(t, es_table, 2)
+        foeew = alfa * foeewl + (1 - alfa) * foeewi
+        qs = min(foeew / ap, ZQMAX)
+    else:
+        if KFLAG == 1:
+            if __INLINED(ES_TABLE_ORDER == 0):
+                ew = foeewmcu(t)
+            else:
+                ew = foeewmcu_table(t, es_table)
+        else:
+            if __INLINED(ES_TABLE_ORDER == 0):
+                ew = foeewm(t)
+            else:
+                ew = foeewm_table(t, es_table)
+        qs = min(ew / ap, ZQMAX)
+    return qs / (1.0 - RETV * qs)
+
+
+@function_collection("cloudsc2_nl_crh2")
+@gtscript.function
+def critical_relative_humidity(eta, trpaus):
+    """The critical relative humidity for cloud formation, as a function of the eta-level and of
+    the eta-level of the tropopause."""
+    rh1 = 1.0
+    rh2 = 0.35 + 0.14 * ((trpaus - 0.25) / 0.15) ** 2 + 0.04 * min(trpaus - 0.25, 0.0) / 0.15
+    rh3 = 1.0
+    if eta < trpaus:
+        crh2 = rh3
+    else:
+        deta2 = 0.3
+        bound1 = trpaus + deta2
+        if eta < bound1:
+            crh2 = rh3 + (rh2 - rh3) * (eta - trpaus) / deta2
+        else:
+            deta1 = 0.09 + 0.16 * (0.4 - trpaus) / 0.3
+            bound2 = 1 - deta1
+            if eta < bound2:
+                crh2 = rh2
+            else:
+                crh2 = rh1 + (rh2 - rh1) * sqrt((1 - eta) / deta1)
+    return crh2
+
+
 @ported_function(from_file="cloudsc2_nl/cloudsc2.F90", from_line=235, to_line=735)
 @stencil_collection("cloudsc2_nl")
 def cloudsc2_nl_def(
@@ -38,18 +114,20 @@ def cloudsc2_nl_def(
     out_tnd_ql: gtscript.Field["float"],
     out_tnd_t: gtscript.Field["float"],
     tmp_aph_s: gtscript.Field[gtscript.IJ, "float"],
-    tmp_covptot: gtscript.Field[gtscript.IJ, "float"],
-    tmp_rfl: gtscript.Field[gtscript.IJ, "float"],
-    tmp_sfl: gtscript.Field[gtscript.IJ, "float"],
+    tmp_covptot: gtscript.Field[gtscript.IJ, "float_acc"],
+    tmp_rfl: gtscript.Field[gtscript.IJ, "float_acc"],
+    tmp_sfl: gtscript.Field[gtscript.IJ, "float_acc"],
     tmp_trpaus: gtscript.Field[gtscript.IJ, "float"],
+    es_table: gtscript.GlobalTable[("float", (ES_TABLE_SIZE, 4))],
     *,
     dt: "float",
 ):
     from __externals__ import (
+        ES_TABLE_ORDER,
+        FUSE_SATURATION,
         LDRAIN1D,
         LEVAPLS2,
         LPHYLIN,
-        R2ES,
         R3IES,
         R3LES,
         R4IES,
@@ -95,6 +173,13 @@ def cloudsc2_nl_def(
             tmp_trpaus[0, 0] = in_eta
 
     with computation(FORWARD), interval(0, -1):
+        # saturation specific humidity: either diagnosed from the input temperature, as done
+        # by the saturation stencil, or read from the output of the saturation stencil
+        if FUSE_SATURATION:
+            qsat0 = diagnose_qsat(in_ap, in_t, es_table)
+        else:
+            qsat0 = in_qsat
+
         # first guess values for q, ql and qi
         q = in_q + dt * in_tnd_cml_q + in_supsat
         ql = in_ql + dt * in_tnd_cml_ql
@@ -122,6 +207,8 @@ def cloudsc2_nl_def(
         out_covptot[0, 0, 0] = 0.0
 
         # calculate dqs/dT correction factor
+        # the saturation water vapour pressure is evaluated at the first guess temperature,
+        # whereas qsat0 stands for the input temperature: the two cannot share an evaluation
         if LPHYLIN or LDRAIN1D:
             if t < RTT:
                 fwat = 0.545 * (tanh(0.17 * (t - RLPTRC)) + 1)
@@ -131,49 +218,38 @@ def cloudsc2_nl_def(
                 fwat = 1.0
                 z3es = R3LES
                 z4es = R4LES
-            foeew = R2ES * exp(z3es * (t - RTT) / (t - z4es))
+            if __INLINED(ES_TABLE_ORDER == 0):
+                foeew = foeew_exact(t, z3es, z4es)
+            else:
+                if t < RTT:
+                    foeew = foeew_table(t, es_table, 2)
+                else:
+                    foeew = foeew_table(t, es_table, 0)
             esdp = min(foeew / in_ap, ZQMAX)
         else:
             fwat = foealfa(t)
-            foeew = foeewm(t)
+            if __INLINED(ES_TABLE_ORDER == 0):
+                foeew = foeewm(t)
+            else:
+                foeew = foeewm_table(t, es_table)
             esdp = foeew / in_ap
         facw = R5LES / ((t - R4LES) ** 2)
         faci = R5IES / ((t - R4IES) ** 2)
         fac = fwat * facw + (1 - fwat) * faci
-        dqsdtemp = fac * in_qsat / (1 - RETV * esdp)
+        dqsdtemp = fac * qsat0 / (1 - RETV * esdp)
         corqs = 1 + cons3 * dqsdtemp
 
         # use clipped state
-        qlim = min(q, in_qsat)
+        qlim = min(q, qsat0)
 
         # set up critical value of humidity
-        rh1 = 1.0
-        rh2 = (
-            0.35
-            + 0.14 * ((tmp_trpaus - 0.25) / 0.15) ** 2
-            + 0.04 * min(tmp_trpaus - 0.25, 0.0) / 0.15
-        )
-        rh3 = 1.0
-        if in_eta < tmp_trpaus:
-            crh2 = rh3
-        else:
-            deta2 = 0.3
-            bound1 = tmp_trpaus + deta2
-            if in_eta < bound1:
-                crh2 = rh3 + (rh2 - rh3) * (in_eta - tmp_trpaus) / deta2
-            else:
-                deta1 = 0.09 + 0.16 * (0.4 - tmp_trpaus) / 0.3
-                bound2 = 1 - deta1
-                if in_eta < bound2:
-                    crh2 = rh2
-                else:
-                    crh2 = rh1 + (rh2 - rh1) * sqrt((1 - in_eta) / deta1)
+        crh2 = critical_relative_humidity(in_eta, tmp_trpaus)
 
         # allow ice supersaturation at cold temperatures
         if t < RTICE:
-            qsat = in_qsat * (1.8 - 0.003 * t)
+            qsat = qsat0 * (1.8 - 0.003 * t)
         else:
-            qsat = in_qsat
+            qsat = qsat0
         qcrit = crh2 * qsat
 
         # simple uniform distribution of total water from Leutreut & Li (1990)
@@ -200,7 +276,7 @@ def cloudsc2_nl_def(
 
         # add compensating subsidence component
         rho = in_ap / (RD * t)
-        rodqsdp = -rho * in_qsat / (in_ap - RETV * foeew)
+        rodqsdp = -rho * qsat0 / (in_ap - RETV * foeew)
         ldcp = fwat * lvdcp + (1 - fwat) * lsdcp
         dtdzmo = RG * (1 / RCPD - ldcp * rodqsdp) / (1 + ldcp * dqsdtemp)
         dqsdz = dqsdtemp * dtdzmo - RG * rodqsdp
@@ -274,11 +350,13 @@ def cloudsc2_nl_def(
             preclr = prtot * covpclr / tmp_covptot
 
             # this is the humidity in the moisest zcovpclr region
-            qe = in_qsat - (in_qsat - qlim) * covpclr / ((1 - out_clc) ** 2)
-            beta = RG * RPECONS * (sqrt(in_ap / tmp_aph_s) / 0.00509 * preclr / covpclr) ** 0.5777
+            qe = qsat0 - (qsat0 - qlim) * covpclr / ((1 - out_clc) ** 2)
+            beta = (
+                RG * RPECONS * (sqrt(in_ap / tmp_aph_s) / 0.00509 * preclr / covpclr) ** 0.5777
+            )
 
             # implicit solution
-            b = dt * beta * (in_qsat - qe) / (1 + dt * beta * corqs)
+            b = dt * beta * (qsat0 - qe) / (1 + dt * beta * corqs)
 
             dtgdp = dt * RG / (in_aph[0, 0, 1] - in_aph[0, 0, 0])
             dpr = min(covpclr * b / dtgdp, preclr)
@@ -322,7 +400,10 @@ def cloudsc2_nl_def(
         qold = q
 
         # clipping of final qv
-        t, q = cuadjtqs_nl(in_ap, t, q)
+        if __INLINED(ES_TABLE_ORDER == 0):
+            t, q = cuadjtqs_nl(in_ap, t, q)
+        else:
+            t, q = cuadjtqs_nl_table(in_ap, t, q, es_table)
 
         # update rain fraction and freezing
         dq = max(qold - q, 0.0)
@@ -375,3 +456,4 @@ def cloudsc2_nl_def(
             out_fplsn[0, 0, 0] = fplsn[0, 0, -1]
             out_fhpsl[0, 0, 0] = -out_fplsl * RLVTT
             out_fhpsn[0, 0, 0] = -out_fplsn * RLSTT
+
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from gt4py.cartesian import gtscript
 
+from cloudsc2py.physics.common.stencils.fcttre import foeew_exact, foeew_table
 from ifs_physics_common.framework.stencil import function_collection
 from ifs_physics_common.utils.f2py import ported_function
 
@@ -9,9 +10,9 @@ from ifs_physics_common.utils.f2py import ported_function
 @function_collection("cuadjtqs_nl_0")
 @gtscript.function
 def cuadjtqs_nl_0(ap, t, q, z3es, z4es, z5alcp, zaldcp):
-    from __externals__ import R2ES, RETV, RTT, ZQMAX
+    from __externals__ import RETV, ZQMAX
 
-    foeew = R2ES * exp(z3es * (t - RTT) / (t - z4es))
+    foeew = foeew_exact(t, z3es, z4es)
     qsat = min(foeew / ap, ZQMAX)
     cor = 1 / (1 - RETV * qsat)
     qsat *= cor
@@ -54,3 +55,42 @@ def cuadjtqs_nl(ap, t, q):
         t, q = cuadjtqs_nl_0(ap, t, q, z3es, z4es, z5alcp, zaldcp)
         t, q = cuadjtqs_nl_0(ap, t, q, z3es, z4es, z5alcp, zaldcp)
         return t, q
+
+
+@function_collection("cuadjtqs_nl_table_0")
+@gtscript.function
+def cuadjtqs_nl_table_0(ap, t, q, es_table, col, z4es, z5alcp, zaldcp):
+    from __externals__ import RETV, ZQMAX
+
+    foeew = foeew_table(t, es_table, col)
+    qsat = min(foeew / ap, ZQMAX)
+    cor = 1 / (1 - RETV * qsat)
+    qsat *= cor
+    z2s = z5alcp / (t - z4es) ** 2
+    cond = (q - qsat) / (1 + qsat * cor * z2s)
+    t += zaldcp * cond
+    q -= cond
+    return t, q
+
+
+@function_collection("cuadjtqs_nl_table")
+@gtscript.function
+def cuadjtqs_nl_table(ap, t, q, es_table):
+    """Like ``cuadjtqs_nl``, but with the saturation vapour pressure looked up in ``es_table``."""
+    from __externals__ import ICALL, R4IES, R4LES, R5ALSCP, R5ALVCP, RALSDCP, RALVDCP, RTT
+
+    if t > RTT:
+        col = 0
+        z4es = R4LES
+        z5alcp = R5ALVCP
+        zaldcp = RALVDCP
+    else:
+        col = 2
+        z4es = R4IES
+        z5alcp = R5ALSCP
+        zaldcp = RALSDCP
+
+    if ICALL == 0:
+        t, q = cuadjtqs_nl_table_0(ap, t, q, es_table, col, z4es, z5alcp, zaldcp)
+        t, q = cuadjtqs_nl_table_0(ap, t, q, es_table, col, z4es, z5alcp, zaldcp)
+        return t, q
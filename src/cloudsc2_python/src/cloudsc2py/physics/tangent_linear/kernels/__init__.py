@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+import cloudsc2py.physics.tangent_linear.kernels.cloudsc2
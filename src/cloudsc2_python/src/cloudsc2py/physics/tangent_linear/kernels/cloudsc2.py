@@ -0,0 +1,730 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import math
+from numba import njit, prange
+from typing import TYPE_CHECKING
+
+from cloudsc2py.framework.kernels import kernel_collection
+from cloudsc2py.physics.nonlinear.kernels.cloudsc2 import critical_relative_humidity
+from cloudsc2py.physics.tangent_linear.kernels.cuadjtqs import build_cuadjtqs_tl
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+@ported_function(from_file="cloudsc2_tl/cloudsc2tl.F90", from_line=321, to_line=1113)
+@kernel_collection("cloudsc2_tl")
+def build_cloudsc2_tl(externals: dict[str, Any]) -> Callable[..., None]:
+    """Build the Numba counterpart of the ``cloudsc2_tl`` stencil.
+
+    As for ``cloudsc2_nl``, each column is processed top-down by a single thread.
+    """
+    LDRAIN1D = externals["LDRAIN1D"]
+    LEVAPLS2 = externals["LEVAPLS2"]
+    LREGCL = externals["LREGCL"]
+    NLEV = externals["NLEV"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    R5IES = externals["R5IES"]
+    R5LES = externals["R5LES"]
+    RCLCRIT = externals["RCLCRIT"]
+    RCPD = externals["RCPD"]
+    RD = externals["RD"]
+    RETV = externals["RETV"]
+    RG = externals["RG"]
+    RKCONV = externals["RKCONV"]
+    RLMIN = externals["RLMIN"]
+    RLMLT = externals["RLMLT"]
+    RLPTRC = externals["RLPTRC"]
+    RLSTT = externals["RLSTT"]
+    RLVTT = externals["RLVTT"]
+    RPECONS = externals["RPECONS"]
+    RTICE = externals["RTICE"]
+    RTT = externals["RTT"]
+    RVTMP2 = externals["RVTMP2"]
+    ZEPS1 = externals["ZEPS1"]
+    ZEPS2 = externals["ZEPS2"]
+    ZQMAX = externals["ZQMAX"]
+    ZSCAL = externals["ZSCAL"]
+    cuadjtqs_tl = build_cuadjtqs_tl(externals)
+
+    @njit(parallel=True)
+    def cloudsc2_tl(
+        i0,
+        j0,
+        ni,
+        nj,
+        nk,
+        in_ap,
+        in_ap_i,
+        in_aph,
+        in_aph_i,
+        in_eta,
+        in_lu,
+        in_lu_i,
+        in_lude,
+        in_lude_i,
+        in_mfd,
+        in_mfd_i,
+        in_mfu,
+        in_mfu_i,
+        in_q,
+        in_q_i,
+        in_qi,
+        in_qi_i,
+        in_ql,
+        in_ql_i,
+        in_qsat,
+        in_qsat_i,
+        in_supsat,
+        in_supsat_i,
+        in_t,
+        in_t_i,
+        in_tnd_cml_q,
+        in_tnd_cml_q_i,
+        in_tnd_cml_qi,
+        in_tnd_cml_qi_i,
+        in_tnd_cml_ql,
+        in_tnd_cml_ql_i,
+        in_tnd_cml_t,
+        in_tnd_cml_t_i,
+        out_clc,
+        out_clc_i,
+        out_covptot,
+        out_covptot_i,
+        out_fhpsl,
+        out_fhpsl_i,
+        out_fhpsn,
+        out_fhpsn_i,
+        out_fplsl,
+        out_fplsl_i,
+        out_fplsn,
+        out_fplsn_i,
+        out_tnd_q,
+        out_tnd_q_i,
+        out_tnd_qi,
+        out_tnd_qi_i,
+        out_tnd_ql,
+        out_tnd_ql_i,
+        out_tnd_t,
+        out_tnd_t_i,
+        tmp_aph_s,
+        tmp_aph_s_i,
+        dt,
+    ):
+        for col in prange(ni * nj):
+            i = i0 + col // nj
+            j = j0 + col % nj
+
+            # eta value at tropopause
+            trpaus = 0.1
+            for k in range(nk - 1):
+                t = in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k]
+                t_below = in_t[i, j, k + 1] + dt * in_tnd_cml_t[i, j, k + 1]
+                if in_eta[k] > 0.1 and in_eta[k] < 0.4 and t > t_below:
+                    trpaus = in_eta[k]
+
+            # set to zero precipitation fluxes at the top
+            rfl = 0.0
+            rfl_i = 0.0
+            sfl = 0.0
+            sfl_i = 0.0
+            covptot = 0.0
+            covptot_i = 0.0
+
+            for k in range(nk):
+                ap = in_ap[i, j, k]
+                ap_i = in_ap_i[i, j, k]
+                qsat0 = in_qsat[i, j, k]
+                qsat0_i = in_qsat_i[i, j, k]
+                lude0 = in_lude[i, j, k]
+                lude0_i = in_lude_i[i, j, k]
+
+                # first guess values for T, q, ql and qi
+                t = in_t[i, j, k] + dt * in_tnd_cml_t[i, j, k]
+                t_i = in_t_i[i, j, k] + dt * in_tnd_cml_t_i[i, j, k]
+                q = in_q[i, j, k] + dt * in_tnd_cml_q[i, j, k] + in_supsat[i, j, k]
+                q_i = in_q_i[i, j, k] + dt * in_tnd_cml_q_i[i, j, k] + in_supsat_i[i, j, k]
+                ql = in_ql[i, j, k] + dt * in_tnd_cml_ql[i, j, k]
+                ql_i = in_ql_i[i, j, k] + dt * in_tnd_cml_ql_i[i, j, k]
+                qi = in_qi[i, j, k] + dt * in_tnd_cml_qi[i, j, k]
+                qi_i = in_qi_i[i, j, k] + dt * in_tnd_cml_qi_i[i, j, k]
+
+                # set up constants
+                ckcodtl = 2 * RKCONV * dt
+                ckcodti = 5 * RKCONV * dt
+                ckcodtla = ckcodtl / 100
+                ckcodtia = ckcodti / 100
+                cons2 = 1 / (RG * dt)
+                cons3 = RLVTT / RCPD
+                meltp2 = RTT + 2
+
+                # parameter for cloud formation
+                scalm = ZSCAL * max(in_eta[k] - 0.2, ZEPS1) ** 0.2
+
+                # thermodynamic constants
+                dp = in_aph[i, j, k + 1] - in_aph[i, j, k]
+                dp_i = in_aph_i[i, j, k + 1] - in_aph_i[i, j, k]
+                zz = 1 / (RCPD + RCPD * RVTMP2 * q)
+                zz_i = -RCPD * RVTMP2 * q_i / (RCPD + RCPD * RVTMP2 * q) ** 2
+                lfdcp = RLMLT * zz
+                lfdcp_i = RLMLT * zz_i
+                lsdcp = RLSTT * zz
+                lsdcp_i = RLSTT * zz_i
+                lvdcp = RLVTT * zz
+                lvdcp_i = RLVTT * zz_i
+
+                # clear cloud and freezing arrays
+                out_covptot[i, j, k] = 0.0
+                out_covptot_i[i, j, k] = 0.0
+
+                # calculate dqs/dT correction factor
+                if t < RTT:
+                    fwat = 0.545 * (math.tanh(0.17 * (t - RLPTRC)) + 1)
+                    fwat_i = 0.545 * 0.17 * t_i / math.cosh(0.17 * (t - RLPTRC)) ** 2
+                    z3es = R3IES
+                    z4es = R4IES
+                else:
+                    fwat = 1.0
+                    fwat_i = 0.0
+                    z3es = R3LES
+                    z4es = R4LES
+                foeew = R2ES * math.exp(z3es * (t - RTT) / (t - z4es))
+                foeew_i = z3es * (RTT - z4es) * t_i * foeew / (t - z4es) ** 2
+                esdp = foeew / ap
+                esdp_i = foeew_i / ap - foeew * ap_i / (ap**2)
+                if esdp > ZQMAX:
+                    esdp = ZQMAX
+                    esdp_i = 0.0
+
+                facw = R5LES / (t - R4LES) ** 2
+                facw_i = -2 * R5LES * t_i / (t - R4LES) ** 3
+                faci = R5IES / (t - R4IES) ** 2
+                faci_i = -2 * R5IES * t_i / (t - R4IES) ** 3
+                fac = fwat * facw + (1 - fwat) * faci
+                fac_i = fwat_i * (facw - faci) + fwat * facw_i + (1 - fwat) * faci_i
+                cor = 1 / (1 - RETV * esdp)
+                cor_i = RETV * esdp_i / (1 - RETV * esdp) ** 2
+                dqsdtemp = fac * cor * qsat0
+                dqsdtemp_i = fac_i * cor * qsat0 + fac * cor_i * qsat0 + fac * cor * qsat0_i
+                corqs = 1 + cons3 * dqsdtemp
+                corqs_i = cons3 * dqsdtemp_i
+
+                # use clipped state
+                if q > qsat0:
+                    qlim = qsat0
+                    qlim_i = qsat0_i
+                else:
+                    qlim = q
+                    qlim_i = q_i
+
+                # set up critical value of humidity
+                crh2 = critical_relative_humidity(in_eta[k], trpaus)
+
+                # allow ice supersaturation at cold temperatures
+                if t < RTICE:
+                    supsat = 1.8 - 0.003 * t
+                    supsat_i = -0.003 * t_i
+                else:
+                    supsat = 1.0
+                    supsat_i = 0.0
+                qsat = qsat0 * supsat
+                qsat_i = qsat0_i * supsat + qsat0 * supsat_i
+                qcrit = crh2 * qsat
+                qcrit_i = crh2 * qsat_i
+
+                # simple uniform distribution of total water from Leutreut & Li (1990)
+                qt = q + ql + qi
+                qt_i = q_i + ql_i + qi_i
+                if qt < qcrit:
+                    clc = 0.0
+                    clc_i = 0.0
+                    qc = 0.0
+                    qc_i = 0.0
+                elif qt >= qsat:
+                    clc = 1.0
+                    clc_i = 0.0
+                    qc = (1 - scalm) * (qsat - qcrit)
+                    qc_i = (1 - scalm) * (qsat_i - qcrit_i)
+                else:
+                    qpd = qsat - qt
+                    qpd_i = qsat_i - qt_i
+                    qcd = qsat - qcrit
+                    qcd_i = qsat_i - qcrit_i
+                    tmp1 = math.sqrt(qpd / (qcd - scalm * (qt - qcrit)))
+                    clc = 1 - tmp1
+                    clc_i = (
+                        -0.5
+                        / tmp1
+                        * (
+                            qpd_i * (qcd - scalm * (qt - qcrit))
+                            - qpd * (qcd_i - scalm * (qt_i - qcrit_i))
+                        )
+                        / (qcd - scalm * (qt - qcrit)) ** 2
+                    )
+
+                    # regularization of cloud fraction perturbation
+                    if LREGCL:
+                        rat = qpd / qcd
+                        yyy = min(
+                            0.3,
+                            3.5 * math.sqrt(rat * (1 - scalm * (1 - rat)) ** 3) / (1 - scalm),
+                        )
+                        clc_i *= yyy
+
+                    qc = (scalm * qpd + (1 - scalm) * qcd) * clc**2
+                    qc_i = (scalm * qpd_i + (1 - scalm) * qcd_i) * clc**2 + 2 * (
+                        scalm * qpd + (1 - scalm) * qcd
+                    ) * clc * clc_i
+
+                # add convective component
+                gdp = RG / (in_aph[i, j, k + 1] - in_aph[i, j, k])
+                gdp_i = (
+                    -RG
+                    * (in_aph_i[i, j, k + 1] - in_aph_i[i, j, k])
+                    / (in_aph[i, j, k + 1] - in_aph[i, j, k]) ** 2
+                )
+                lude = dt * lude0 * gdp
+                lude_i = dt * (lude0_i * gdp + lude0 * gdp_i)
+                lo1 = k < NLEV - 1 and lude >= RLMIN and in_lu[i, j, k + 1] >= ZEPS2
+                if lo1:
+                    lu = in_lu[i, j, k + 1]
+                    tmp2 = math.exp(-lude / lu)
+                    clc_i += -clc_i * (1 - tmp2) + (1 - clc) * tmp2 * (
+                        lude_i / lu - lude * in_lu_i[i, j, k + 1] / lu**2
+                    )
+                    clc += (1 - clc) * (1 - tmp2)
+                    qc += lude
+                    qc_i += lude_i
+
+                # add compensating subsidence component
+                fac1 = 1 / (RD * t)
+                rho = ap * fac1
+                rho_i = (ap_i - ap * t_i / t) * fac1
+
+                fac2 = 1 / (ap - RETV * foeew)
+                rodqsdp = -rho * qsat0 * fac2
+                rodqsdp_i = (
+                    -rho_i * qsat0 - rho * qsat0_i + rho * qsat0 * (ap_i - RETV * foeew_i) * fac2
+                ) * fac2
+
+                ldcp = fwat * lvdcp + (1 - fwat) * lsdcp
+                ldcp_i = fwat_i * (lvdcp - lsdcp) + fwat * lvdcp_i + (1 - fwat) * lsdcp_i
+
+                fac3 = 1 / (1 + ldcp * dqsdtemp)
+                dtdzmo = RG * (1 / RCPD - ldcp * rodqsdp) * fac3
+                dtdzmo_i = (
+                    -(
+                        RG * (ldcp_i * rodqsdp + ldcp * rodqsdp_i)
+                        + dtdzmo * (ldcp_i * dqsdtemp + ldcp * dqsdtemp_i)
+                    )
+                    * fac3
+                )
+
+                dqsdz = dqsdtemp * dtdzmo - RG * rodqsdp
+                dqsdz_i = dqsdtemp_i * dtdzmo + dqsdtemp * dtdzmo_i - RG * rodqsdp_i
+
+                mf = in_mfu[i, j, k] + in_mfd[i, j, k]
+                mf_i = in_mfu_i[i, j, k] + in_mfd_i[i, j, k]
+                tmp3 = dt * dqsdz * mf / rho
+                if tmp3 < qc:
+                    dqc = tmp3
+                    dqc_i = (dt * (dqsdz_i * mf + dqsdz * mf_i) - dqc * rho_i) / rho
+                    if LREGCL:
+                        dqc_i *= 0.1
+                else:
+                    dqc = qc
+                    dqc_i = qc_i
+                qc -= dqc
+                qc_i -= dqc_i
+
+                # new cloud liquid/ice contents and condensation rates (liquid/ice)
+                qlwc = qc * fwat
+                qlwc_i = qc_i * fwat + qc * fwat_i
+
+                qiwc = qc * (1 - fwat)
+                qiwc_i = qc_i * (1 - fwat) - qc * fwat_i
+
+                condl = (qlwc - ql) / dt
+                condl_i = (qlwc_i - ql_i) / dt
+
+                condi = (qiwc - qi) / dt
+                condi_i = (qiwc_i - qi_i) / dt
+
+                # calculate precipitation overlap
+                # simple form based on Maximum Overlap
+                if clc > covptot:
+                    covptot = clc
+                    covptot_i = clc_i
+                covpclr = covptot - clc
+                covpclr_i = covptot_i - clc_i
+                if covpclr < 0.0:
+                    covpclr = 0.0
+                    covpclr_i = 0.0
+
+                # melting of incoming snow
+                if sfl != 0:
+                    cons = cons2 * dp / lfdcp
+                    cons_i = cons2 * (dp_i * lfdcp - dp * lfdcp_i) / lfdcp**2
+                    if t > meltp2:
+                        z2s = cons * (t - meltp2)
+                        z2s_i = cons_i * (t - meltp2) + cons * t_i
+                    else:
+                        z2s = 0.0
+                        z2s_i = 0.0
+
+                    if sfl <= z2s:
+                        snmlt = sfl
+                        snmlt_i = sfl_i
+                    else:
+                        snmlt = z2s
+                        snmlt_i = z2s_i
+
+                    rfln = rfl + snmlt
+                    rfln_i = rfl_i + snmlt_i
+                    sfln = sfl - snmlt
+                    sfln_i = sfl_i - snmlt_i
+                    t -= snmlt / cons
+                    t_i -= (snmlt_i * cons - snmlt * cons_i) / cons**2
+                else:
+                    rfln = rfl
+                    rfln_i = rfl_i
+                    sfln = sfl
+                    sfln_i = sfl_i
+
+                if clc > ZEPS2:
+                    # diagnostic calculation of rain production from cloud liquid water
+                    if LEVAPLS2 or LDRAIN1D:
+                        lcrit = 1.9 * RCLCRIT
+                    else:
+                        lcrit = 2.0 * RCLCRIT
+
+                    # in-cloud liquid
+                    cldl = qlwc / clc
+                    cldl_i = qlwc_i / clc - qlwc * clc_i / clc**2
+
+                    ltmp4 = math.exp(-((cldl / lcrit) ** 2))
+                    dl = ckcodtl * (1 - ltmp4)
+                    ltmp5 = math.exp(-dl)
+
+                    # regularization of autoconversion
+                    if LREGCL:
+                        dl_i = (2 * ckcodtla / lcrit**2) * ltmp4 * cldl * cldl_i
+                    else:
+                        dl_i = (2 * ckcodtl / lcrit**2) * ltmp4 * cldl * cldl_i
+
+                    qlnew = clc * cldl * ltmp5
+                    qlnew_i = (
+                        clc_i * cldl * ltmp5 + clc * cldl_i * ltmp5 - clc * cldl * ltmp5 * dl_i
+                    )
+                    prr = qlwc - qlnew
+                    prr_i = qlwc_i - qlnew_i
+                    qlwc -= prr
+                    qlwc_i -= prr_i
+
+                    # diagnostic calculation of snow production from cloud ice
+                    if LEVAPLS2 or LDRAIN1D:
+                        icrit = 0.0001
+                    else:
+                        icrit = 2.0 * RCLCRIT
+
+                    cldi = qiwc / clc
+                    cldi_i = qiwc_i / clc - qiwc * clc_i / clc**2
+
+                    itmp41 = math.exp(-((cldi / icrit) ** 2))
+                    itmp42 = math.exp(0.025 * (t - RTT))
+                    di = ckcodti * itmp42 * (1 - itmp41)
+                    itmp5 = math.exp(-di)
+
+                    # regularization of autoconversion
+                    if LREGCL:
+                        di_i = (
+                            ckcodtia
+                            * itmp42
+                            * (itmp41 * (2 * cldi * cldi_i / icrit**2 - 0.025 * t_i) + 0.025 * t_i)
+                        )
+                    else:
+                        di_i = (
+                            ckcodti
+                            * itmp42
+                            * (itmp41 * (2 * cldi * cldi_i / icrit**2 - 0.025 * t_i) + 0.025 * t_i)
+                        )
+
+                    qinew = clc * cldi * itmp5
+                    qinew_i = (
+                        clc_i * cldi * itmp5 + clc * cldi_i * itmp5 - clc * cldi * itmp5 * di_i
+                    )
+                    prs = qiwc - qinew
+                    prs_i = qiwc_i - qinew_i
+                    qiwc -= prs
+                    qiwc_i -= prs_i
+                else:
+                    prr = 0.0
+                    prr_i = 0.0
+                    prs = 0.0
+                    prs_i = 0.0
+
+                # new precipitation
+                dr = cons2 * dp * (prr + prs)
+                dr_i = cons2 * (dp_i * (prr + prs) + dp * (prr_i + prs_i))
+
+                # rain fraction (different from cloud liquid water fraction!)
+                if t < RTT:
+                    rfreeze = cons2 * dp * prr
+                    rfreeze_i = cons2 * (dp_i * prr + dp * prr_i)
+                    fwatr = 0.0
+                    fwatr_i = 0.0
+                else:
+                    rfreeze = 0.0
+                    rfreeze_i = 0.0
+                    fwatr = 1.0
+                    fwatr_i = 0.0
+                rfln += fwatr * dr
+                rfln_i += fwatr_i * dr + fwatr * dr_i
+                sfln += (1 - fwatr) * dr
+                sfln_i += -fwatr_i * dr + (1 - fwatr) * dr_i
+
+                # precipitation evaporation
+                prtot = rfln + sfln
+                prtot_i = rfln_i + sfln_i
+                if prtot > ZEPS2 and covpclr > ZEPS2 and (LEVAPLS2 or LDRAIN1D):
+                    preclr = prtot * covpclr / covptot
+                    preclr_i = (
+                        prtot_i * covpclr + prtot * covpclr_i
+                    ) / covptot - prtot * covpclr * covptot_i / covptot**2
+
+                    # this is the humidity in the moistest covpclr region
+                    qe = qsat0 - (qsat0 - qlim) * covpclr / (1 - clc) ** 2
+                    qe_i = (
+                        qsat0_i
+                        - (qsat0_i * covpclr - qlim_i * covpclr + (qsat0 - qlim) * covpclr_i)
+                        / (1 - clc) ** 2
+                        - 2 * (qsat0 - qlim) * covpclr * clc_i / (1 - clc) ** 3
+                    )
+
+                    aph_s = tmp_aph_s[i, j]
+                    aph_s_i = tmp_aph_s_i[i, j]
+                    tmp6 = math.sqrt(ap / aph_s)
+                    beta = RG * RPECONS * (tmp6 * preclr / (0.00509 * covpclr)) ** 0.5777
+                    beta_i = (
+                        0.5777
+                        * RG
+                        * RPECONS
+                        / 0.00509
+                        * (0.00509 * covpclr / (tmp6 * preclr)) ** 0.4223
+                        * (
+                            (
+                                tmp6 * preclr_i
+                                + 0.5 * preclr * ap_i / tmp6
+                                - 0.5 * preclr * tmp6 * aph_s_i / aph_s
+                            )
+                            / covpclr
+                            - tmp6 * preclr * covpclr_i / covpclr**2
+                        )
+                    )
+
+                    # implicit solution
+                    b = dt * beta * (qsat0 - qe) / (1 + dt * beta * corqs)
+                    b_i = dt * (beta_i * (qsat0 - qe) + beta * (qsat0_i - qe_i)) / (
+                        1 + dt * beta * corqs
+                    ) - dt**2 * b * (beta_i * corqs + beta * corqs_i) / (1 + dt * beta * corqs)
+
+                    dtgdp = dt * RG / (in_aph[i, j, k + 1] - in_aph[i, j, k])
+                    dtgdp_i = (
+                        -dt
+                        * RG
+                        * (in_aph_i[i, j, k + 1] - in_aph_i[i, j, k])
+                        / (in_aph[i, j, k + 1] - in_aph[i, j, k]) ** 2
+                    )
+                    dpr = covpclr * b / dtgdp
+                    dpr_i = (
+                        covpclr_i * b + covpclr * b_i
+                    ) / dtgdp - covpclr * b * dtgdp_i / dtgdp**2
+                    if dpr > preclr:
+                        dpr = preclr
+                        dpr_i = preclr_i
+                    preclr -= dpr
+                    preclr_i -= dpr_i
+                    if preclr <= 0:
+                        covptot = clc
+                        covptot_i = clc_i
+                    out_covptot[i, j, k] = covptot
+                    out_covptot_i[i, j, k] = covptot_i
+
+                    # warm proportion
+                    evapr = dpr * rfln / prtot
+                    evapr_i = (
+                        dpr_i * rfln + dpr * rfln_i
+                    ) / prtot - dpr * rfln * prtot_i / prtot**2
+                    rfln -= evapr
+                    rfln_i -= evapr_i
+
+                    # ice proportion
+                    evaps = dpr * sfln / prtot
+                    evaps_i = (
+                        dpr_i * sfln + dpr * sfln_i
+                    ) / prtot - dpr * sfln * prtot_i / prtot**2
+                    sfln -= evaps
+                    sfln_i -= evaps_i
+                else:
+                    evapr = 0.0
+                    evapr_i = 0.0
+                    evaps = 0.0
+                    evaps_i = 0.0
+
+                # incrementation of T and Q fluxes' swap
+                dqdt = -(condl + condi) + (lude0 + evapr + evaps) * gdp
+                dqdt_i = (
+                    -(condl_i + condi_i)
+                    + (lude0_i + evapr_i + evaps_i) * gdp
+                    + (lude0 + evapr + evaps) * gdp_i
+                )
+
+                tmp7 = (
+                    lvdcp * evapr
+                    + lsdcp * evaps
+                    + lude0 * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                    - (lsdcp - lvdcp) * rfreeze
+                )
+                dtdt = lvdcp * condl + lsdcp * condi - tmp7 * gdp
+                dtdt_i = (
+                    lvdcp_i * condl
+                    + lvdcp * condl_i
+                    + lsdcp_i * condi
+                    + lsdcp * condi_i
+                    - (
+                        lvdcp_i * evapr
+                        + lvdcp * evapr_i
+                        + lsdcp_i * evaps
+                        + lsdcp * evaps_i
+                        + lude0_i * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                        + lude0 * (fwat_i * (lvdcp - lsdcp) + fwat * lvdcp_i + (1 - fwat) * lsdcp_i)
+                        - (lsdcp_i - lvdcp_i) * rfreeze
+                        - (lsdcp - lvdcp) * rfreeze_i
+                    )
+                    * gdp
+                    - tmp7 * gdp_i
+                )
+
+                # first guess T and Q
+                t += dt * dtdt
+                t_i += dt * dtdt_i
+                q += dt * dqdt
+                q_i += dt * dqdt_i
+                qold = q
+                qold_i = q_i
+
+                # clipping of final qv
+                t, t_i, q, q_i = cuadjtqs_tl(ap, ap_i, t, t_i, q, q_i)
+
+                if qold >= q:
+                    dq = qold - q
+                    dq_i = qold_i - q_i
+                    if LREGCL:
+                        dq_i *= 0.7
+                else:
+                    dq = 0.0
+                    dq_i = 0.0
+                dr2 = cons2 * dp * dq
+                dr2_i = cons2 * (dp_i * dq + dp * dq_i)
+
+                # update rain fraction and freezing
+                # note: impact of new temperature t_i on fwat_i is neglected here
+                if t < RTT:
+                    rfreeze2 = fwat * dr2
+                    rfreeze2_i = fwat_i * dr2 + fwat * dr2_i
+                    fwatr = 0.0
+                    fwatr_i = 0.0
+                else:
+                    rfreeze2 = 0.0
+                    rfreeze2_i = 0.0
+                    fwatr = 1.0
+                    fwatr_i = 0.0
+
+                rn = fwatr * dr2
+                rn_i = fwatr_i * dr2 + fwatr * dr2_i
+                sn = (1 - fwatr) * dr2
+                sn_i = -fwatr_i * dr2 + (1 - fwatr) * dr2_i
+
+                # note: the extra condensation due to the adjustment goes directly to precipitation
+                condl += fwatr * dq / dt
+                condl_i += (fwatr_i * dq + fwatr * dq_i) / dt
+                condi += (1 - fwatr) * dq / dt
+                condi_i += (-fwatr_i * dq + (1 - fwatr) * dq_i) / dt
+                rfln += rn
+                rfln_i += rn_i
+                sfln += sn
+                sfln_i += sn_i
+                rfreeze += rfreeze2
+                rfreeze_i += rfreeze2_i
+
+                # calculate output tendencies
+                out_clc[i, j, k] = clc
+                out_clc_i[i, j, k] = clc_i
+                out_tnd_q[i, j, k] = -(condl + condi) + (lude0 + evapr + evaps) * gdp
+                out_tnd_q_i[i, j, k] = (
+                    -(condl_i + condi_i)
+                    + (lude0_i + evapr_i + evaps_i) * gdp
+                    + (lude0 + evapr + evaps) * gdp_i
+                )
+                tmp8 = (
+                    lvdcp * evapr
+                    + lsdcp * evaps
+                    + lude0 * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                    - (lsdcp - lvdcp) * rfreeze
+                )
+                out_tnd_t[i, j, k] = lvdcp * condl + lsdcp * condi - tmp8 * gdp
+                out_tnd_t_i[i, j, k] = (
+                    lvdcp_i * condl
+                    + lvdcp * condl_i
+                    + lsdcp_i * condi
+                    + lsdcp * condi_i
+                    - (
+                        lvdcp_i * evapr
+                        + lvdcp * evapr_i
+                        + lsdcp_i * evaps
+                        + lsdcp * evaps_i
+                        + lude0_i * (fwat * lvdcp + (1 - fwat) * lsdcp)
+                        + lude0 * (fwat_i * (lvdcp - lsdcp) + fwat * lvdcp_i + (1 - fwat) * lsdcp_i)
+                        - (lsdcp_i - lvdcp_i) * rfreeze
+                        - (lsdcp - lvdcp) * rfreeze_i
+                    )
+                    * gdp
+                    - tmp8 * gdp_i
+                )
+                out_tnd_ql[i, j, k] = (qlwc - ql) / dt
+                out_tnd_ql_i[i, j, k] = (qlwc_i - ql_i) / dt
+                out_tnd_qi[i, j, k] = (qiwc - qi) / dt
+                out_tnd_qi_i[i, j, k] = (qiwc_i - qi_i) / dt
+
+                # enthalpy fluxes due to precipitation, on the half level below
+                out_fplsl[i, j, k + 1] = rfln
+                out_fplsl_i[i, j, k + 1] = rfln_i
+                out_fplsn[i, j, k + 1] = sfln
+                out_fplsn_i[i, j, k + 1] = sfln_i
+                out_fhpsl[i, j, k + 1] = -out_fplsl[i, j, k + 1] * RLVTT
+                out_fhpsl_i[i, j, k + 1] = -out_fplsl_i[i, j, k + 1] * RLVTT
+                out_fhpsn[i, j, k + 1] = -out_fplsn[i, j, k + 1] * RLSTT
+                out_fhpsn_i[i, j, k + 1] = -out_fplsn_i[i, j, k + 1] * RLSTT
+
+                # record rain flux for next level
+                rfl = rfln
+                rfl_i = rfln_i
+                sfl = sfln
+                sfl_i = sfln_i
+
+            out_fplsl[i, j, 0] = 0.0
+            out_fplsl_i[i, j, 0] = 0.0
+            out_fplsn[i, j, 0] = 0.0
+            out_fplsn_i[i, j, 0] = 0.0
+            out_fhpsl[i, j, 0] = 0.0
+            out_fhpsl_i[i, j, 0] = 0.0
+            out_fhpsn[i, j, 0] = 0.0
+            out_fhpsn_i[i, j, 0] = 0.0
+
+    return cloudsc2_tl
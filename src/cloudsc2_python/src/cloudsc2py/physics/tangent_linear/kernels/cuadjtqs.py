@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import math
+from numba import njit
+from typing import TYPE_CHECKING
+
+from ifs_physics_common.utils.f2py import ported_function
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+
+@ported_function(from_file="cloudsc2_tl/cuadjtqstl.F90", from_line=10, to_line=482)
+def build_cuadjtqs_tl(externals: dict[str, Any]) -> Callable[..., tuple[float, ...]]:
+    """Build the Numba counterpart of ``cuadjtqs_tl``."""
+    ICALL = externals["ICALL"]
+    R2ES = externals["R2ES"]
+    R3IES = externals["R3IES"]
+    R3LES = externals["R3LES"]
+    R4IES = externals["R4IES"]
+    R4LES = externals["R4LES"]
+    R5ALSCP = externals["R5ALSCP"]
+    R5ALVCP = externals["R5ALVCP"]
+    RALSDCP = externals["RALSDCP"]
+    RALVDCP = externals["RALVDCP"]
+    RETV = externals["RETV"]
+    RTT = externals["RTT"]
+    ZQMAX = externals["ZQMAX"]
+
+    @njit
+    def cuadjtqs_tl_0(ap, ap_i, t, t_i, q, q_i, z3es, z4es, z5alcp, zaldcp):
+        qp = 1 / ap
+        qp_i = -ap_i / ap**2
+        foeew = R2ES * math.exp(z3es * (t - RTT) / (t - z4es))
+        foeew_i = foeew * z3es * t_i * (RTT - z4es) / (t - z4es) ** 2
+        qsat = qp * foeew
+        qsat_i = qp_i * foeew + qp * foeew_i
+        if qsat > ZQMAX:
+            qsat = ZQMAX
+            qsat_i = 0.0
+        cor = 1 / (1 - RETV * qsat)
+        cor_i = RETV * qsat_i / (1 - RETV * qsat) ** 2
+        qsat_i = qsat_i * cor + qsat * cor_i
+        qsat *= cor
+        z2s = z5alcp / (t - z4es) ** 2
+        z2s_i = -2 * z5alcp * t_i / (t - z4es) ** 3
+        cond = (q - qsat) / (1 + qsat * cor * z2s)
+        cond_i = (q_i - qsat_i) / (1 + qsat * cor * z2s) - (q - qsat) * (
+            qsat_i * cor * z2s + qsat * cor_i * z2s + qsat * cor * z2s_i
+        ) / (1 + qsat * cor * z2s) ** 2
+        t += zaldcp * cond
+        t_i += zaldcp * cond_i
+        q -= cond
+        q_i -= cond_i
+        return t, t_i, q, q_i
+
+    @njit
+    def cuadjtqs_tl(ap, ap_i, t, t_i, q, q_i):
+        if t > RTT:
+            z3es = R3LES
+            z4es = R4LES
+            z5alcp = R5ALVCP
+            zaldcp = RALVDCP
+        else:
+            z3es = R3IES
+            z4es = R4IES
+            z5alcp = R5ALSCP
+            zaldcp = RALSDCP
+
+        if ICALL == 0:
+            t, t_i, q, q_i = cuadjtqs_tl_0(ap, ap_i, t, t_i, q, q_i, z3es, z4es, z5alcp, zaldcp)
+            t, t_i, q, q_i = cuadjtqs_tl_0(ap, ap_i, t, t_i, q, q_i, z3es, z4es, z5alcp, zaldcp)
+        return t, t_i, q, q_i
+
+    return cuadjtqs_tl
@@ -5,13 +5,18 @@ from functools import cached_property
 import numpy as np
 from typing import TYPE_CHECKING
 
+from cloudsc2py.framework.blocking import launch_column_blocks
+from cloudsc2py.framework.config import get_precision_externals
+from cloudsc2py.framework.kernels import NumbaComponent
+from cloudsc2py.framework.storage import managed_temporary_storage
 from ifs_physics_common.framework.components import ImplicitTendencyComponent
 from ifs_physics_common.framework.grid import I, J, K
-from ifs_physics_common.framework.storage import managed_temporary_storage, zeros
+from ifs_physics_common.framework.storage import zeros
 from ifs_physics_common.utils.f2py import ported_method
 from ifs_physics_common.utils.numpyx import assign
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
     from datetime import timedelta
     from typing import Optional
 
@@ -23,7 +28,9 @@ if TYPE_CHECKING:
 
 
 class Cloudsc2TL(ImplicitTendencyComponent):
+    block_size: Optional[int]
     cloudsc2: StencilObject
+    executor: Optional[Executor] = None
     klevel: Storage
 
     def __init__(
@@ -39,10 +46,12 @@ class Cloudsc2TL(ImplicitTendencyComponent):
         yrncl_parameters: Optional[ParameterDict] = None,
         yrphnc_parameters: Optional[ParameterDict] = None,
         *,
+        block_size: Optional[int] = None,
         enable_checks: bool = True,
         gt4py_config: GT4PyConfig,
     ) -> None:
         super().__init__(computational_grid, enable_checks=enable_checks, gt4py_config=gt4py_config)
+        self.block_size = block_size
 
         nk = self.computational_grid.grids[I, J, K].shape[2]
         self.klevel = zeros(
@@ -70,6 +79,7 @@ class Cloudsc2TL(ImplicitTendencyComponent):
                 "ZSCAL": 0.9,
             }
         )
+        externals.update(get_precision_externals(gt4py_config.dtypes))
         self.cloudsc2 = self.compile_stencil("cloudsc2_tl", externals)
 
     @cached_property
@@ -151,12 +161,23 @@ class Cloudsc2TL(ImplicitTendencyComponent):
         out_diagnostics: StorageDict,
         overwrite_tendencies: dict[str, bool],
     ) -> None:
+        # the precipitation fluxes are accumulated in (possibly) higher precision
         with managed_temporary_storage(
-            self.computational_grid, *repeat(((I, J), "float"), 9), gt4py_config=self.gt4py_config
+            self.computational_grid,
+            *repeat(((I, J), "float"), 2),
+            *repeat(((I, J), "float_acc"), 6),
+            ((I, J), "float"),
+            gt4py_config=self.gt4py_config,
         ) as (aph_s, aph_s_i, rfl, rfl_i, sfl, sfl_i, covptot, covptot_i, trpaus):
             aph_s[...] = state["f_aph"][..., -1]
             aph_s_i[...] = state["f_aph_i"][..., -1]
-            self.cloudsc2(
+            # with block_size, the columns are processed in blocks, like NPROMA blocks, possibly
+            # concurrently by executor
+            launch_column_blocks(
+                self.cloudsc2,
+                self.computational_grid.grids[I, J, K - 1 / 2].shape,
+                self.block_size,
+                self.executor,
                 in_ap=state["f_ap"],
                 in_ap_i=state["f_ap_i"],
                 in_aph=state["f_aph"],
@@ -220,9 +241,11 @@ class Cloudsc2TL(ImplicitTendencyComponent):
                 tmp_sfl=sfl,
                 tmp_sfl_i=sfl_i,
                 tmp_trpaus=trpaus,
-                dt=timestep.total_seconds(),
-                origin=(0, 0, 0),
-                domain=self.computational_grid.grids[I, J, K - 1 / 2].shape,
+                dt=self.gt4py_config.dtypes.float(timestep.total_seconds()),
                 validate_args=self.gt4py_config.validate_args,
                 exec_info=self.gt4py_config.exec_info,
             )
+
+
+class NumbaCloudsc2TL(NumbaComponent, Cloudsc2TL):
+    """Like ``Cloudsc2TL``, but running the Numba kernel in place of the ``cloudsc2_tl`` stencil."""
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from gt4py.cartesian import gtscript
 
+from cloudsc2py.physics.common.stencils.fcttre import foeew_exact
 from cloudsc2py.physics.tangent_linear.stencils.cuadjtqs import cuadjtqs_tl
 from ifs_physics_common.framework.stencil import stencil_collection
 from ifs_physics_common.utils.f2py import ported_function
@@ -64,13 +65,13 @@ def cloudsc2_tl_def(
     out_tnd_t_i: gtscript.Field["float"],
     tmp_aph_s: gtscript.Field[gtscript.IJ, "float"],
     tmp_aph_s_i: gtscript.Field[gtscript.IJ, "float"],
-    tmp_covptot: gtscript.Field[gtscript.IJ, "float"],
-    tmp_covptot_i: gtscript.Field[gtscript.IJ, "float"],
+    tmp_covptot: gtscript.Field[gtscript.IJ, "float_acc"],
+    tmp_covptot_i: gtscript.Field[gtscript.IJ, "float_acc"],
     tmp_klevel: gtscript.Field[gtscript.K, "int"],
-    tmp_rfl: gtscript.Field[gtscript.IJ, "float"],
-    tmp_rfl_i: gtscript.Field[gtscript.IJ, "float"],
-    tmp_sfl: gtscript.Field[gtscript.IJ, "float"],
-    tmp_sfl_i: gtscript.Field[gtscript.IJ, "float"],
+    tmp_rfl: gtscript.Field[gtscript.IJ, "float_acc"],
+    tmp_rfl_i: gtscript.Field[gtscript.IJ, "float_acc"],
+    tmp_sfl: gtscript.Field[gtscript.IJ, "float_acc"],
+    tmp_sfl_i: gtscript.Field[gtscript.IJ, "float_acc"],
     tmp_trpaus: gtscript.Field[gtscript.IJ, "float"],
     *,
     dt: "float",
@@ -80,7 +81,6 @@ def cloudsc2_tl_def(
         LEVAPLS2,
         LREGCL,
         NLEV,
-        R2ES,
         R3IES,
         R3LES,
         R4IES,
@@ -179,7 +179,7 @@ def cloudsc2_tl_def(
             fwat_i = 0.0
             z3es = R3LES
             z4es = R4LES
-        foeew = R2ES * exp(z3es * (t - RTT) / (t - z4es))
+        foeew = foeew_exact(t, z3es, z4es)
         foeew_i = z3es * (RTT - z4es) * t_i * foeew / (t - z4es) ** 2
         esdp = foeew / in_ap
         esdp_i = foeew_i / in_ap - foeew * in_ap_i / (in_ap**2)
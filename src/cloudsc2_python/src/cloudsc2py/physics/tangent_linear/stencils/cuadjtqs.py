@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from gt4py.cartesian import gtscript
 
+from cloudsc2py.physics.common.stencils.fcttre import foeew_exact
 from ifs_physics_common.framework.stencil import function_collection
 from ifs_physics_common.utils.f2py import ported_function
 
@@ -9,11 +10,11 @@ from ifs_physics_common.utils.f2py import ported_function
 @function_collection("cuadjtqs_tl_0")
 @gtscript.function
 def cuadjtqs_tl_0(ap, ap_i, t, t_i, q, q_i, z3es, z4es, z5alcp, zaldcp):
-    from __externals__ import R2ES, RETV, RTT, ZQMAX
+    from __externals__ import RETV, RTT, ZQMAX
 
     qp = 1 / ap
     qp_i = - ap_i / ap**2
-    foeew = R2ES * exp(z3es * (t - RTT) / (t - z4es))
+    foeew = foeew_exact(t, z3es, z4es)
     foeew_i = foeew * z3es * t_i * (RTT - z4es) / (t - z4es) ** 2
     qsat = qp * foeew
     qsat_i = qp_i * foeew + qp * foeew_i
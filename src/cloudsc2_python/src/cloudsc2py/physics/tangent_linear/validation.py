@@ -4,10 +4,11 @@ import numpy as np
 import sys
 from typing import TYPE_CHECKING
 
-from cloudsc2py.physics.common.increment import PerturbedState, StateIncrement
+from cloudsc2py.physics.common.increment import PerturbedState, PerturbedStates, StateIncrement
 from cloudsc2py.physics.common.saturation import Saturation
-from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL
-from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL, NumbaCloudsc2NL
+from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL, NumbaCloudsc2TL
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
 from ifs_physics_common.utils.f2py import ported_method
 from ifs_physics_common.utils.timing import timing
 
@@ -16,11 +17,13 @@ if TYPE_CHECKING:
     from typing import Optional
 
     from ifs_physics_common.framework.config import GT4PyConfig
-    from ifs_physics_common.framework.grid import ComputationalGrid
     from ifs_physics_common.utils.typingx import DataArrayDict, ParameterDict
 
 
 class TaylorTest:
+    diag_names = ("f_clc", "f_fhpsl", "f_fhpsn", "f_fplsl", "f_fplsn", "f_covptot")
+    tend_names = ("f_t", "f_q", "f_ql", "f_qi")
+
     def __init__(
         self,
         computational_grid: ComputationalGrid,
@@ -39,6 +42,7 @@ class TaylorTest:
         *,
         enable_checks: bool = True,
         gt4py_config: GT4PyConfig,
+        numba: bool = False,
     ) -> None:
         self.f1 = factor1
         self.f2s = factor2s
@@ -57,8 +61,8 @@ class TaylorTest:
             gt4py_config=gt4py_config,
         )
 
-        # microphysics
-        self.cloudsc2_nl = Cloudsc2NL(
+        # microphysics, possibly running the Numba kernels
+        self.cloudsc2_nl = (NumbaCloudsc2NL if numba else Cloudsc2NL)(
             computational_grid,
             lphylin,
             ldrain1d,
@@ -71,7 +75,7 @@ class TaylorTest:
             enable_checks=enable_checks,
             gt4py_config=gt4py_config,
         )
-        self.cloudsc2_tl = Cloudsc2TL(
+        self.cloudsc2_tl = (NumbaCloudsc2TL if numba else Cloudsc2TL)(
             computational_grid,
             lphylin,
             ldrain1d,
@@ -90,12 +94,9 @@ class TaylorTest:
         self.state_increment = StateIncrement(
             computational_grid, factor1, enable_checks=enable_checks, gt4py_config=gt4py_config
         )
-        self.perturbed_states = [
-            PerturbedState(
-                computational_grid, factor2, enable_checks=enable_checks, gt4py_config=gt4py_config
-            )
-            for factor2 in factor2s
-        ]
+        self.perturbed_states = self.get_perturbed_states(
+            computational_grid, factor2s, enable_checks=enable_checks, gt4py_config=gt4py_config
+        )
 
         # auxiliary dicts
         self.diags_nl = None
@@ -111,6 +112,22 @@ class TaylorTest:
     def __call__(self, state: DataArrayDict, timestep: timedelta) -> None:
         self.validate(self.run(state, timestep))
 
+    @staticmethod
+    def get_perturbed_states(
+        computational_grid: ComputationalGrid,
+        factor2s: tuple[float, ...],
+        *,
+        enable_checks: bool,
+        gt4py_config: GT4PyConfig,
+    ) -> list[PerturbedState]:
+        """Build the components generating the perturbed states, one per factor."""
+        return [
+            PerturbedState(
+                computational_grid, factor2, enable_checks=enable_checks, gt4py_config=gt4py_config
+            )
+            for factor2 in factor2s
+        ]
+
     @ported_method(
         from_file="cloudsc2_tl/cloudsc_driver_tl_mod.F90",
         from_line=126,
@@ -118,18 +135,7 @@ class TaylorTest:
     )
     def run(self, state: DataArrayDict, timestep: timedelta) -> np.ndarray:
         with timing("run"):
-            self.diags_sat = self.saturation(state, out=self.diags_sat)
-            state.update(self.diags_sat)
-
-            self.tends_nl, self.diags_nl = self.cloudsc2_nl(
-                state, timestep, out_tendencies=self.tends_tl, out_diagnostics=self.diags_nl
-            )
-
-            self.state_i = self.state_increment(state, out=self.state_i)
-            state.update(self.state_i)
-            self.tends_tl, self.diags_tl = self.cloudsc2_tl(
-                state, timestep, out_tendencies=self.tends_tl, out_diagnostics=self.diags_tl
-            )
+            self.run_tangent_linear(state, timestep)
 
         norms = np.zeros(len(self.f2s))
         for i, perturbed_state in enumerate(self.perturbed_states):
@@ -149,6 +155,21 @@ class TaylorTest:
 
         return norms
 
+    def run_tangent_linear(self, state: DataArrayDict, timestep: timedelta) -> None:
+        """Run the nonlinear and the tangent linear microphysics on the unperturbed state."""
+        self.diags_sat = self.saturation(state, out=self.diags_sat)
+        state.update(self.diags_sat)
+
+        self.tends_nl, self.diags_nl = self.cloudsc2_nl(
+            state, timestep, out_tendencies=self.tends_tl, out_diagnostics=self.diags_nl
+        )
+
+        self.state_i = self.state_increment(state, out=self.state_i)
+        state.update(self.state_i)
+        self.tends_tl, self.diags_tl = self.cloudsc2_tl(
+            state, timestep, out_tendencies=self.tends_tl, out_diagnostics=self.diags_tl
+        )
+
     @ported_method(from_file="cloudsc2_tl/cloudsc_driver_tl_mod.F90", from_line=275, to_line=313)
     def validate(self, norms: np.ndarray) -> None:
         print(">>> Taylor test: Start")
@@ -193,15 +214,13 @@ class TaylorTest:
         total_count = 0
         total_norm = 0.0
 
-        tend_names = ("f_t", "f_q", "f_ql", "f_qi")
-        for name in tend_names:
+        for name in self.tend_names:
             field_nl, field_nl_p, field_tl = self.get_fields(name, "tends")
             norm = self.get_field_norm(i, field_nl, field_nl_p, field_tl)
             total_count += norm > 0
             total_norm += norm
 
-        diag_names = ("f_clc", "f_fhpsl", "f_fhpsn", "f_fplsl", "f_fplsn", "f_covptot")
-        for name in diag_names:
+        for name in self.diag_names:
             field_nl, field_nl_p, field_tl = self.get_fields(name, "diags")
             norm = self.get_field_norm(i, field_nl, field_nl_p, field_tl)
             total_count += norm > 0
@@ -231,3 +250,139 @@ class TaylorTest:
         else:
             norm = 0
         return norm
+
+
+class BatchedTaylorTest(TaylorTest):
+    """Like ``TaylorTest``, but evaluating all factors ``factor2s`` at once.
+
+    The perturbed states are laid out along the second horizontal direction of a grid with one
+    index per factor: they are generated by a single ``PerturbedStates`` launch and fed to a
+    single launch of the nonlinear microphysics, and the norms of all factors are reduced at once.
+    """
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        factor1: float,
+        factor2s: tuple[float, ...],
+        kflag: int,
+        lphylin: bool,
+        ldrain1d: bool,
+        yoethf_parameters: Optional[ParameterDict] = None,
+        yomcst_parameters: Optional[ParameterDict] = None,
+        yrecld_parameters: Optional[ParameterDict] = None,
+        yrecldp_parameters: Optional[ParameterDict] = None,
+        yrephli_parameters: Optional[ParameterDict] = None,
+        yrncl_parameters: Optional[ParameterDict] = None,
+        yrphnc_parameters: Optional[ParameterDict] = None,
+        *,
+        enable_checks: bool = True,
+        gt4py_config: GT4PyConfig,
+        numba: bool = False,
+    ) -> None:
+        super().__init__(
+            computational_grid,
+            factor1,
+            factor2s,
+            kflag,
+            lphylin,
+            ldrain1d,
+            yoethf_parameters,
+            yomcst_parameters,
+            yrecld_parameters,
+            yrecldp_parameters,
+            yrephli_parameters,
+            yrncl_parameters,
+            yrphnc_parameters,
+            enable_checks=enable_checks,
+            gt4py_config=gt4py_config,
+            numba=numba,
+        )
+
+        # the perturbed states are evaluated by a single launch
+        self.cloudsc2_nl_p = (NumbaCloudsc2NL if numba else Cloudsc2NL)(
+            get_batched_grid(computational_grid, len(factor2s)),
+            lphylin,
+            ldrain1d,
+            yoethf_parameters,
+            yomcst_parameters,
+            yrecld_parameters,
+            yrecldp_parameters,
+            yrephli_parameters,
+            yrphnc_parameters,
+            enable_checks=enable_checks,
+            gt4py_config=gt4py_config,
+        )
+
+    @staticmethod
+    def get_perturbed_states(
+        computational_grid: ComputationalGrid,
+        factor2s: tuple[float, ...],
+        *,
+        enable_checks: bool,
+        gt4py_config: GT4PyConfig,
+    ) -> PerturbedStates:
+        """Build the single component generating the perturbed states of all factors."""
+        return PerturbedStates(
+            get_batched_grid(computational_grid, len(factor2s)),
+            factor2s,
+            enable_checks=enable_checks,
+            gt4py_config=gt4py_config,
+        )
+
+    def run(self, state: DataArrayDict, timestep: timedelta) -> np.ndarray:
+        with timing("run"):
+            self.run_tangent_linear(state, timestep)
+
+            self.state_p = self.perturbed_states(state, out=self.state_p)
+            self.state_p["time"] = state["time"]
+            self.state_p["f_eta"] = state["f_eta"]
+            self.tends_nl_p, self.diags_nl_p = self.cloudsc2_nl_p(
+                self.state_p,
+                timestep,
+                out_tendencies=self.tends_nl_p,
+                out_diagnostics=self.diags_nl_p,
+            )
+
+        with timing("norms"):
+            norms = self.get_norms()
+
+        return norms
+
+    def get_norms(self) -> np.ndarray:
+        """Compute the norms of all factors, as ``get_norm`` does for a single factor."""
+        assert self.diags_nl is not None, "Did you execute the run() method?"
+
+        total_count = np.zeros(len(self.f2s), dtype=int)
+        total_norm = np.zeros(len(self.f2s))
+
+        for dct_name, names in (("tends", self.tend_names), ("diags", self.diag_names)):
+            for name in names:
+                field_nl, field_nl_p, field_tl = self.get_fields(name, dct_name)
+                norms = self.get_field_norms(field_nl, field_nl_p, field_tl)
+                total_count += norms > 0
+                total_norm += norms
+
+        return np.where(total_count > 0, total_norm / np.maximum(total_count, 1), 0)
+
+    def get_fields(self, name: str, dct_name: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        field_nl = getattr(self, dct_name + "_nl")[name].data[:, 0, :]
+        # all factors at once
+        field_nl_p = getattr(self, dct_name + "_nl_p")[name].data
+        field_tl = getattr(self, dct_name + "_tl")[name + "_i"].data[:, 0, :]
+        return field_nl, field_nl_p, field_tl
+
+    def get_field_norms(
+        self, field_nl: np.ndarray, field_nl_p: np.ndarray, field_tl: np.ndarray
+    ) -> np.ndarray:
+        """Compute ``get_field_norm`` for all factors, ``field_nl_p`` having one index per factor
+        along the second axis."""
+        den = np.abs(np.array(self.f2s) * np.sum(field_tl))
+        num = np.abs(np.sum(field_nl_p - field_nl[:, np.newaxis], axis=(0, 2)))
+        return np.where(den > sys.float_info.epsilon, num / np.maximum(den, sys.float_info.min), 0)
+
+
+def get_batched_grid(computational_grid: ComputationalGrid, num_factors: int) -> ComputationalGrid:
+    """Get the grid with one index per factor along the second horizontal direction."""
+    ni, _, nk = computational_grid.grids[I, J, K].shape
+    return ComputationalGrid(ni, num_factors, nk)
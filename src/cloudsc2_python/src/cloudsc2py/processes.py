@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import multiprocessing
+import traceback
+from typing import TYPE_CHECKING
+
+from cloudsc2py.framework.blocking import get_column_blocks
+from cloudsc2py.framework.storage import SharedPackedStorage
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.nonlinear.microphysics import (
+    Cloudsc2NL,
+    Cloudsc2NLWithSaturation,
+    NumbaCloudsc2NL,
+    NumbaCloudsc2NLWithSaturation,
+)
+from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL, NumbaCloudsc2TL
+from cloudsc2py.state import attach_shared_state, get_packed_storage, get_shared_state_spec
+from ifs_physics_common.framework.components import DiagnosticComponent
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
+
+if TYPE_CHECKING:
+    from datetime import timedelta
+    from multiprocessing.connection import Connection
+    from typing import Any, Callable, Optional, Union
+
+    from ifs_physics_common.framework.components import ImplicitTendencyComponent
+    from ifs_physics_common.framework.config import GT4PyConfig
+    from ifs_physics_common.utils.typingx import DataArrayDict, ParameterDict
+
+    Component = Union[DiagnosticComponent, ImplicitTendencyComponent]
+    ComponentFactory = Callable[[ComputationalGrid, GT4PyConfig], list[Component]]
+
+
+def get_nonlinear_components(
+    computational_grid: ComputationalGrid,
+    gt4py_config: GT4PyConfig,
+    yoethf_parameters: Optional[ParameterDict] = None,
+    yomcst_parameters: Optional[ParameterDict] = None,
+    yrecld_parameters: Optional[ParameterDict] = None,
+    yrecldp_parameters: Optional[ParameterDict] = None,
+    yrephli_parameters: Optional[ParameterDict] = None,
+    yrphnc_parameters: Optional[ParameterDict] = None,
+    *,
+    enable_checks: bool = True,
+    es_table_order: int = 0,
+    fuse_saturation: bool = False,
+    numba: bool = False,
+) -> list[Component]:
+    """Get the components run by ``run_nonlinear.py``, as a factory for ``ProcessPoolEngine``
+    (e.g. through ``functools.partial``). With ``numba=True``, the microphysics runs the Numba
+    kernel."""
+    parameters = (
+        yoethf_parameters,
+        yomcst_parameters,
+        yrecld_parameters,
+        yrecldp_parameters,
+        yrephli_parameters,
+        yrphnc_parameters,
+    )
+    kwargs = {
+        "enable_checks": enable_checks,
+        "es_table_order": es_table_order,
+        "gt4py_config": gt4py_config,
+    }
+    if fuse_saturation:
+        cls = NumbaCloudsc2NLWithSaturation if numba else Cloudsc2NLWithSaturation
+        return [cls(computational_grid, 1, True, False, *parameters, **kwargs)]
+    cls = NumbaCloudsc2NL if numba else Cloudsc2NL
+    return [
+        Saturation(computational_grid, 1, True, yoethf_parameters, yomcst_parameters, **kwargs),
+        cls(computational_grid, True, False, *parameters, **kwargs),
+    ]
+
+
+def get_tangent_linear_components(
+    computational_grid: ComputationalGrid,
+    gt4py_config: GT4PyConfig,
+    yoethf_parameters: Optional[ParameterDict] = None,
+    yomcst_parameters: Optional[ParameterDict] = None,
+    yrecld_parameters: Optional[ParameterDict] = None,
+    yrecldp_parameters: Optional[ParameterDict] = None,
+    yrephli_parameters: Optional[ParameterDict] = None,
+    yrncl_parameters: Optional[ParameterDict] = None,
+    yrphnc_parameters: Optional[ParameterDict] = None,
+    *,
+    enable_checks: bool = True,
+    numba: bool = False,
+) -> list[Component]:
+    """Get the saturation and the tangent linear microphysics, as a factory for
+    ``ProcessPoolEngine``. The state must contain the increments of the input fields. With
+    ``numba=True``, the microphysics runs the Numba kernel."""
+    return [
+        Saturation(
+            computational_grid,
+            1,
+            True,
+            yoethf_parameters,
+            yomcst_parameters,
+            enable_checks=enable_checks,
+            gt4py_config=gt4py_config,
+        ),
+        (NumbaCloudsc2TL if numba else Cloudsc2TL)(
+            computational_grid,
+            True,
+            False,
+            yoethf_parameters,
+            yomcst_parameters,
+            yrecld_parameters,
+            yrecldp_parameters,
+            yrephli_parameters,
+            yrncl_parameters,
+            yrphnc_parameters,
+            enable_checks=enable_checks,
+            gt4py_config=gt4py_config,
+        ),
+    ]
+
+
+def run_components(
+    components: list[Component],
+    state: DataArrayDict,
+    timestep: timedelta,
+    tendencies: DataArrayDict,
+    diagnostics: DataArrayDict,
+) -> None:
+    """Run ``components`` in sequence, each one seeing the diagnostics of the previous ones."""
+    for component in components:
+        out_diagnostics = {key: diagnostics[key] for key in component._diagnostic_properties}
+        if isinstance(component, DiagnosticComponent):
+            component(state, out=out_diagnostics)
+        else:
+            out_tendencies = {key: tendencies[key] for key in component._tendency_properties}
+            component(
+                state, timestep, out_tendencies=out_tendencies, out_diagnostics=out_diagnostics
+            )
+        state.update(out_diagnostics)
+
+
+def run_worker(
+    connection: Connection,
+    factory: ComponentFactory,
+    specs: tuple[dict, dict, dict],
+    columns: tuple[int, int],
+    gt4py_config: GT4PyConfig,
+    readonly_state: bool,
+) -> None:
+    """The loop of the worker processes of ``ProcessPoolEngine``."""
+    try:
+        state_spec, tendencies_spec, diagnostics_spec = specs
+        state = attach_shared_state(
+            state_spec, gt4py_config=gt4py_config, columns=columns, readonly=readonly_state
+        )
+        tendencies, diagnostics = (
+            attach_shared_state(spec, gt4py_config=gt4py_config, columns=columns)
+            for spec in (tendencies_spec, diagnostics_spec)
+        )
+        _, nj, nk = state_spec["storage"]["shape"]
+        computational_grid = ComputationalGrid(columns[1] - columns[0], nj, nk)
+        components = factory(computational_grid, gt4py_config)
+        connection.send(None)
+    except Exception:
+        connection.send(traceback.format_exc())
+        return
+
+    while (timestep := connection.recv()) is not None:
+        try:
+            run_components(components, state, timestep, tendencies, diagnostics)
+            connection.send(None)
+        except Exception:
+            connection.send(traceback.format_exc())
+
+
+class ProcessPoolEngine:
+    """Run a sequence of components over the columns split among a pool of processes.
+
+    The state, tendencies and diagnostics live in shared memory (see ``share_state``). Each
+    worker process attaches to the slice of columns it owns, and runs its own instances of
+    the components, built by ``factory(computational_grid, gt4py_config)`` on that slice. The
+    parent process only dispatches the runs and collects the errors, so that no data is copied
+    between processes. Unlike ``ColumnParallelExecutor``, this does not rely on the backend
+    releasing the GIL.
+
+    ``factory`` must be picklable, e.g. ``functools.partial(get_nonlinear_components, ...)``.
+    The components are built once in the parent process too, to compile the stencils before
+    the workers load them, and to get the properties of the tendencies and diagnostics.
+    """
+
+    diagnostics: DataArrayDict
+    num_processes: int
+    tendencies: DataArrayDict
+
+    _connections: list[Connection]
+    _processes: list[multiprocessing.process.BaseProcess]
+    _shared_storages: list[SharedPackedStorage]
+
+    def __init__(
+        self,
+        computational_grid: ComputationalGrid,
+        state: DataArrayDict,
+        factory: ComponentFactory,
+        num_processes: int,
+        *,
+        gt4py_config: GT4PyConfig,
+        readonly_state: bool = False,
+    ) -> None:
+        """``state`` must be returned by either ``share_state`` or ``attach_shared_state``. With
+        ``readonly_state=True``, the workers attach to the state read-only."""
+        if not isinstance(get_packed_storage(state), SharedPackedStorage):
+            raise RuntimeError("The state must live in shared memory (see share_state).")
+        if num_processes <= 0:
+            raise RuntimeError(f"The number of processes must be positive, got {num_processes}.")
+
+        self._connections = []
+        self._processes = []
+        self._shared_storages = []
+        try:
+            self._start(
+                computational_grid, state, factory, num_processes, gt4py_config, readonly_state
+            )
+        except BaseException:
+            self.close()
+            raise
+        self.num_processes = len(self._processes)
+
+    def __call__(self, timestep: timedelta) -> None:
+        """Run the components over all columns, writing into ``tendencies`` and ``diagnostics``."""
+        for connection in self._connections:
+            connection.send(timestep)
+        self._collect()
+
+    def __enter__(self) -> ProcessPoolEngine:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes and destroy the tendencies and diagnostics."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                # the worker has already exited
+                pass
+        for process in self._processes:
+            process.join()
+        self._connections.clear()
+        self._processes.clear()
+        for shared_storage in self._shared_storages:
+            shared_storage.unlink()
+        self._shared_storages.clear()
+
+    def _start(
+        self,
+        computational_grid: ComputationalGrid,
+        state: DataArrayDict,
+        factory: ComponentFactory,
+        num_processes: int,
+        gt4py_config: GT4PyConfig,
+        readonly_state: bool,
+    ) -> None:
+        tendency_properties, diagnostic_properties = {}, {}
+        for component in factory(computational_grid, gt4py_config):
+            tendency_properties.update(getattr(component, "_tendency_properties", {}))
+            diagnostic_properties.update(component._diagnostic_properties)
+        self.tendencies = self._allocate(computational_grid, tendency_properties, gt4py_config)
+        self.diagnostics = self._allocate(computational_grid, diagnostic_properties, gt4py_config)
+        specs = (
+            get_shared_state_spec(state),
+            get_shared_state_spec(self.tendencies),
+            get_shared_state_spec(self.diagnostics),
+        )
+
+        num_cols = computational_grid.grids[I, J, K].shape[0]
+        blocks = get_column_blocks(
+            computational_grid.grids[I, J, K].shape, -(-num_cols // num_processes)
+        )
+        context = multiprocessing.get_context("spawn")
+        for (start, _, _), (size, _, _) in blocks:
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=run_worker,
+                args=(
+                    worker_connection,
+                    factory,
+                    specs,
+                    (start, start + size),
+                    gt4py_config,
+                    readonly_state,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+        self._collect()
+
+    def _allocate(
+        self, computational_grid: ComputationalGrid, properties: dict, gt4py_config: GT4PyConfig
+    ) -> DataArrayDict:
+        shared_storage = SharedPackedStorage(
+            computational_grid, list(properties), gt4py_config=gt4py_config
+        )
+        self._shared_storages.append(shared_storage)
+        return {
+            key: shared_storage.get_data_array(key, value["grid"], value["units"])
+            for key, value in properties.items()
+        }
+
+    def _collect(self) -> None:
+        errors = [connection.recv() for connection in self._connections]
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise RuntimeError("Error in a worker process:\n" + errors[0])
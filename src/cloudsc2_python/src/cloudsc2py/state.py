@@ -1,19 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 import numpy as np
 from typing import TYPE_CHECKING
 
-from ifs_physics_common.framework.grid import I, J, K
-from ifs_physics_common.framework.storage import allocate_data_array
+from cloudsc2py.framework.storage import (
+    PackedStorage,
+    SharedPackedStorage,
+    allocate_data_array,
+    get_storage_pool,
+)
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
+from ifs_physics_common.framework.storage import get_data_array
 from ifs_physics_common.utils.f2py import ported_function
-from ifs_physics_common.utils.numpyx import assign
+from ifs_physics_common.utils.numpyx import assign, to_numpy
 
 if TYPE_CHECKING:
-    from cloudsc2py.utils.iox import HDF5Reader
+    from typing import Callable, Optional
+
+    from cloudsc2py.utils.iox import HDF5Reader, NpyDirectory
     from ifs_physics_common.framework.config import GT4PyConfig
-    from ifs_physics_common.framework.grid import ComputationalGrid
-    from ifs_physics_common.utils.typingx import DataArray, DataArrayDict
+    from ifs_physics_common.utils.typingx import DataArray, DataArrayDict, Storage
 
 
 @ported_function(
@@ -34,22 +43,15 @@ def allocate_state(
             computational_grid, (I, J, K - 1 / 2), units, gt4py_config=gt4py_config, dtype="float"
         )
 
-    def allocator_d(units: str) -> DataArray:
-        return allocate_data_array(
-            computational_grid,
-            (I, J, K),
-            units,
-            data_shape=(5,),
-            data_dims=("d",),
-            gt4py_config=gt4py_config,
-            dtype="float",
-        )
+    f5_clv, f_ql, f_qi = allocate_cloud_variables(
+        computational_grid, "g g^-1", gt4py_config=gt4py_config
+    )
 
     return {
         "f_t": allocator("K"),
         "f_q": allocator("g g^-1"),
-        "f_ql": allocator("g g^-1"),
-        "f_qi": allocator("g g^-1"),
+        "f_ql": f_ql,
+        "f_qi": f_qi,
         "f_ap": allocator("Pa"),
         "f_aph": allocator_zh("Pa"),
         "f_lu": allocator("g g^-1"),
@@ -57,7 +59,7 @@ def allocate_state(
         "f_mfu": allocator("kg m^-2 s^-1"),
         "f_mfd": allocator("kg m^-2 s^-1"),
         "f_a": allocator("1"),
-        "f5_clv": allocator_d("g g^-1"),
+        "f5_clv": f5_clv,
         "f_supsat": allocator("g g^-1"),
     }
 
@@ -71,25 +73,200 @@ def allocate_tendencies(
             computational_grid, (I, J, K), units, gt4py_config=gt4py_config, dtype="float"
         )
 
-    def allocator_ikd(units: str) -> DataArray:
-        return allocate_data_array(
-            computational_grid,
-            (I, J, K),
-            units,
-            data_shape=(5,),
-            data_dims=("d",),
-            gt4py_config=gt4py_config,
-            dtype="float",
-        )
+    f5_cld, f_ql, f_qi = allocate_cloud_variables(
+        computational_grid, "g g^-1 s^-1", gt4py_config=gt4py_config
+    )
 
     return {
         "f_t": allocator_ik("K s^-1"),
         "f_a": allocator_ik("s^-1"),
         "f_q": allocator_ik("g g^-1 s^-1"),
-        "f_ql": allocator_ik("g g^-1 s^-1"),
-        "f_qi": allocator_ik("g g^-1 s^-1"),
-        "f5_cld": allocator_ikd("s^-1"),
+        "f_ql": f_ql,
+        "f_qi": f_qi,
+        "f5_cld": f5_cld,
+    }
+
+
+def allocate_cloud_variables(
+    computational_grid: ComputationalGrid, units: str, *, gt4py_config: GT4PyConfig
+) -> tuple[DataArray, DataArray, DataArray]:
+    """Allocate the cloud liquid and ice fields, and the cloud-variable field viewing both.
+
+    Out of the five cloud species of the input, only liquid (index 0) and ice (index 1) are
+    used, so only those are allocated: as the two halves of a single storage with twice as many
+    columns along the second horizontal direction. Splitting an axis preserves the memory layout
+    chosen by the backend, and splitting a horizontal axis also preserves the vertical padding
+    of the storages, so that both halves are valid (I, J, K) storages; the cloud-variable field,
+    with a trailing data dimension of size 2, is a further view of the same storage. Return the
+    cloud-variable, liquid and ice fields, all sharing their memory.
+    """
+    ni, nj, nk = computational_grid.grids[I, J, K].shape
+    buffer = get_storage_pool().acquire(
+        ComputationalGrid(ni, 2 * nj, nk),
+        (I, J, K),
+        gt4py_config=gt4py_config,
+        dtype="float",
+        zero=True,
+    )
+    # splitting an axis never requires a copy, so this is a view of buffer
+    clv = buffer.reshape((ni, 2, nj) + buffer.shape[2:]).transpose((0, 2, 3, 1))
+    out = (
+        get_data_array(clv, computational_grid, (I, J, K), units, data_dims=("d",)),
+        get_data_array(buffer[:, :nj], computational_grid, (I, J, K), units),
+        get_data_array(buffer[:, nj:], computational_grid, (I, J, K), units),
+    )
+    # the fields only hold views, so the buffer is recorded for release_data_arrays
+    for data_array in out:
+        data_array.attrs["pooled_storage"] = buffer
+    return out
+
+
+def allocate_packed_state(
+    computational_grid: ComputationalGrid,
+    *,
+    gt4py_config: GT4PyConfig,
+    alignment: Optional[int] = None,
+) -> dict[str, DataArray]:
+    """Allocate the fields of the state returned by ``get_initial_state`` as views of a single
+    packed storage, whose slots are possibly aligned to ``alignment`` bytes.
+
+    The packed storage can be retrieved via ``get_packed_storage``.
+    """
+    properties = {
+        "f_t": ((I, J, K), "K"),
+        "f_q": ((I, J, K), "g g^-1"),
+        # f_ql and f_qi must be consecutive, since f5_clv is a view of both
+        "f_ql": ((I, J, K), "g g^-1"),
+        "f_qi": ((I, J, K), "g g^-1"),
+        "f_ap": ((I, J, K), "Pa"),
+        "f_aph": ((I, J, K - 1 / 2), "Pa"),
+        "f_lu": ((I, J, K), "g g^-1"),
+        "f_lude": ((I, J, K), "kg m^-3 s^-1"),
+        "f_mfu": ((I, J, K), "kg m^-2 s^-1"),
+        "f_mfd": ((I, J, K), "kg m^-2 s^-1"),
+        "f_a": ((I, J, K), "1"),
+        "f_supsat": ((I, J, K), "g g^-1"),
+        "f_tnd_cml_t": ((I, J, K), "K s^-1"),
+        "f_tnd_cml_q": ((I, J, K), "g g^-1 s^-1"),
+        "f_tnd_cml_ql": ((I, J, K), "g g^-1 s^-1"),
+        "f_tnd_cml_qi": ((I, J, K), "g g^-1 s^-1"),
+    }
+    packed_storage = PackedStorage(
+        computational_grid, list(properties), gt4py_config=gt4py_config, alignment=alignment
+    )
+    out = {
+        key: packed_storage.get_data_array(key, grid_id, units)
+        for key, (grid_id, units) in properties.items()
+    }
+    out["f5_clv"] = get_data_array(
+        packed_storage.get_stacked_fields(("f_ql", "f_qi")),
+        computational_grid,
+        (I, J, K),
+        "g g^-1",
+        data_dims=("d",),
+    )
+    out["f5_clv"].attrs["packed_storage"] = packed_storage
+    return out
+
+
+def get_packed_storage(state: DataArrayDict) -> Optional[PackedStorage]:
+    """Get the storage packing the fields of ``state``, if any."""
+    return state["f_t"].attrs.get("packed_storage", None)
+
+
+def share_state(
+    state: DataArrayDict,
+    computational_grid: ComputationalGrid,
+    *,
+    gt4py_config: GT4PyConfig,
+    alignment: Optional[int] = None,
+) -> DataArrayDict:
+    """Copy ``state`` into a block of shared memory, which other processes can attach to via
+    ``attach_shared_state(get_shared_state_spec(out))``.
+
+    The (I, J, K) and (I, J, K - 1/2) fields of the returned state are views of a
+    ``SharedPackedStorage``, which can be retrieved via ``get_packed_storage``. The fields with
+    data dimensions (i.e. ``f5_clv``) are dropped, while any other entry (e.g. ``f_eta`` and
+    ``time``) is kept as is. The caller is responsible for unlinking the shared storage.
+    """
+    nk = computational_grid.grids[I, J, K].shape[2]
+    fields = {key: value for key, value in state.items() if getattr(value, "ndim", 0) == 3}
+    shared_storage = SharedPackedStorage(
+        computational_grid, list(fields), gt4py_config=gt4py_config, alignment=alignment
+    )
+    out = {}
+    for key, value in fields.items():
+        grid_id = (I, J, K - 1 / 2) if value.shape[2] == nk + 1 else (I, J, K)
+        out[key] = shared_storage.get_data_array(key, grid_id, value.attrs["units"])
+        assign(out[key].data, value.data)
+    out.update(
+        {key: value for key, value in state.items() if getattr(value, "ndim", 0) not in (3, 4)}
+    )
+    return out
+
+
+def get_shared_state_spec(state: DataArrayDict) -> dict:
+    """Get the (picklable) arguments for other processes to attach to a state returned by
+    ``share_state``, or to the outputs of a ``ProcessPoolEngine``."""
+    shared_storage = next(
+        value.attrs["packed_storage"]
+        for value in state.values()
+        if "packed_storage" in getattr(value, "attrs", {})
+    )
+    nk = shared_storage.computational_grid.grids[I, J, K].shape[2]
+    fields, others = {}, {}
+    for key, value in state.items():
+        if hasattr(value, "attrs") and value.attrs.get("packed_storage", None) is shared_storage:
+            fields[key] = (value.shape[2] == nk + 1, value.attrs["units"])
+        else:
+            others[key] = value
+    return {"storage": shared_storage.spec, "fields": fields, "others": others}
+
+
+def attach_shared_state(
+    spec: dict,
+    *,
+    gt4py_config: GT4PyConfig,
+    columns: Optional[tuple[int, int]] = None,
+    readonly: bool = False,
+    track: bool = True,
+) -> DataArrayDict:
+    """Attach to a state shared by another process (see ``share_state``), possibly only to
+    the columns from ``columns[0]`` to ``columns[1]`` (excluded).
+
+    See ``SharedPackedStorage`` for ``readonly`` and ``track``.
+    """
+    shared_storage = SharedPackedStorage.attach(
+        spec["storage"], gt4py_config=gt4py_config, readonly=readonly, track=track
+    )
+    packed_storage = shared_storage if columns is None else shared_storage.get_columns(*columns)
+    out = {
+        key: packed_storage.get_data_array(
+            key, (I, J, K - 1 / 2) if staggered else (I, J, K), units
+        )
+        for key, (staggered, units) in spec["fields"].items()
     }
+    out.update(spec["others"])
+    return out
+
+
+def tile(field: Storage, buffer: np.ndarray) -> None:
+    """Fill ``field`` by replicating the columns of ``buffer`` along the first axis.
+
+    All full blocks of columns are filled with a single (broadcast) assignment through a view
+    of ``field`` with the first axis split into ``(nb, mi)``; the remaining columns with a
+    second assignment.
+    """
+    ni = field.shape[0]
+    mi = buffer.shape[0]
+    nb = ni // mi
+
+    if nb > 0:
+        # splitting an axis never requires a copy, so this is a view of field
+        blocks = field[: nb * mi].reshape((nb, mi) + field.shape[1:])
+        assign(blocks, buffer[np.newaxis])
+    if nb * mi < ni:
+        assign(field[nb * mi :], buffer[: ni - nb * mi])
 
 
 @ported_function(from_file="common/module/expand_mod.F90", from_line=270, to_line=302)
@@ -98,18 +275,29 @@ def initialize(
     hdf5_reader: HDF5Reader,
     data_array_dict_key: str,
     hdf5_reader_key: str,
+    *,
+    start: int = 0,
+    data_index: Optional[int] = None,
 ) -> None:
-    field = data_array_dict[data_array_dict_key].data
-    ni, _, nk = field.shape[:3]
-    buffer = hdf5_reader.get_field(hdf5_reader_key)
-    mi, mk = buffer.shape[:2]
+    # columns first, levels second
+    field = data_array_dict[data_array_dict_key].data[:, 0]
+    ni = field.shape[0]
+    mi = hdf5_reader.get_nlon()
 
-    nk = min(nk, mk)
+    # the first (up to) mi columns are read straight into the storage, the first one being the
+    # column start of the (virtually) expanded input...
+    start = start % mi
+    n = min(ni, mi - start)
+    head = hdf5_reader.read_field(hdf5_reader_key, field[:n], start=start, data_index=data_index)
+    if n < min(ni, mi):
+        hdf5_reader.read_field(
+            hdf5_reader_key, field[n : min(ni, mi)], start=0, data_index=data_index
+        )
 
-    nb = ni // mi
-    for b in range(nb):
-        assign(field[b * mi : (b + 1) * mi, 0:1, :nk], buffer[:, np.newaxis, :nk])
-    assign(field[nb * mi :, 0:1, :nk], buffer[: ni - nb * mi, np.newaxis, :nk])
+    # ...and then replicated within the storage
+    if ni > mi:
+        nk = head.shape[1]
+        tile(field[mi:, :nk], field[:mi, :nk])
 
 
 @ported_function(
@@ -117,46 +305,100 @@ def initialize(
     from_line=167,
     to_line=177,
 )
-def initialize_state(state: dict[str, DataArray], hdf5_reader: HDF5Reader) -> None:
+def initialize_state(
+    state: dict[str, DataArray],
+    hdf5_reader: HDF5Reader,
+    *,
+    start: int = 0,
+    num_threads: int = 1,
+) -> None:
+    tasks = []
     for key in state:
         hdf5_reader_key = "P" + key.split("_", maxsplit=1)[1].upper()
-        initialize(state, hdf5_reader, key, hdf5_reader_key)
+        tasks.append(partial(initialize, state, hdf5_reader, key, hdf5_reader_key, start=start))
+    run_tasks(tasks, num_threads)
 
 
 @ported_function(from_file="common/module/expand_mod.F90", from_line=134, to_line=171)
-def initialize_tendencies(tendencies: dict[str, DataArray], hdf5_reader: HDF5Reader) -> None:
+def initialize_tendencies(
+    tendencies: dict[str, DataArray],
+    hdf5_reader: HDF5Reader,
+    *,
+    start: int = 0,
+    num_threads: int = 1,
+) -> None:
+    tasks = []
     for key in tendencies:
         hdf5_reader_key = "TENDENCY_CML_" + key.split("_", maxsplit=1)[1].upper()
-        initialize(tendencies, hdf5_reader, key, hdf5_reader_key)
+        tasks.append(
+            partial(initialize, tendencies, hdf5_reader, key, hdf5_reader_key, start=start)
+        )
+    run_tasks(tasks, num_threads)
+
+
+def run_tasks(tasks: list[Callable[[], None]], num_threads: int = 1) -> None:
+    """Run ``tasks`` on a pool of ``num_threads`` threads, or sequentially if ``num_threads == 1``.
+
+    The reads from file are serialised by the reader, while the transpositions and expansions,
+    which release the GIL, overlap.
+    """
+    if num_threads > 1:
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = [executor.submit(task) for task in tasks]
+        for future in futures:
+            # re-raise any exception
+            future.result()
+    else:
+        for task in tasks:
+            task()
 
 
 def get_accumulated_tendencies(
-    computational_grid: ComputationalGrid, hdf5_reader: HDF5Reader, *, gt4py_config: GT4PyConfig
+    computational_grid: ComputationalGrid,
+    hdf5_reader: HDF5Reader,
+    *,
+    gt4py_config: GT4PyConfig,
+    num_threads: int = 1,
 ) -> dict[str, DataArray]:
     tendencies = allocate_tendencies(computational_grid, gt4py_config=gt4py_config)
+    # f_ql and f_qi are views of f5_cld
     out = {key: tendencies[key] for key in tendencies if key not in ("f_ql", "f_qi")}
-    initialize_tendencies(out, hdf5_reader)
-    out["f_ql"] = tendencies["f_ql"]
-    out["f_qi"] = tendencies["f_qi"]
-    out["f_ql"][...] = out["f5_cld"][..., 0]
-    out["f_qi"][...] = out["f5_cld"][..., 1]
-    return out
+    initialize_tendencies(out, hdf5_reader, num_threads=num_threads)
+    return tendencies
 
 
 def get_initial_state(
-    computational_grid: ComputationalGrid, hdf5_reader: HDF5Reader, *, gt4py_config: GT4PyConfig
+    computational_grid: ComputationalGrid,
+    hdf5_reader: HDF5Reader,
+    *,
+    gt4py_config: GT4PyConfig,
+    num_threads: int = 1,
+    packed: bool = False,
+    alignment: Optional[int] = None,
 ) -> DataArrayDict:
+    """Read and expand the initial state, using ``num_threads`` threads to ingest the fields.
+
+    With ``packed=True``, all fields are views of a single storage (see
+    ``allocate_packed_state``).
+    """
+    if packed:
+        out = allocate_packed_state(
+            computational_grid, gt4py_config=gt4py_config, alignment=alignment
+        )
+        update_initial_state(out, hdf5_reader, num_threads=num_threads)
+        out["time"] = datetime(1970, 1, 1)
+        return out
+
     state = allocate_state(computational_grid, gt4py_config=gt4py_config)
 
+    # f_ql and f_qi are views of f5_clv
     out = {key: state[key] for key in state if key not in ("f_ql", "f_qi")}
-    initialize_state(out, hdf5_reader)
+    initialize_state(out, hdf5_reader, num_threads=num_threads)
     out["f_ql"] = state["f_ql"]
     out["f_qi"] = state["f_qi"]
-    out["f_ql"][...] = out["f5_clv"][..., 0]
-    out["f_qi"][...] = out["f5_clv"][..., 1]
 
     tendencies = get_accumulated_tendencies(
-        computational_grid, hdf5_reader, gt4py_config=gt4py_config
+        computational_grid, hdf5_reader, gt4py_config=gt4py_config, num_threads=num_threads
     )
     out["f_tnd_cml_t"] = tendencies["f_t"]
     out["f_tnd_cml_q"] = tendencies["f_q"]
@@ -166,3 +408,136 @@ def get_initial_state(
     out["time"] = datetime(1970, 1, 1)
 
     return out
+
+
+def update_initial_state(
+    state: DataArrayDict, hdf5_reader: HDF5Reader, *, start: int = 0, num_threads: int = 1
+) -> None:
+    """Refill ``state``, as returned by ``get_initial_state``, in place.
+
+    The first column of ``state`` receives the column ``start`` of the expanded input, so that
+    a large grid can be processed chunk by chunk on the same, pre-allocated, chunk-sized state.
+    """
+    out = {
+        key: state[key]
+        for key in (
+            "f_t",
+            "f_q",
+            "f_ap",
+            "f_aph",
+            "f_lu",
+            "f_lude",
+            "f_mfu",
+            "f_mfd",
+            "f_a",
+            "f5_clv",
+            "f_supsat",
+        )
+    }
+    initialize_state(out, hdf5_reader, start=start, num_threads=num_threads)
+
+    tasks = [
+        partial(initialize, state, hdf5_reader, "f_tnd_cml_t", "TENDENCY_CML_T", start=start),
+        partial(initialize, state, hdf5_reader, "f_tnd_cml_q", "TENDENCY_CML_Q", start=start),
+        partial(
+            initialize,
+            state,
+            hdf5_reader,
+            "f_tnd_cml_ql",
+            "TENDENCY_CML_CLD",
+            start=start,
+            data_index=0,
+        ),
+        partial(
+            initialize,
+            state,
+            hdf5_reader,
+            "f_tnd_cml_qi",
+            "TENDENCY_CML_CLD",
+            start=start,
+            data_index=1,
+        ),
+    ]
+    run_tasks(tasks, num_threads)
+
+
+def save_initial_state(state: DataArrayDict, npy_directory: NpyDirectory) -> None:
+    """Dump a state as returned by ``get_initial_state`` to a directory of ``.npy`` files."""
+    # f5_clv is not stored, as it is a view of f_ql and f_qi
+    fields = {
+        key: to_numpy(state[key].data) for key in state if key not in ("f5_clv", "f_eta", "time")
+    }
+    # the (I, J, K) storages may be padded with extra levels, unlike the (I, J, K - 1/2) ones
+    ni, _, nk = state["f_aph"].shape
+    npy_directory.write(
+        fields,
+        num_cols=ni,
+        num_levels=nk - 1,
+        dtype=fields["f_t"].dtype.str,
+        time=state["time"].isoformat(),
+    )
+
+
+def get_initial_state_from_npy(
+    computational_grid: ComputationalGrid,
+    npy_directory: NpyDirectory,
+    *,
+    gt4py_config: GT4PyConfig,
+    packed: bool = False,
+    alignment: Optional[int] = None,
+) -> DataArrayDict:
+    """Load a state saved by ``save_initial_state``, bypassing HDF5 decoding and expansion."""
+    metadata = npy_directory.get_metadata()
+    ni, _, nk = computational_grid.grids[I, J, K].shape
+    if metadata["num_cols"] < ni or metadata["num_levels"] != nk:
+        raise RuntimeError(
+            f"The directory `{npy_directory.dirname}` stores a state with "
+            f"{metadata['num_cols']} columns and {metadata['num_levels']} levels, "
+            f"but the grid has {ni} columns and {nk} levels."
+        )
+    if np.dtype(metadata["dtype"]) != np.dtype(gt4py_config.dtypes.float):
+        raise RuntimeError(
+            f"The directory `{npy_directory.dirname}` stores a state in "
+            f"{np.dtype(metadata['dtype'])}, but {np.dtype(gt4py_config.dtypes.float)} "
+            f"is required."
+        )
+
+    if packed:
+        out = allocate_packed_state(
+            computational_grid, gt4py_config=gt4py_config, alignment=alignment
+        )
+    else:
+        state = allocate_state(computational_grid, gt4py_config=gt4py_config)
+        tendencies = allocate_tendencies(computational_grid, gt4py_config=gt4py_config)
+        out = dict(state)
+        out["f_tnd_cml_t"] = tendencies["f_t"]
+        out["f_tnd_cml_q"] = tendencies["f_q"]
+        out["f_tnd_cml_ql"] = tendencies["f_ql"]
+        out["f_tnd_cml_qi"] = tendencies["f_qi"]
+
+    update_initial_state_from_npy(out, npy_directory)
+
+    out["time"] = datetime.fromisoformat(metadata["time"])
+
+    return out
+
+
+def update_initial_state_from_npy(
+    state: DataArrayDict, npy_directory: NpyDirectory, *, start: int = 0
+) -> None:
+    """Refill ``state`` in place with the stored columns ``start``, ``start + 1``, ...
+
+    Only the columns of ``state`` with a counterpart in ``npy_directory`` are overwritten.
+    """
+    metadata = npy_directory.get_metadata()
+    if not 0 <= start < metadata["num_cols"]:
+        raise RuntimeError(
+            f"The directory `{npy_directory.dirname}` stores {metadata['num_cols']} columns, "
+            f"cannot start reading from column {start}."
+        )
+
+    for key in npy_directory.keys():
+        field = state[key].data
+        stop = min(start + field.shape[0], metadata["num_cols"])
+        # only the requested slice of the memory-mapped file is read from disk
+        assign(field[: stop - start], npy_directory.get_field(key)[start:stop])
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import numpy as np
+from typing import TYPE_CHECKING
+
+from cloudsc2py.state import allocate_state, allocate_tendencies
+from ifs_physics_common.framework.grid import I, J, K
+from ifs_physics_common.utils.numpyx import assign, to_numpy
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from ifs_physics_common.framework.config import GT4PyConfig
+    from ifs_physics_common.framework.grid import ComputationalGrid
+    from ifs_physics_common.utils.typingx import DataArrayDict, ParameterDict
+
+
+# relative frequency of each regime
+default_regimes = {"cloudy": 0.4, "clear": 0.3, "warm": 0.15, "cold": 0.15}
+
+
+def get_synthetic_state(
+    computational_grid: ComputationalGrid,
+    reference_state: DataArrayDict,
+    yoethf_parameters: ParameterDict,
+    *,
+    gt4py_config: GT4PyConfig,
+    seed: int = 0,
+    regimes: Optional[dict[str, float]] = None,
+) -> DataArrayDict:
+    """Generate a state with the same fields as ``get_initial_state``, without reading any file.
+
+    Each column is a perturbation of a randomly drawn column of ``reference_state`` (e.g. the
+    state returned by ``get_initial_state`` on the grid of the input file), according to a
+    regime drawn with the relative frequencies ``regimes`` (``default_regimes`` by default):
+
+    * cloudy: moister column, with more condensate and cloud cover;
+    * clear: drier column, without condensate, cloud cover nor convective fluxes;
+    * warm/cold: column warmer/colder by 2 to 8 K, with the specific humidity rescaled to keep
+      the relative humidity approximately constant.
+
+    Temperature, humidity and surface pressure are further perturbed by small noise, and the
+    condensate is repartitioned between liquid and ice based on the perturbed temperature, within
+    the mixed phase bounded by the temperatures ``RTICE`` and ``RTWAT`` of ``yoethf_parameters``.
+    The generated state only depends on ``seed``, ``regimes`` and the grid size.
+    """
+    ni = computational_grid.grids[I, J, K].shape[0]
+    rng = np.random.default_rng(seed)
+    names, probabilities = get_regime_probabilities(regimes)
+
+    state = allocate_state(computational_grid, gt4py_config=gt4py_config)
+    tendencies = allocate_tendencies(computational_grid, gt4py_config=gt4py_config)
+    state["f_tnd_cml_t"] = tendencies["f_t"]
+    state["f_tnd_cml_q"] = tendencies["f_q"]
+    state["f_tnd_cml_ql"] = tendencies["f_ql"]
+    state["f_tnd_cml_qi"] = tendencies["f_qi"]
+
+    # the reference column and the regime of each column
+    ref = {key: to_numpy(reference_state[key].data)[:, 0] for key in state}
+    mi = ref["f_t"].shape[0]
+    columns = rng.integers(mi, size=ni)
+    regime = rng.choice(len(names), size=ni, p=probabilities)
+    is_cloudy, is_clear, is_warm, is_cold = (
+        (regime == names.index(name))[:, np.newaxis] for name in ("cloudy", "clear", "warm", "cold")
+    )
+    out = {key: field[columns] for key, field in ref.items()}
+
+    # temperature
+    shift = rng.uniform(2, 8, size=(ni, 1))
+    dt = np.where(is_warm, shift, np.where(is_cold, -shift, 0))
+    dt = dt + rng.normal(0, 0.5, size=(ni, 1)) + rng.normal(0, 0.2, size=out["f_t"].shape)
+    out["f_t"] += dt
+
+    # humidity: ~7% per kelvin at constant relative humidity (Clausius-Clapeyron)
+    factor = np.exp(0.07 * dt) * rng.lognormal(0, 0.05, size=(ni, 1))
+    factor = np.where(is_cloudy, factor * rng.uniform(1.0, 1.1, size=(ni, 1)), factor)
+    factor = np.where(is_clear, factor * rng.uniform(0.6, 0.9, size=(ni, 1)), factor)
+    out["f_q"] *= factor
+
+    # clouds and condensate
+    clv = out["f5_clv"]
+    condensate = clv[..., 0] + clv[..., 1]
+    condensate = np.where(is_cloudy, condensate * rng.uniform(1, 3, size=(ni, 1)), condensate)
+    condensate = np.where(is_clear, 0, condensate)
+    liquid_fraction = (
+        np.clip(
+            (out["f_t"] - yoethf_parameters["RTICE"]) * yoethf_parameters["RTWAT_RTICE_R"], 0, 1
+        )
+        ** 2
+    )
+    clv[..., 0] = liquid_fraction * condensate
+    clv[..., 1] = (1 - liquid_fraction) * condensate
+    cover = np.where(is_cloudy, out["f_a"] + rng.uniform(0, 0.3, size=(ni, 1)), out["f_a"])
+    out["f_a"] = np.clip(np.where(is_clear, 0, cover), 0, 1)
+    for key in ("f_lu", "f_lude", "f_mfu", "f_mfd"):
+        out[key] = np.where(is_clear, 0, out[key])
+
+    # pressure: rescaling whole columns preserves the eta-levels
+    factor = 1 + rng.normal(0, 0.005, size=(ni, 1))
+    out["f_ap"] *= factor
+    out["f_aph"] *= factor
+
+    out["f_q"] = np.maximum(out["f_q"], 0)
+    # f_ql and f_qi are views of f5_clv
+    for key in (key for key in state if key not in ("f_ql", "f_qi")):
+        field = state[key].data[:, 0]
+        mk = min(field.shape[1], out[key].shape[1])
+        assign(field[:, :mk], out[key][:, :mk])
+    state["time"] = reference_state["time"]
+
+    return state
+
+
+def get_regime_probabilities(
+    regimes: Optional[dict[str, float]] = None,
+) -> tuple[list[str], np.ndarray]:
+    regimes = regimes or default_regimes
+    unknown = set(regimes) - set(default_regimes)
+    if unknown:
+        raise RuntimeError(
+            f"Unknown regimes {', '.join(sorted(unknown))}, "
+            f"options are: {', '.join(default_regimes)}."
+        )
+    names = list(default_regimes)
+    weights = np.array([regimes.get(name, 0.0) for name in names], dtype=float)
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise RuntimeError(f"Invalid regime frequencies {regimes}.")
+    return names, weights / weights.sum()
@@ -3,15 +3,22 @@ from __future__ import annotations
 from datetime import timedelta
 from functools import lru_cache
 import h5py
+import hashlib
+import json
 import numpy as np
+import os
+import queue
+import threading
 from typing import TYPE_CHECKING
 
 from ifs_physics_common.utils.f2py import ported_method
+from ifs_physics_common.utils.numpyx import assign, to_numpy
 
 if TYPE_CHECKING:
-    from typing import Union
+    from typing import Any, Optional, Union
 
     from ifs_physics_common.framework.config import DataTypes
+    from ifs_physics_common.utils.typingx import DataArrayDict, Storage
 
 
 class HDF5Reader:
@@ -21,35 +28,136 @@ class HDF5Reader:
 
     f: h5py.File
     data_types: DataTypes
+    filename: str
+    parameters: dict[str, Union[bool, float, int]]
+    zero_copy: bool
 
-    def __init__(self, filename: str, data_types: DataTypes) -> None:
-        self.f = h5py.File(filename)
+    def __init__(
+        self,
+        filename: str,
+        data_types: DataTypes,
+        *,
+        cache_parameters: bool = False,
+        zero_copy: bool = False,
+    ) -> None:
+        # with cache_parameters=True, the index of the scalar datasets is cached in the user
+        # cache directory (see get_cache_dir), rather than built by scanning the file
+        # with zero_copy=True, contiguous datasets are returned as read-only views on a memory
+        # map of the file rather than as in-memory copies
+        self.f = h5py.File(filename, "r")
         self.data_types = data_types
+        self.filename = filename
+        self.zero_copy = zero_copy
+        self._mmap = None
+
+        # serialises the accesses to the file, so that the reader can be shared among threads
+        self._lock = threading.RLock()
+
+        # all scalar datasets are indexed once and for all
+        self.parameters = (
+            self._load_parameter_index() if cache_parameters else self._build_parameter_index()
+        )
 
     def __del__(self) -> None:
         self.f.close()
 
-    def get_field(self, name: str):
-        ds = self.f.get(name, None)
-        if ds is None:
-            raise RuntimeError(f"Unknown field `{name}`.")
+    def get_field(self, name: str, buffer: Optional[np.ndarray] = None) -> np.ndarray:
+        """Get the field ``name``, with the horizontal and vertical axis in front.
 
-        if ds.ndim == 1:
-            return self._get_field_1d(ds, name)
-        elif ds.ndim == 2:
-            return self._get_field_2d(ds, name)
-        elif ds.ndim == 3:
-            return self._get_field_3d(ds, name)
-        else:
-            raise RuntimeError(f"The field `{name}` has unexpected shape {ds.shape}.")
+        If provided, ``buffer`` must have the same shape as the dataset in the file. Unless the
+        dataset can be memory-mapped, the data is read directly into ``buffer`` and the returned
+        array is a (possibly transposed) view of it.
+        """
+        with self._lock:
+            ds = self.f.get(name, None)
+            if ds is None:
+                raise RuntimeError(f"Unknown field `{name}`.")
+
+            if ds.ndim == 1:
+                return self._get_field_1d(ds, name, buffer)
+            elif ds.ndim == 2:
+                return self._get_field_2d(ds, name, buffer)
+            elif ds.ndim == 3:
+                return self._get_field_3d(ds, name, buffer)
+            else:
+                raise RuntimeError(f"The field `{name}` has unexpected shape {ds.shape}.")
+
+    def read_field(
+        self, name: str, out: Storage, *, start: int = 0, data_index: Optional[int] = None
+    ) -> Storage:
+        """Fill ``out``, with the horizontal and vertical axis in front, with the field ``name``.
+
+        The columns ``start``, ``start + 1``, ... of the field are stored in ``out``, which is
+        typically a view of a storage, without intermediate arrays: if ``out`` has the same
+        memory layout as the dataset in the file (possibly up to a transposition), the data is
+        read directly into it, otherwise it is copied with a single strided assignment from the
+        required hyperslab only. If ``out`` has more levels than the field, the trailing levels
+        are not touched; if it has fewer components along the data axis, only the leading
+        components are read. Return the view of ``out`` which has been filled.
+
+        Only the accesses to the file hold the lock of the reader: the strided assignment is
+        carried out without it, so that it overlaps with the reads of other threads.
+        """
+        with self._lock:
+            ds = self.f.get(name, None)
+            if ds is None:
+                raise RuntimeError(f"Unknown field `{name}`.")
+            if (
+                ds.ndim not in (2, 3)
+                or ds.ndim != out.ndim + (data_index is not None)
+                or (out.ndim == 3 and out.shape[2] > ds.shape[self._get_axes(ds, name)[2]])
+            ):
+                raise RuntimeError(
+                    f"Cannot read the field `{name}` with shape {ds.shape} into an array with "
+                    f"shape {out.shape}."
+                )
+
+            axes = self._get_axes(ds, name)
+            ni = out.shape[0]
+            nk = min(out.shape[1], ds.shape[axes[1]])
+            if not 0 <= start <= ds.shape[axes[0]] - ni:
+                raise RuntimeError(
+                    f"Cannot read {ni} columns of the field `{name}` from column {start}: "
+                    f"the field has {ds.shape[axes[0]]} columns."
+                )
+
+            # hyperslab in the file, and view of out with the axes ordered as in the file
+            selection = [slice(None)] * ds.ndim
+            selection[axes[0]] = slice(start, start + ni)
+            selection[axes[1]] = slice(0, nk)
+            out = out[:, :nk]
+            if data_index is not None:
+                selection[axes[2]] = slice(data_index, data_index + 1)
+                dest = out[..., np.newaxis]
+            else:
+                if ds.ndim == 3:
+                    selection[axes[2]] = slice(0, out.shape[2])
+                dest = out
+            dest = np.transpose(dest, axes=[axes.index(axis) for axis in range(ds.ndim)])
+
+            mmap = self._map_dataset(ds) if self.zero_copy else None
+            if mmap is not None:
+                src = mmap[tuple(selection)]
+            elif isinstance(dest, np.ndarray) and dest.flags.c_contiguous:
+                ds.read_direct(dest, source_sel=tuple(selection))
+                return out
+            else:
+                # the hyperslab is read into a scratch buffer
+                src = ds[tuple(selection)]
+
+        assign(dest, src)
+
+        return out
 
     @lru_cache
     def get_nlev(self) -> int:
-        return self.f["KLEV"][0]
+        with self._lock:
+            return self.f["KLEV"][0]
 
     @lru_cache
     def get_nlon(self) -> int:
-        return self.f["KLON"][0]
+        with self._lock:
+            return self.f["KLON"][0]
 
     def get_timestep(self) -> timedelta:
         return timedelta(seconds=self._get_parameter_f("PTSPHY"))
@@ -76,7 +184,7 @@ class HDF5Reader:
             "RTWAT_RTICECU_R": self._get_parameter_f("RTWAT_RTICECU_R"),
             "RKOOP1": self._get_parameter_f("RKOOP1"),
             "RKOOP2": self._get_parameter_f("RKOOP2"),
-            "RVTMP2": 0.0,
+            "RVTMP2": self.data_types.float(0.0),
         }
         return out
 
@@ -258,35 +366,46 @@ class HDF5Reader:
     def get_yrphnc_parameters(self) -> dict[str, bool]:
         return {"LEVAPLS2": False}
 
-    def _get_field_1d(self, ds: h5py.Dataset, name: str) -> np.ndarray:
+    def _get_field_1d(
+        self, ds: h5py.Dataset, name: str, buffer: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         nlon = self.get_nlon()
         nlev = self.get_nlev()
         if nlon <= ds.shape[0] <= nlon + 1 or nlev <= ds.shape[0] <= nlev + 1:
-            return ds[:]
+            return self._read_dataset(ds, buffer)
         else:
             raise RuntimeError(
                 f"The field `{name}` is expected to have shape ({nlon}(+1),) or "
                 f"({nlev}(+1),), but has shape {ds.shape}."
             )
 
-    def _get_field_2d(self, ds, name):
-        nlon = self.get_nlon()
-        nlev = self.get_nlev()
-        if nlon <= ds.shape[0] <= nlon + 1 and nlev <= ds.shape[1] <= nlev + 1:
-            return ds[...]
-        elif nlon <= ds.shape[1] <= nlon + 1 and nlev <= ds.shape[0] <= nlev + 1:
-            return np.transpose(ds[...])
-        else:
-            raise RuntimeError(
-                f"The field `{name}` is expected to have shape "
-                f"({nlon}(+1), {nlev}(+1)) or ({nlev}(+1), {nlon}(+1)), "
-                f"but has shape {ds.shape}."
-            )
+    def _get_field_2d(
+        self, ds: h5py.Dataset, name: str, buffer: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return np.transpose(self._read_dataset(ds, buffer), axes=self._get_axes(ds, name))
+
+    def _get_field_3d(
+        self, ds: h5py.Dataset, name: str, buffer: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return np.transpose(self._read_dataset(ds, buffer), axes=self._get_axes(ds, name))
 
-    def _get_field_3d(self, ds, name):
+    def _get_axes(self, ds: h5py.Dataset, name: str) -> tuple[int, ...]:
+        """Get the axes of ``ds`` along which the columns, the levels and the data lie."""
         nlon = self.get_nlon()
         nlev = self.get_nlev()
 
+        if ds.ndim == 2:
+            if nlon <= ds.shape[0] <= nlon + 1 and nlev <= ds.shape[1] <= nlev + 1:
+                return 0, 1
+            elif nlon <= ds.shape[1] <= nlon + 1 and nlev <= ds.shape[0] <= nlev + 1:
+                return 1, 0
+            else:
+                raise RuntimeError(
+                    f"The field `{name}` is expected to have shape "
+                    f"({nlon}(+1), {nlev}(+1)) or ({nlev}(+1), {nlon}(+1)), "
+                    f"but has shape {ds.shape}."
+                )
+
         if nlon in ds.shape:
             axes = [ds.shape.index(nlon)]
         elif nlon + 1 in ds.shape:
@@ -303,13 +422,297 @@ class HDF5Reader:
 
         axes += tuple({0, 1, 2} - set(axes))
 
-        return np.transpose(ds[...], axes=axes)
+        return tuple(axes)
+
+    def _read_dataset(self, ds: h5py.Dataset, buffer: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.zero_copy:
+            out = self._map_dataset(ds)
+            if out is not None:
+                return out
+
+        if buffer is not None:
+            if buffer.shape != ds.shape:
+                raise RuntimeError(
+                    f"The buffer for the field `{ds.name}` is expected to have shape "
+                    f"{ds.shape}, but has shape {buffer.shape}."
+                )
+            ds.read_direct(buffer)
+            return buffer
+
+        return ds[...]
+
+    def _map_dataset(self, ds: h5py.Dataset) -> Optional[np.ndarray]:
+        # only contiguous datasets can be mapped: chunked datasets may be filtered (e.g. compressed)
+        if ds.chunks is not None or ds.dtype.kind not in "biuf":
+            return None
+        offset = ds.id.get_offset()
+        if offset is None:
+            # storage not allocated yet, or external
+            return None
+
+        if self._mmap is None:
+            self._mmap = np.memmap(self.filename, dtype=np.uint8, mode="r")
+        return np.ndarray(ds.shape, dtype=ds.dtype, buffer=self._mmap, offset=offset, order="C")
+
+    def _build_parameter_index(self) -> dict[str, Union[bool, float, int]]:
+        out = {}
+        for name, ds in self.f.items():
+            if isinstance(ds, h5py.Dataset) and ds.size == 1 and ds.dtype.kind in "biuf":
+                out[name] = ds[()].item(0)
+        return out
+
+    def _load_parameter_index(self) -> dict[str, Union[bool, float, int]]:
+        """Load the parameter index from the cache, keyed by the absolute path of the file.
+
+        The cached index is trusted as long as the size and modification time of the file are
+        unchanged; otherwise, it is rebuilt and the cache is updated, unless the cache directory
+        is not writable.
+        """
+        filename = os.path.abspath(self.filename)
+        stat = os.stat(filename)
+        cache_dir = get_cache_dir()
+        cache_filename = os.path.join(
+            cache_dir, hashlib.sha256(filename.encode()).hexdigest() + ".params.json"
+        )
+
+        try:
+            with open(cache_filename, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        if (
+            cache.get("filename") == filename
+            and cache.get("mtime_ns") == stat.st_mtime_ns
+            and cache.get("size") == stat.st_size
+        ):
+            return cache["parameters"]
+
+        parameters = self._build_parameter_index()
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError:
+            return parameters
+        if os.access(cache_dir, os.W_OK):
+            cache = {
+                "filename": filename,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "parameters": parameters,
+            }
+            try:
+                with open(cache_filename, "w") as f:
+                    json.dump(cache, f, indent=1)
+            except OSError:
+                pass
+
+        return parameters
 
     def _get_parameter_b(self, name: str) -> bool:
-        return self.data_types.bool(self.f.get(name, [True])[0])
+        return self.data_types.bool(self.parameters.get(name, self.default_dataset_b[0]))
 
     def _get_parameter_f(self, name: str) -> float:
-        return self.data_types.float(self.f.get(name, [0.0])[0])
+        return self.data_types.float(self.parameters.get(name, self.default_dataset_f[0]))
 
     def _get_parameter_i(self, name: str) -> int:
-        return self.data_types.int(self.f.get(name, [0])[0])
+        return self.data_types.int(self.parameters.get(name, self.default_dataset_i[0]))
+
+
+class HDF5Writer:
+    """Write fields to an HDF5 file, in a layout which can be read back by ``HDF5Reader``.
+
+    Fields are stored with the horizontal axis first, and chunked along it, so that a column
+    can be read back without decompressing the whole field. Unless ``background=False``,
+    fields are copied upon submission and written by a dedicated thread.
+    """
+
+    compressions = (None, "gzip", "lzf")
+
+    f: h5py.File
+    chunk_size: int
+    compression: Optional[str]
+    compression_opts: Optional[int]
+    filename: str
+    nlev: int
+    nlon: int
+
+    def __init__(
+        self,
+        filename: str,
+        nlon: int,
+        nlev: int,
+        *,
+        chunk_size: int = 32,
+        compression: Optional[str] = None,
+        compression_opts: Optional[int] = None,
+        background: bool = True,
+        max_pending: int = 16,
+    ) -> None:
+        if compression not in self.compressions:
+            raise RuntimeError(
+                f"Unknown compression `{compression}`, "
+                f"options are: {', '.join(str(c) for c in self.compressions)}."
+            )
+
+        self.f = h5py.File(filename, "w")
+        self.chunk_size = min(chunk_size, nlon)
+        self.compression = compression
+        self.compression_opts = compression_opts
+        self.filename = filename
+        self.nlev = nlev
+        self.nlon = nlon
+
+        # the grid size is stored as in the input files
+        self.f["KLON"] = np.array([nlon], dtype=np.int32)
+        self.f["KLEV"] = np.array([nlev], dtype=np.int32)
+
+        # the file is only accessed by the background thread from now on
+        self._error: Optional[Exception] = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        else:
+            self._queue = None
+            self._thread = None
+
+    def __enter__(self) -> HDF5Writer:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if hasattr(self, "f"):
+            self.close()
+
+    def close(self) -> None:
+        """Wait for all pending writes and close the file."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.f:
+            self.f.close()
+        self._raise_error()
+
+    def flush(self) -> None:
+        """Wait for all pending writes."""
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_error()
+
+    def write_field(self, name: str, field: np.ndarray, *, start: int = 0) -> None:
+        """Write ``field``, with the horizontal and vertical axis in front, from column ``start``.
+
+        The data is copied before returning, so ``field`` can be overwritten straight away.
+        """
+        if not 0 <= start <= self.nlon - field.shape[0]:
+            raise RuntimeError(
+                f"Cannot write {field.shape[0]} columns of the field `{name}` from column "
+                f"{start}: the file holds {self.nlon} columns."
+            )
+        self._raise_error()
+
+        if self._queue is None:
+            self._write(name, field, start)
+        else:
+            self._queue.put((name, np.array(field, copy=True), start))
+
+    def write_fields(
+        self, fields: DataArrayDict, *, start: int = 0, num_cols: Optional[int] = None
+    ) -> None:
+        """Write the first ``num_cols`` columns of all ``fields`` defined over (I, J, K)."""
+        for name, field in fields.items():
+            self.write_field(name, to_numpy(field.data)[:num_cols, 0], start=start)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            try:
+                if self._error is None:
+                    self._write(*item)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name: str, field: np.ndarray, start: int) -> None:
+        ds = self.f.get(name, None)
+        if ds is None:
+            ds = self.f.create_dataset(
+                name,
+                shape=(self.nlon,) + field.shape[1:],
+                dtype=field.dtype,
+                chunks=(self.chunk_size,) + field.shape[1:],
+                compression=self.compression,
+                compression_opts=self.compression_opts,
+            )
+        ds[start : start + field.shape[0]] = field
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Writing to `{self.filename}` failed.") from error
+
+
+class NpyDirectory:
+    """A directory of raw ``.npy`` files, one per field, described by a JSON manifest."""
+
+    manifest_filename = "manifest.json"
+
+    dirname: str
+
+    def __init__(self, dirname: str) -> None:
+        self.dirname = dirname
+
+    def write(self, fields: dict[str, np.ndarray], **metadata: Any) -> None:
+        os.makedirs(self.dirname, exist_ok=True)
+        manifest = {"metadata": metadata, "fields": {}}
+        for name, field in fields.items():
+            filename = name + ".npy"
+            np.save(os.path.join(self.dirname, filename), field, allow_pickle=False)
+            manifest["fields"][name] = {
+                "filename": filename,
+                "shape": list(field.shape),
+                "dtype": field.dtype.str,
+            }
+        with open(os.path.join(self.dirname, self.manifest_filename), "w") as f:
+            json.dump(manifest, f, indent=1)
+
+    @lru_cache
+    def get_manifest(self) -> dict[str, Any]:
+        filename = os.path.join(self.dirname, self.manifest_filename)
+        if not os.path.exists(filename):
+            raise RuntimeError(f"The directory `{self.dirname}` has no manifest.")
+        with open(filename, "r") as f:
+            return json.load(f)
+
+    def get_metadata(self) -> dict[str, Any]:
+        return self.get_manifest()["metadata"]
+
+    def get_field(self, name: str) -> np.ndarray:
+        """Get a read-only memory map of the field ``name``."""
+        entry = self.get_manifest()["fields"].get(name, None)
+        if entry is None:
+            raise RuntimeError(f"Unknown field `{name}`.")
+        return np.load(
+            os.path.join(self.dirname, entry["filename"]), mmap_mode="r", allow_pickle=False
+        )
+
+    def keys(self) -> list[str]:
+        return list(self.get_manifest()["fields"].keys())
+
+
+def get_cache_dir() -> str:
+    """Get the directory of the files cached by cloudsc2py: ``$CLOUDSC2PY_CACHE_DIR`` if set,
+    otherwise ``cloudsc2py`` within ``$XDG_CACHE_HOME`` (by default ``~/.cache``)."""
+    cache_dir = os.environ.get("CLOUDSC2PY_CACHE_DIR", None)
+    if cache_dir is None:
+        cache_home = os.environ.get("XDG_CACHE_HOME", None) or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(cache_home, "cloudsc2py")
+    return cache_dir
@@ -1,17 +1,177 @@
 # -*- coding: utf-8 -*-
+from __future__ import annotations
+import numpy as np
 import os
 import pytest
+from typing import Literal, Optional, TYPE_CHECKING
 
+from cloudsc2py.framework.config import DataTypes
+from cloudsc2py.physics.common.diagnostics import EtaLevels
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.state import allocate_state, allocate_tendencies
+from cloudsc2py.utils.iox import HDF5Reader
+from ifs_physics_common.framework.config import GT4PyConfig
+from ifs_physics_common.framework.grid import I, J, K
+from ifs_physics_common.utils.numpyx import assign
 
-from src.cloudsc2_python.utils import HDF5Reader
+if TYPE_CHECKING:
+    from ifs_physics_common.framework.grid import ComputationalGrid
+    from ifs_physics_common.utils.typingx import DataArrayDict, ParameterDict
 
 
-def hdf5_reader_core():
+# standard IFS constants, so that the tests do not require the input file
+RTT = 273.16
+RD = 287.0597
+RV = 461.5250
+RCPD = 3.5 * RD
+RLVTT = 2.5008e6
+RLSTT = 2.8345e6
+R2ES = 611.21 * RD / RV
+R3LES = 17.502
+R3IES = 22.587
+R4LES = 32.19
+R4IES = -0.7
+R5LES = R3LES * (RTT - R4LES)
+R5IES = R3IES * (RTT - R4IES)
+RTICE = RTT - 23.0
+RTICECU = RTT - 23.0
+
+
+def hdf5_reader_core() -> HDF5Reader:
     pwd = os.path.join("/", *os.path.abspath(__file__).split("/")[:-1])
     path = os.path.join(pwd, "../../../config-files/input.h5")
-    return HDF5Reader(path)
+    return HDF5Reader(path, DataTypes(bool=bool, float=np.float64, int=np.int64))
 
 
 @pytest.fixture(scope="module")
-def hdf5_reader():
+def hdf5_reader() -> HDF5Reader:
     return hdf5_reader_core()
+
+
+def get_gt4py_config(
+    backend: str = "numpy", *, precision: Literal["double", "mixed", "single"] = "double"
+) -> GT4PyConfig:
+    gt4py_config = GT4PyConfig(backend=backend, rebuild=False, validate_args=True, verbose=False)
+    data_types = DataTypes(bool=bool, float=np.float64, float_acc=np.float64, int=np.int64)
+    return gt4py_config.with_dtypes(data_types.with_precision(precision))
+
+
+def get_parameters(
+    *, dtype: Optional[type] = None, levapls2: bool = False, lregcl: bool = True
+) -> dict[str, ParameterDict]:
+    """The parameters of the microphysics, keyed by the name of the getter of ``HDF5Reader``.
+
+    If provided, ``dtype`` is the type of the floating point parameters, as returned by
+    ``HDF5Reader`` with ``dtype`` as floating point type.
+    """
+    yoethf = {
+        "R2ES": R2ES,
+        "R3LES": R3LES,
+        "R3IES": R3IES,
+        "R4LES": R4LES,
+        "R4IES": R4IES,
+        "R5LES": R5LES,
+        "R5IES": R5IES,
+        "R5ALVCP": R5LES * RLVTT / RCPD,
+        "R5ALSCP": R5IES * RLSTT / RCPD,
+        "RALVDCP": RLVTT / RCPD,
+        "RALSDCP": RLSTT / RCPD,
+        "RTWAT": RTT,
+        "RTICE": RTICE,
+        "RTICECU": RTICECU,
+        "RTWAT_RTICE_R": 1 / (RTT - RTICE),
+        "RTWAT_RTICECU_R": 1 / (RTT - RTICECU),
+        "RVTMP2": 0.0,
+    }
+    yomcst = {
+        "RG": 9.80665,
+        "RD": RD,
+        "RCPD": RCPD,
+        "RETV": RV / RD - 1,
+        "RLVTT": RLVTT,
+        "RLSTT": RLSTT,
+        "RLMLT": RLSTT - RLVTT,
+        "RTT": RTT,
+        "RV": RV,
+    }
+    yrecldp = {"RCLCRIT": 4e-4, "RKCONV": 1 / 6000, "RLMIN": 1e-8, "RPECONS": 5.547e-5}
+    yrephli = {"LPHYLIN": True, "RLPTRC": RTICE + (RTT - RTICE) / 2**0.5}
+    if dtype is not None:
+        for parameters in (yoethf, yomcst, yrecldp, yrephli):
+            for name, value in parameters.items():
+                if isinstance(value, float):
+                    parameters[name] = dtype(value)
+    return {
+        "yoethf": yoethf,
+        "yomcst": yomcst,
+        "yrecld": {},
+        "yrecldp": yrecldp,
+        "yrephli": yrephli,
+        "yrncl": {"LREGCL": lregcl},
+        "yrphnc": {"LEVAPLS2": levapls2},
+    }
+
+
+def get_random_state(
+    computational_grid: ComputationalGrid,
+    *,
+    cloudy_fraction: float,
+    gt4py_config: GT4PyConfig,
+    seed: int = 0,
+) -> DataArrayDict:
+    """Generate random columns, either cloudy or clear with probability ``cloudy_fraction``.
+
+    The cloudy columns are close to saturation, with condensate and convective detrainment. The
+    clear columns are dry, without condensate nor detrainment. The reference eta-levels and the
+    saturation specific humidity are diagnosed as in the drivers.
+    """
+    ni, nj, nk = computational_grid.grids[I, J, K].shape
+    rng = np.random.default_rng(seed)
+
+    state = allocate_state(computational_grid, gt4py_config=gt4py_config)
+    tendencies = allocate_tendencies(computational_grid, gt4py_config=gt4py_config)
+    state["f_tnd_cml_t"] = tendencies["f_t"]
+    state["f_tnd_cml_q"] = tendencies["f_q"]
+    state["f_tnd_cml_ql"] = tendencies["f_ql"]
+    state["f_tnd_cml_qi"] = tendencies["f_qi"]
+
+    cloudy = rng.random((ni, nj, 1)) < cloudy_fraction
+    shape = (ni, nj, nk)
+
+    aph = np.linspace(0, 1, nk + 1) ** 2 * 1e5 * (1 + 0.01 * rng.standard_normal((ni, nj, 1)))
+    ap = 0.5 * (aph[..., :-1] + aph[..., 1:])
+    t = 200 + 100 * (ap / 1e5) ** 0.3 + rng.normal(0, 2, shape)
+    qsat = np.minimum(R2ES * np.exp(R3LES * (t - RTT) / (t - R4LES)) / ap, 0.5)
+    rh = np.where(cloudy, rng.uniform(0.8, 1.05, shape), rng.uniform(0.05, 0.3, shape))
+
+    fields = {
+        "f_aph": aph,
+        "f_ap": ap,
+        "f_t": t,
+        "f_q": rh * qsat,
+        "f_ql": np.where(cloudy, rng.uniform(0, 1e-4, shape), 0),
+        "f_qi": np.where(cloudy, rng.uniform(0, 1e-4, shape), 0),
+        "f_lu": np.where(cloudy, rng.uniform(0, 1e-4, shape), 0),
+        "f_lude": np.where(cloudy, rng.uniform(0, 1e-6, shape), 0),
+        "f_mfu": rng.uniform(0, 1e-2, shape),
+        "f_mfd": -rng.uniform(0, 1e-2, shape),
+        "f_tnd_cml_t": rng.normal(0, 1e-5, shape),
+        "f_tnd_cml_q": rng.normal(0, 1e-9, shape) * cloudy,
+    }
+    for key, field in fields.items():
+        assign(state[key].data[..., : field.shape[2]], field)
+
+    eta_levels = EtaLevels(computational_grid, gt4py_config=gt4py_config)
+    state.update(eta_levels(state))
+    parameters = get_parameters(dtype=gt4py_config.dtypes.float)
+    saturation = Saturation(
+        computational_grid,
+        1,
+        True,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        gt4py_config=gt4py_config,
+    )
+    state.update(saturation(state))
+
+    return state
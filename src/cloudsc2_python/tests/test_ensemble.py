@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+import numpy as np
+
+from cloudsc2py.ensemble import get_ensemble_state, get_ensemble_statistics, scatter_members
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_random_state
+
+
+nx, nz = 8, 10
+
+
+def get_control_state():
+    state = get_random_state(
+        ComputationalGrid(nx, 1, nz), cloudy_fraction=0.5, gt4py_config=get_gt4py_config(), seed=6
+    )
+    state["time"] = datetime(2000, 1, 1)
+    return state
+
+
+def get_state(control_state, num_members, **kwargs):
+    return get_ensemble_state(
+        ComputationalGrid(nx, num_members, nz),
+        control_state,
+        gt4py_config=get_gt4py_config(),
+        **kwargs,
+    )
+
+
+def test_ensemble_state():
+    control_state = get_control_state()
+    state = get_state(control_state, 4, seed=1)
+    assert state["time"] == control_state["time"]
+
+    # member 0 is the control state, the others only differ in temperature and humidity
+    for key, field in state.items():
+        if key == "time":
+            continue
+        data = to_numpy(field.data)
+        control = to_numpy(control_state[key].data)[:, 0, :nz]
+        assert np.array_equal(data[:, 0, :nz], control), key
+        if key not in ("f_t", "f_q"):
+            assert np.all(data[:, :, :nz] == control[:, np.newaxis]), key
+    for key in ("f_t", "f_q"):
+        data = to_numpy(state[key].data)
+        for m in range(1, 4):
+            assert not np.array_equal(data[:, m], data[:, 0]), key
+
+    # the same seed gives the same members, whatever the ensemble size
+    same_state = get_state(control_state, 4, seed=1)
+    smaller_state = get_state(control_state, 2, seed=1)
+    other_state = get_state(control_state, 4, seed=2)
+    for key in ("f_t", "f_q"):
+        data = to_numpy(state[key].data)
+        assert np.array_equal(to_numpy(same_state[key].data), data)
+        assert np.array_equal(to_numpy(smaller_state[key].data), data[:, :2])
+        assert not np.array_equal(to_numpy(other_state[key].data)[:, 1:], data[:, 1:])
+
+
+def test_scatter_members():
+    state = get_state(get_control_state(), 3)
+    members = scatter_members(state)
+    assert len(members) == 3
+    for m, member in enumerate(members):
+        assert member["time"] is state["time"]
+        for key, field in member.items():
+            if key == "time":
+                continue
+            data = to_numpy(field.data)
+            assert data.shape[1] == 1
+            assert np.array_equal(data[:, 0], to_numpy(state[key].data)[:, m]), key
+            # the fields of the members are views of the ensemble fields
+            assert np.shares_memory(data, to_numpy(state[key].data)), key
+
+
+def test_ensemble_statistics():
+    control_state = get_control_state()
+    state = get_state(control_state, 5, t_stddev=0.0, q_stddev=0.0)
+    mean, stddev = get_ensemble_statistics(state)
+    assert mean.keys() == stddev.keys() == state.keys() - {"time"}
+    for key in mean:
+        control = to_numpy(control_state[key].data)[:, 0, :nz]
+        # up to the rounding errors of the mean
+        assert np.allclose(mean[key][:, :nz], control, rtol=1e-14, atol=0), key
+        assert np.all(stddev[key] <= 1e-14 * np.abs(mean[key])), key
+
+    _, stddev = get_ensemble_statistics(get_state(control_state, 5))
+    assert np.all(stddev["f_t"][:, :nz] > 0)
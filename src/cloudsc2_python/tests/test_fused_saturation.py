@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+import numpy as np
+import pytest
+
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL, Cloudsc2NLWithSaturation
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+computational_grid = ComputationalGrid(24, 1, 20)
+dt = timedelta(seconds=900)
+
+
+@pytest.mark.parametrize("lphylin", (True, False))
+@pytest.mark.parametrize("kflag", (1, 2))
+def test_fused_saturation(kflag, lphylin):
+    gt4py_config = get_gt4py_config()
+    parameters = get_parameters()
+    state = get_random_state(
+        computational_grid, cloudy_fraction=0.7, gt4py_config=gt4py_config, seed=9
+    )
+    saturation = Saturation(
+        computational_grid,
+        kflag,
+        lphylin,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        gt4py_config=gt4py_config,
+    )
+    microphysics_args = (
+        parameters["yoethf"],
+        parameters["yomcst"],
+        parameters["yrecld"],
+        parameters["yrecldp"],
+        parameters["yrephli"],
+        parameters["yrphnc"],
+    )
+    cloudsc2_nl = Cloudsc2NL(
+        computational_grid, lphylin, False, *microphysics_args, gt4py_config=gt4py_config
+    )
+    cloudsc2_nl_fused = Cloudsc2NLWithSaturation(
+        computational_grid, kflag, lphylin, False, *microphysics_args, gt4py_config=gt4py_config
+    )
+    assert "f_qsat" not in cloudsc2_nl_fused._input_properties
+
+    state.update(saturation(state))
+    tends, diags = cloudsc2_nl(state, dt)
+    # f_qsat is not read by the fused component
+    state["f_qsat"].data[...] = np.nan
+    tends_fused, diags_fused = cloudsc2_nl_fused(state, dt)
+
+    for outputs, outputs_fused in ((tends, tends_fused), (diags, diags_fused)):
+        assert outputs.keys() == outputs_fused.keys()
+        for key in outputs:
+            assert np.array_equal(
+                to_numpy(outputs_fused[key].data), to_numpy(outputs[key].data)
+            ), key
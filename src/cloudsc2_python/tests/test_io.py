@@ -1,6 +1,18 @@
 # -*- coding: utf-8 -*-
 import h5py
+import json
 import numpy as np
+import os
+import pytest
+
+from cloudsc2py.framework.config import DataTypes
+from cloudsc2py.state import get_initial_state, run_tasks, update_initial_state
+from cloudsc2py.utils.iox import HDF5Reader, HDF5Writer
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
+from ifs_physics_common.framework.storage import zeros
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config
 
 
 def assert_parameter_bi(src_dict, src_key, trg_dict, trg_key=None):
@@ -58,5 +70,219 @@ def test_get_yrephli_parameters(hdf5_reader):
         assert_parameter(src_dict, src_key, trg_dict, trg_key)
 
 
+def get_reader(filename):
+    return HDF5Reader(filename, DataTypes(bool=bool, float=np.float64, int=np.int64))
+
+
+@pytest.mark.parametrize("compression", ("gzip", "lzf"))
+def test_hdf5_writer(tmp_path, compression):
+    filename = str(tmp_path / "output.h5")
+    nlon, nlev = 10, 6
+    rng = np.random.default_rng(0)
+    fields = {
+        "A": rng.random((nlon, nlev)),
+        "B": rng.random((nlon, nlev + 1)),
+        "C": rng.random((nlon, nlev, 2)),
+    }
+    with HDF5Writer(filename, nlon, nlev, chunk_size=4, compression=compression) as writer:
+        for name, field in fields.items():
+            # the data is copied upon submission, so the source can be overwritten straight away
+            src = field.copy()
+            writer.write_field(name, src)
+            src[...] = np.nan
+        writer.write_field("D", fields["A"][:3])
+        writer.write_field("D", fields["A"][3:], start=3)
+
+    reader = get_reader(filename)
+    assert reader.get_nlon() == nlon
+    assert reader.get_nlev() == nlev
+    for name, field in fields.items():
+        assert reader.f[name].compression == compression
+        assert np.array_equal(reader.get_field(name), field), name
+    assert np.array_equal(reader.get_field("D"), fields["A"])
+
+
+@pytest.mark.parametrize("background", (True, False))
+def test_hdf5_writer_error(tmp_path, monkeypatch, background):
+    writer = HDF5Writer(str(tmp_path / "output.h5"), 10, 6, background=background)
+    field = np.zeros((10, 6))
+
+    def write(*args):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(writer, "_write", write)
+    if background:
+        # the error is raised by the call following the failing write
+        writer.write_field("A", field)
+        with pytest.raises(RuntimeError, match="Writing to") as excinfo:
+            writer.flush()
+        assert isinstance(excinfo.value.__cause__, OSError)
+        writer.write_field("A", field)
+        with pytest.raises(RuntimeError, match="Writing to"):
+            writer.close()
+    else:
+        with pytest.raises(OSError):
+            writer.write_field("A", field)
+        writer.close()
+
+
+def write_parameters(filename, rg):
+    with h5py.File(filename, "w") as f:
+        f["KLON"] = np.array([4], dtype=np.int32)
+        f["KLEV"] = np.array([3], dtype=np.int32)
+        f["RG"] = np.array([rg])
+        f["LPHYLIN"] = np.array([True])
+
+
+def test_parameter_index(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("CLOUDSC2PY_CACHE_DIR", str(cache_dir))
+    filename = str(tmp_path / "input.h5")
+    write_parameters(filename, 9.8)
+    data_types = DataTypes(bool=bool, float=np.float64, int=np.int64)
+
+    # not cached by default
+    assert HDF5Reader(filename, data_types).parameters["RG"] == 9.8
+    assert not cache_dir.exists()
+
+    # the index is cached in the cache directory only
+    assert HDF5Reader(filename, data_types, cache_parameters=True).parameters["RG"] == 9.8
+    (cache_filename,) = cache_dir.iterdir()
+    assert sorted(os.listdir(tmp_path)) == ["cache", "input.h5"]
+
+    # the cached index is re-used as long as the file is unchanged
+    with open(cache_filename) as f:
+        cache = json.load(f)
+    cache["parameters"]["RG"] = 1.0
+    with open(cache_filename, "w") as f:
+        json.dump(cache, f)
+    reader = HDF5Reader(filename, data_types, cache_parameters=True)
+    assert reader.parameters["RG"] == 1.0
+    assert reader.parameters["LPHYLIN"] == 1
+    del reader
+
+    # and rebuilt once the file is modified
+    stat = os.stat(filename)
+    write_parameters(filename, 9.81)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert HDF5Reader(filename, data_types, cache_parameters=True).parameters["RG"] == 9.81
+    with open(cache_filename) as f:
+        assert json.load(f)["parameters"]["RG"] == 9.81
+
+    # the cache is skipped if it cannot be written
+    monkeypatch.setenv("CLOUDSC2PY_CACHE_DIR", str(cache_filename / "cache"))
+    assert HDF5Reader(filename, data_types, cache_parameters=True).parameters["RG"] == 9.81
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
+
+
+def write_input(filename, nlon, nlev):
+    """Write random input fields, with the Fortran layout of the input files. ``nlev`` must
+    differ from the number of cloud species, so that the axes of the fields can be told apart."""
+    rng = np.random.default_rng(1)
+    with h5py.File(filename, "w") as f:
+        f["KLON"] = np.array([nlon], dtype=np.int32)
+        f["KLEV"] = np.array([nlev], dtype=np.int32)
+        for name in (
+            "PT",
+            "PQ",
+            "PAP",
+            "PLU",
+            "PLUDE",
+            "PMFU",
+            "PMFD",
+            "PA",
+            "PSUPSAT",
+            "TENDENCY_CML_T",
+            "TENDENCY_CML_A",
+            "TENDENCY_CML_Q",
+        ):
+            f[name] = rng.random((nlev, nlon))
+        f["PAPH"] = rng.random((nlev + 1, nlon))
+        for name in ("PCLV", "TENDENCY_CML_CLD"):
+            f[name] = rng.random((5, nlev, nlon))
+        # a chunked dataset, which is read through a scratch buffer
+        f.create_dataset("PT_GZIP", data=f["PT"][...], compression="gzip")
+
+
+@pytest.mark.parametrize("zero_copy", (False, True))
+def test_read_field(tmp_path, zero_copy):
+    filename = str(tmp_path / "input.h5")
+    nlon, nlev = 9, 6
+    write_input(filename, nlon, nlev)
+    reader = HDF5Reader(
+        filename, DataTypes(bool=bool, float=np.float64, int=np.int64), zero_copy=zero_copy
+    )
+    gt4py_config = get_gt4py_config()
+    computational_grid = ComputationalGrid(3, 1, nlev)
+    with h5py.File(filename, "r") as f:
+        pt = f["PT"][...].T
+        pclv = np.transpose(f["PCLV"][...], (2, 1, 0))
+
+    # a hyperslab of columns, straight into a storage
+    for name in ("PT", "PT_GZIP"):
+        storage = zeros(computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float")
+        storage[...] = -1.0
+        out = reader.read_field(name, storage[:, 0], start=2)
+        assert np.array_equal(to_numpy(out), pt[2:5]), name
+        assert np.array_equal(to_numpy(storage)[:, 0, :nlev], pt[2:5]), name
+        # the levels beyond those of the field are not touched
+        assert np.all(to_numpy(storage)[:, 0, nlev:] == -1.0), name
+
+    # a single component, or the leading components, of a field with a data axis
+    storage = zeros(computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float")
+    reader.read_field("PCLV", storage[:, 0], start=6, data_index=1)
+    assert np.array_equal(to_numpy(storage)[:, 0, :nlev], pclv[6:9, :, 1])
+    storage = zeros(
+        computational_grid, (I, J, K), (2,), gt4py_config=gt4py_config, dtype="float"
+    )
+    reader.read_field("PCLV", storage[:, 0, :nlev], start=1)
+    assert np.array_equal(to_numpy(storage)[:, 0, :nlev], pclv[1:4, :, :2])
+
+    with pytest.raises(RuntimeError):
+        reader.read_field("PT", storage[:, 0, :, 0], start=7)
+    with pytest.raises(RuntimeError):
+        reader.read_field("PCLV", storage[:, 0, :, 0])
+
+
+def test_threaded_ingestion(tmp_path):
+    filename = str(tmp_path / "input.h5")
+    nlon, nlev = 9, 6
+    write_input(filename, nlon, nlev)
+    reader = HDF5Reader(filename, DataTypes(bool=bool, float=np.float64, int=np.int64))
+    gt4py_config = get_gt4py_config()
+    # more columns than in the file, so that the input is expanded
+    computational_grid = ComputationalGrid(16, 1, nlev)
+
+    for packed in (False, True):
+        state = get_initial_state(
+            computational_grid, reader, gt4py_config=gt4py_config, packed=packed
+        )
+        state_threaded = get_initial_state(
+            computational_grid, reader, gt4py_config=gt4py_config, num_threads=4, packed=packed
+        )
+        assert state.keys() == state_threaded.keys()
+        with h5py.File(filename, "r") as f:
+            pt = f["PT"][...].T
+        assert np.array_equal(to_numpy(state["f_t"].data)[:, 0, :nlev], pt[np.arange(16) % nlon])
+        for key in state.keys() - {"time"}:
+            assert np.array_equal(
+                to_numpy(state_threaded[key].data), to_numpy(state[key].data)
+            ), key
+
+        # a chunk of the expanded input, refilled in place
+        update_initial_state(state, reader, start=3)
+        update_initial_state(state_threaded, reader, start=3, num_threads=4)
+        for key in state.keys() - {"time"}:
+            assert np.array_equal(
+                to_numpy(state_threaded[key].data), to_numpy(state[key].data)
+            ), key
+
+    def fail():
+        raise OSError("Unable to read the field")
+
+    # the errors of the threads are raised by the caller
+    with pytest.raises(OSError):
+        run_tasks([lambda: None, fail], num_threads=2)
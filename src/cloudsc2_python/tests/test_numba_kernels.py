@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+import numpy as np
+import pytest
+import sys
+
+from cloudsc2py.physics.adjoint.microphysics import Cloudsc2AD, NumbaCloudsc2AD
+from cloudsc2py.physics.adjoint.validation import SymmetryTest
+from cloudsc2py.physics.common.increment import StateIncrement
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL, NumbaCloudsc2NL
+from cloudsc2py.physics.tangent_linear.microphysics import Cloudsc2TL, NumbaCloudsc2TL
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+pytest.importorskip("numba")
+
+
+computational_grid = ComputationalGrid(16, 1, 20)
+dt = timedelta(seconds=900)
+
+
+def get_state(seed=0):
+    return get_random_state(
+        computational_grid, cloudy_fraction=0.7, gt4py_config=get_gt4py_config(), seed=seed
+    )
+
+
+def get_component(cls, levapls2, ldrain1d, lregcl=None):
+    parameters = get_parameters(levapls2=levapls2, lregcl=bool(lregcl))
+    args = [
+        parameters["yoethf"],
+        parameters["yomcst"],
+        parameters["yrecld"],
+        parameters["yrecldp"],
+        parameters["yrephli"],
+    ]
+    if lregcl is not None:
+        args.append(parameters["yrncl"])
+    args.append(parameters["yrphnc"])
+    return cls(computational_grid, True, ldrain1d, *args, gt4py_config=get_gt4py_config())
+
+
+def get_tl_state(seed=0):
+    """The trajectory, and its perturbation."""
+    state = get_state(seed)
+    state_increment = StateIncrement(
+        computational_grid, 0.01, ignore_supsat=True, gt4py_config=get_gt4py_config()
+    )
+    state.update(state_increment(state))
+    return state
+
+
+def get_ad_state(lregcl, levapls2, ldrain1d, seed=0):
+    """The trajectory, and the perturbations of the outputs computed by the tangent linear."""
+    state = get_tl_state(seed)
+    tends_tl, diags_tl = get_component(Cloudsc2TL, levapls2, ldrain1d, lregcl)(state, dt)
+    SymmetryTest.add_tendencies_to_state(state, tends_tl)
+    state.update(diags_tl)
+    return state
+
+
+def assert_allclose(outputs, reference_outputs):
+    # the kernels may contract or reorder the floating point operations differently
+    assert outputs.keys() == reference_outputs.keys()
+    for key in outputs:
+        field = to_numpy(outputs[key].data)
+        reference = to_numpy(reference_outputs[key].data)
+        scale = np.abs(reference).max()
+        assert np.abs(field - reference).max() <= 1e-11 * scale, key
+
+
+@pytest.mark.parametrize("ldrain1d", (False, True))
+@pytest.mark.parametrize("levapls2", (False, True))
+def test_nl(levapls2, ldrain1d):
+    state = get_state()
+    tends, diags = get_component(Cloudsc2NL, levapls2, ldrain1d)(state, dt)
+    tends_nb, diags_nb = get_component(NumbaCloudsc2NL, levapls2, ldrain1d)(state, dt)
+    assert_allclose(tends_nb, tends)
+    assert_allclose(diags_nb, diags)
+
+
+@pytest.mark.parametrize("ldrain1d", (False, True))
+@pytest.mark.parametrize("levapls2", (False, True))
+@pytest.mark.parametrize("lregcl", (False, True))
+def test_tl(lregcl, levapls2, ldrain1d):
+    state = get_tl_state()
+    tends, diags = get_component(Cloudsc2TL, levapls2, ldrain1d, lregcl)(state, dt)
+    tends_nb, diags_nb = get_component(NumbaCloudsc2TL, levapls2, ldrain1d, lregcl)(state, dt)
+    assert_allclose(tends_nb, tends)
+    assert_allclose(diags_nb, diags)
+
+
+@pytest.mark.parametrize("ldrain1d", (False, True))
+@pytest.mark.parametrize("levapls2", (False, True))
+@pytest.mark.parametrize("lregcl", (False, True))
+def test_ad(lregcl, levapls2, ldrain1d):
+    # the stencil zeroes the perturbations of the outputs, as the Fortran code does, hence
+    # each component is given its own copy of the state
+    state = get_ad_state(lregcl, levapls2, ldrain1d)
+    tends, diags = get_component(Cloudsc2AD, levapls2, ldrain1d, lregcl)(state, dt)
+
+    state = get_ad_state(lregcl, levapls2, ldrain1d)
+    cloudsc2_ad_nb = get_component(NumbaCloudsc2AD, levapls2, ldrain1d, lregcl)
+    inputs = {key: to_numpy(state[key].data).copy() for key in cloudsc2_ad_nb._input_properties}
+    tends_nb, diags_nb = cloudsc2_ad_nb(state, dt)
+    assert_allclose(tends_nb, tends)
+    assert_allclose(diags_nb, diags)
+
+    # the Numba kernel must not overwrite its inputs
+    for key, field in inputs.items():
+        assert np.array_equal(to_numpy(state[key].data), field), key
+
+
+@pytest.mark.parametrize("lregcl", (False, True))
+@pytest.mark.parametrize("numba", (False, True))
+def test_symmetry(numba, lregcl):
+    parameters = get_parameters(lregcl=lregcl)
+    symmetry_test = SymmetryTest(
+        computational_grid,
+        0.01,
+        1,
+        True,
+        False,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        parameters["yrecld"],
+        parameters["yrecldp"],
+        parameters["yrephli"],
+        parameters["yrncl"],
+        parameters["yrphnc"],
+        gt4py_config=get_gt4py_config(),
+        numba=numba,
+    )
+    state = get_state()
+
+    # as SymmetryTest.__call__, but computing the norms of TL(dx) before the stencil zeroes it
+    state_i = symmetry_test.state_increment(state)
+    state.update(state_i)
+    tends_tl, diags_tl = symmetry_test.cloudsc2_tl(state, dt)
+    norm1 = symmetry_test.get_norm1(tends_tl, diags_tl)
+    symmetry_test.add_tendencies_to_state(state, tends_tl)
+    state.update(diags_tl)
+    tends_ad, diags_ad = symmetry_test.cloudsc2_ad(state, dt)
+    norm2 = symmetry_test.get_norm2(state_i, tends_ad, diags_ad)
+
+    # <TL(dx), TL(dx)> = <dx, AD(TL(dx))>, up to the same threshold as SymmetryTest
+    assert np.all(norm2 > 0)
+    assert np.all(np.abs(norm1 - norm2) < 1e4 * sys.float_info.epsilon * norm2)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+import numpy as np
+import pytest
+
+from cloudsc2py.framework.parallel import ColumnParallelExecutor
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+computational_grid = ComputationalGrid(32, 1, 20)
+dt = timedelta(seconds=900)
+
+
+def get_components():
+    parameters = get_parameters()
+    gt4py_config = get_gt4py_config()
+    saturation = Saturation(
+        computational_grid,
+        1,
+        True,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        gt4py_config=gt4py_config,
+    )
+    cloudsc2_nl = Cloudsc2NL(
+        computational_grid,
+        True,
+        False,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        parameters["yrecld"],
+        parameters["yrecldp"],
+        parameters["yrephli"],
+        parameters["yrphnc"],
+        gt4py_config=gt4py_config,
+    )
+    return saturation, cloudsc2_nl
+
+
+def assert_equal(outputs, reference_outputs):
+    assert outputs.keys() == reference_outputs.keys()
+    for key in outputs:
+        assert np.array_equal(
+            to_numpy(outputs[key].data), to_numpy(reference_outputs[key].data)
+        ), key
+
+
+@pytest.mark.parametrize("block_size", (None, 5))
+@pytest.mark.parametrize("num_threads", (1, 3))
+def test_column_parallel_executor(num_threads, block_size):
+    state = get_random_state(
+        computational_grid, cloudy_fraction=0.7, gt4py_config=get_gt4py_config(), seed=3
+    )
+    saturation, cloudsc2_nl = get_components()
+    diags_sat = saturation(state)
+    tends, diags = cloudsc2_nl({**state, **diags_sat}, dt)
+
+    with ColumnParallelExecutor(
+        saturation, num_threads, block_size
+    ) as parallel_saturation, ColumnParallelExecutor(
+        cloudsc2_nl, num_threads, block_size
+    ) as parallel_cloudsc2_nl:
+        diags_sat_p = parallel_saturation(state)
+        tends_p, diags_p = parallel_cloudsc2_nl({**state, **diags_sat_p}, dt)
+        assert_equal(diags_sat_p, diags_sat)
+        assert_equal(tends_p, tends)
+        assert_equal(diags_p, diags)
+
+        # as in the forecast driver, the outputs are written into the given buffers
+        for out in (diags_sat_p, tends_p, diags_p):
+            for field in out.values():
+                field.data[...] = 0.0
+        parallel_saturation(state, out=diags_sat_p)
+        parallel_cloudsc2_nl(
+            {**state, **diags_sat_p}, dt, out_tendencies=tends_p, out_diagnostics=diags_p
+        )
+        assert_equal(diags_sat_p, diags_sat)
+        assert_equal(tends_p, tends)
+        assert_equal(diags_p, diags)
+
+    # the components are left as they were
+    for component in (saturation, cloudsc2_nl):
+        assert component.block_size is None
+        assert component.executor is None
+
+
+def test_column_parallel_executor_block_size():
+    _, cloudsc2_nl = get_components()
+    assert ColumnParallelExecutor(cloudsc2_nl, 3).get_default_block_size() == 11
+    with pytest.raises(RuntimeError):
+        ColumnParallelExecutor(cloudsc2_nl, 0)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pytest
+
+from cloudsc2py.processes import ProcessPoolEngine, get_nonlinear_components
+from cloudsc2py.state import get_packed_storage, share_state
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+computational_grid = ComputationalGrid(32, 1, 20)
+dt = timedelta(seconds=900)
+
+
+def get_factory():
+    parameters = get_parameters()
+    return partial(
+        get_nonlinear_components,
+        yoethf_parameters=parameters["yoethf"],
+        yomcst_parameters=parameters["yomcst"],
+        yrecld_parameters=parameters["yrecld"],
+        yrecldp_parameters=parameters["yrecldp"],
+        yrephli_parameters=parameters["yrephli"],
+        yrphnc_parameters=parameters["yrphnc"],
+    )
+
+
+@pytest.fixture
+def shared_state():
+    gt4py_config = get_gt4py_config()
+    state = get_random_state(
+        computational_grid, cloudy_fraction=0.7, gt4py_config=gt4py_config, seed=2
+    )
+    out = share_state(state, computational_grid, gt4py_config=gt4py_config)
+    yield out
+    get_packed_storage(out).unlink()
+
+
+def run_serial(state):
+    """Run the components within this process, over all columns at once."""
+    saturation, cloudsc2_nl = get_factory()(computational_grid, get_gt4py_config())
+    diagnostics = saturation(state)
+    tendencies, diagnostics_nl = cloudsc2_nl({**state, **diagnostics}, dt)
+    diagnostics.update(diagnostics_nl)
+    return tendencies, diagnostics
+
+
+@pytest.mark.parametrize("readonly_state", (False, True))
+def test_process_pool_engine(shared_state, readonly_state):
+    tendencies, diagnostics = run_serial(shared_state)
+    with ProcessPoolEngine(
+        computational_grid,
+        shared_state,
+        get_factory(),
+        2,
+        gt4py_config=get_gt4py_config(),
+        readonly_state=readonly_state,
+    ) as engine:
+        assert engine.num_processes == 2
+        engine(dt)
+        for out, out_engine in ((tendencies, engine.tendencies), (diagnostics, engine.diagnostics)):
+            assert out.keys() == out_engine.keys()
+            for key in out:
+                assert np.array_equal(
+                    to_numpy(out[key].data), to_numpy(out_engine[key].data)
+                ), key
+
+
+def test_process_pool_engine_error(shared_state):
+    with ProcessPoolEngine(
+        computational_grid, shared_state, get_factory(), 2, gt4py_config=get_gt4py_config()
+    ) as engine:
+        # the timestep is not a timedelta, so that the components raise in the workers
+        with pytest.raises(RuntimeError, match="Error in a worker process"):
+            engine(900)
+
+        # the workers survive the error
+        engine(dt)
+
+
+def test_process_pool_engine_close(shared_state):
+    engine = ProcessPoolEngine(
+        computational_grid, shared_state, get_factory(), 2, gt4py_config=get_gt4py_config()
+    )
+    names = [
+        next(iter(out.values())).attrs["packed_storage"].shared_memory.name
+        for out in (engine.tendencies, engine.diagnostics)
+    ]
+    engine.close()
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    # closing twice is harmless
+    engine.close()
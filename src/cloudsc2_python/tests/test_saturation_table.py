@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from cloudsc2py.physics.common.saturation import Saturation
+from cloudsc2py.physics.common.saturation_table import (
+    ES_TABLE_SIZE,
+    ES_TABLE_TMAX,
+    ES_TABLE_TMIN,
+    get_es_table,
+    interpolate_es_table,
+    validate_es_table,
+)
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+# the maximum relative errors documented by validate_es_table, with some margin
+tolerances = {1: 1e-3, 3: 1e-7}
+
+
+@pytest.mark.parametrize("order", (1, 3))
+def test_validate_es_table(order):
+    parameters = get_parameters()
+    errors = validate_es_table(parameters["yoethf"], parameters["yomcst"], order)
+    assert errors.keys() == {"water", "ice"}
+    for error in errors.values():
+        assert 0 < error < tolerances[order]
+
+    # the NumPy replica of the lookup is exact at the nodes of the table
+    table = get_es_table(parameters["yoethf"], parameters["yomcst"])
+    t = np.linspace(ES_TABLE_TMIN, ES_TABLE_TMAX, ES_TABLE_SIZE)[:-1]
+    for col in (0, 2):
+        assert np.allclose(
+            interpolate_es_table(table, t, col, order), table[:-1, col], rtol=1e-14, atol=0
+        )
+
+
+@pytest.mark.parametrize("order", (1, 3))
+def test_es_table_stencil(order):
+    """The lookup within the saturation stencil matches the NumPy replica, and the exact
+    evaluation up to the tolerance of the table."""
+    computational_grid = ComputationalGrid(16, 1, 30)
+    gt4py_config = get_gt4py_config("gt:cpu_kfirst")
+    parameters = get_parameters()
+    yoethf, yomcst = parameters["yoethf"], parameters["yomcst"]
+    state = get_random_state(
+        computational_grid, cloudy_fraction=0.5, gt4py_config=gt4py_config, seed=4
+    )
+    saturation_exact, saturation = (
+        Saturation(
+            computational_grid,
+            1,
+            True,
+            yoethf,
+            yomcst,
+            es_table_order=es_table_order,
+            gt4py_config=gt4py_config,
+        )
+        for es_table_order in (0, order)
+    )
+    qsat_exact = to_numpy(saturation_exact(state)["f_qsat"].data)[..., :-1]
+    qsat = to_numpy(saturation(state)["f_qsat"].data)[..., :-1]
+
+    t = to_numpy(state["f_t"].data)[..., :-1]
+    ap = to_numpy(state["f_ap"].data)[..., :-1]
+    table = get_es_table(yoethf, yomcst)
+    alfa = np.minimum(
+        1.0,
+        ((np.clip(t, yoethf["RTICE"], yoethf["RTWAT"]) - yoethf["RTICE"]) * yoethf["RTWAT_RTICE_R"])
+        ** 2,
+    )
+    foeew = alfa * interpolate_es_table(table, t, 0, order) + (1 - alfa) * interpolate_es_table(
+        table, t, 2, order
+    )
+    qs = np.minimum(foeew / ap, 0.5)
+    qsat_replica = qs / (1 - yomcst["RETV"] * qs)
+
+    assert np.allclose(qsat, qsat_replica, rtol=1e-12, atol=0)
+    assert np.allclose(qsat, qsat_exact, rtol=tolerances[order], atol=0)
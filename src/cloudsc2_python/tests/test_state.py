@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+import numpy as np
+import pytest
+
+from cloudsc2py.state import (
+    allocate_state,
+    get_initial_state_from_npy,
+    save_initial_state,
+    update_initial_state_from_npy,
+)
+from cloudsc2py.utils.iox import NpyDirectory
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_random_state
+
+
+computational_grid = ComputationalGrid(12, 1, 15)
+
+
+def get_state():
+    """A random state with the fields of an initial state only."""
+    gt4py_config = get_gt4py_config()
+    random_state = get_random_state(
+        computational_grid, cloudy_fraction=0.5, gt4py_config=gt4py_config, seed=5
+    )
+    state = {
+        key: random_state[key]
+        for key in allocate_state(computational_grid, gt4py_config=gt4py_config)
+        if key != "time"
+    }
+    state["time"] = datetime(2000, 1, 1, 6)
+    return state
+
+
+@pytest.mark.parametrize("packed", (False, True))
+def test_npy_round_trip(tmp_path, packed):
+    state = get_state()
+    npy_directory = NpyDirectory(str(tmp_path / "state"))
+    save_initial_state(state, npy_directory)
+    assert "f5_clv" not in npy_directory.keys()
+
+    out = get_initial_state_from_npy(
+        computational_grid,
+        NpyDirectory(npy_directory.dirname),
+        gt4py_config=get_gt4py_config(),
+        packed=packed,
+    )
+    assert out["time"] == state["time"]
+    for key in npy_directory.keys():
+        assert np.array_equal(to_numpy(out[key].data), to_numpy(state[key].data)), key
+
+    # f5_clv still views f_ql and f_qi
+    assert np.array_equal(to_numpy(out["f5_clv"].data)[..., 0], to_numpy(out["f_ql"].data))
+    assert np.array_equal(to_numpy(out["f5_clv"].data)[..., 1], to_numpy(out["f_qi"].data))
+
+
+def test_npy_chunks(tmp_path):
+    state = get_state()
+    npy_directory = NpyDirectory(str(tmp_path / "state"))
+    save_initial_state(state, npy_directory)
+
+    # the columns are read chunk by chunk into a chunk-sized state
+    chunk_grid = ComputationalGrid(5, 1, 15)
+    chunk = get_initial_state_from_npy(chunk_grid, npy_directory, gt4py_config=get_gt4py_config())
+    for start in (0, 5, 10):
+        update_initial_state_from_npy(chunk, npy_directory, start=start)
+        num_cols = min(5, 12 - start)
+        for key in npy_directory.keys():
+            assert np.array_equal(
+                to_numpy(chunk[key].data)[:num_cols],
+                to_numpy(state[key].data)[start : start + num_cols],
+            ), key
+
+    with pytest.raises(RuntimeError):
+        update_initial_state_from_npy(chunk, npy_directory, start=12)
+    with pytest.raises(RuntimeError):
+        get_initial_state_from_npy(
+            ComputationalGrid(12, 1, 14), npy_directory, gt4py_config=get_gt4py_config()
+        )
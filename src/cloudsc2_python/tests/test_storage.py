@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+import gc
+import numpy as np
+import pytest
+
+from cloudsc2py.framework.storage import (
+    PackedStorage,
+    StoragePool,
+    get_storage_pool,
+    managed_temporary_storage,
+    managed_temporary_storage_pool,
+    release_data_arrays,
+)
+from cloudsc2py.state import allocate_state
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config
+
+
+computational_grid = ComputationalGrid(8, 1, 10)
+
+
+def test_storage_pool_reuse():
+    gt4py_config = get_gt4py_config()
+    storage_pool = StoragePool()
+    storage = storage_pool.acquire(
+        computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float"
+    )
+    storage[...] = 1.0
+    storage_pool.release(storage)
+    assert storage_pool.get_statistics() == {"hits": 0, "misses": 1, "available": 1, "in_use": 0}
+
+    # the storage is handed out again, and filled with zeros only on request
+    assert (
+        storage_pool.acquire(computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float")
+        is storage
+    )
+    assert np.all(storage == 1.0)
+    storage_pool.release(storage)
+    assert (
+        storage_pool.acquire(
+            computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float", zero=True
+        )
+        is storage
+    )
+    assert np.all(storage == 0.0)
+
+    # a storage with another key is allocated anew
+    other = storage_pool.acquire(
+        computational_grid, (I, J, K - 1 / 2), gt4py_config=gt4py_config, dtype="float"
+    )
+    assert other is not storage
+    assert storage_pool.get_statistics() == {"hits": 2, "misses": 2, "available": 0, "in_use": 2}
+
+    storage_pool.reset_statistics()
+    assert storage_pool.hits == storage_pool.misses == 0
+
+
+def test_storage_pool_tracking():
+    gt4py_config = get_gt4py_config()
+    storage_pool = StoragePool()
+
+    # a storage never released can be garbage collected
+    storage = storage_pool.acquire(
+        computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float"
+    )
+    assert storage_pool.get_statistics()["in_use"] == 1
+    del storage
+    gc.collect()
+    assert storage_pool.get_statistics()["in_use"] == 0
+
+    # storages not handed out by the pool, and double releases, are ignored
+    storage = storage_pool.acquire(
+        computational_grid, (I, J, K), gt4py_config=gt4py_config, dtype="float"
+    )
+    storage_pool.release(storage.copy())
+    storage_pool.release(storage[:4])
+    storage_pool.release(storage)
+    storage_pool.release(storage)
+    assert storage_pool.get_statistics()["available"] == 1
+
+
+def test_managed_temporary_storage_pool():
+    gt4py_config = get_gt4py_config()
+    previous_storage_pool = get_storage_pool()
+    with managed_temporary_storage_pool() as storage_pool:
+        assert get_storage_pool() is storage_pool
+        with managed_temporary_storage(
+            computational_grid, ((I, J, K), "float"), ((I, J), "float"), gt4py_config=gt4py_config
+        ) as (a, b):
+            assert storage_pool.get_statistics()["in_use"] == 2
+        assert storage_pool.get_statistics()["available"] == 2
+        with managed_temporary_storage(
+            computational_grid, ((I, J, K), "float"), gt4py_config=gt4py_config
+        ) as (c,):
+            assert c is a
+        assert storage_pool.hits == 1
+    assert get_storage_pool() is previous_storage_pool
+    assert storage_pool.get_statistics()["available"] == 0
+
+
+def test_release_data_arrays():
+    gt4py_config = get_gt4py_config()
+    with managed_temporary_storage_pool() as storage_pool:
+        state = allocate_state(computational_grid, gt4py_config=gt4py_config)
+        # f5_clv, f_ql and f_qi are views of a single storage
+        num_storages = len(state) - 2
+        assert storage_pool.get_statistics()["in_use"] == num_storages
+
+        release_data_arrays(state)
+        assert storage_pool.get_statistics() == {
+            "hits": 0,
+            "misses": num_storages,
+            "available": num_storages,
+            "in_use": 0,
+        }
+
+        # a later state re-uses all storages, the cloud variables included
+        allocate_state(computational_grid, gt4py_config=gt4py_config)
+        assert storage_pool.hits == num_storages
+        assert storage_pool.misses == num_storages
+
+
+def get_packed_storage(alignment=None):
+    return PackedStorage(
+        computational_grid,
+        ("f_t", "f_ql", "f_qi", "f_aph"),
+        gt4py_config=get_gt4py_config(),
+        alignment=alignment,
+    )
+
+
+def test_packed_storage_views():
+    packed_storage = get_packed_storage()
+    buffer = to_numpy(packed_storage.buffer)
+    f_t = packed_storage.get_field("f_t")
+    f_aph = packed_storage.get_field("f_aph", (I, J, K - 1 / 2))
+    f_cl = packed_storage.get_stacked_fields(("f_ql", "f_qi"))
+    assert f_aph.shape[2] == computational_grid.grids[I, J, K - 1 / 2].shape[2]
+
+    # the fields are views of the buffer, each occupying its own slot
+    f_t[...] = 1.0
+    f_aph[...] = 2.0
+    f_cl[..., 0] = 3.0
+    f_cl[..., 1] = 4.0
+    num_levels = packed_storage.num_levels
+    for slot, value in enumerate((1.0, 3.0, 4.0, 2.0)):
+        start = slot * num_levels
+        levels = f_aph.shape[2] if slot == 3 else f_t.shape[2]
+        assert np.all(buffer[:, :, start : start + levels] == value)
+    assert np.array_equal(to_numpy(packed_storage.get_field("f_ql")), to_numpy(f_cl[..., 0]))
+    assert np.array_equal(to_numpy(packed_storage.get_field("f_qi")), to_numpy(f_cl[..., 1]))
+
+    with pytest.raises(RuntimeError):
+        packed_storage.get_stacked_fields(("f_t", "f_qi"))
+
+
+def test_packed_storage_snapshot():
+    packed_storage = get_packed_storage()
+    f_t = packed_storage.get_field("f_t")
+    f_t[...] = np.random.default_rng(0).random(f_t.shape)
+    snapshot = packed_storage.snapshot()
+    reference = to_numpy(f_t).copy()
+
+    packed_storage.buffer[...] = 0.0
+    packed_storage.restore(snapshot)
+    assert np.array_equal(to_numpy(f_t), reference)
+
+    # a snapshot into a given storage
+    out = packed_storage.snapshot(out=np.zeros_like(snapshot))
+    assert np.array_equal(to_numpy(out), to_numpy(snapshot))
+
+
+def test_packed_storage_columns():
+    packed_storage = get_packed_storage()
+    f_t = packed_storage.get_field("f_t")
+    f_t[...] = np.arange(f_t.shape[0])[:, np.newaxis, np.newaxis]
+
+    columns = packed_storage.get_columns(2, 5)
+    assert columns.base is packed_storage
+    assert columns.computational_grid.grids[I, J, K].shape == (3, 1, 10)
+    assert np.all(to_numpy(columns.get_field("f_t"))[:, 0, 0] == (2, 3, 4))
+
+    # the columns share the memory of the storage
+    columns.get_field("f_t")[...] = -1.0
+    assert np.all(to_numpy(f_t)[2:5] == -1.0)
+    assert np.all(to_numpy(f_t)[5:] >= 0.0)
+
+
+def test_packed_storage_alignment():
+    itemsize = np.dtype(get_gt4py_config().dtypes.float).itemsize
+    for alignment in (0, -itemsize, itemsize + 1):
+        with pytest.raises(RuntimeError):
+            get_packed_storage(alignment)
+
+    # the slots start at multiples of the alignment
+    packed_storage = get_packed_storage(alignment=8 * itemsize)
+    assert packed_storage.num_levels % 8 == 0
+    assert packed_storage.num_levels >= computational_grid.grids[I, J, K - 1 / 2].shape[2]
+
+    with pytest.raises(RuntimeError):
+        PackedStorage(
+            computational_grid,
+            ("f_t",),
+            gt4py_config=get_gt4py_config(),
+            buffer=packed_storage.buffer,
+        )
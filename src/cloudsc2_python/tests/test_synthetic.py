@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+import numpy as np
+import pytest
+
+from cloudsc2py.synthetic import get_regime_probabilities, get_synthetic_state
+from ifs_physics_common.framework.grid import ComputationalGrid
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+reference_grid = ComputationalGrid(20, 1, 15)
+
+
+def get_reference_state():
+    state = get_random_state(
+        reference_grid, cloudy_fraction=0.5, gt4py_config=get_gt4py_config(), seed=8
+    )
+    state["time"] = datetime(2000, 1, 1)
+    return state
+
+
+def get_state(reference_state, num_cols, yoethf=None, **kwargs):
+    return get_synthetic_state(
+        ComputationalGrid(num_cols, 1, 15),
+        reference_state,
+        yoethf or get_parameters()["yoethf"],
+        gt4py_config=get_gt4py_config(),
+        **kwargs,
+    )
+
+
+def test_synthetic_state():
+    reference_state = get_reference_state()
+    state = get_state(reference_state, 50, seed=1)
+    assert state.keys() == reference_state.keys() - {"f_eta", "f_qsat"}
+    assert state["time"] == reference_state["time"]
+
+    # the same seed gives the same state
+    same_state = get_state(reference_state, 50, seed=1)
+    other_state = get_state(reference_state, 50, seed=2)
+    for key in state.keys() - {"time"}:
+        data = to_numpy(state[key].data)
+        assert np.array_equal(to_numpy(same_state[key].data), data), key
+    assert not np.array_equal(to_numpy(other_state["f_t"].data), to_numpy(state["f_t"].data))
+
+    # f_ql and f_qi are still views of f5_clv
+    f5_clv = to_numpy(state["f5_clv"].data)
+    for index, key in enumerate(("f_ql", "f_qi")):
+        assert np.shares_memory(to_numpy(state[key].data), f5_clv)
+        assert np.array_equal(to_numpy(state[key].data), f5_clv[..., index])
+
+
+def test_synthetic_state_regimes():
+    reference_state = get_reference_state()
+    # the reference columns have no cloud cover, but all have convective mass fluxes
+    assert np.all(to_numpy(reference_state["f_a"].data) == 0)
+    assert np.all(to_numpy(reference_state["f_mfu"].data)[..., :15] > 0)
+
+    state = get_state(reference_state, 4000, seed=3)
+    is_cloudy = np.any(to_numpy(state["f_a"].data)[:, 0] > 0, axis=1)
+    is_clear = np.all(to_numpy(state["f_mfu"].data)[:, 0] == 0, axis=1)
+    assert abs(is_cloudy.mean() - 0.4) < 0.03
+    assert abs(is_clear.mean() - 0.3) < 0.03
+    assert not np.any(is_cloudy & is_clear)
+    assert np.all(to_numpy(state["f5_clv"].data)[is_clear] == 0)
+
+    state = get_state(reference_state, 100, regimes={"clear": 1.0})
+    assert np.all(to_numpy(state["f_mfu"].data) == 0)
+    assert np.all(to_numpy(state["f_a"].data) == 0)
+
+    with pytest.raises(RuntimeError):
+        get_regime_probabilities({"foggy": 1.0})
+    with pytest.raises(RuntimeError):
+        get_regime_probabilities({"cloudy": 0.0})
+    names, probabilities = get_regime_probabilities({"cloudy": 1.0, "warm": 3.0})
+    assert dict(zip(names, probabilities)) == {"cloudy": 0.25, "clear": 0, "warm": 0.75, "cold": 0}
+
+
+def test_synthetic_state_mixed_phase():
+    reference_state = get_reference_state()
+
+    # with the mixed phase above all temperatures, the condensate is ice only
+    yoethf = get_parameters()["yoethf"]
+    yoethf["RTICE"] = 1000.0
+    state = get_state(reference_state, 50, yoethf=yoethf, seed=4)
+    assert np.all(to_numpy(state["f_ql"].data) == 0)
+    assert np.any(to_numpy(state["f_qi"].data) > 0)
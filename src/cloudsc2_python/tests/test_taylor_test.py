@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+import numpy as np
+
+from cloudsc2py.physics.tangent_linear.validation import BatchedTaylorTest, TaylorTest
+from ifs_physics_common.framework.grid import ComputationalGrid
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+computational_grid = ComputationalGrid(16, 1, 20)
+factor2s = tuple(float(10 ** -(i + 1)) for i in range(5))
+
+
+def run_taylor_test(cls):
+    gt4py_config = get_gt4py_config()
+    parameters = get_parameters()
+    state = get_random_state(
+        computational_grid, cloudy_fraction=0.7, gt4py_config=gt4py_config, seed=7
+    )
+    state["time"] = datetime(2000, 1, 1)
+    taylor_test = cls(
+        computational_grid,
+        0.01,
+        factor2s,
+        1,
+        True,
+        False,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        parameters["yrecld"],
+        parameters["yrecldp"],
+        parameters["yrephli"],
+        parameters["yrncl"],
+        parameters["yrphnc"],
+        gt4py_config=gt4py_config,
+    )
+    return taylor_test.run(state, timedelta(seconds=900))
+
+
+def test_batched_taylor_test():
+    norms = run_taylor_test(TaylorTest)
+    batched_norms = run_taylor_test(BatchedTaylorTest)
+    assert norms.shape == batched_norms.shape == (len(factor2s),)
+    assert np.all(norms > 0)
+    # up to the order of the summations
+    assert np.allclose(batched_norms, norms, rtol=1e-12, atol=0)
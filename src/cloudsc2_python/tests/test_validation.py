@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+import numpy as np
+
+from cloudsc2py.physics.nonlinear.microphysics import Cloudsc2NL
+from cloudsc2py.physics.nonlinear.validation import Validator
+from cloudsc2py.utils.iox import HDF5Writer
+from ifs_physics_common.framework.grid import ComputationalGrid, I, J, K
+from ifs_physics_common.utils.numpyx import to_numpy
+
+from .conftest import get_gt4py_config, get_parameters, get_random_state
+
+
+def run_cloudsc2_nl(computational_grid, precision):
+    gt4py_config = get_gt4py_config(precision=precision)
+    parameters = get_parameters(dtype=gt4py_config.dtypes.float)
+    state = get_random_state(
+        computational_grid, cloudy_fraction=0.7, gt4py_config=gt4py_config, seed=0
+    )
+    cloudsc2_nl = Cloudsc2NL(
+        computational_grid,
+        True,
+        False,
+        parameters["yoethf"],
+        parameters["yomcst"],
+        parameters["yrecld"],
+        parameters["yrecldp"],
+        parameters["yrephli"],
+        parameters["yrphnc"],
+        gt4py_config=gt4py_config,
+    )
+    tendencies, diagnostics = cloudsc2_nl(state, timedelta(seconds=900))
+    return gt4py_config, tendencies, diagnostics
+
+
+def write_reference(filename, computational_grid, tendencies, diagnostics):
+    """Write the outputs of a run as the reference fields read by ``Validator``."""
+    ni, _, nk = computational_grid.grids[I, J, K].shape
+    fields = {
+        "TENDENCY_LOC_T": tendencies["f_t"],
+        "TENDENCY_LOC_Q": tendencies["f_q"],
+        "PCOVPTOT": diagnostics["f_covptot"],
+        "PFHPSL": diagnostics["f_fhpsl"],
+        "PFHPSN": diagnostics["f_fhpsn"],
+        "PFPLSL": diagnostics["f_fplsl"],
+        "PFPLSN": diagnostics["f_fplsn"],
+    }
+    with HDF5Writer(filename, ni, nk, background=False) as writer:
+        for name, field in fields.items():
+            staggered = name.startswith("PF")
+            writer.write_field(name, to_numpy(field.data)[:, 0, : nk + staggered])
+        writer.write_field(
+            "TENDENCY_LOC_CLD",
+            np.stack(
+                [to_numpy(tendencies[key].data)[:, 0, :nk] for key in ("f_ql", "f_qi")], axis=-1
+            ),
+        )
+
+
+def test_mixed_precision(tmp_path):
+    computational_grid = ComputationalGrid(150, 1, 60)
+    filename = str(tmp_path / "reference.h5")
+    _, tendencies, diagnostics = run_cloudsc2_nl(computational_grid, "double")
+    write_reference(filename, computational_grid, tendencies, diagnostics)
+
+    gt4py_config, tendencies, diagnostics = run_cloudsc2_nl(computational_grid, "mixed")
+    validator = Validator(filename, gt4py_config.dtypes)
+    assert validator(tendencies, diagnostics) == []
+
+    # the tolerances of single precision are not enough
+    factor = Validator.mixed_precision_factor
+    validator = Validator(
+        filename, gt4py_config.dtypes, validator.atol / factor, validator.rtol / factor
+    )
+    assert validator(tendencies, diagnostics) != []